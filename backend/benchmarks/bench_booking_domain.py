@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Booking 領域模型微基準測試
+用途：比較 frozen dataclass 舊版值物件與 __slots__ + 快取新版在
+      100k 筆預約列表轉換下的 CPU 時間與記憶體配置
+
+執行：
+    python benchmarks/bench_booking_domain.py [--count 100000] [--repeat 3]
+"""
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from booking.domain.models import Booking, BookingItem, BookingStatus, Customer
+from booking.domain.value_objects import Money, Duration
+
+
+TZ = ZoneInfo("Asia/Taipei")
+
+
+# === 舊版實作（重構前的 frozen dataclass 與逐次加總），作為對照組 ===
+
+@dataclass(frozen=True)
+class LegacyMoney:
+    amount: Decimal
+    currency: str = "TWD"
+    
+    def __post_init__(self):
+        if self.amount < 0:
+            raise ValueError(f"金額不可為負數: {self.amount}")
+        if self.currency not in ["TWD", "USD", "JPY"]:
+            raise ValueError(f"不支援的幣別: {self.currency}")
+    
+    def __add__(self, other):
+        return LegacyMoney(amount=self.amount + other.amount, currency=self.currency)
+
+
+@dataclass(frozen=True)
+class LegacyDuration:
+    minutes: int
+    
+    def __post_init__(self):
+        if self.minutes < 0:
+            raise ValueError(f"時長不可為負數: {self.minutes}")
+    
+    def __add__(self, other):
+        return LegacyDuration(minutes=self.minutes + other.minutes)
+    
+    def to_timedelta(self):
+        return timedelta(minutes=self.minutes)
+
+
+@dataclass
+class LegacyBookingItem:
+    service_id: int
+    service_name: str
+    service_price: LegacyMoney
+    service_duration: LegacyDuration
+    option_ids: list[int] = field(default_factory=list)
+    option_names: list[str] = field(default_factory=list)
+    option_prices: list[LegacyMoney] = field(default_factory=list)
+    option_durations: list[LegacyDuration] = field(default_factory=list)
+    
+    def total_price(self):
+        total = self.service_price
+        for option_price in self.option_prices:
+            total = total + option_price
+        return total
+    
+    def total_duration(self):
+        total = self.service_duration
+        for option_dur in self.option_durations:
+            total = total + option_dur
+        return total
+
+
+class LegacyBooking:
+    def __init__(self, id, merchant_id, customer, staff_id, start_at, items, status):
+        self.id = id
+        self.merchant_id = merchant_id
+        self.customer = customer
+        self.staff_id = staff_id
+        self.start_at = start_at
+        self.items = items
+        self.status = status
+        self.created_at = datetime.now(timezone.utc)
+        self.updated_at = None
+        self.cancelled_at = None
+        self.completed_at = None
+        self.notes = None
+        self._validate_invariants()
+    
+    def _validate_invariants(self):
+        if len(self.items) == 0:
+            raise ValueError("預約必須至少包含一個服務項目")
+        if self.start_at.tzinfo is None:
+            raise ValueError("start_at 必須包含時區資訊")
+        calculated_end = self.start_at + self.total_duration().to_timedelta()
+        if hasattr(self, '_end_at') and self._end_at != calculated_end:
+            raise ValueError("end_at 計算錯誤")
+    
+    @property
+    def end_at(self):
+        return self.start_at + self.total_duration().to_timedelta()
+    
+    def total_price(self):
+        total = self.items[0].total_price()
+        for item in self.items[1:]:
+            total = total + item.total_price()
+        return total
+    
+    def total_duration(self):
+        total = self.items[0].total_duration()
+        for item in self.items[1:]:
+            total = total + item.total_duration()
+        return total
+
+
+# === 資料建構 ===
+
+def build_bookings(count: int, money_cls, duration_cls, item_cls, booking_factory) -> list:
+    """建立 count 筆各含兩個項目（含兩個加購選項）的預約"""
+    base = datetime(2025, 10, 16, 10, 0, tzinfo=TZ)
+    bookings = []
+    for i in range(count):
+        items = [
+            item_cls(
+                service_id=1,
+                service_name="Gel Basic",
+                service_price=money_cls(Decimal("800")),
+                service_duration=duration_cls(60),
+                option_ids=[1, 2],
+                option_names=["French", "Art"],
+                option_prices=[money_cls(Decimal("200")), money_cls(Decimal("300"))],
+                option_durations=[duration_cls(15), duration_cls(20)]
+            ),
+            item_cls(
+                service_id=2,
+                service_name="Hand Care",
+                service_price=money_cls(Decimal("500")),
+                service_duration=duration_cls(45)
+            ),
+        ]
+        bookings.append(booking_factory(
+            id=str(i),
+            merchant_id="bench-merchant",
+            customer=Customer(line_user_id=f"U{i}"),
+            staff_id=i % 20,
+            start_at=base + timedelta(minutes=30 * (i % 500)),
+            items=items,
+            status=BookingStatus.CONFIRMED
+        ))
+    return bookings
+
+
+def list_conversion(bookings: list) -> list[dict]:
+    """模擬 merchant_router.list_bookings 的列表轉換（end_at / 總計多次讀取）"""
+    result = []
+    for booking in bookings:
+        end_at = booking.end_at
+        result.append({
+            "id": booking.id,
+            "start_at": booking.start_at,
+            "end_at": end_at,
+            "total_price": booking.total_price().amount,
+            "total_duration": booking.total_duration().minutes,
+            "overlaps_next_hour": booking.end_at > booking.start_at + timedelta(hours=1),
+            "items": [
+                (item.service_id, item.total_price().amount, item.total_duration().minutes)
+                for item in booking.items
+            ],
+        })
+    return result
+
+
+def measure(label: str, func, repeat: int) -> tuple[float, int]:
+    """回傳 (最佳秒數, 峰值配置 bytes)"""
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    print(f"  {label:<32} {best * 1000:>10.1f} ms   peak {peak / 1024 / 1024:>8.1f} MiB")
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Booking 領域模型微基準測試")
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"📊 {args.count:,} 筆預約，最佳 {args.repeat} 次")
+    
+    results = {}
+    for name, money_cls, duration_cls, item_cls, factory in [
+        ("legacy", LegacyMoney, LegacyDuration, LegacyBookingItem, LegacyBooking),
+        ("current", Money, Duration, BookingItem, Booking),
+    ]:
+        print(f"\n▶ {name}")
+        hydrate = lambda: build_bookings(args.count, money_cls, duration_cls, item_cls, factory)
+        build = measure("hydrate aggregates", hydrate, args.repeat)
+        bookings = hydrate()
+        convert = measure("list conversion", lambda: list_conversion(bookings), args.repeat)
+        results[name] = (build, convert)
+        del bookings
+    
+    print("\n📈 改善幅度（current vs legacy）")
+    for index, label in enumerate(["hydrate aggregates", "list conversion"]):
+        legacy_time, legacy_peak = results["legacy"][index]
+        current_time, current_peak = results["current"][index]
+        print(
+            f"  {label:<32} CPU {legacy_time / current_time:>5.2f}x   "
+            f"alloc {(1 - current_peak / legacy_peak) * 100:>5.1f}% less"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+列表響應序列化基準測試
+用途：比較預約 / 服務列表在原本路徑（逐欄 isoformat() / float() 組 dict → FastAPI jsonable_encoder
+      → 標準庫 json）與 FastJSONResponse（orjson 直接編碼）下產生響應 body 的 CPU 時間；
+      LIFF 預約列表則比較「建立時驗證 DTO + response_model 驗證 + 序列化」與
+      「組 dict + pydantic-core 直接編碼」（PydanticJSONResponse）。
+      並確認兩者輸出的 JSON 內容相同
+
+執行：
+    python benchmarks/bench_serialization.py [--count 10000] [--repeat 5]
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from api.routers.merchant_router import _booking_row_to_dict
+from booking.application.dtos import BookingItemResponse, BookingResponse, CustomerDTO
+from booking.domain.models import Booking, BookingItem, Customer
+from booking.domain.read_models import BookingListRow
+from booking.domain.value_objects import Duration, Money
+from booking.infrastructure.routers.liff_router import _booking_to_dict
+from shared.serialization import FastJSONResponse, PydanticJSONResponse
+
+
+TZ = ZoneInfo("Asia/Taipei")
+
+
+def build_rows(count: int) -> list[BookingListRow]:
+    start = datetime(2025, 10, 28, 10, 0, tzinfo=TZ)
+    return [
+        BookingListRow(
+            id=f"00000000-0000-0000-0000-{index:012d}",
+            merchant_id="11111111-1111-1111-1111-111111111111",
+            staff_id=index % 5 + 1,
+            status="confirmed",
+            start_at=start + timedelta(minutes=30 * index),
+            end_at=start + timedelta(minutes=30 * index + 90),
+            customer={"line_user_id": f"U{index:08d}", "name": "王小明", "phone": "0912345678", "email": None},
+            items=[
+                {
+                    "service_id": 1,
+                    "service_name": "凝膠指甲",
+                    "service_price": 800.0,
+                    "service_duration_minutes": 60,
+                    "option_ids": [1],
+                    "option_names": ["卸甲"],
+                },
+                {
+                    "service_id": 2,
+                    "service_name": "手部保養",
+                    "service_price": 300.0,
+                    "service_duration_minutes": 30,
+                    "option_ids": [],
+                    "option_names": [],
+                },
+            ],
+            total_price_amount=Decimal("1100.00"),
+            total_price_currency="TWD",
+            total_duration_minutes=90,
+            notes="第一次來訪" if index % 3 == 0 else None,
+            created_at=start - timedelta(days=1, seconds=index),
+        )
+        for index in range(count)
+    ]
+
+
+def build_services(count: int) -> list[dict]:
+    return [
+        {
+            "id": index,
+            "merchant_id": "11111111-1111-1111-1111-111111111111",
+            "name": f"服務 {index}",
+            "description": "凝膠指甲（含基礎修型）",
+            "base_price": Decimal("800.00") if index % 2 else Decimal("650.50"),
+            "duration_minutes": 60,
+            "is_active": True,
+            "category": "手部",
+            "allow_stack": True,
+        }
+        for index in range(count)
+    ]
+
+
+def build_bookings(count: int) -> list[Booking]:
+    start = datetime(2025, 10, 28, 10, 0, tzinfo=TZ)
+    return [
+        Booking.create_new(
+            merchant_id="11111111-1111-1111-1111-111111111111",
+            customer=Customer(line_user_id=f"U{index:08d}", name="王小明", phone="0912345678"),
+            staff_id=index % 5 + 1,
+            start_at=start + timedelta(minutes=30 * index),
+            items=[
+                BookingItem(
+                    service_id=1,
+                    service_name="凝膠指甲",
+                    service_price=Money(Decimal("800")),
+                    service_duration=Duration(60),
+                    option_ids=[1],
+                    option_names=["卸甲"],
+                    option_prices=[Money(Decimal("100"))],
+                    option_durations=[Duration(15)]
+                ),
+            ]
+        )
+        for index in range(count)
+    ]
+
+
+# === 原本的路徑（merchant_router.list_bookings / liff_router._booking_to_response 重構前），作為對照組 ===
+
+def legacy_booking_response(booking: Booking) -> BookingResponse:
+    return BookingResponse(
+        id=booking.id,
+        merchant_id=booking.merchant_id,
+        customer=CustomerDTO(
+            line_user_id=booking.customer.line_user_id,
+            name=booking.customer.name,
+            phone=booking.customer.phone,
+            email=booking.customer.email
+        ),
+        staff_id=booking.staff_id,
+        status=booking.status.value,
+        start_at=booking.start_at,
+        end_at=booking.end_at,
+        items=[
+            BookingItemResponse(
+                service_id=item.service_id,
+                service_name=item.service_name,
+                service_price=item.service_price.amount,
+                service_duration_minutes=item.service_duration.minutes,
+                option_ids=item.option_ids,
+                option_names=item.option_names,
+                total_price=item.total_price().amount,
+                total_duration_minutes=item.total_duration().minutes
+            )
+            for item in booking.items
+        ],
+        total_price=booking.total_price().amount,
+        total_duration_minutes=booking.total_duration().minutes,
+        notes=booking.notes,
+        created_at=booking.created_at,
+        updated_at=booking.updated_at,
+        cancelled_at=booking.cancelled_at,
+        completed_at=booking.completed_at
+    )
+
+
+def legacy_model_response(adapter: TypeAdapter, models) -> bytes:
+    """FastAPI 對 response_model 的處理：驗證回傳值後以 TypeAdapter 序列化"""
+    return adapter.dump_json(adapter.validate_python(models))
+
+
+def legacy_booking_dict(row: BookingListRow) -> dict:
+    return {
+        "id": str(row.id),
+        "merchant_id": row.merchant_id,
+        "customer": row.customer,
+        "staff_id": row.staff_id,
+        "start_at": row.start_at.isoformat(),
+        "end_at": row.end_at.isoformat(),
+        "status": row.status,
+        "total_price": float(row.total_price_amount),
+        "total_duration": row.total_duration_minutes,
+        "notes": row.notes,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "items": [
+            {
+                "service_id": item["service_id"],
+                "service_name": item["service_name"],
+                "service_price": float(item["service_price"]),
+                "service_duration": item.get("service_duration_minutes") or item.get("service_duration"),
+                "option_ids": item.get("option_ids", []),
+                "option_names": item.get("option_names", []),
+            }
+            for item in row.items
+        ]
+    }
+
+
+def legacy_response(content) -> bytes:
+    """FastAPI 對未設定 response_model 的回傳值所做的處理"""
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def measure(label: str, func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    
+    print(f"  {label:<32} {best * 1000:>10.1f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列表響應序列化基準測試")
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    rows = build_rows(args.count)
+    services = build_services(args.count)
+    bookings = build_bookings(args.count)
+    response_adapter = TypeAdapter(list[BookingResponse])
+    cases = [
+        (
+            "booking list",
+            lambda: legacy_response([legacy_booking_dict(row) for row in rows]),
+            lambda: FastJSONResponse([_booking_row_to_dict(row) for row in rows]).body,
+        ),
+        (
+            "service list",
+            lambda: legacy_response(services),
+            lambda: FastJSONResponse(services).body,
+        ),
+        (
+            "liff booking list",
+            lambda: legacy_model_response(response_adapter, [legacy_booking_response(b) for b in bookings]),
+            lambda: PydanticJSONResponse([_booking_to_dict(b) for b in bookings]).body,
+        ),
+    ]
+    
+    print(f"📊 {args.count:,} 筆，最佳 {args.repeat} 次")
+    results = {}
+    for name, legacy, current in cases:
+        assert json.loads(legacy()) == json.loads(current()), f"{name}: 輸出不一致"
+        print(f"\n▶ {name}")
+        results[name] = (
+            measure("before", legacy, args.repeat),
+            measure("after", current, args.repeat),
+        )
+    
+    print("\n📈 改善幅度（after vs before）")
+    for name, (legacy_time, current_time) in results.items():
+        print(f"  {name:<32} CPU {legacy_time / current_time:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Worker 冷啟動基準測試
+用途：量測新的 Python 程序中 `import api.main`、create_app()（匯入並掛載所有路由）與
+      第一個請求（GET /health，不執行啟動事件、不連線資料庫）的耗時，
+      並以 -X importtime 列出累計匯入時間最長的模組（找出拖慢 worker 重啟 / 擴容的匯入）
+
+執行：
+    python benchmarks/bench_startup.py [--runs 5] [--top 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parent.parent / "src"
+
+# 於子程序執行（每次都是冷的直譯器）；各階段耗時以 JSON 輸出
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import api.main
+imported = time.perf_counter()
+app = api.main.create_app()
+created = time.perf_counter()
+from fastapi.testclient import TestClient
+response = TestClient(app).get("/health")
+assert response.status_code == 200, response.text
+served = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (served - created) * 1000,
+    "total_ms": (served - started) * 1000,
+    "deferred": [name for name in ("jose", "passlib", "psycopg2") if name not in sys.modules],
+}))
+"""
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    env.setdefault("PYTHONDONTWRITEBYTECODE", "0")
+    return env
+
+
+def run_probe() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        capture_output=True, text=True, env=_env(), check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list[tuple[int, str]]:
+    """-X importtime：(累計微秒, 模組) 由大到小"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main; api.main.create_app()"],
+        capture_output=True, text=True, env=_env(), check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker 冷啟動基準測試")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    
+    run_probe()  # 預熱：產生 .pyc，之後量測的是一般重啟（非首次部署）的情況
+    samples = [run_probe() for _ in range(args.runs)]
+    
+    print(f"📊 冷啟動（{args.runs} 次，中位數 / 最大）")
+    for key, label in [
+        ("import_ms", "import api.main"),
+        ("create_app_ms", "create_app()"),
+        ("first_request_ms", "first request"),
+        ("total_ms", "total"),
+    ]:
+        values = [sample[key] for sample in samples]
+        print(f"  {label:<16} {statistics.median(values):>8.1f} ms {max(values):>8.1f} ms")
+    print(f"  延遲匯入（啟動時未載入）: {', '.join(samples[-1]['deferred']) or '-'}")
+    
+    print(f"\n🐢 累計匯入時間最長的模組（前 {args.top}）")
+    for cumulative_us, module in slowest_imports(args.top):
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,9 @@ from catalog.infrastructure.orm.models import ServiceORM, ServiceOptionORM, Staf
 from merchant.infrastructure.orm.models import MerchantORM
 from billing.infrastructure.orm.models import PlanORM, SubscriptionORM
 from identity.infrastructure.orm.models import UserORM
+from notification.infrastructure.orm.models import (
+    BookingReminderORM, CampaignChunkORM, CampaignORM, MessageTemplateORM, NotificationRecordORM
+)
 
 # Alembic Config object
 config = context.config
@@ -31,7 +34,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
-
+    
     with context.begin_transaction():
         context.run_migrations()
 
@@ -43,13 +46,13 @@ def run_migrations_online() -> None:
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
-
+    
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
             target_metadata=target_metadata
         )
-
+        
         with context.begin_transaction():
             context.run_migrations()
 
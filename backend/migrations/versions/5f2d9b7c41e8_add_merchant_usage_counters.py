@@ -0,0 +1,32 @@
+"""add_merchant_usage_counters
+
+Revision ID: 5f2d9b7c41e8
+Revises: a3c8e1f2b7d4
+Create Date: 2025-10-21 09:30:41.208815
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5f2d9b7c41e8'
+down_revision = 'a3c8e1f2b7d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('merchant_usage_counters',
+    sa.Column('merchant_id', sa.UUID(as_uuid=False), nullable=False, comment='商家 ID'),
+    sa.Column('month', sa.Date(), nullable=False, comment='計數月份（當月 1 日，預設時區）'),
+    sa.Column('bookings_count', sa.Integer(), server_default=sa.text('0'), nullable=False, comment='本月建立且未取消的預約數'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False, comment='更新時間'),
+    sa.CheckConstraint('bookings_count >= 0', name='chk_usage_bookings_non_negative'),
+    sa.PrimaryKeyConstraint('merchant_id', 'month'),
+    comment='商家每月用量計數表'
+    )
+    # 既有資料請執行 scripts/reconcile_usage.py 建立當月計數
+
+
+def downgrade() -> None:
+    op.drop_table('merchant_usage_counters')
@@ -0,0 +1,40 @@
+"""add_slot_hold_columns
+
+Revision ID: a3c8e1f2b7d4
+Revises: d895eb3524af
+Create Date: 2025-10-20 10:12:05.417203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a3c8e1f2b7d4'
+down_revision = 'd895eb3524af'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 時段暫留：沿用 booking_locks 與 EXCLUDE 約束，以 expires_at 區分暫留與正式鎖定
+    op.add_column('booking_locks', sa.Column(
+        'expires_at', sa.DateTime(timezone=True), nullable=True, comment='暫留到期時間（NULL = 正式鎖定）'
+    ))
+    op.add_column('booking_locks', sa.Column(
+        'holder_id', sa.String(length=100), nullable=True, comment='暫留者（用戶 ID）'
+    ))
+    op.create_index(
+        'idx_booking_locks_hold_expiry',
+        'booking_locks',
+        ['expires_at'],
+        unique=False,
+        postgresql_where=sa.text('booking_id IS NULL')
+    )
+
+
+def downgrade() -> None:
+    # 先刪除未轉為預約的暫留，避免降版後變成永久鎖定
+    op.execute('DELETE FROM booking_locks WHERE booking_id IS NULL AND expires_at IS NOT NULL')
+    op.drop_index('idx_booking_locks_hold_expiry', table_name='booking_locks')
+    op.drop_column('booking_locks', 'holder_id')
+    op.drop_column('booking_locks', 'expires_at')
@@ -0,0 +1,52 @@
+"""add_booking_reminders
+
+Revision ID: a3c9e6f0d512
+Revises: e4b8f15c9a27
+Create Date: 2025-10-24 09:18:44.271605
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'a3c9e6f0d512'
+down_revision = 'e4b8f15c9a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('booking_reminders',
+    sa.Column('booking_id', postgresql.UUID(as_uuid=False), nullable=False, comment='預約 ID'),
+    sa.Column('offset_minutes', sa.Integer(), nullable=False, comment='預約開始前幾分鐘提醒'),
+    sa.Column('merchant_id', postgresql.UUID(as_uuid=False), nullable=False, comment='商家 ID'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='狀態: sending/sent/failed'),
+    sa.Column('error_message', sa.Text(), nullable=True, comment='發送失敗原因'),
+    sa.Column('claimed_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False, comment='取得發送權時間'),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True, comment='發送完成時間'),
+    sa.CheckConstraint("status IN ('sending', 'sent', 'failed')", name='chk_booking_reminder_status'),
+    sa.ForeignKeyConstraint(['booking_id'], ['bookings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('booking_id', 'offset_minutes'),
+    comment='預約提醒發送紀錄'
+    )
+    op.create_index(
+        'idx_booking_reminders_merchant_claimed',
+        'booking_reminders',
+        ['merchant_id', 'claimed_at'],
+        unique=False
+    )
+    # 提醒載入依開始時間範圍掃描有效預約
+    op.create_index(
+        'idx_bookings_active_start_at',
+        'bookings',
+        ['start_at'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('pending', 'confirmed')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_bookings_active_start_at', table_name='bookings')
+    op.drop_index('idx_booking_reminders_merchant_claimed', table_name='booking_reminders')
+    op.drop_table('booking_reminders')
@@ -0,0 +1,40 @@
+"""add_message_templates
+
+Revision ID: b6d2f8a41c73
+Revises: a3c9e6f0d512
+Create Date: 2025-10-24 16:02:31.508127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'b6d2f8a41c73'
+down_revision = 'a3c9e6f0d512'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('message_templates',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False, comment='模板 ID'),
+    sa.Column('merchant_id', postgresql.UUID(as_uuid=False), nullable=False, comment='商家 ID'),
+    sa.Column('template_key', sa.String(length=50), nullable=False, comment='通知類型，如 booking_confirmed'),
+    sa.Column('channel_type', sa.String(length=20), nullable=False, comment='渠道: line/email/sms'),
+    sa.Column('template', sa.Text(), nullable=False, comment='模板內容（str.format 具名變數）'),
+    sa.Column('subject', sa.String(length=200), nullable=True, comment='主旨（Email）'),
+    sa.Column('version', sa.Integer(), nullable=False, comment='版本（每次覆寫遞增）'),
+    sa.Column('is_active', sa.Boolean(), nullable=False, comment='是否啟用'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False, comment='建立時間'),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True, comment='更新時間'),
+    sa.CheckConstraint('version > 0', name='chk_message_template_version_positive'),
+    sa.ForeignKeyConstraint(['merchant_id'], ['merchants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('merchant_id', 'template_key', 'channel_type', name='uq_message_templates_merchant_key'),
+    comment='商家自訂訊息模板'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('message_templates')
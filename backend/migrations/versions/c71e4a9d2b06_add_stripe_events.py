@@ -0,0 +1,53 @@
+"""add_stripe_events
+
+Revision ID: c71e4a9d2b06
+Revises: 5f2d9b7c41e8
+Create Date: 2025-10-22 14:05:17.630942
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c71e4a9d2b06'
+down_revision = '5f2d9b7c41e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('stripe_events',
+    sa.Column('id', sa.String(length=255), nullable=False, comment='Stripe 事件 ID（evt_...）'),
+    sa.Column('type', sa.String(length=100), nullable=False, comment='事件類型，如 invoice.paid'),
+    sa.Column('stripe_subscription_id', sa.String(length=100), nullable=True, comment='事件所屬 Stripe 訂閱 ID（同訂閱的事件依序處理）'),
+    sa.Column('stripe_created_at', sa.DateTime(timezone=True), nullable=False, comment='Stripe 事件建立時間（處理順序）'),
+    sa.Column('payload', postgresql.JSON(astext_type=sa.Text()), nullable=False, comment='原始事件內容'),
+    sa.Column('status', sa.String(length=20), server_default=sa.text("'pending'"), nullable=False, comment='處理狀態: pending/processed/ignored/failed'),
+    sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False, comment='處理失敗次數'),
+    sa.Column('last_error', sa.Text(), nullable=True, comment='最近一次處理錯誤'),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False, comment='接收時間'),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True, comment='處理完成時間'),
+    sa.CheckConstraint("status IN ('pending', 'processed', 'ignored', 'failed')", name='chk_stripe_event_status'),
+    sa.PrimaryKeyConstraint('id'),
+    comment='Stripe webhook 事件收件匣'
+    )
+    op.create_index(
+        'idx_stripe_events_pending',
+        'stripe_events',
+        ['stripe_created_at', 'received_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+    op.create_index(
+        'idx_stripe_events_subscription',
+        'stripe_events',
+        ['stripe_subscription_id', 'stripe_created_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_stripe_events_subscription', table_name='stripe_events')
+    op.drop_index('idx_stripe_events_pending', table_name='stripe_events')
+    op.drop_table('stripe_events')
@@ -0,0 +1,60 @@
+"""add_campaigns
+
+Revision ID: c8e1a7d35f49
+Revises: b6d2f8a41c73
+Create Date: 2025-10-27 10:41:18.263504
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'c8e1a7d35f49'
+down_revision = 'b6d2f8a41c73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('campaigns',
+    sa.Column('id', postgresql.UUID(as_uuid=False), nullable=False, comment='活動 ID'),
+    sa.Column('merchant_id', postgresql.UUID(as_uuid=False), nullable=False, comment='商家 ID'),
+    sa.Column('message', sa.Text(), nullable=False, comment='推播訊息'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='狀態: pending/running/completed/failed'),
+    sa.Column('recipient_cursor', sa.String(length=100), nullable=True, comment='已分批的最後一個 line_user_id'),
+    sa.Column('recipients_exhausted', sa.Boolean(), nullable=False, comment='收件者是否已全部分批'),
+    sa.Column('chunk_count', sa.Integer(), nullable=False, comment='分批數'),
+    sa.Column('recipient_count', sa.Integer(), nullable=False, comment='收件者數'),
+    sa.Column('sent_count', sa.Integer(), nullable=False, comment='已送出收件者數'),
+    sa.Column('failed_count', sa.Integer(), nullable=False, comment='發送失敗收件者數'),
+    sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True, comment='執行中心跳（逾時可由其他 worker 接手）'),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False, comment='建立時間'),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True, comment='完成時間'),
+    sa.CheckConstraint("status IN ('pending', 'running', 'completed', 'failed')", name='chk_campaign_status'),
+    sa.ForeignKeyConstraint(['merchant_id'], ['merchants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    comment='LINE 推播活動'
+    )
+    op.create_index('idx_campaigns_merchant_created', 'campaigns', ['merchant_id', 'created_at'], unique=False)
+    op.create_table('campaign_chunks',
+    sa.Column('campaign_id', postgresql.UUID(as_uuid=False), nullable=False, comment='活動 ID'),
+    sa.Column('seq', sa.Integer(), nullable=False, comment='分批序號'),
+    sa.Column('recipients', sa.JSON(), nullable=False, comment='收件者 line_user_id 列表'),
+    sa.Column('recipient_count', sa.Integer(), nullable=False, comment='收件者數'),
+    sa.Column('retry_key', postgresql.UUID(as_uuid=False), nullable=False, comment='X-Line-Retry-Key（重送時 LINE 以此去重）'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='狀態: pending/sent/failed'),
+    sa.Column('attempts', sa.Integer(), nullable=False, comment='呼叫次數'),
+    sa.Column('error_message', sa.Text(), nullable=True, comment='最近一次錯誤'),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True, comment='送出時間'),
+    sa.CheckConstraint("status IN ('pending', 'sent', 'failed')", name='chk_campaign_chunk_status'),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('campaign_id', 'seq'),
+    comment='LINE 推播分批'
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('campaign_chunks')
+    op.drop_index('idx_campaigns_merchant_created', table_name='campaigns')
+    op.drop_table('campaigns')
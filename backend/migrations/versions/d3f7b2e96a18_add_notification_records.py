@@ -0,0 +1,46 @@
+"""add_notification_records
+
+Revision ID: d3f7b2e96a18
+Revises: c8e1a7d35f49
+Create Date: 2025-10-28 15:22:07.914362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'd3f7b2e96a18'
+down_revision = 'c8e1a7d35f49'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('notification_records',
+    sa.Column('id', postgresql.UUID(as_uuid=False), nullable=False, comment='記錄 ID'),
+    sa.Column('merchant_id', postgresql.UUID(as_uuid=False), nullable=False, comment='商家 ID'),
+    sa.Column('booking_id', postgresql.UUID(as_uuid=False), nullable=True, comment='預約 ID'),
+    sa.Column('recipient', sa.String(length=100), nullable=False, comment='收件者（LINE User ID / Email / 電話）'),
+    sa.Column('channel_type', sa.String(length=20), nullable=False, comment='渠道: line/email/sms'),
+    sa.Column('notification_type', sa.String(length=50), nullable=False, comment='通知類型'),
+    sa.Column('message', sa.Text(), nullable=False, comment='發送內容'),
+    sa.Column('status', sa.String(length=20), nullable=False, comment='狀態: pending/sent/failed'),
+    sa.Column('error_message', sa.Text(), nullable=True, comment='失敗原因'),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True, comment='送出時間'),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, comment='建立時間'),
+    sa.CheckConstraint("status IN ('pending', 'sent', 'failed')", name='chk_notification_record_status'),
+    sa.ForeignKeyConstraint(['merchant_id'], ['merchants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    comment='通知發送記錄'
+    )
+    op.create_index('idx_notification_records_booking', 'notification_records', ['merchant_id', 'booking_id', 'created_at'], unique=False, postgresql_where=sa.text('booking_id IS NOT NULL'))
+    op.create_index('idx_notification_records_recipient', 'notification_records', ['merchant_id', 'recipient', 'created_at'], unique=False)
+    op.create_index('idx_notification_records_created', 'notification_records', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notification_records_created', table_name='notification_records')
+    op.drop_index('idx_notification_records_recipient', table_name='notification_records')
+    op.drop_index('idx_notification_records_booking', table_name='notification_records')
+    op.drop_table('notification_records')
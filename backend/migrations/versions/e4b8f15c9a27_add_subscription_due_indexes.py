@@ -0,0 +1,38 @@
+"""add_subscription_due_indexes
+
+Revision ID: e4b8f15c9a27
+Revises: c71e4a9d2b06
+Create Date: 2025-10-23 11:42:08.915364
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8f15c9a27'
+down_revision = 'c71e4a9d2b06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 到期排程依狀態分別掃描週期結束 / 試用結束（部分索引，已取消的訂閱不佔空間）
+    op.create_index(
+        'idx_subscriptions_period_due',
+        'subscriptions',
+        ['current_period_end'],
+        unique=False,
+        postgresql_where=sa.text("status = 'active'")
+    )
+    op.create_index(
+        'idx_subscriptions_trial_due',
+        'subscriptions',
+        ['trial_end'],
+        unique=False,
+        postgresql_where=sa.text("status = 'trialing'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_subscriptions_trial_due', table_name='subscriptions')
+    op.drop_index('idx_subscriptions_period_due', table_name='subscriptions')
@@ -0,0 +1,27 @@
+"""add_stripe_event_next_attempt_at
+
+Revision ID: f2a6c9d41b83
+Revises: d3f7b2e96a18
+Create Date: 2025-10-30 10:18:46.207531
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f2a6c9d41b83'
+down_revision = 'd3f7b2e96a18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 失敗事件以指數退避重試：領取時略過 next_attempt_at 未到的事件
+    op.add_column(
+        'stripe_events',
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True, comment='失敗後下次可重試時間（指數退避；NULL = 立即可處理）')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('stripe_events', 'next_attempt_at')
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+LINE webhook 接收吞吐量基準測試
+
+以錄製的 webhook body（每個檔案一個原始 request body）或合成事件測量：
+- 簽章驗證（HMAC-SHA256，原始 bytes）
+- 放入佇列至背景 worker 分批處理完成（發布至無訂閱者的 EventBus）
+指定 --url 時改為對執行中的 API 送出已簽章請求，量測端點回應延遲
+
+用法：
+    python scripts/bench_line_webhook.py --requests 20000
+    python scripts/bench_line_webhook.py --payload recorded/*.json --merchants 50
+    python scripts/bench_line_webhook.py --url http://localhost:8000/api/v1/notifications/webhooks/line/<merchant_id> \\
+        --secret <channel secret> --requests 5000 --concurrency 100
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from notification.application.line_webhook import LineEventPublisher, LineWebhookQueue
+from notification.domain.events import LINE_EVENT_TYPES
+from notification.domain.line_service import LineMessagingService
+from shared.event_bus import EventBus
+
+
+def synthetic_body(events_per_request: int) -> bytes:
+    """合成 follow / message / postback 混合的 webhook body"""
+    now_ms = int(time.time() * 1000)
+    kinds = [
+        {"type": "follow"},
+        {"type": "message", "message": {"type": "text", "id": "1", "text": "我想預約週六下午"}},
+        {"type": "postback", "postback": {"data": "action=confirm&booking_id=b-1"}},
+    ]
+    events = []
+    for n in range(events_per_request):
+        event = dict(kinds[n % len(kinds)])
+        event.update({
+            "webhookEventId": uuid.uuid4().hex,
+            "timestamp": now_ms + n,
+            "replyToken": uuid.uuid4().hex,
+            "source": {"type": "user", "userId": f"U{uuid.uuid4().hex}"},
+            "deliveryContext": {"isRedelivery": False},
+            "mode": "active",
+        })
+        events.append(event)
+    return json.dumps({"destination": "Ubench", "events": events}).encode()
+
+
+def sign(body: bytes, secret: str) -> str:
+    return base64.b64encode(hmac.new(secret.encode(), body, hashlib.sha256).digest()).decode()
+
+
+def bench_in_process(bodies: list[bytes], secret: str, requests: int, merchants: int, workers: int):
+    signatures = [sign(body, secret) for body in bodies]
+    
+    started = time.perf_counter()
+    for n in range(requests):
+        index = n % len(bodies)
+        assert LineMessagingService.verify_webhook_signature(bodies[index], signatures[index], secret)
+    verify_elapsed = time.perf_counter() - started
+    
+    # 重複使用的 body 會被 webhookEventId 去重，published 只計首次出現的事件
+    published = [0]
+    bus = EventBus()
+    for event_type in LINE_EVENT_TYPES.values():
+        bus.subscribe(event_type, lambda event: published.__setitem__(0, published[0] + 1))
+    
+    parsed = [json.loads(body)["events"] for body in bodies]
+    webhook_queue = LineWebhookQueue(
+        LineEventPublisher(bus), workers=workers, max_pending=requests + workers
+    ).start()
+    total_events = 0
+    started = time.perf_counter()
+    for n in range(requests):
+        events = parsed[n % len(parsed)]
+        webhook_queue.submit(f"merchant-{n % merchants}", events)
+        total_events += len(events)
+    enqueue_elapsed = time.perf_counter() - started
+    webhook_queue.stop()
+    drain_elapsed = time.perf_counter() - started
+    
+    print(f"簽章驗證：{requests / verify_elapsed:,.0f} req/s（平均 {verify_elapsed / requests * 1e6:.1f}µs）")
+    print(f"放入佇列：{requests / enqueue_elapsed:,.0f} req/s")
+    print(
+        f"處理完成：{total_events:,} 個事件（去重後發布 {published[0]:,} 個）"
+        f"，{total_events / drain_elapsed:,.0f} events/s"
+    )
+
+
+async def bench_http(url: str, bodies: list[bytes], secret: str, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    
+    async with httpx.AsyncClient(timeout=30) as client:
+        async def send(n: int):
+            body = bodies[n % len(bodies)]
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(url, content=body, headers={
+                    "Content-Type": "application/json",
+                    "X-Line-Signature": sign(body, secret),
+                })
+                latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(send(n) for n in range(requests)))
+        elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    print(f"{requests / elapsed:,.0f} req/s；狀態碼 {statuses}")
+    print(
+        f"延遲 p50={latencies[len(latencies) // 2] * 1000:.1f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99)] * 1000:.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LINE webhook 接收吞吐量基準測試")
+    parser.add_argument("--payload", nargs="*", default=[], help="錄製的 webhook body 檔案")
+    parser.add_argument("--events-per-request", type=int, default=5, help="合成 body 的事件數")
+    parser.add_argument("--requests", type=int, default=10_000)
+    parser.add_argument("--merchants", type=int, default=20, help="進程內測試的商家數（分片）")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--secret", default="bench-channel-secret")
+    parser.add_argument("--url", help="對執行中的 API 送出（需使用該商家的 channel secret）")
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    
+    bodies = [Path(path).read_bytes() for path in args.payload] or [
+        synthetic_body(args.events_per_request) for _ in range(100)
+    ]
+    
+    if args.url:
+        asyncio.run(bench_http(args.url, bodies, args.secret, args.requests, args.concurrency))
+    else:
+        bench_in_process(bodies, args.secret, args.requests, args.merchants, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+處理已到期的訂閱（免費方案續訂、付費方案逾寬限期標記逾期）
+
+API 預設於背景定期執行；停用背景排程（SUBSCRIPTION_SCHEDULER_INTERVAL_SECONDS=0）時
+可改由 cron 執行本腳本，多台同時執行也不會重複處理
+
+用法：
+    python scripts/expire_subscriptions.py
+    python scripts/expire_subscriptions.py --grace-hours 0 --batch-size 100
+"""
+import argparse
+import logging
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from billing.infrastructure.subscription_scheduler import SubscriptionScheduler
+from shared.config import settings
+from shared.database import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="處理已到期的訂閱")
+    parser.add_argument("--batch-size", type=int, default=settings.subscription_scheduler_batch_size)
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=settings.subscription_grace_period_hours,
+        help="週期 / 試用結束後等待續費的小時數"
+    )
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    result = SubscriptionScheduler(
+        SessionLocal,
+        batch_size=args.batch_size,
+        grace_period=timedelta(hours=args.grace_hours)
+    ).run_once()
+    
+    print(f"✅ 續訂 {result.renewed} 筆，標記逾期 {result.past_due} 筆")
+
+
+if __name__ == "__main__":
+    main()
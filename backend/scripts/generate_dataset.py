@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+大規模合成資料產生器（效能測試 / EXPLAIN 分析用）
+
+以 PostgreSQL COPY 載入接近正式環境規模的資料：商家、訂閱、服務與加購選項、美甲師、
+營業時間、休假、預約與預約鎖定。各表的資料列先編碼為 COPY text 格式寫入記憶體緩衝，
+累積到 --flush-mb 後依外鍵順序 COPY 並提交（記憶體用量固定，不經過 ORM）
+
+資料分佈：
+- 每位美甲師每週休 1–2 天（商家公休日 + 個人排休），另有特休與每年固定的生日假；休假日不排預約
+- 預約只排在營業時間內，同一美甲師的預約時間不重疊；週末與傍晚的預約密度較高
+- 過去的預約大多為 completed，未來的預約為 confirmed / pending；各有一部分 cancelled
+- 未取消的預約各有一筆 booking_locks（符合 no_overlap_booking_locks）；已取消的預約沒有鎖定
+- 回頭客：每個商家有固定的顧客池，少數常客佔多數預約
+
+相同 --seed、規模參數與 --anchor 在空資料庫上產生完全相同的資料
+（各商家使用獨立的亂數序列，UUID 也由亂數產生）
+
+用法：
+    python scripts/generate_dataset.py --truncate                 # 預設：2,000 商家 / 20,000 美甲師 / 1,000 萬預約
+    python scripts/generate_dataset.py --merchants 50 --staff 400 --bookings 200000 --seed 7
+    python scripts/generate_dataset.py --dry-run                  # 只產生並編碼，不連線資料庫（量測產生速度）
+
+載入後可執行 scripts/reconcile_usage.py 重建當月用量計數
+"""
+import argparse
+import io
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+TZ = ZoneInfo("Asia/Taipei")
+
+# 依外鍵順序（COPY 時先載入被參照的表）
+TABLE_COLUMNS = {
+    "merchants": (
+        "id", "slug", "name", "status", "timezone", "address", "phone", "extra_data", "created_at"
+    ),
+    "subscriptions": (
+        "id", "merchant_id", "plan_id", "status", "current_period_start", "current_period_end",
+        "trial_end", "created_at", "updated_at", "cancelled_at"
+    ),
+    "services": (
+        "id", "merchant_id", "name", "category", "description", "base_price_amount",
+        "base_price_currency", "base_duration_minutes", "is_active", "allow_stack"
+    ),
+    "service_options": (
+        "id", "service_id", "name", "add_price_amount", "add_price_currency", "add_duration_minutes",
+        "is_active", "display_order"
+    ),
+    "staff": ("id", "merchant_id", "name", "email", "phone", "skills", "is_active"),
+    "staff_working_hours": ("id", "staff_id", "day_of_week", "start_time", "end_time"),
+    "staff_holidays": ("id", "staff_id", "merchant_id", "holiday_date", "name", "is_recurring"),
+    "bookings": (
+        "id", "merchant_id", "staff_id", "status", "start_at", "end_at", "customer", "items",
+        "total_price_amount", "total_price_currency", "total_duration_minutes", "notes",
+        "created_at", "updated_at", "cancelled_at", "completed_at"
+    ),
+    "booking_locks": ("id", "merchant_id", "staff_id", "start_at", "end_at", "booking_id", "created_at"),
+}
+
+# 整數主鍵（SERIAL）的表：載入後需將序列推進到 MAX(id)
+SERIAL_TABLES = ("services", "service_options", "staff", "staff_working_hours", "staff_holidays")
+
+PLANS = [
+    ("free", "免費方案", Decimal("0"), 30, 1, 5),
+    ("basic", "基礎方案", Decimal("999"), 300, 3, 20),
+    ("pro", "專業方案", Decimal("2499"), 2000, 10, 50),
+    ("enterprise", "企業方案", Decimal("6999"), 100000, 100, 500),
+]
+
+# (名稱, 分類, 價格, 分鐘, 加購選項 [(名稱, 價格, 分鐘)])
+SERVICE_TEMPLATES = [
+    ("基礎凝膠指甲", "基礎服務", 800, 60, [("法式造型", 200, 15), ("漸層", 300, 20)]),
+    ("手部保養", "保養", 600, 45, [("去角質", 150, 10)]),
+    ("足部凝膠", "基礎服務", 1000, 75, [("法式造型", 200, 15)]),
+    ("卸甲", "卸甲", 300, 30, []),
+    ("光療延甲", "延甲", 1800, 120, [("彩繪", 400, 30), ("鑲鑽", 300, 15)]),
+    ("單色凝膠", "基礎服務", 700, 60, [("貓眼", 200, 10)]),
+    ("足部保養", "保養", 900, 60, [("去角質", 150, 10)]),
+    ("造型彩繪", "造型", 1500, 90, [("立體雕花", 500, 30)]),
+]
+
+SURNAMES = "陳林黃張李王吳劉蔡楊許鄭謝郭洪曾邱廖賴周"
+GIVEN_NAMES = ["怡君", "雅婷", "詩涵", "佳穎", "欣怡", "雅雯", "宜蓁", "家瑜", "品妤", "思妤", "郁婷", "筱涵"]
+DISTRICTS = ["台北市大安區", "台北市信義區", "新北市板橋區", "台中市西屯區", "台南市東區", "高雄市苓雅區"]
+STAFF_NOTES = [None] * 8 + ["第一次來訪", "指甲較薄", "想做跟上次一樣的款式"]
+
+# 每小時的預約密度（平均約為 1；傍晚最高）
+HOUR_WEIGHTS = {
+    9: 0.5, 10: 0.6, 11: 0.8, 12: 0.9, 13: 1.0, 14: 1.1, 15: 1.1, 16: 1.0,
+    17: 1.1, 18: 1.4, 19: 1.3, 20: 0.8, 21: 0.5,
+}
+# 星期（0=Monday）的預約密度
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.85, 0.9, 1.1, 1.4, 1.3]
+
+SLOT_MINUTES = 30
+
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+class CopyText(str):
+    """已編碼為 COPY text 格式的欄位（重複使用的 JSON 只跳脫一次）"""
+
+
+def copy_value(value) -> str:
+    """Python 值 → COPY text 格式欄位（JSON / 陣列欄位由呼叫端先轉為字串）"""
+    if type(value) is CopyText:
+        return value
+    if value is None:
+        return "\\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    return str(value)
+
+
+class CopyLoader:
+    """
+    各表的 COPY 緩衝
+    
+    累積超過 flush_bytes 時依 TABLE_COLUMNS 順序 COPY 並提交；connection 為 None 時（--dry-run）只計數
+    """
+    
+    def __init__(self, connection, flush_bytes: int):
+        self.connection = connection
+        self.flush_bytes = flush_bytes
+        self.buffers = {table: io.StringIO() for table in TABLE_COLUMNS}
+        self.rows: Counter = Counter()
+        self.buffered = 0
+        self.copied_bytes = 0
+    
+    def add(self, table: str, row: tuple):
+        line = "\t".join(map(copy_value, row)) + "\n"
+        self.buffers[table].write(line)
+        self.rows[table] += 1
+        self.buffered += len(line)
+        if self.buffered >= self.flush_bytes:
+            self.flush()
+    
+    def flush(self):
+        cursor = self.connection.cursor() if self.connection is not None else None
+        for table, columns in TABLE_COLUMNS.items():
+            buffer = self.buffers[table]
+            if not buffer.tell():
+                continue
+            if cursor is not None:
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+            self.copied_bytes += buffer.tell()
+            self.buffers[table] = io.StringIO()
+        if cursor is not None:
+            cursor.close()
+            self.connection.commit()
+        self.buffered = 0
+
+
+class DatasetGenerator:
+    """依商家逐一產生資料列（每個商家使用以 seed 與商家序號建立的亂數序列）"""
+    
+    def __init__(
+        self,
+        loader: CopyLoader,
+        seed: int,
+        merchants: int,
+        staff: int,
+        bookings: int,
+        anchor: date,
+        past_days: int,
+        future_days: int,
+        plan_ids: dict[str, int],
+        id_offsets: dict[str, int],
+        holidays_per_staff: int = 8
+    ):
+        self.loader = loader
+        self.seed = seed
+        self.merchants = merchants
+        self.staff = staff
+        self.bookings = bookings
+        self.anchor = anchor
+        self.now = datetime.combine(anchor, dt_time(9, 0), tzinfo=TZ)
+        self.first_day = anchor - timedelta(days=past_days)
+        self.last_day = anchor + timedelta(days=future_days)
+        self.plan_ids = plan_ids
+        self.next_ids = dict(id_offsets)
+        self.holidays_per_staff = holidays_per_staff
+    
+    def run(self, progress_every: int = 100):
+        started = time.perf_counter()
+        for index in range(self.merchants):
+            self.generate_merchant(index)
+            if progress_every and (index + 1) % progress_every == 0:
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {index + 1:>6}/{self.merchants} 商家  "
+                    f"{self.loader.rows['bookings']:>11,} 筆預約  {elapsed:>7.1f}s"
+                )
+        self.loader.flush()
+    
+    def _next_id(self, table: str) -> int:
+        value = self.next_ids[table]
+        self.next_ids[table] = value + 1
+        return value
+    
+    @staticmethod
+    def _uuid(rng: random.Random) -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    
+    def _share(self, total: int, index: int) -> int:
+        """total 平均分給各商家（餘數給前幾個商家）"""
+        return total // self.merchants + (1 if index < total % self.merchants else 0)
+    
+    def generate_merchant(self, index: int):
+        rng = random.Random(f"{self.seed}:{index}")
+        add = self.loader.add
+        merchant_id = self._uuid(rng)
+        created_at = self.now - timedelta(days=rng.randint(30, 1500), minutes=rng.randint(0, 1439))
+        
+        add("merchants", (
+            merchant_id, f"bench-{index:05d}", f"美甲沙龍 {index:05d}",
+            "active" if rng.random() < 0.95 else "suspended", "Asia/Taipei",
+            f"{rng.choice(DISTRICTS)}{rng.randint(1, 300)}號", f"02-{rng.randint(20000000, 29999999)}",
+            "{}", created_at
+        ))
+        self._generate_subscription(rng, merchant_id, created_at)
+        
+        service_ids, combos = self._generate_services(rng, merchant_id)
+        customers = self._generate_customers(rng, max(50, self._share(self.bookings, index) // 4))
+        
+        # 商家營業時間與公休日
+        open_hour = rng.choice((10, 10, 11))
+        close_hour = open_hour + rng.choice((9, 10))
+        closed_day = rng.choice((0, 1, None))
+        
+        staff_count = max(1, self._share(self.staff, index))
+        bookings_per_staff = self._share(self.bookings, index) / staff_count
+        for _ in range(staff_count):
+            self._generate_staff(
+                rng, merchant_id, service_ids, combos, customers,
+                open_hour, close_hour, closed_day, bookings_per_staff
+            )
+    
+    def _generate_subscription(self, rng: random.Random, merchant_id: str, created_at: datetime):
+        roll = rng.random()
+        period_start = self.now - timedelta(days=rng.randint(0, 29), hours=rng.randint(0, 23))
+        trial_end = cancelled_at = None
+        if roll < 0.7:
+            status, tier = "active", rng.choice(("basic", "basic", "pro", "enterprise"))
+            period_end = period_start + timedelta(days=30)
+        elif roll < 0.8:
+            # 試用中（部分已過期，讓到期批次排程有資料可處理）
+            status, tier = "trialing", "basic"
+            trial_end = period_end = self.now + timedelta(days=rng.randint(-3, 14), hours=rng.randint(0, 23))
+            period_start = trial_end - timedelta(days=14)
+        elif roll < 0.9:
+            status, tier = "past_due", rng.choice(("basic", "pro"))
+            period_end = self.now - timedelta(days=rng.randint(1, 10))
+            period_start = period_end - timedelta(days=30)
+        else:
+            status, tier = "cancelled", rng.choice(("free", "basic"))
+            period_end = self.now - timedelta(days=rng.randint(1, 90))
+            period_start = period_end - timedelta(days=30)
+            cancelled_at = period_end
+        
+        self.loader.add("subscriptions", (
+            self._uuid(rng), merchant_id, self.plan_ids[tier], status, period_start, period_end,
+            trial_end, created_at, period_start, cancelled_at
+        ))
+    
+    def _generate_services(self, rng: random.Random, merchant_id: str) -> tuple[list[int], list[tuple]]:
+        """服務與加購選項；回傳 (服務 ID, 預約組合 [(items JSON, 價格, 分鐘)])"""
+        add = self.loader.add
+        templates = rng.sample(SERVICE_TEMPLATES, rng.randint(5, len(SERVICE_TEMPLATES)))
+        services = []
+        for name, category, price, minutes, options in templates:
+            service_id = self._next_id("services")
+            price = price + rng.choice((0, 0, 100, 200))
+            add("services", (
+                service_id, merchant_id, name, category, f"{name}服務", Decimal(price), "TWD", minutes, True, True
+            ))
+            option_rows = []
+            for order, (option_name, option_price, option_minutes) in enumerate(options):
+                option_id = self._next_id("service_options")
+                add("service_options", (
+                    option_id, service_id, option_name, Decimal(option_price), "TWD", option_minutes, True, order
+                ))
+                option_rows.append((option_id, option_name, option_price, option_minutes))
+            services.append((service_id, name, price, minutes, option_rows))
+        
+        def item(service, option=None) -> dict:
+            service_id, name, price, minutes, _ = service
+            return {
+                "service_id": service_id,
+                "service_name": name,
+                "service_price": float(price),
+                "currency": "TWD",
+                "service_duration_minutes": minutes,
+                "option_ids": [option[0]] if option else [],
+                "option_names": [option[1]] if option else [],
+                "option_prices": [float(option[2])] if option else [],
+                "option_durations_minutes": [option[3]] if option else [],
+            }
+        
+        # 組合：單一服務、服務 + 一個加購、兩個服務
+        combos = []
+        for service in services:
+            combos.append([item(service)])
+            combos.extend([item(service, option)] for option in service[4])
+        for first, second in zip(services, services[1:]):
+            combos.append([item(first), item(second)])
+        
+        encoded = []
+        for items in combos:
+            price = sum(i["service_price"] + sum(i["option_prices"]) for i in items)
+            minutes = sum(i["service_duration_minutes"] + sum(i["option_durations_minutes"]) for i in items)
+            # 時段以 30 分鐘為單位
+            minutes = -(-minutes // SLOT_MINUTES) * SLOT_MINUTES
+            encoded.append((CopyText(copy_value(json.dumps(items, ensure_ascii=False))), Decimal(int(price)), minutes))
+        return [service[0] for service in services], encoded
+    
+    def _generate_customers(self, rng: random.Random, count: int) -> list[CopyText]:
+        """顧客池（customer JSON）"""
+        return [
+            CopyText(copy_value(json.dumps({
+                "line_user_id": f"U{rng.getrandbits(128):032x}",
+                "name": rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES),
+                "phone": f"09{rng.randint(0, 99999999):08d}",
+                "email": None,
+            }, ensure_ascii=False)))
+            for _ in range(count)
+        ]
+    
+    def _generate_staff(
+        self,
+        rng: random.Random,
+        merchant_id: str,
+        service_ids: list[int],
+        combos: list[tuple],
+        customers: list[str],
+        open_hour: int,
+        close_hour: int,
+        closed_day: Optional[int],
+        target_bookings: float
+    ):
+        add = self.loader.add
+        staff_id = self._next_id("staff")
+        skills = rng.sample(service_ids, rng.randint(max(1, len(service_ids) - 3), len(service_ids)))
+        add("staff", (
+            staff_id, merchant_id, rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES),
+            f"staff{staff_id}@example.com", f"09{rng.randint(0, 99999999):08d}",
+            "{" + ",".join(map(str, sorted(skills))) + "}", rng.random() < 0.95
+        ))
+        
+        # 營業時間：商家公休日 + 個人排休
+        days_off = {closed_day} if closed_day is not None else set()
+        days_off.add(rng.choice([day for day in range(7) if day not in days_off]))
+        working_days = [day for day in range(7) if day not in days_off]
+        for day in working_days:
+            add("staff_working_hours", (
+                self._next_id("staff_working_hours"), staff_id, day,
+                dt_time(open_hour), dt_time(close_hour)
+            ))
+        
+        # 休假：特休（指定日期）+ 每年固定的生日假
+        window = (self.last_day - self.first_day).days
+        leave_days = {self.first_day + timedelta(days=rng.randrange(window)) for _ in range(self.holidays_per_staff)}
+        birthday = date(2000, rng.randint(1, 12), rng.randint(1, 28))
+        for leave_day in sorted(leave_days):
+            add("staff_holidays", (self._next_id("staff_holidays"), staff_id, merchant_id, leave_day, "特休", False))
+        add("staff_holidays", (self._next_id("staff_holidays"), staff_id, merchant_id, birthday, "生日假", True))
+        
+        # 各日接受預約的機率：b = q*S / (1 + q*(A-1)) → q = b / (S - b*(A-1))
+        # （S = 每日時段數，A = 平均預約時段數，b = 每日目標預約數）
+        open_days = sum(
+            1 for offset in range(window + 1)
+            if (self.first_day + timedelta(days=offset)).weekday() in working_days
+        ) - len(leave_days) or 1
+        slots_per_day = (close_hour - open_hour) * 60 // SLOT_MINUTES
+        average_slots = sum(minutes for _, _, minutes in combos) / len(combos) / SLOT_MINUTES
+        per_day = target_bookings / open_days
+        base_rate = per_day / max(slots_per_day - per_day * (average_slots - 1), 1e-9)
+        
+        day = self.first_day
+        while day <= self.last_day:
+            if day.weekday() in working_days and day not in leave_days and (day.month, day.day) != (birthday.month, birthday.day):
+                self._generate_day(
+                    rng, merchant_id, staff_id, combos, customers, day,
+                    open_hour, close_hour, min(1.0, base_rate * WEEKDAY_WEIGHTS[day.weekday()])
+                )
+            day += timedelta(days=1)
+    
+    def _generate_day(
+        self,
+        rng: random.Random,
+        merchant_id: str,
+        staff_id: int,
+        combos: list[tuple],
+        customers: list[str],
+        day: date,
+        open_hour: int,
+        close_hour: int,
+        rate: float
+    ):
+        """依序掃過當日時段；接受時排入一筆預約並跳到預約結束（同一美甲師不重疊）"""
+        add = self.loader.add
+        cursor = datetime.combine(day, dt_time(open_hour), tzinfo=TZ)
+        close = datetime.combine(day, dt_time(close_hour), tzinfo=TZ)
+        slot = timedelta(minutes=SLOT_MINUTES)
+        
+        while cursor + slot <= close:
+            if rng.random() >= rate * HOUR_WEIGHTS.get(cursor.hour, 1.0):
+                cursor += slot
+                continue
+            items, price, minutes = rng.choice(combos)
+            end_at = cursor + timedelta(minutes=minutes)
+            if end_at > close:
+                cursor += slot
+                continue
+            
+            booking_id = self._uuid(rng)
+            # 常客：顧客池前段被選中的機率較高
+            customer = customers[int(len(customers) * rng.random() ** 2)]
+            # 提前預約時間（小時）：指數分佈，平均約 5 天、最多 90 天；未來的預約建立於「今天」之前
+            created_at = min(
+                max(cursor - timedelta(hours=1 + rng.expovariate(1 / 120)), cursor - timedelta(days=90)),
+                self.now
+            )
+            status, cancelled_at, completed_at = self._booking_status(rng, cursor, end_at, created_at)
+            add("bookings", (
+                booking_id, merchant_id, staff_id, status, cursor, end_at, customer, items,
+                price, "TWD", minutes, rng.choice(STAFF_NOTES),
+                created_at, cancelled_at or completed_at, cancelled_at, completed_at
+            ))
+            if status != "cancelled":
+                add("booking_locks", (self._uuid(rng), merchant_id, staff_id, cursor, end_at, booking_id, created_at))
+            cursor = end_at
+    
+    def _booking_status(
+        self,
+        rng: random.Random,
+        start_at: datetime,
+        end_at: datetime,
+        created_at: datetime
+    ) -> tuple[str, Optional[datetime], Optional[datetime]]:
+        """(status, cancelled_at, completed_at)"""
+        roll = rng.random()
+        if end_at <= self.now:
+            if roll < 0.82:
+                return "completed", None, end_at
+            if roll < 0.94:
+                return "cancelled", created_at + (start_at - created_at) * rng.random(), None
+            return "confirmed", None, None  # 未到 / 未結案
+        if roll < 0.75:
+            return "confirmed", None, None
+        if roll < 0.9:
+            return "pending", None, None
+        cancelled_at = created_at + (min(start_at, self.now) - created_at) * rng.random()
+        return "cancelled", cancelled_at, None
+
+
+def prepare_database(connection, truncate: bool) -> tuple[dict[str, int], dict[str, int]]:
+    """確保方案存在；回傳 (tier → plan_id, 各整數主鍵表的起始 ID)"""
+    with connection.cursor() as cursor:
+        if truncate:
+            cursor.execute(f"TRUNCATE {', '.join(TABLE_COLUMNS)} RESTART IDENTITY CASCADE")
+        
+        for tier, name, price, max_bookings, max_staff, max_services in PLANS:
+            cursor.execute(
+                """
+                INSERT INTO plans (tier, name, description, price_amount, price_currency, billing_interval, features, is_active)
+                VALUES (%s, %s, %s, %s, 'TWD', 'month', %s, true)
+                ON CONFLICT (tier) DO NOTHING
+                """,
+                (tier, name, f"{name}（合成資料）", price, json.dumps({
+                    "max_bookings_per_month": max_bookings,
+                    "max_staff": max_staff,
+                    "max_services": max_services,
+                    "enable_line_notification": tier != "free",
+                    "enable_custom_branding": tier in ("pro", "enterprise"),
+                    "enable_analytics": tier in ("pro", "enterprise"),
+                    "support_level": "email",
+                }))
+            )
+        cursor.execute("SELECT tier, id FROM plans")
+        plan_ids = dict(cursor.fetchall())
+        
+        id_offsets = {}
+        for table in SERIAL_TABLES:
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}")
+            id_offsets[table] = cursor.fetchone()[0]
+    connection.commit()
+    return plan_ids, id_offsets
+
+
+def finish_database(connection):
+    """推進 SERIAL 序列並更新統計資訊"""
+    with connection.cursor() as cursor:
+        for table in SERIAL_TABLES:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+            )
+    connection.commit()
+    
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        for table in TABLE_COLUMNS:
+            cursor.execute(f"ANALYZE {table}")
+    connection.autocommit = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="大規模合成資料產生器（COPY）")
+    parser.add_argument("--url", help="資料庫連線字串（預設為 DATABASE_URL）")
+    parser.add_argument("--merchants", type=int, default=2_000)
+    parser.add_argument("--staff", type=int, default=20_000, help="美甲師總數（平均分給各商家）")
+    parser.add_argument("--bookings", type=int, default=10_000_000, help="目標預約總數（實際筆數依營業時間容量略有差異）")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=date.today(), help="「今天」（YYYY-MM-DD）")
+    parser.add_argument("--past-days", type=int, default=365, help="預約涵蓋的過去天數")
+    parser.add_argument("--future-days", type=int, default=60, help="預約涵蓋的未來天數")
+    parser.add_argument("--holidays-per-staff", type=int, default=8, help="每位美甲師的特休天數")
+    parser.add_argument("--flush-mb", type=float, default=32, help="COPY 緩衝大小（MB）")
+    parser.add_argument("--truncate", action="store_true", help="先清空相關資料表（TRUNCATE ... CASCADE）")
+    parser.add_argument("--dry-run", action="store_true", help="不連線資料庫，只產生並編碼資料列")
+    args = parser.parse_args()
+    
+    connection = None
+    if args.dry_run:
+        plan_ids = {tier: index for index, (tier, *_) in enumerate(PLANS, start=1)}
+        id_offsets = {table: 1 for table in SERIAL_TABLES}
+    else:
+        from shared.database import POOL_MODE_NULL, create_db_engine
+        
+        engine = create_db_engine(args.url, register_metrics=False, pool_mode=POOL_MODE_NULL)
+        connection = engine.raw_connection().dbapi_connection
+        plan_ids, id_offsets = prepare_database(connection, args.truncate)
+    
+    loader = CopyLoader(connection, flush_bytes=int(args.flush_mb * 1024 * 1024))
+    generator = DatasetGenerator(
+        loader,
+        seed=args.seed,
+        merchants=args.merchants,
+        staff=args.staff,
+        bookings=args.bookings,
+        anchor=args.anchor,
+        past_days=args.past_days,
+        future_days=args.future_days,
+        plan_ids=plan_ids,
+        id_offsets=id_offsets,
+        holidays_per_staff=args.holidays_per_staff
+    )
+    
+    print(
+        f"🌱 產生資料：{args.merchants:,} 商家 / {args.staff:,} 美甲師 / 目標 {args.bookings:,} 預約"
+        f"（seed={args.seed}, anchor={args.anchor}）"
+    )
+    started = time.perf_counter()
+    try:
+        generator.run(progress_every=max(1, args.merchants // 20))
+        if connection is not None:
+            print("📈 更新序列與統計資訊...")
+            finish_database(connection)
+    finally:
+        if connection is not None:
+            connection.close()
+    elapsed = time.perf_counter() - started
+    
+    print(f"\n✅ 完成，耗時 {elapsed:.1f}s（{loader.copied_bytes / 1024 / 1024:,.0f} MB）")
+    for table in TABLE_COLUMNS:
+        print(f"  {table:<22} {loader.rows[table]:>12,}")
+    print(f"  {loader.rows['bookings'] / elapsed:,.0f} 預約/秒")
+
+
+if __name__ == "__main__":
+    main()
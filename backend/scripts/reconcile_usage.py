@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+依 bookings 重新計算商家每月用量計數（merchant_usage_counters）
+
+用法：
+    python scripts/reconcile_usage.py                  # 校正當月
+    python scripts/reconcile_usage.py --month 2025-10
+    python scripts/reconcile_usage.py --batch-size 50  # 尖峰時段使用較小批次
+"""
+import argparse
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from billing.domain.models import usage_month
+from billing.infrastructure.usage_reconciler import UsageReconciler
+from shared.database import SessionLocal
+from shared.timezone import now_utc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重新計算商家每月預約用量")
+    parser.add_argument("--month", help="月份（YYYY-MM，預設為當月）")
+    parser.add_argument("--batch-size", type=int, default=200, help="每個交易處理的商家數")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    month = (
+        datetime.strptime(args.month, "%Y-%m").date()
+        if args.month else usage_month(now_utc())
+    )
+    corrected = UsageReconciler(SessionLocal, args.batch_size).reconcile(month)
+    
+    print(f"✅ {month:%Y-%m} 校正完成，修正 {corrected} 個商家")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+重放 Stripe webhook 事件至本機 API（壓測 webhook 接收與背景處理）
+
+以 webhook secret 簽章後並行送出；未指定檔案時產生合成的續訂風暴：
+每個訂閱依序 invoice.payment_failed → invoice.paid，並依 --duplicate-ratio 重送部分事件
+
+用法：
+    python scripts/replay_stripe_events.py --secret whsec_test --subscriptions 500
+    python scripts/replay_stripe_events.py --secret whsec_test --file events.jsonl --concurrency 100
+    python scripts/replay_stripe_events.py --url http://localhost:8000/api/v1/billing/webhooks/stripe ...
+
+合成事件的訂閱 ID 為 sub_replay_<n>，需對應 subscriptions.stripe_subscription_id 才會套用
+（否則處理器重試後標記 failed，仍可用來測量接收延遲）
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from billing.infrastructure.stripe_webhook import sign_payload
+
+
+def load_events(path: str) -> list[dict]:
+    """讀取 JSON Lines（每行一個 Stripe 事件；可由 Stripe CLI / Dashboard 匯出）"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_events(subscriptions: int, duplicate_ratio: float) -> list[dict]:
+    """產生合成續訂事件（同訂閱的事件建立時間遞增，送出順序打亂）"""
+    now = int(time.time())
+    events = []
+    for n in range(subscriptions):
+        subscription_id = f"sub_replay_{n}"
+        for offset, event_type in enumerate(("invoice.payment_failed", "invoice.paid")):
+            events.append({
+                "id": f"evt_{uuid.uuid4().hex}",
+                "object": "event",
+                "type": event_type,
+                "created": now - 60 + offset,
+                "data": {"object": {"object": "invoice", "subscription": subscription_id}},
+            })
+    
+    events += random.sample(events, int(len(events) * duplicate_ratio))
+    random.shuffle(events)
+    return events
+
+
+async def replay(url: str, secret: str, events: list[dict], concurrency: int) -> tuple[Counter, list[float]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    outcomes: Counter = Counter()
+    latencies: list[float] = []
+    
+    async with httpx.AsyncClient(timeout=30) as client:
+        async def send(event: dict):
+            payload = json.dumps(event).encode()
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(url, content=payload, headers={
+                        "Content-Type": "application/json",
+                        "Stripe-Signature": sign_payload(payload, secret),
+                    })
+                except httpx.HTTPError as e:
+                    outcomes[type(e).__name__] += 1
+                    return
+                latencies.append(time.perf_counter() - started)
+            
+            if response.status_code == 200:
+                outcomes[response.json().get("status", "ok")] += 1
+            else:
+                outcomes[f"http_{response.status_code}"] += 1
+        
+        await asyncio.gather(*(send(event) for event in events))
+    
+    return outcomes, latencies
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重放 Stripe webhook 事件")
+    parser.add_argument("--url", default="http://localhost:8000/api/v1/billing/webhooks/stripe")
+    parser.add_argument("--secret", required=True, help="Stripe webhook secret（與 STRIPE_WEBHOOK_SECRET 相同）")
+    parser.add_argument("--file", help="事件 JSON Lines 檔案（未指定時產生合成事件）")
+    parser.add_argument("--subscriptions", type=int, default=100, help="合成事件的訂閱數")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1, help="合成事件重送比例")
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    
+    events = load_events(args.file) if args.file else synthetic_events(args.subscriptions, args.duplicate_ratio)
+    
+    started = time.perf_counter()
+    outcomes, latencies = asyncio.run(replay(args.url, args.secret, events, args.concurrency))
+    elapsed = time.perf_counter() - started
+    
+    print(f"送出 {len(events)} 個事件，耗時 {elapsed:.2f}s（{len(events) / elapsed:.0f} req/s）")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome:<20} {count}")
+    if latencies:
+        print(
+            f"延遲 p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+            f"p99={percentile(latencies, 0.99) * 1000:.1f}ms "
+            f"max={max(latencies) * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
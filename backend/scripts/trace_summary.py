@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+彙總追蹤 span 檔案（OTLP/JSON），依步驟列出 p50 / p99
+
+用法：
+    TRACING_ENABLED=true uvicorn ...   # 產生 /tmp/nail-booking-spans.jsonl
+    python scripts/trace_summary.py /tmp/nail-booking-spans.jsonl
+    python scripts/trace_summary.py spans.jsonl --prefix BookingService.create_booking
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from shared.tracing import format_summary, iter_exported_spans, summarize_spans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="彙總追蹤 span 的 p50 / p99")
+    parser.add_argument("path", help="OTLP/JSON span 檔案")
+    parser.add_argument("--prefix", default="", help="只彙總名稱以此開頭的 span")
+    args = parser.parse_args()
+    
+    spans = (
+        span for span in iter_exported_spans(args.path)
+        if span["name"].startswith(args.prefix)
+    )
+    summaries = summarize_spans(spans)
+    
+    if not summaries:
+        print("⚠️  沒有符合的 span")
+        return
+    
+    print(format_summary(summaries))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,57 @@
 """
 API Gateway - FastAPI Main Application
 BFF (Backend for Frontend) 主入口
+
+create_app() 建立應用：註冊中介層、掛載 api/routers 下的所有路由、註冊背景工作的啟動 / 關閉
+- 匯入本模組不建立應用；`uvicorn api.main:app` 第一次取用 app 時才呼叫 create_app()
+  （或 `uvicorn api.main:create_app --factory`）
+- 各限界上下文的路由模組於 create_app() 內才匯入；背景工作的模組於啟動事件中才匯入
+- 資料庫引擎於啟動事件中建立（見 shared.database.get_engine）
 """
-from fastapi import FastAPI, HTTPException, Depends
+from typing import Iterable, Optional
+from fastapi import APIRouter, FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
+import importlib
 import logging
 import sys
+import threading
 from pathlib import Path
 
 # 添加 src 目錄到 Python 路徑
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from shared.database import SessionLocal
-from identity.infrastructure.repositories.sqlalchemy_user_repository import SQLAlchemyUserRepository
-from identity.application.services import PasswordService
-
-# 建立 FastAPI 應用
-app = FastAPI(
-    title="LINE 美甲預約系統 API",
-    description="基於 DDD × BDD × TDD 的多租戶預約系統",
-    version="0.1.0",
-    docs_url="/docs",
-    redoc_url="/redoc"
+from shared.config import settings
+from shared.database import READ_YOUR_WRITES_HEADER, SessionLocal
+from shared.metrics import load_peer_snapshots, metrics
+from shared.profiling import profile_store
+from shared.rate_limit import AdmissionController, create_rate_limiter, pool_wait_tracker
+from api.middleware import (
+    AdmissionControlMiddleware,
+    MetricsMiddleware,
+    ProfilingMiddleware,
+    QueryStatsMiddleware,
+    RateLimitMiddleware,
+    TracingMiddleware
 )
 
-# CORS 中介層
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",  # Admin Panel
-        "http://localhost:3001",  # Customer Booking
-        "http://localhost:3002",  # System Admin Panel
-        "https://liff.line.me",   # LINE LIFF
-    ],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+logger = logging.getLogger(__name__)
+
+API_PREFIX = "/api/v1"
+
+# 掛載於 API_PREFIX 下的路由模組（各模組的 `router`）
+ROUTER_MODULES = (
+    "api.routers.public_router",
+    "booking.infrastructure.routers.liff_router",
+    "api.routers.merchant_router",
+    "api.routers.notification_router",
+    "api.routers.billing_router",
+    "api.routers.profiling_router",
+    "api.routers.admin_router",
 )
 
+
 # === 資料模型 ===
 
 class LoginRequest(BaseModel):
@@ -62,11 +74,18 @@ def get_db():
     finally:
         db.close()
 
+
+# 認證與系統端點（各限界上下文的端點見 ROUTER_MODULES）
+router = APIRouter()
+
 # === 認證端點 ===
 
-@app.post("/api/v1/auth/login", response_model=LoginResponse, tags=["Authentication"])
+@router.post("/api/v1/auth/login", response_model=LoginResponse, tags=["Authentication"])
 async def login(request: LoginRequest, db = Depends(get_db)):
     """用戶登入"""
+    from identity.domain.auth_service import PasswordService, TokenService
+    from identity.infrastructure.repositories.sqlalchemy_user_repository import SQLAlchemyUserRepository
+    
     user_repo = SQLAlchemyUserRepository(db)
     
     # 查找用戶
@@ -103,14 +122,21 @@ async def login(request: LoginRequest, db = Depends(get_db)):
     if user.merchant_id:
         user_data["merchant_id"] = user.merchant_id
     
+    # 已掛載的路由以 JWT 驗證（identity.infrastructure.dependencies）
+    token = TokenService.create_access_token(
+        user_id=user.id,
+        merchant_id=user.merchant_id,
+        role=user.role.name.value
+    )
+    
     return LoginResponse(
         success=True,
-        token=f"jwt-token-{user.id}",  # 簡化的 token
+        token=token,
         user=user_data,
         message="登入成功"
     )
 
-@app.get("/api/v1/auth/me", tags=["Authentication"])
+@router.get("/api/v1/auth/me", tags=["Authentication"])
 async def get_current_user():
     """獲取當前用戶資訊"""
     return {
@@ -120,54 +146,9 @@ async def get_current_user():
         "role": "ADMIN"
     }
 
-# === 系統管理員端點 ===
-
-@app.get("/api/v1/admin/stats", tags=["System Admin"])
-async def get_admin_stats():
-    """獲取系統統計數據"""
-    return {
-        "total_merchants": 5,
-        "active_merchants": 4,
-        "total_bookings": 128,
-        "total_revenue": 25600.50
-    }
-
-@app.get("/api/v1/admin/merchants", tags=["System Admin"])
-async def get_merchants():
-    """獲取商家列表"""
-    return [
-        {
-            "id": "00000000-0000-0000-0000-000000000001",
-            "name": "美甲沙龍 A",
-            "slug": "nail-salon-a",
-            "email": "merchant@nailbooking.com",
-            "is_active": True,
-            "total_bookings": 45,
-            "total_revenue": 8900.00
-        },
-        {
-            "id": "00000000-0000-0000-0000-000000000002",
-            "name": "美甲沙龍 B",
-            "slug": "nail-salon-b",
-            "email": "merchant2@nailbooking.com",
-            "is_active": True,
-            "total_bookings": 32,
-            "total_revenue": 6400.00
-        },
-        {
-            "id": "00000000-0000-0000-0000-000000000003",
-            "name": "美甲沙龍 C",
-            "slug": "nail-salon-c",
-            "email": "merchant3@nailbooking.com",
-            "is_active": False,
-            "total_bookings": 18,
-            "total_revenue": 3600.00
-        }
-    ]
-
 # === 健康檢查 ===
 
-@app.get("/health", tags=["System"])
+@router.get("/health", tags=["System"])
 async def health_check():
     """健康檢查端點"""
     return {
@@ -177,7 +158,22 @@ async def health_check():
         "environment": "development"
     }
 
-@app.get("/", tags=["System"])
+@router.get("/metrics", tags=["System"], include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus 指標端點（多 worker 時合併其他 worker 的快照）"""
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    
+    peers = load_peer_snapshots(
+        settings.metrics_multiproc_dir,
+        max_age_seconds=settings.metrics_publish_interval_seconds * 3
+    )
+    return PlainTextResponse(
+        metrics.render(peers),
+        media_type="text/plain; version=0.0.4"
+    )
+
+@router.get("/", tags=["System"])
 async def root():
     """API 根路徑"""
     return {
@@ -188,10 +184,8 @@ async def root():
 
 # === 全局異常處理 ===
 
-@app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """全局異常處理"""
-    logger = logging.getLogger(__name__)
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
     return JSONResponse(
         status_code=500,
@@ -201,11 +195,242 @@ async def global_exception_handler(request, exc):
         }
     )
 
+
+# === 應用工廠 ===
+
+def _add_middleware(app: FastAPI):
+    # CORS 中介層
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:3000",  # Admin Panel
+            "http://localhost:3001",  # Customer Booking
+            "http://localhost:3002",  # System Admin Panel
+            "https://liff.line.me",   # LINE LIFF
+        ],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[READ_YOUR_WRITES_HEADER],  # read-your-writes：前端讀取後於後續請求帶回
+    )
+    
+    # 每請求查詢統計（回應標頭 + N+1 / 慢查詢 log）
+    if settings.query_stats_enabled:
+        app.add_middleware(
+            QueryStatsMiddleware,
+            n_plus_one_threshold=settings.n_plus_one_threshold
+        )
+    
+    # 連線池壅塞時拒絕公開查詢（503），保留連線給預約寫入
+    if settings.admission_control_enabled:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            controller=AdmissionController(
+                pool_wait_tracker,
+                shed_wait_seconds=settings.admission_shed_wait_ms / 1000,
+                retry_after_seconds=settings.admission_retry_after_seconds
+            )
+        )
+    
+    # 令牌桶限流（IP / 登入用戶 / 商家，429）
+    if settings.rate_limit_enabled:
+        app.add_middleware(
+            RateLimitMiddleware,
+            limiter=create_rate_limiter(),
+            trust_forwarded_for=settings.rate_limit_trust_forwarded_for
+        )
+    
+    # 請求延遲 / 處理中請求數指標
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+    
+    # 按需請求剖析（管理員標頭 X-Profile-Request 或抽樣；結果見 /admin/profiles）
+    if settings.profiling_enabled:
+        app.add_middleware(
+            ProfilingMiddleware,
+            store=profile_store,
+            sample_rate=settings.profiling_sample_rate,
+            interval_ms=settings.profiling_interval_ms
+        )
+    
+    # 請求追蹤根 span（服務層 / repository span 掛在其下，輸出至 TRACING_EXPORT_PATH）
+    if settings.tracing_enabled:
+        app.add_middleware(TracingMiddleware)
+
+
+def include_routers(app: FastAPI, modules: Iterable[str] = ROUTER_MODULES):
+    """匯入路由模組並掛載於 API_PREFIX 下"""
+    for module_name in modules:
+        app.include_router(importlib.import_module(module_name).router, prefix=API_PREFIX)
+
+
+def _register_lifecycle(app: FastAPI):
+    """背景工作的啟動 / 關閉（依註冊順序執行；模組於事件中才匯入）"""
+    
+    @app.on_event("startup")
+    async def init_database():
+        """建立資料庫引擎；pgbouncer 連線池模式：以背景存活檢查取代每次借出的 pre-ping"""
+        from shared.database import get_engine, start_pool_liveness_checker
+        
+        get_engine()
+        start_pool_liveness_checker()
+    
+    @app.on_event("startup")
+    async def start_metrics_publisher():
+        """多 worker 部署：定期發布本 worker 的指標快照"""
+        if settings.metrics_enabled and settings.metrics_multiproc_dir:
+            from shared.metrics import start_snapshot_publisher
+            
+            start_snapshot_publisher(
+                metrics,
+                settings.metrics_multiproc_dir,
+                settings.metrics_publish_interval_seconds
+            )
+    
+    @app.on_event("startup")
+    async def start_slot_hold_sweeper():
+        """背景清除已到期的時段暫留"""
+        from booking.infrastructure.hold_sweeper import start_hold_sweeper
+        
+        start_hold_sweeper()
+    
+    @app.on_event("startup")
+    async def start_subscription_expiry_scheduler():
+        """背景處理到期訂閱（多個 worker 同時執行時以 SKIP LOCKED 分工）"""
+        from billing.infrastructure.subscription_scheduler import start_subscription_scheduler
+        
+        start_subscription_scheduler()
+    
+    @app.on_event("startup")
+    async def start_stripe_event_processor():
+        """背景套用 Stripe webhook 收件匣中的事件"""
+        if settings.stripe_webhook_secret and settings.stripe_event_poll_interval_seconds > 0:
+            from billing.infrastructure.stripe_event_processor import stripe_event_processor
+            
+            stripe_event_processor.start()
+            app.state.stripe_event_processor = stripe_event_processor
+    
+    @app.on_event("startup")
+    async def start_line_webhook_workers():
+        """背景處理 LINE webhook 佇列"""
+        from notification.application.line_webhook import line_webhook_queue
+        
+        line_webhook_queue.start()
+    
+    @app.on_event("startup")
+    async def start_notification_record_writer():
+        """背景批次寫入通知記錄並清除過期記錄"""
+        from notification.infrastructure.notification_record_writer import notification_record_writer
+        
+        notification_record_writer.start()
+    
+    @app.on_event("startup")
+    async def start_booking_reminders():
+        """背景排程預約提醒（多個 worker 同時執行時以發送紀錄去重）"""
+        from notification.infrastructure.reminder_scheduler import start_reminder_scheduler
+        from shared.event_bus import event_bus
+        
+        app.state.reminder_scheduler = start_reminder_scheduler(event_bus)
+    
+    @app.on_event("startup")
+    async def start_availability_listener():
+        """多 worker 部署：LISTEN 可訂狀態通知並推播給本 worker 的 SSE 訂閱者"""
+        from booking.application.availability import availability_bridge
+        
+        if availability_bridge is not None:
+            availability_bridge.start()
+    
+    @app.on_event("shutdown")
+    async def close_availability_streams():
+        """關閉 SSE 串流（客戶端收到 resync 後自行重連）"""
+        from booking.application.availability import availability_bridge, availability_broadcaster
+        
+        availability_broadcaster.close_all()
+        if availability_bridge is not None:
+            availability_bridge.stop()
+    
+    @app.on_event("shutdown")
+    async def stop_stripe_event_processor():
+        """等待處理中的批次完成（未處理的事件留在收件匣）"""
+        processor = getattr(app.state, "stripe_event_processor", None)
+        if processor is not None:
+            processor.stop()
+    
+    @app.on_event("shutdown")
+    async def drain_line_webhook_queue():
+        """處理完已接收的 LINE 事件後停止 worker"""
+        from notification.application.line_webhook import line_webhook_queue
+        
+        line_webhook_queue.stop()
+    
+    @app.on_event("shutdown")
+    async def stop_booking_reminders():
+        """發送完已到期的提醒後停止（時間輪中的提醒於重啟後重新載入）"""
+        scheduler = getattr(app.state, "reminder_scheduler", None)
+        if scheduler is not None:
+            scheduler.stop()
+    
+    @app.on_event("shutdown")
+    async def flush_notification_records():
+        """寫入尚未寫入的通知記錄（在提醒排程停止之後，包含最後發送的提醒）"""
+        from notification.infrastructure.notification_record_writer import notification_record_writer
+        
+        notification_record_writer.stop()
+    
+    @app.on_event("shutdown")
+    async def flush_spans():
+        """寫出尚未輸出的追蹤 span"""
+        from shared.tracing import tracer
+        
+        if tracer.exporter is not None:
+            tracer.exporter.flush()
+
+
+def create_app(router_modules: Optional[Iterable[str]] = None) -> FastAPI:
+    """
+    建立 FastAPI 應用
+    
+    Args:
+        router_modules: 要掛載的路由模組（預設為 ROUTER_MODULES）
+    """
+    app = FastAPI(
+        title="LINE 美甲預約系統 API",
+        description="基於 DDD × BDD × TDD 的多租戶預約系統",
+        version="0.1.0",
+        docs_url="/docs",
+        redoc_url="/redoc"
+    )
+    
+    _add_middleware(app)
+    app.include_router(router)
+    include_routers(app, ROUTER_MODULES if router_modules is None else router_modules)
+    app.add_exception_handler(Exception, global_exception_handler)
+    _register_lifecycle(app)
+    return app
+
+
+_app: Optional[FastAPI] = None
+_app_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    # `from api.main import app` / `uvicorn api.main:app`：第一次取用時才建立應用
+    if name == "app":
+        global _app
+        if _app is None:
+            with _app_lock:
+                if _app is None:
+                    _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
-        "main:app",
+        "main:create_app",
+        factory=True,
         host="0.0.0.0",
         port=8000,
         reload=True
-    )
\ No newline at end of file
+    )
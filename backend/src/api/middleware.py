@@ -0,0 +1,372 @@
+"""
+API Gateway - Middleware
+- 每請求 SQL 查詢統計：回應標頭、請求 log 與 N+1 警告
+- 請求延遲與處理中請求數指標（/metrics）
+- 按需請求剖析（管理員標頭或抽樣）
+- 請求根 span（串接服務層 / repository 的追蹤 span）
+- 令牌桶限流（IP / 登入用戶 / 商家）與連線池感知的准入控制
+"""
+from typing import Optional
+from urllib.parse import parse_qsl
+import json
+import logging
+import math
+import random
+import re
+import time
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from identity.domain.auth_service import TokenService
+from identity.domain.models import RoleType
+from shared.metrics import (
+    ADMISSION_SHED_TOTAL,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS_IN_FLIGHT,
+    RATE_LIMITED_TOTAL
+)
+from shared.profiling import ProfileStore, profile_request
+from shared.rate_limit import AdmissionController, TokenBucketLimiter
+from shared.tracing import tracer
+from shared.query_stats import preview, track_queries
+
+logger = logging.getLogger(__name__)
+
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+PROFILE_REQUEST_HEADER = "X-Profile-Request"
+PROFILE_ID_HEADER = "X-Profile-Id"
+RATE_LIMIT_REMAINING_HEADER = "X-RateLimit-Remaining"
+
+# 不限流的端點：系統端點，以及以簽章驗證來源的 webhook（來源 IP 固定，重試突發時不可回 429）
+UNLIMITED_PATHS = frozenset({"/health", "/metrics", "/api/v1/billing/webhooks/stripe"})
+UNLIMITED_PATH_PREFIXES = ("/api/v1/notifications/webhooks/line/",)
+_PUBLIC_MERCHANT_PATH = re.compile(r"^/api/v1/public/merchants/([^/]+)")
+
+
+class QueryStatsMiddleware:
+    """
+    查詢統計中介層（純 ASGI，確保 contextvar 範圍涵蓋整個請求）
+    
+    - 回應標頭：X-DB-Query-Count / X-DB-Query-Time-Ms（統計至回應開始送出為止）
+    - 請求結束：DEBUG 記錄摘要；同一語句重複達門檻時 WARNING（疑似 N+1）
+    """
+    
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        
+        with track_queries(f"{method} {scope['path']}") as stats:
+            async def send_with_headers(message: Message):
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERY_COUNT_HEADER] = str(stats.count)
+                    headers[QUERY_TIME_HEADER] = f"{stats.total_ms:.1f}"
+                await send(message)
+            
+            await self.app(scope, receive, send_with_headers)
+        
+        # 路由比對完成後改用路由樣板（/bookings/{booking_id}），便於彙整
+        route = scope.get("route")
+        if route is not None and hasattr(route, "path"):
+            stats.route = f"{method} {route.path}"
+        
+        logger.debug(f"{stats.route}: {stats.summary()}")
+        
+        for statement, times in stats.repeated(self.n_plus_one_threshold):
+            logger.warning(
+                f"Possible N+1 on {stats.route}: {times}x {preview(statement)}"
+            )
+
+
+class MetricsMiddleware:
+    """
+    請求指標中介層（純 ASGI）
+    
+    - http_requests_in_flight：處理中的請求數
+    - http_request_duration_seconds：依 method / 路由樣板 / 狀態碼分桶
+      未比對到路由的請求（404 掃描等）一律記為 "unmatched"，避免標籤爆量
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=route.path if route is not None and hasattr(route, "path") else "unmatched",
+                status=status_code
+            )
+
+
+class ProfilingMiddleware:
+    """
+    按需請求剖析中介層（純 ASGI）
+    
+    觸發條件（任一）：
+    - 管理員（JWT role=admin）帶上 X-Profile-Request: 1
+    - 依 sample_rate 隨機抽樣
+    
+    剖析結果（CPU 取樣 + 記憶體配置差異、路由與查詢參數）於請求結束後存入
+    ProfileStore，回應標頭 X-Profile-Id 指向該份結果
+    """
+    
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore,
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0
+    ):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.interval_seconds = interval_ms / 1000
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        
+        with profile_request(self.interval_seconds) as profile:
+            if profile is None:
+                # 已有其他請求在剖析中
+                await self.app(scope, receive, send)
+                return
+            
+            profile_id = self.store.new_id()
+            status_code = 500
+            
+            async def send_with_profile_id(message: Message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id
+                await send(message)
+            
+            await self.app(scope, receive, send_with_profile_id)
+        
+        route = scope.get("route")
+        profile_meta = {
+            "method": scope["method"],
+            "route": route.path if route is not None and hasattr(route, "path") else None,
+            "path": scope["path"],
+            "query_params": dict(parse_qsl(scope.get("query_string", b"").decode("latin-1"))),
+            "status": status_code,
+            "trigger": trigger,
+        }
+        
+        try:
+            self.store.save({**profile_meta, **profile}, profile_id)
+        except OSError as e:
+            logger.warning(f"Failed to store request profile: {e}")
+            return
+        
+        logger.info(
+            f"Request profiled ({trigger}): {scope['method']} {profile_meta['route'] or scope['path']} "
+            f"{profile['duration_ms']}ms, {profile['cpu']['samples']} samples -> {profile_id}"
+        )
+    
+    def _trigger(self, scope: Scope) -> Optional[str]:
+        headers = dict(scope.get("headers") or [])
+        requested = headers.get(PROFILE_REQUEST_HEADER.lower().encode(), b"").decode()
+        if requested in ("1", "true") and _is_admin(headers):
+            return "admin"
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+
+def _token_payload(headers: dict) -> Optional[dict]:
+    """解析 Authorization: Bearer token（無效時為 None）"""
+    authorization = headers.get(b"authorization", b"").decode()
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return TokenService.decode_token(token)
+    except Exception:
+        return None
+
+
+def _is_admin(headers: dict) -> bool:
+    """驗證 Authorization: Bearer token 是否為系統管理員"""
+    payload = _token_payload(headers)
+    return payload is not None and payload.get("role") == RoleType.ADMIN.value
+
+
+async def _send_error(send: Send, status_code: int, detail: str, headers: dict):
+    """直接回應錯誤（與 HTTPException 相同的 {"detail": ...} 格式）"""
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode()
+    raw_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    raw_headers.extend((name.lower().encode(), value.encode()) for name, value in headers.items())
+    await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """
+    令牌桶限流中介層（純 ASGI）
+    
+    每個請求同時扣除三個維度的令牌：
+    - ip：客戶 IP（RATE_LIMIT_TRUST_FORWARDED_FOR 時取 X-Forwarded-For 第一個）
+    - user：Bearer token 的 sub（登入用戶 / LIFF 客戶）
+    - merchant：/api/v1/public/merchants/{slug} 的 slug，或查詢參數 merchant_id
+    任一維度不足即回 429 + Retry-After
+    """
+    
+    def __init__(self, app: ASGIApp, limiter: TokenBucketLimiter, trust_forwarded_for: bool = False):
+        self.app = app
+        self.limiter = limiter
+        self.trust_forwarded_for = trust_forwarded_for
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"  # CORS preflight
+            or scope["path"] in UNLIMITED_PATHS
+            or scope["path"].startswith(UNLIMITED_PATH_PREFIXES)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        identities = self._identities(scope)
+        if self.limiter.blocking:
+            # Redis 後端為同步 client：移至執行緒池，不阻塞 event loop；記憶體後端直接呼叫
+            limited_scope, decision = await run_in_threadpool(self.limiter.check, identities)
+        else:
+            limited_scope, decision = self.limiter.check(identities)
+        if limited_scope is not None:
+            RATE_LIMITED_TOTAL.inc(scope=limited_scope)
+            retry_after = max(math.ceil(decision.retry_after_seconds), 1)
+            await _send_error(
+                send,
+                429,
+                "請求過於頻繁，請稍後再試",
+                {"Retry-After": str(retry_after), RATE_LIMIT_REMAINING_HEADER: "0"}
+            )
+            return
+        
+        async def send_with_remaining(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[RATE_LIMIT_REMAINING_HEADER] = str(decision.remaining)
+            await send(message)
+        
+        await self.app(scope, receive, send_with_remaining)
+    
+    def _identities(self, scope: Scope) -> dict[str, Optional[str]]:
+        headers = dict(scope.get("headers") or [])
+        
+        ip = None
+        if self.trust_forwarded_for and b"x-forwarded-for" in headers:
+            ip = headers[b"x-forwarded-for"].decode().split(",")[0].strip()
+        if not ip and scope.get("client"):
+            ip = scope["client"][0]
+        
+        payload = _token_payload(headers)
+        user = payload.get("sub") if payload else None
+        
+        match = _PUBLIC_MERCHANT_PATH.match(scope["path"])
+        if match:
+            merchant = match.group(1)
+        else:
+            merchant = dict(parse_qsl(scope.get("query_string", b"").decode())).get("merchant_id")
+        
+        return {"ip": ip, "user": user, "merchant": merchant}
+
+
+class AdmissionControlMiddleware:
+    """
+    准入控制中介層（純 ASGI）
+    
+    連線池借出等待（衰減平均）超過門檻時，低優先請求（公開查詢 GET）直接回 503 + Retry-After，
+    不再佔用連線；預約寫入、LIFF 與管理端點不受影響
+    """
+    
+    def __init__(self, app: ASGIApp, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and self.controller.should_shed(scope["method"], scope["path"]):
+            ADMISSION_SHED_TOTAL.inc()
+            await _send_error(
+                send,
+                503,
+                "系統忙碌中，請稍後再試",
+                {"Retry-After": str(self.controller.retry_after_seconds)}
+            )
+            return
+        
+        await self.app(scope, receive, send)
+
+
+class TracingMiddleware:
+    """
+    請求追蹤中介層（純 ASGI）
+    
+    每個請求開啟根 span，服務層與 repository 的 span 皆掛在其下；
+    路由比對後將 span 名稱改為路由樣板（HTTP GET /bookings/{booking_id}）
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        method = scope["method"]
+        
+        with tracer.span(f"HTTP {method} {scope['path']}", **{"http.method": method}) as span:
+            async def send_with_status(message: Message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                await send(message)
+            
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                route = scope.get("route")
+                if route is not None and hasattr(route, "path"):
+                    span.name = f"HTTP {method} {route.path}"
+                    span.set_attribute("http.route", route.path)
@@ -15,7 +15,8 @@ from merchant.domain.models import Merchant
 from merchant.application.services import MerchantService
 from merchant.infrastructure.repositories.sqlalchemy_merchant_repository import SQLAlchemyMerchantRepository
 from billing.application.services import BillingService
-from billing.infrastructure.repositories.sqlalchemy_billing_repository import SQLAlchemyBillingRepository
+from billing.infrastructure.repositories.sqlalchemy_plan_repository import SQLAlchemyPlanRepository
+from billing.infrastructure.repositories.sqlalchemy_subscription_repository import SQLAlchemySubscriptionRepository
 
 router = APIRouter(prefix="/admin", tags=["System Admin"])
 
@@ -71,8 +72,7 @@ def get_merchant_service(db: Session = Depends(get_db)) -> MerchantService:
 
 def get_billing_service(db: Session = Depends(get_db)) -> BillingService:
     """Dependency: 建立 BillingService"""
-    billing_repo = SQLAlchemyBillingRepository(db)
-    return BillingService(billing_repo)
+    return BillingService(SQLAlchemySubscriptionRepository(db), SQLAlchemyPlanRepository(db))
 
 # ========== 系統統計 ==========
 
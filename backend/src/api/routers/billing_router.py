@@ -3,22 +3,35 @@ Billing Context - API Layer - Router
 訂閱與計費相關的 API 端點
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from pydantic import BaseModel
 
 from billing.application.services import BillingService
+from billing.application.status_cache import billing_status_cache, plan_catalog
 from billing.domain.models import Subscription, Plan, SubscriptionStatus
 from billing.domain.exceptions import (
     SubscriptionNotFoundError,
     NoActiveSubscriptionError,
     SubscriptionPastDueError,
     PlanNotFoundError,
-    QuotaExceededError
+    QuotaExceededError,
+    WebhookSignatureError
 )
+from shared.config import settings
 from shared.dependencies import get_db
+from shared.metrics import STRIPE_EVENTS_TOTAL
 from sqlalchemy.orm import Session
 from billing.infrastructure.repositories.sqlalchemy_subscription_repository import SQLAlchemySubscriptionRepository
 from billing.infrastructure.repositories.sqlalchemy_plan_repository import SQLAlchemyPlanRepository
+from billing.infrastructure.repositories.sqlalchemy_usage_counter_repository import SQLAlchemyUsageCounterRepository
+from billing.infrastructure.repositories.sqlalchemy_stripe_event_repository import SQLAlchemyStripeEventRepository
+from billing.infrastructure.stripe_event_processor import stripe_event_processor
+from billing.infrastructure.stripe_webhook import (
+    event_created_at,
+    event_subscription_id,
+    parse_event,
+    verify_signature
+)
 
 router = APIRouter(prefix="/billing", tags=["billing"])
 
@@ -71,7 +84,14 @@ def get_billing_service(db: Session = Depends(get_db)) -> BillingService:
     """Dependency: 建立 BillingService"""
     subscription_repo = SQLAlchemySubscriptionRepository(db)
     plan_repo = SQLAlchemyPlanRepository(db)
-    return BillingService(subscription_repo, plan_repo)
+    usage_repo = SQLAlchemyUsageCounterRepository(db)
+    return BillingService(
+        subscription_repo,
+        plan_repo,
+        status_cache=billing_status_cache,
+        plan_catalog=plan_catalog,
+        usage_repo=usage_repo
+    )
 
 
 # ========== Plan Endpoints ==========
@@ -160,7 +180,8 @@ async def get_plan(
 @router.post("/subscriptions", response_model=SubscriptionResponse, status_code=status.HTTP_201_CREATED)
 async def create_subscription(
     request: CreateSubscriptionRequest,
-    billing_service: BillingService = Depends(get_billing_service)
+    billing_service: BillingService = Depends(get_billing_service),
+    db: Session = Depends(get_db)
 ):
     """
     建立新訂閱（含試用期）
@@ -171,6 +192,8 @@ async def create_subscription(
             plan_id=request.plan_id,
             trial_days=request.trial_days
         )
+        db.commit()
+        billing_service.publish_pending_events()  # 提交後才使訂閱狀態快取失效
         
         return SubscriptionResponse(
             id=subscription.id,
@@ -255,6 +278,10 @@ async def get_subscription_status(
                 "enable_custom_branding": plan.features.enable_custom_branding,
                 "enable_analytics": plan.features.enable_analytics,
                 "support_level": plan.features.support_level
+            },
+            quota_info={
+                "bookings_this_month": billing_service.get_booking_usage(merchant_id),
+                "max_bookings_per_month": plan.features.max_bookings_per_month
             }
         )
     except NoActiveSubscriptionError:
@@ -272,13 +299,16 @@ async def get_subscription_status(
 @router.post("/subscriptions/{subscription_id}/activate", response_model=SubscriptionResponse)
 async def activate_subscription(
     subscription_id: str,
-    billing_service: BillingService = Depends(get_billing_service)
+    billing_service: BillingService = Depends(get_billing_service),
+    db: Session = Depends(get_db)
 ):
     """
     啟用訂閱（付款成功後）
     """
     try:
         subscription = billing_service.activate_subscription(subscription_id)
+        db.commit()
+        billing_service.publish_pending_events()  # 提交後才使訂閱狀態快取失效
         
         return SubscriptionResponse(
             id=subscription.id,
@@ -307,13 +337,16 @@ async def activate_subscription(
 @router.post("/subscriptions/{subscription_id}/cancel", response_model=SubscriptionResponse)
 async def cancel_subscription(
     subscription_id: str,
-    billing_service: BillingService = Depends(get_billing_service)
+    billing_service: BillingService = Depends(get_billing_service),
+    db: Session = Depends(get_db)
 ):
     """
     取消訂閱
     """
     try:
         subscription = billing_service.cancel_subscription(subscription_id)
+        db.commit()
+        billing_service.publish_pending_events()  # 提交後才使訂閱狀態快取失效
         
         return SubscriptionResponse(
             id=subscription.id,
@@ -343,11 +376,51 @@ async def cancel_subscription(
 
 @router.post("/webhooks/stripe")
 async def stripe_webhook(
-    # 這裡應該接收 Stripe 的 webhook 事件
-    # 簡化版：僅記錄日誌
+    request: Request,
+    stripe_signature: Optional[str] = Header(None, alias="Stripe-Signature"),
+    db: Session = Depends(get_db)
 ):
     """
-    接收 Stripe 付款 webhook
+    接收 Stripe webhook
+    
+    驗證簽章後寫入 stripe_events 並立即回應 200（重送的事件以 event id 去重）；
+    訂閱狀態變更由背景處理器依訂閱分組、依序套用
     """
-    # TODO: 實作 Stripe webhook 驗證與處理
+    if not settings.stripe_webhook_secret:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="未設定 Stripe webhook secret"
+        )
+    
+    payload = await request.body()
+    try:
+        verify_signature(
+            payload,
+            stripe_signature,
+            settings.stripe_webhook_secret,
+            tolerance_seconds=settings.stripe_webhook_tolerance_seconds
+        )
+        event = parse_event(payload)
+    except WebhookSignatureError as e:
+        STRIPE_EVENTS_TOTAL.inc(outcome="invalid_signature")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"無效的事件內容: {e}")
+    
+    created = SQLAlchemyStripeEventRepository(db).record(
+        event_id=event["id"],
+        event_type=event["type"],
+        stripe_subscription_id=event_subscription_id(event),
+        stripe_created_at=event_created_at(event),
+        payload=event
+    )
+    # 提交後才回應：回應 200 即代表事件已持久化，Stripe 不會再重送
+    db.commit()
+    
+    if not created:
+        STRIPE_EVENTS_TOTAL.inc(outcome="duplicate")
+        return {"status": "duplicate"}
+    
+    STRIPE_EVENTS_TOTAL.inc(outcome="received")
+    stripe_event_processor.notify()
     return {"status": "received"}
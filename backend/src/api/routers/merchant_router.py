@@ -16,6 +16,20 @@ from booking.infrastructure.repositories.sqlalchemy_booking_repository import (
 from booking.infrastructure.repositories.sqlalchemy_booking_lock_repository import (
     SQLAlchemyBookingLockRepository
 )
+from booking.infrastructure.repositories.sqlalchemy_booking_read_repository import (
+    SQLAlchemyBookingReadRepository
+)
+from billing.application.services import BillingService
+from billing.application.status_cache import billing_status_cache, plan_catalog
+from billing.infrastructure.repositories.sqlalchemy_subscription_repository import (
+    SQLAlchemySubscriptionRepository
+)
+from billing.infrastructure.repositories.sqlalchemy_plan_repository import (
+    SQLAlchemyPlanRepository
+)
+from billing.infrastructure.repositories.sqlalchemy_usage_counter_repository import (
+    SQLAlchemyUsageCounterRepository
+)
 from catalog.application.services import CatalogService
 from catalog.infrastructure.repositories.sqlalchemy_service_repository import (
     SQLAlchemyServiceRepository
@@ -24,6 +38,7 @@ from catalog.infrastructure.repositories.sqlalchemy_staff_repository import (
     SQLAlchemyStaffRepository
 )
 from shared.database import get_db
+from shared.serialization import FastJSONResponse
 from identity.infrastructure.dependencies import get_current_user
 from identity.domain.models import User
 
@@ -93,10 +108,83 @@ def get_booking_service(db: Session = Depends(get_db)) -> BookingService:
     staff_repo = SQLAlchemyStaffRepository(db)
     catalog_service = CatalogService(service_repo, staff_repo)
     
-    return BookingService(booking_repo, booking_lock_repo, catalog_service)
+    # 商家端取消同樣要歸還預約額度（與 LIFF 端相同的 Billing 組態）
+    billing_service = BillingService(
+        SQLAlchemySubscriptionRepository(db),
+        SQLAlchemyPlanRepository(db),
+        status_cache=billing_status_cache,
+        plan_catalog=plan_catalog,
+        usage_repo=SQLAlchemyUsageCounterRepository(db)
+    )
+    
+    return BookingService(
+        booking_repo,
+        booking_lock_repo,
+        catalog_service,
+        billing_service=billing_service,
+        booking_read_repo=SQLAlchemyBookingReadRepository(db)
+    )
+
+
+def _booking_item_to_dict(item: dict) -> dict:
+    return {
+        "service_id": item["service_id"],
+        "service_name": item["service_name"],
+        "service_price": float(item["service_price"]),
+        # 兼容兩種欄位名稱格式
+        "service_duration": item.get("service_duration_minutes") or item.get("service_duration"),
+        "option_ids": item.get("option_ids", []),
+        "option_names": item.get("option_names", []),
+    }
+
+
+def _booking_row_to_dict(row) -> dict:
+    """預約列表資料列 → 響應 dict（datetime 交給 FastJSONResponse 編碼）"""
+    return {
+        "id": str(row.id),
+        "merchant_id": row.merchant_id,
+        "customer": row.customer,
+        "staff_id": row.staff_id,
+        "start_at": row.start_at,
+        "end_at": row.end_at,
+        "status": row.status,
+        "total_price": float(row.total_price_amount),
+        "total_duration": row.total_duration_minutes,
+        "notes": row.notes,
+        "created_at": row.created_at,
+        "items": [_booking_item_to_dict(item) for item in row.items]
+    }
+
+
+def _booking_to_dict(booking) -> dict:
+    """Booking 聚合 → 響應 dict（欄位同預約列表，不含 created_at）"""
+    time_slot = booking.time_slot()
+    return {
+        "id": str(booking.id),
+        "merchant_id": booking.merchant_id,
+        "customer": booking.customer,
+        "staff_id": booking.staff_id,
+        "start_at": time_slot.start_at,
+        "end_at": time_slot.end_at,
+        "status": booking.status.value,
+        "total_price": float(booking.total_price().amount),
+        "total_duration": booking.total_duration().minutes,
+        "notes": booking.notes,
+        "items": [
+            {
+                "service_id": item.service_id,
+                "service_name": item.service_name,
+                "service_price": float(item.service_price.amount),
+                "service_duration": item.service_duration.minutes,
+                "option_ids": item.option_ids,
+                "option_names": item.option_names,
+            }
+            for item in booking.items
+        ]
+    }
 
 
-@router.get("/bookings")
+@router.get("/bookings", response_class=FastJSONResponse)
 async def list_bookings(
     start_date: Optional[date] = Query(None, description="開始日期"),
     end_date: Optional[date] = Query(None, description="結束日期"),
@@ -125,50 +213,19 @@ async def list_bookings(
     from booking.domain.models import BookingStatus
     status_enum = BookingStatus(status) if status else None
     
-    bookings = await booking_service.list_bookings(
+    # 讀取模型：直接查詢扁平欄位，不水合 Booking 聚合
+    rows = await booking_service.list_booking_rows(
         merchant_id=merchant_id,
         start_date=start_date,
         end_date=end_date,
-        status=status_enum
+        status=status_enum,
+        staff_id=staff_id
     )
     
-    # 如果有staff_id篩選，過濾結果
-    if staff_id:
-        bookings = [b for b in bookings if b.staff_id == staff_id]
-    
-    # 轉換為JSON可序列化格式
-    result = []
-    for booking in bookings:
-        time_slot = booking.time_slot()
-        result.append({
-            "id": str(booking.id),
-            "merchant_id": booking.merchant_id,
-            "customer": booking.customer,
-            "staff_id": booking.staff_id,
-            "start_at": time_slot.start_at.isoformat(),
-            "end_at": time_slot.end_at.isoformat(),
-            "status": booking.status.value,
-            "total_price": float(booking.total_price().amount),
-            "total_duration": booking.total_duration().minutes,
-            "notes": booking.notes,
-            "created_at": booking.created_at.isoformat() if booking.created_at else None,
-            "items": [
-                {
-                    "service_id": item.service_id,
-                    "service_name": item.service_name,
-                    "service_price": float(item.service_price.amount),
-                    "service_duration": item.service_duration.minutes,
-                    "option_ids": item.option_ids,
-                    "option_names": item.option_names,
-                }
-                for item in booking.items
-            ]
-        })
-    
-    return result
+    return FastJSONResponse([_booking_row_to_dict(row) for row in rows])
 
 
-@router.get("/services")
+@router.get("/services", response_class=FastJSONResponse)
 async def list_services(
     current_user: User = Depends(get_current_user),
     catalog_service: CatalogService = Depends(get_catalog_service)
@@ -188,7 +245,7 @@ async def list_services(
         
         services = await catalog_service.list_services(merchant_id, is_active_only=False)
         
-        return [
+        return FastJSONResponse([
             {
                 "id": service.id,
                 "merchant_id": service.merchant_id,
@@ -201,7 +258,7 @@ async def list_services(
                 "allow_stack": service.allow_stack
             }
             for service in services
-        ]
+        ])
     except HTTPException:
         raise
     except Exception as e:
@@ -211,7 +268,7 @@ async def list_services(
         )
 
 
-@router.get("/staff")
+@router.get("/staff", response_class=FastJSONResponse)
 async def list_staff(
     current_user: User = Depends(get_current_user),
     catalog_service: CatalogService = Depends(get_catalog_service)
@@ -231,7 +288,7 @@ async def list_staff(
         
         staff_list = await catalog_service.list_staff(merchant_id, is_active_only=False)
         
-        return [
+        return FastJSONResponse([
             {
                 "id": staff.id,
                 "merchant_id": staff.merchant_id,
@@ -250,7 +307,7 @@ async def list_staff(
                 ]
             }
             for staff in staff_list
-        ]
+        ])
     except HTTPException:
         raise
     except Exception as e:
@@ -412,12 +469,13 @@ async def delete_staff(
 
 # ========== Booking Update/Delete Endpoints ==========
 
-@router.put("/bookings/{booking_id}")
+@router.put("/bookings/{booking_id}", response_class=FastJSONResponse)
 async def update_booking(
     booking_id: str,
     request: dict,
     current_user: User = Depends(get_current_user),
-    booking_service: BookingService = Depends(get_booking_service)
+    booking_service: BookingService = Depends(get_booking_service),
+    db: Session = Depends(get_db)
 ):
     """
     更新預約資訊
@@ -454,34 +512,13 @@ async def update_booking(
                 # 直接更新狀態
                 booking.status = new_status
                 booking_service.booking_repo.save(booking)
+        db.commit()
+        booking_service.publish_pending_events()
         
         # 重新載入並返回
         updated_booking = booking_service.booking_repo.find_by_id(booking_id, merchant_id)
         
-        time_slot = updated_booking.time_slot()
-        return {
-            "id": str(updated_booking.id),
-            "merchant_id": updated_booking.merchant_id,
-            "customer": updated_booking.customer,
-            "staff_id": updated_booking.staff_id,
-            "start_at": time_slot.start_at.isoformat(),
-            "end_at": time_slot.end_at.isoformat(),
-            "status": updated_booking.status.value,
-            "total_price": float(updated_booking.total_price().amount),
-            "total_duration": updated_booking.total_duration().minutes,
-            "notes": updated_booking.notes,
-            "items": [
-                {
-                    "service_id": item.service_id,
-                    "service_name": item.service_name,
-                    "service_price": float(item.service_price.amount),
-                    "service_duration": item.service_duration.minutes,
-                    "option_ids": item.option_ids,
-                    "option_names": item.option_names,
-                }
-                for item in updated_booking.items
-            ]
-        }
+        return FastJSONResponse(_booking_to_dict(updated_booking))
     except HTTPException:
         raise
     except Exception as e:
@@ -495,7 +532,8 @@ async def update_booking(
 async def delete_booking(
     booking_id: str,
     current_user: User = Depends(get_current_user),
-    booking_service: BookingService = Depends(get_booking_service)
+    booking_service: BookingService = Depends(get_booking_service),
+    db: Session = Depends(get_db)
 ):
     """
     刪除預約（取消預約）
@@ -521,6 +559,8 @@ async def delete_booking(
         # 取消預約
         requester_line_id = booking.customer.line_user_id or "merchant"
         await booking_service.cancel_booking(booking_id, merchant_id, requester_line_id, "商家刪除")
+        db.commit()
+        booking_service.publish_pending_events()
         
         return None
     except ValueError as e:
@@ -598,7 +638,7 @@ async def get_business_hours(
                     business_days[day_name] = True
         
         return business_days
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -664,7 +704,7 @@ async def update_business_hours(
                     )
         
         return {"message": "營業時間設定已更新"}
-        
+    
     except HTTPException:
         raise
     except Exception as e:
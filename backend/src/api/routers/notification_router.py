@@ -3,21 +3,41 @@ Notification Context - API Layer - Router
 通知與 LINE 推播相關的 API 端點
 """
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID, uuid4
+import json
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
+from notification.application.line_webhook import ChannelSecretStore, line_webhook_queue
 from notification.application.services import NotificationService
-from notification.domain.models import NotificationType, ChannelType
+from notification.domain.line_service import LineMessagingService
+from notification.domain.models import Campaign, CampaignStatus, NotificationType, ChannelType
 from notification.domain.exceptions import (
     TemplateNotFoundError,
     TemplateRenderError,
     NotificationSendError,
     LineCredentialsNotConfiguredError
 )
+from notification.infrastructure.campaign_sender import campaign_sender
+from notification.infrastructure.notification_record_writer import notification_record_writer
+from notification.infrastructure.repositories.sqlalchemy_campaign_repository import SQLAlchemyCampaignRepository
+from notification.infrastructure.repositories.sqlalchemy_message_template_repository import (
+    SQLAlchemyMessageTemplateRepository
+)
+from notification.infrastructure.repositories.sqlalchemy_notification_record_repository import (
+    SQLAlchemyNotificationRecordRepository
+)
+from identity.domain.models import Permission, User
+from identity.infrastructure.dependencies import require_permission
 from merchant.application.services import MerchantService
 from merchant.domain.repositories import MerchantRepository
 from merchant.infrastructure.repositories.sqlalchemy_merchant_repository import SQLAlchemyMerchantRepository
+from shared.config import settings
+from shared.database import SessionLocal
 from shared.dependencies import get_db
+from shared.metrics import LINE_WEBHOOK_EVENTS_TOTAL
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
@@ -44,12 +64,19 @@ class TestNotificationRequest(BaseModel):
     recipient: str
     message: str
 
+class CreateCampaignRequest(BaseModel):
+    """建立推播活動請求 DTO"""
+    message: str
+
 
 # ========== Dependencies ==========
 
-def get_notification_service() -> NotificationService:
-    """Dependency: 建立 NotificationService"""
-    return NotificationService()
+def get_notification_service(db: Session = Depends(get_db)) -> NotificationService:
+    """Dependency: 建立 NotificationService（含商家自訂模板與通知記錄）"""
+    return NotificationService(
+        SQLAlchemyMessageTemplateRepository(db),
+        record_sink=notification_record_writer.submit
+    )
 
 def get_merchant_service(db: Session = Depends(get_db)) -> MerchantService:
     """Dependency: 建立 MerchantService"""
@@ -103,7 +130,7 @@ async def send_notification(
             success=success,
             message="通知發送成功" if success else "通知發送失敗"
         )
-        
+    
     except TemplateNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -173,7 +200,7 @@ async def test_notification(
             )
         else:
             raise LineCredentialsNotConfiguredError(request.merchant_id)
-            
+    
     except LineCredentialsNotConfiguredError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -217,15 +244,160 @@ async def list_notification_templates():
     }
 
 
+# ========== Notification Record Endpoints ==========
+
+@router.get("/records")
+def list_notification_records(
+    booking_id: Optional[UUID] = None,
+    recipient: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(require_permission(Permission.MERCHANT_READ)),
+    db: Session = Depends(get_db)
+):
+    """
+    查詢通知發送記錄（依預約或依客戶 LINE User ID）
+    
+    記錄由背景批次寫入，剛發送的通知約 1 秒後可查詢
+    """
+    if booking_id is None and not recipient:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="需指定 booking_id 或 recipient")
+    
+    repo = SQLAlchemyNotificationRecordRepository(db)
+    if booking_id is not None:
+        records = repo.find_by_booking(current_user.merchant_id, str(booking_id))[:limit]
+    else:
+        records = repo.find_by_recipient(current_user.merchant_id, recipient, limit)
+    return {"records": [record.to_dict() for record in records]}
+
+
+# ========== Campaign Endpoints ==========
+
+@router.post("/campaigns", status_code=status.HTTP_202_ACCEPTED)
+def create_campaign(
+    request: CreateCampaignRequest,
+    current_user: User = Depends(require_permission(Permission.MERCHANT_UPDATE)),
+    merchant_service: MerchantService = Depends(get_merchant_service),
+    db: Session = Depends(get_db)
+):
+    """
+    建立 LINE 推播活動（發送給商家所有曾預約的 LINE 客戶）
+    
+    於背景分批發送，以 GET /notifications/campaigns/{campaign_id} 查詢進度
+    """
+    if not current_user.merchant_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="使用者未關聯商家")
+    
+    merchant = merchant_service.get_merchant_by_id(current_user.merchant_id)
+    if not merchant.line_credentials or not merchant.line_credentials.is_configured():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"LINE 憑證未配置: {LineCredentialsNotConfiguredError(current_user.merchant_id)}"
+        )
+    
+    try:
+        campaign = Campaign(id=str(uuid4()), merchant_id=current_user.merchant_id, message=request.message)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    SQLAlchemyCampaignRepository(db).create(campaign)
+    db.commit()
+    
+    campaign_sender.start(campaign.id)
+    return campaign.to_dict()
+
+
+@router.get("/campaigns/{campaign_id}")
+def get_campaign(
+    campaign_id: UUID,
+    current_user: User = Depends(require_permission(Permission.MERCHANT_READ)),
+    db: Session = Depends(get_db)
+):
+    """查詢推播活動進度"""
+    campaign = SQLAlchemyCampaignRepository(db).find_by_id(str(campaign_id), current_user.merchant_id)
+    if campaign is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="推播活動不存在")
+    return campaign.to_dict()
+
+
+@router.post("/campaigns/{campaign_id}/resume", status_code=status.HTTP_202_ACCEPTED)
+def resume_campaign(
+    campaign_id: UUID,
+    current_user: User = Depends(require_permission(Permission.MERCHANT_UPDATE)),
+    db: Session = Depends(get_db)
+):
+    """
+    續傳中斷或有失敗分批的推播活動
+    
+    已送出的分批不會重送；執行中的活動心跳逾時前不會被重複執行
+    """
+    campaign = SQLAlchemyCampaignRepository(db).find_by_id(str(campaign_id), current_user.merchant_id)
+    if campaign is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="推播活動不存在")
+    if campaign.status == CampaignStatus.COMPLETED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="推播活動已完成")
+    
+    campaign_sender.start(campaign.id)
+    return campaign.to_dict()
+
+
 # ========== Webhook Endpoints ==========
 
-@router.post("/webhooks/line")
+def _load_channel_secret(merchant_id: str) -> Optional[str]:
+    """載入商家的 LINE channel secret（ChannelSecretStore 快取未命中時呼叫）"""
+    try:
+        UUID(merchant_id)
+    except ValueError:
+        return None
+    
+    with SessionLocal() as db:
+        merchant = SQLAlchemyMerchantRepository(db).find_by_id(merchant_id)
+    if merchant is None or merchant.line_credentials is None:
+        return None
+    return merchant.line_credentials.channel_secret
+
+
+channel_secrets = ChannelSecretStore(
+    _load_channel_secret,
+    ttl_seconds=settings.line_channel_secret_cache_ttl_seconds,
+    refresh_interval_seconds=settings.line_channel_secret_refresh_interval_seconds
+)
+
+
+@router.post("/webhooks/line/{merchant_id}")
 async def line_webhook(
-    # 這裡應該接收 LINE 的 webhook 事件
-    # 簡化版：僅記錄日誌
+    merchant_id: str,
+    request: Request,
+    x_line_signature: Optional[str] = Header(None, alias="X-Line-Signature")
 ):
     """
-    接收 LINE Bot webhook
+    接收商家 LINE 官方帳號的 webhook（Webhook URL 需帶商家 ID）
+    
+    以原始 body 驗證簽章後放入佇列並立即回應；follow / message / postback 等事件
+    由背景 worker 依商家分批發布為領域事件
     """
-    # TODO: 實作 LINE webhook 驗證與處理
+    body = await request.body()
+    
+    secret = await run_in_threadpool(channel_secrets.get, merchant_id)
+    if secret is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"商家未設定 LINE channel: {merchant_id}"
+        )
+    
+    if not LineMessagingService.verify_webhook_signature(body, x_line_signature, secret):
+        # 商家可能剛更新 channel secret：重新載入後再驗證一次（每個商家有最短重新載入間隔）
+        secret = await run_in_threadpool(channel_secrets.get, merchant_id, True)
+        if not secret or not LineMessagingService.verify_webhook_signature(body, x_line_signature, secret):
+            LINE_WEBHOOK_EVENTS_TOTAL.inc(outcome="invalid_signature")
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="簽章驗證失敗")
+    
+    try:
+        events = json.loads(body).get("events") or []
+    except (ValueError, AttributeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="無效的 webhook 內容")
+    
+    # LINE Developers「Verify」會送出空的 events
+    if events and not line_webhook_queue.submit(merchant_id, events):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="事件佇列已滿")
+    
     return {"status": "received"}
@@ -0,0 +1,81 @@
+"""
+請求剖析 API 路由
+系統管理員列出與下載按需請求剖析結果（由 ProfilingMiddleware 產生）
+"""
+
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from identity.domain.models import User, Permission
+from identity.infrastructure.dependencies import require_permission
+from shared.profiling import ProfileStore, collapsed_stacks, profile_store
+
+router = APIRouter(prefix="/admin/profiles", tags=["System Admin"])
+
+# ========== DTOs ==========
+
+class ProfileSummary(BaseModel):
+    """請求剖析摘要"""
+    id: str
+    created_at: str
+    method: Optional[str] = None
+    route: Optional[str] = None
+    path: Optional[str] = None
+    query_params: dict = {}
+    status: Optional[int] = None
+    trigger: Optional[str] = None
+    duration_ms: Optional[float] = None
+    cpu_samples: int = 0
+    peak_traced_bytes: Optional[int] = None
+
+# ========== Dependencies ==========
+
+def get_profile_store() -> ProfileStore:
+    """Dependency: 取得請求剖析結果儲存"""
+    return profile_store
+
+# ========== 請求剖析 ==========
+
+@router.get("", response_model=List[ProfileSummary])
+async def list_profiles(
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(require_permission(Permission.ADMIN_ALL)),
+    store: ProfileStore = Depends(get_profile_store)
+):
+    """
+    列出最近的請求剖析結果
+    只有系統管理員可以訪問
+    """
+    return [ProfileSummary(**summary) for summary in store.list_summaries(limit)]
+
+@router.get("/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query("json", pattern="^(json|collapsed)$"),
+    current_user: User = Depends(require_permission(Permission.ADMIN_ALL)),
+    store: ProfileStore = Depends(get_profile_store)
+):
+    """
+    下載請求剖析結果
+    
+    - format=json：完整結果（CPU 取樣、記憶體配置、路由與查詢參數）
+    - format=collapsed：collapsed stacks 文字，可直接匯入 speedscope / flamegraph.pl
+    """
+    try:
+        path = store.path(profile_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="剖析結果不存在")
+    
+    profile = store.load(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="剖析結果不存在")
+    
+    if format == "collapsed":
+        return PlainTextResponse(
+            collapsed_stacks(profile),
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.collapsed.txt"'}
+        )
+    
+    return FileResponse(path, media_type="application/json", filename=f"{profile_id}.json")
@@ -1,20 +1,29 @@
 """
 Public API Router
 公開 API（無需認證）
+
+皆為純查詢端點，Session 走唯讀庫（get_read_db）
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 from datetime import date, datetime, timedelta
 from typing import Optional
 
 from booking.application.dtos import SlotResponse
+from booking.application.availability import availability_broadcaster, availability_topic
 from booking.application.services import BookingService
+from booking.application.slot_cache import slot_cache
 from booking.infrastructure.repositories.sqlalchemy_booking_repository import (
     SQLAlchemyBookingRepository
 )
 from booking.infrastructure.repositories.sqlalchemy_booking_lock_repository import (
     SQLAlchemyBookingLockRepository
 )
+from booking.infrastructure.repositories.sqlalchemy_booking_read_repository import (
+    SQLAlchemyBookingReadRepository
+)
 from catalog.application.services import CatalogService
 from catalog.infrastructure.repositories.sqlalchemy_service_repository import (
     SQLAlchemyServiceRepository
@@ -27,7 +36,11 @@ from merchant.infrastructure.repositories.sqlalchemy_merchant_repository import
     SQLAlchemyMerchantRepository
 )
 from merchant.domain.exceptions import MerchantNotFoundError
-from shared.database import get_db
+from shared.broadcast import CLOSED, Subscription
+from shared.config import settings
+from shared.database import get_read_db, read_session_router
+from shared.exceptions import TooManySubscribersError
+from shared.serialization import FastJSONResponse
 from datetime import timezone, timedelta
 
 TZ = timezone(timedelta(hours=8))  # Asia/Taipei
@@ -36,29 +49,36 @@ TZ = timezone(timedelta(hours=8))  # Asia/Taipei
 router = APIRouter(prefix="/public", tags=["Public"])
 
 
-def get_merchant_service(db: Session = Depends(get_db)) -> MerchantService:
+def get_merchant_service(db: Session = Depends(get_read_db)) -> MerchantService:
     """Dependency: 建立 MerchantService"""
     merchant_repo = SQLAlchemyMerchantRepository(db)
     return MerchantService(merchant_repo)
 
 
-def get_catalog_service(db: Session = Depends(get_db)) -> CatalogService:
+def get_catalog_service(db: Session = Depends(get_read_db)) -> CatalogService:
     """Dependency: 建立 CatalogService"""
     service_repo = SQLAlchemyServiceRepository(db)
     staff_repo = SQLAlchemyStaffRepository(db)
     return CatalogService(service_repo, staff_repo)
 
 
-def get_booking_service_for_slots(db: Session = Depends(get_db)) -> BookingService:
+def get_booking_service_for_slots(db: Session = Depends(get_read_db)) -> BookingService:
     """Dependency: 建立 BookingService（用於時段查詢）"""
     booking_repo = SQLAlchemyBookingRepository(db)
     booking_lock_repo = SQLAlchemyBookingLockRepository(db)
+    booking_read_repo = SQLAlchemyBookingReadRepository(db)
     
     service_repo = SQLAlchemyServiceRepository(db)
     staff_repo = SQLAlchemyStaffRepository(db)
     catalog_service = CatalogService(service_repo, staff_repo)
     
-    return BookingService(booking_repo, booking_lock_repo, catalog_service)
+    return BookingService(
+        booking_repo,
+        booking_lock_repo,
+        catalog_service,
+        booking_read_repo=booking_read_repo,
+        slot_cache=slot_cache
+    )
 
 
 @router.get("/merchants/{slug}")
@@ -128,7 +148,7 @@ async def get_merchant_categories(
         )
 
 
-@router.get("/merchants/{slug}/services")
+@router.get("/merchants/{slug}/services", response_class=FastJSONResponse)
 async def get_merchant_services(
     slug: str,
     merchant_service: MerchantService = Depends(get_merchant_service),
@@ -154,7 +174,7 @@ async def get_merchant_services(
     try:
         services = await catalog_service.list_services(merchant.id, is_active_only=True)
         
-        return [
+        return FastJSONResponse([
             {
                 "id": service.id,
                 "merchant_id": service.merchant_id,
@@ -166,7 +186,7 @@ async def get_merchant_services(
                 "category": service.category
             }
             for service in services
-        ]
+        ])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -174,7 +194,7 @@ async def get_merchant_services(
         )
 
 
-@router.get("/merchants/{slug}/staff")
+@router.get("/merchants/{slug}/staff", response_class=FastJSONResponse)
 async def get_merchant_staff(
     slug: str,
     merchant_service: MerchantService = Depends(get_merchant_service),
@@ -200,7 +220,7 @@ async def get_merchant_staff(
     try:
         staff_list = await catalog_service.list_staff(merchant.id, is_active_only=True)
         
-        return [
+        return FastJSONResponse([
             {
                 "id": staff.id,
                 "merchant_id": staff.merchant_id,
@@ -211,7 +231,7 @@ async def get_merchant_staff(
                 "skills": staff.skills
             }
             for staff in staff_list
-        ]
+        ])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -291,6 +311,77 @@ async def get_available_slots(
         )
 
 
+@router.get("/merchants/{slug}/availability/stream")
+async def stream_availability(
+    slug: str,
+    request: Request,
+    staff_id: int = Query(..., description="員工 ID"),
+    target_date: date = Query(..., description="目標日期（YYYY-MM-DD）")
+):
+    """
+    可訂狀態推播（Server-Sent Events）
+    
+    - **slug**: 商家 slug
+    - **staff_id**: 員工 ID
+    - **target_date**: 目標日期（YYYY-MM-DD）
+    
+    事件：
+    - `availability`：{"type": "booked" | "held" | "released", "start_time", "end_time", ...}，
+      與該區間重疊的時段改為不可訂 / 重新查詢
+    - `resync`：推播中斷（連線過慢或服務重啟），請重新查詢 /slots 後再訂閱
+    - 每 SSE_HEARTBEAT_SECONDS 秒送出註解行（: ping）保持連線
+    
+    連線數超過上限時回 503 + Retry-After
+    """
+    # 只在建立連線時查詢商家；串流期間不佔用資料庫連線
+    db = read_session_router.open(request)
+    try:
+        merchant = MerchantService(SQLAlchemyMerchantRepository(db)).get_merchant_by_slug(slug)
+    except MerchantNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"商家不存在: {slug}"
+        )
+    finally:
+        db.close()
+    
+    try:
+        subscription = availability_broadcaster.subscribe(
+            availability_topic(merchant.id, staff_id, target_date)
+        )
+    except TooManySubscribersError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="推播連線數已達上限，請稍後再試",
+            headers={"Retry-After": "5"}
+        )
+    
+    return StreamingResponse(
+        _availability_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(subscription.close)  # 串流未開始即斷線時也釋放訂閱
+    )
+
+
+async def _availability_events(subscription: Subscription):
+    """SSE 串流：推播訊息、心跳與 resync"""
+    try:
+        yield "retry: 3000\n\n"
+        yield "event: ready\ndata: {}\n\n"
+        while True:
+            message = await subscription.get(timeout=settings.sse_heartbeat_seconds)
+            if message is None:
+                yield ": ping\n\n"
+            elif message is CLOSED:
+                yield "event: resync\ndata: {}\n\n"
+                return
+            else:
+                yield f"event: availability\ndata: {message}\n\n"
+    finally:
+        subscription.close()
+
+
 @router.get("/merchants/{slug}/holidays")
 async def get_merchant_holidays(
     slug: str,
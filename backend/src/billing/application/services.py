@@ -5,8 +5,10 @@ BillingService 協調訂閱與計費邏輯
 from typing import Optional
 from datetime import datetime, timedelta, timezone as dt_timezone
 
-from billing.domain.models import Subscription, Plan, SubscriptionStatus, PlanTier
-from billing.domain.repositories import SubscriptionRepository, PlanRepository
+from billing.domain.models import Subscription, Plan, SubscriptionStatus, PlanTier, usage_month
+from billing.domain.repositories import SubscriptionRepository, PlanRepository, UsageCounterRepository
+from billing.application.status_cache import BillingStatus, BillingStatusCache, PlanCatalog
+from billing.domain.events import SubscriptionStatusChangedEvent
 from billing.domain.exceptions import (
     SubscriptionNotFoundError,
     NoActiveSubscriptionError,
@@ -14,8 +16,20 @@ from billing.domain.exceptions import (
     PlanNotFoundError,
     QuotaExceededError
 )
+from shared.event_bus import DomainEvent, event_bus
+from shared.tracing import trace_methods
 
 
+# Stripe 事件類型 → 訂閱狀態轉換（BillingService 方法名稱；其餘事件類型不處理）
+STRIPE_EVENT_ACTIONS = {
+    "invoice.paid": "activate_subscription",
+    "invoice.payment_succeeded": "activate_subscription",
+    "invoice.payment_failed": "mark_subscription_past_due",
+    "customer.subscription.deleted": "cancel_subscription",
+}
+
+
+@trace_methods
 class BillingService:
     """
     BillingService 應用服務
@@ -29,10 +43,19 @@ class BillingService:
     def __init__(
         self,
         subscription_repo: SubscriptionRepository,
-        plan_repo: PlanRepository
+        plan_repo: PlanRepository,
+        status_cache: Optional[BillingStatusCache] = None,  # 訂閱狀態快取（None = 每次查詢）
+        plan_catalog: Optional[PlanCatalog] = None,  # 方案目錄（None = 每次查詢）
+        usage_repo: Optional[UsageCounterRepository] = None  # 用量計數（None = 不檢查預約額度）
     ):
         self.subscription_repo = subscription_repo
         self.plan_repo = plan_repo
+        self.status_cache = status_cache
+        self.plan_catalog = plan_catalog
+        self.usage_repo = usage_repo
+        # 訂閱狀態變更事件於交易提交後才發布（publish_pending_events），
+        # 避免快取在提交前失效、又被其他請求以舊狀態重新寫入
+        self._pending_events: list[DomainEvent] = []
     
     def get_active_subscription(self, merchant_id: str) -> Subscription:
         """
@@ -54,7 +77,29 @@ class BillingService:
         
         return subscription
     
-    def validate_can_create_booking(self, merchant_id: str) -> Subscription:
+    def get_billing_status(self, merchant_id: str) -> BillingStatus:
+        """
+        取得商家訂閱狀態快照（含方案功能）
+        
+        注入 status_cache 時優先由快取取得
+        
+        Raises:
+            NoActiveSubscriptionError: 無啟用訂閱
+            PlanNotFoundError: 訂閱的方案不存在
+        """
+        if self.status_cache:
+            status = self.status_cache.get(merchant_id)
+            if status is not None:
+                return status
+        
+        subscription = self.get_active_subscription(merchant_id)
+        status = BillingStatus.of(subscription, self.get_plan(subscription.plan_id))
+        
+        if self.status_cache:
+            self.status_cache.set(status)
+        return status
+    
+    def validate_can_create_booking(self, merchant_id: str) -> BillingStatus:
         """
         驗證商家可建立預約
         
@@ -62,18 +107,18 @@ class BillingService:
             merchant_id: 商家 ID
         
         Returns:
-            訂閱聚合
+            訂閱狀態快照
         
         Raises:
             NoActiveSubscriptionError: 無訂閱
             SubscriptionPastDueError: 訂閱逾期
         """
-        subscription = self.get_active_subscription(merchant_id)
+        status = self.get_billing_status(merchant_id)
         
-        if not subscription.can_create_booking():
+        if not status.can_create_booking():
             raise SubscriptionPastDueError(merchant_id)
         
-        return subscription
+        return status
     
     def check_booking_quota(
         self,
@@ -94,21 +139,62 @@ class BillingService:
             NoActiveSubscriptionError: 無訂閱
             QuotaExceededError: 超過額度
         """
-        subscription = self.get_active_subscription(merchant_id)
-        plan = self.plan_repo.find_by_id(subscription.plan_id)
+        features = self.get_billing_status(merchant_id).features
         
-        if plan is None:
-            raise PlanNotFoundError(subscription.plan_id)
-        
-        if not plan.features.allows_booking_creation(current_month_bookings):
+        if not features.allows_booking_creation(current_month_bookings):
             raise QuotaExceededError(
                 resource="bookings_per_month",
-                limit=plan.features.max_bookings_per_month,
+                limit=features.max_bookings_per_month,
                 current=current_month_bookings
             )
         
         return True
     
+    def reserve_booking_quota(self, merchant_id: str, at: Optional[datetime] = None) -> Optional[int]:
+        """
+        佔用一筆本月預約額度（於建立預約的交易內呼叫，交易回滾時一併撤銷）
+        
+        Args:
+            merchant_id: 商家 ID
+            at: 預約建立時間（決定計數月份，預設為現在）
+        
+        Returns:
+            佔用後的本月預約數；未注入 usage_repo 時為 None（不檢查）
+        
+        Raises:
+            NoActiveSubscriptionError: 無訂閱
+            QuotaExceededError: 超過額度
+        """
+        if self.usage_repo is None:
+            return None
+        
+        limit = self.get_billing_status(merchant_id).features.max_bookings_per_month
+        month = usage_month(at or datetime.now(dt_timezone.utc))
+        
+        count = self.usage_repo.increment_bookings(merchant_id, month, limit)
+        if count is None:
+            raise QuotaExceededError(
+                resource="bookings_per_month",
+                limit=limit,
+                current=self.usage_repo.get_bookings(merchant_id, month)
+            )
+        
+        return count
+    
+    def release_booking_quota(self, merchant_id: str, created_at: datetime) -> None:
+        """歸還預約額度（取消預約時，計入預約建立當月）"""
+        if self.usage_repo is None:
+            return
+        
+        self.usage_repo.decrement_bookings(merchant_id, usage_month(created_at))
+    
+    def get_booking_usage(self, merchant_id: str, at: Optional[datetime] = None) -> int:
+        """查詢本月已使用的預約數"""
+        if self.usage_repo is None:
+            return 0
+        
+        return self.usage_repo.get_bookings(merchant_id, usage_month(at or datetime.now(dt_timezone.utc)))
+    
     def create_subscription(
         self,
         merchant_id: str,
@@ -127,9 +213,7 @@ class BillingService:
             新訂閱
         """
         # 驗證方案存在
-        plan = self.plan_repo.find_by_id(plan_id)
-        if plan is None:
-            raise PlanNotFoundError(plan_id)
+        self.get_plan(plan_id)
         
         # 建立訂閱
         from uuid import uuid4
@@ -148,6 +232,7 @@ class BillingService:
         )
         
         self.subscription_repo.save(subscription)
+        self._queue_status_changed(subscription)
         
         return subscription
     
@@ -160,6 +245,7 @@ class BillingService:
         
         subscription.activate()
         self.subscription_repo.save(subscription)
+        self._queue_status_changed(subscription)
         
         return subscription
     
@@ -172,6 +258,7 @@ class BillingService:
         
         subscription.mark_past_due()
         self.subscription_repo.save(subscription)
+        self._queue_status_changed(subscription)
         
         return subscription
     
@@ -184,12 +271,62 @@ class BillingService:
         
         subscription.cancel()
         self.subscription_repo.save(subscription)
+        self._queue_status_changed(subscription)
         
         return subscription
     
+    def renew_subscription(self, subscription_id: str, new_period_end: datetime) -> Subscription:
+        """續訂（付款成功並進入新週期）"""
+        subscription = self.subscription_repo.find_by_id(subscription_id)
+        
+        if subscription is None:
+            raise SubscriptionNotFoundError(subscription_id)
+        
+        subscription.renew(new_period_end)
+        self.subscription_repo.save(subscription)
+        self._queue_status_changed(subscription)
+        
+        return subscription
+    
+    def apply_stripe_event(
+        self,
+        event_type: str,
+        stripe_subscription_id: str,
+        period_end: Optional[datetime] = None
+    ) -> Optional[Subscription]:
+        """
+        套用 Stripe webhook 事件至訂閱狀態（由背景事件處理器呼叫）
+        
+        付款成功且事件帶有較新的週期結束時間時續訂（推進 current_period_end），
+        否則只啟用；到期排程據此判斷訂閱是否已續費
+        
+        Returns:
+            變更後的訂閱；不處理的事件類型回傳 None
+        
+        Raises:
+            SubscriptionNotFoundError: 找不到對應的訂閱
+        """
+        action = STRIPE_EVENT_ACTIONS.get(event_type)
+        if action is None:
+            return None
+        
+        subscription = self.subscription_repo.find_by_stripe_subscription_id(stripe_subscription_id)
+        if subscription is None:
+            raise SubscriptionNotFoundError(stripe_subscription_id)
+        
+        if action == "activate_subscription" and period_end is not None and (
+            subscription.current_period_end is None or period_end > subscription.current_period_end
+        ):
+            return self.renew_subscription(subscription.id, period_end)
+        
+        return getattr(self, action)(subscription.id)
+    
     def get_plan(self, plan_id: int) -> Plan:
         """取得方案"""
-        plan = self.plan_repo.find_by_id(plan_id)
+        if self.plan_catalog:
+            plan = self.plan_catalog.get(plan_id, self.plan_repo)
+        else:
+            plan = self.plan_repo.find_by_id(plan_id)
         
         if plan is None:
             raise PlanNotFoundError(plan_id)
@@ -198,5 +335,20 @@ class BillingService:
     
     def list_active_plans(self) -> list[Plan]:
         """列出所有啟用方案"""
+        if self.plan_catalog:
+            return self.plan_catalog.list_active(self.plan_repo)
         return self.plan_repo.find_all_active()
+    
+    def publish_pending_events(self):
+        """交易提交後發布暫存的訂閱狀態變更事件（訂閱狀態快取據此失效）"""
+        events, self._pending_events = self._pending_events, []
+        event_bus.publish_all(events)
+    
+    def _queue_status_changed(self, subscription: Subscription):
+        """暫存訂閱狀態變更事件（提交後由 publish_pending_events 發布）"""
+        self._pending_events.append(SubscriptionStatusChangedEvent.create(
+            subscription_id=subscription.id,
+            merchant_id=subscription.merchant_id,
+            status=subscription.status.value
+        ))
 
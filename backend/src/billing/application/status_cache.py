@@ -0,0 +1,161 @@
+"""
+Billing Context - Application Layer - Billing Status Cache & Plan Catalog
+預約路徑的訂閱驗證快取
+
+每筆預約都要確認商家訂閱狀態與方案額度，但訂閱只在付款事件時改變、方案幾乎不變：
+- BillingStatusCache：商家 → 訂閱狀態、週期結束時間、方案功能；
+  存活 billing_status_cache_ttl_seconds 秒，且最遲於 current_period_end 失效
+  （週期結束時需重新確認續訂結果），訂閱狀態變更事件立即失效
+- PlanCatalog：行程內方案目錄快照（不可變），定期或遇到未知方案時重新載入
+
+快取為單一 worker 內有效；其他 worker 最多於 TTL 內沿用舊狀態
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional
+import logging
+import threading
+import time
+
+from billing.domain.models import Plan, PlanFeatures, Subscription, SubscriptionStatus
+from billing.domain.repositories import PlanRepository
+from shared.config import settings
+from shared.event_bus import DomainEvent, EventBus, event_bus
+from shared.metrics import BILLING_STATUS_CACHE_TOTAL
+from shared.single_flight import MISSING, TTLCache
+from shared.timezone import now_utc
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class BillingStatus:
+    """商家訂閱狀態快照（預約路徑驗證用）"""
+    merchant_id: str
+    subscription_id: str
+    plan_id: int
+    status: SubscriptionStatus
+    current_period_end: Optional[datetime]
+    features: PlanFeatures
+    
+    @classmethod
+    def of(cls, subscription: Subscription, plan: Plan) -> "BillingStatus":
+        return cls(
+            merchant_id=subscription.merchant_id,
+            subscription_id=subscription.id,
+            plan_id=plan.id,
+            status=subscription.status,
+            current_period_end=subscription.current_period_end,
+            features=plan.features
+        )
+    
+    def can_create_booking(self) -> bool:
+        """規則同 Subscription.can_create_booking"""
+        return self.status not in (SubscriptionStatus.PAST_DUE, SubscriptionStatus.CANCELLED)
+
+
+class BillingStatusCache:
+    """商家訂閱狀態快取（依訂閱狀態變更事件失效）"""
+    
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.enabled = ttl_seconds > 0
+        self._entries = TTLCache(ttl_seconds, max_entries, clock)
+    
+    def get(self, merchant_id: str) -> Optional[BillingStatus]:
+        if not self.enabled:
+            return None
+        
+        status = self._entries.get(merchant_id)
+        if status is MISSING:
+            BILLING_STATUS_CACHE_TOTAL.inc(outcome="miss")
+            return None
+        
+        BILLING_STATUS_CACHE_TOTAL.inc(outcome="hit")
+        return status
+    
+    def set(self, status: BillingStatus, now: Optional[datetime] = None):
+        """寫入；存活時間不超過訂閱週期結束"""
+        if not self.enabled:
+            return
+        
+        ttl = self._entries.ttl_seconds
+        if status.current_period_end is not None:
+            ttl = min(ttl, (status.current_period_end - (now or now_utc())).total_seconds())
+        if ttl > 0:
+            self._entries.set(status.merchant_id, status, ttl_seconds=ttl)
+    
+    def invalidate(self, merchant_id: str):
+        self._entries.delete(merchant_id)
+        logger.debug(f"Billing status cache invalidated: {merchant_id}")
+    
+    def handle_subscription_changed(self, event: DomainEvent):
+        """事件處理：訂閱建立 / 啟用 / 逾期 / 取消"""
+        self.invalidate(event.payload["merchant_id"])
+    
+    def subscribe(self, bus: EventBus):
+        bus.subscribe("SubscriptionStatusChanged", self.handle_subscription_changed)
+    
+    def clear(self):
+        self._entries.clear()
+
+
+class PlanCatalog:
+    """
+    行程內方案目錄
+    
+    快照為唯讀 mapping，重新載入時整個替換（讀取端不需加鎖）；
+    停用方案不在 find_all_active 結果內，遇到時以 find_by_id 補入快照
+    """
+    
+    def __init__(self, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._plans: Mapping[int, Plan] = MappingProxyType({})
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+    
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and self._clock() - self._loaded_at < self.ttl_seconds
+    
+    def _reload(self, plan_repo: PlanRepository):
+        plans = {plan.id: plan for plan in plan_repo.find_all_active()}
+        with self._lock:
+            self._plans = MappingProxyType(plans)
+            self._loaded_at = self._clock()
+        logger.info(f"Plan catalog loaded: {len(plans)} plans")
+    
+    def get(self, plan_id: int, plan_repo: PlanRepository) -> Optional[Plan]:
+        """取得方案（回傳的 Plan 由所有請求共用，呼叫端不可修改）"""
+        if not self._is_fresh():
+            self._reload(plan_repo)
+        
+        plan = self._plans.get(plan_id)
+        if plan is None:
+            plan = plan_repo.find_by_id(plan_id)
+            if plan is not None:
+                with self._lock:
+                    self._plans = MappingProxyType({**self._plans, plan.id: plan})
+        return plan
+    
+    def list_active(self, plan_repo: PlanRepository) -> list[Plan]:
+        if not self._is_fresh():
+            self._reload(plan_repo)
+        return [plan for plan in self._plans.values() if plan.is_active]
+    
+    def clear(self):
+        with self._lock:
+            self._plans = MappingProxyType({})
+            self._loaded_at = None
+
+
+# 全局訂閱狀態快取與方案目錄
+billing_status_cache = BillingStatusCache(settings.billing_status_cache_ttl_seconds)
+billing_status_cache.subscribe(event_bus)
+
+plan_catalog = PlanCatalog(settings.plan_catalog_ttl_seconds)
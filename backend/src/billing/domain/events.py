@@ -0,0 +1,28 @@
+"""
+Billing Context - Domain Layer - Domain Events
+訂閱生命週期事件
+"""
+from dataclasses import dataclass
+from uuid import uuid4
+
+from shared.event_bus import DomainEvent
+from shared.timezone import now_utc
+
+
+@dataclass
+class SubscriptionStatusChangedEvent(DomainEvent):
+    """訂閱狀態變更事件（建立、啟用、逾期、取消）"""
+    
+    @classmethod
+    def create(cls, subscription_id: str, merchant_id: str, status: str):
+        return cls(
+            event_id=str(uuid4()),
+            occurred_at=now_utc(),
+            aggregate_id=subscription_id,
+            aggregate_type="Subscription",
+            event_type="SubscriptionStatusChanged",
+            payload={
+                "merchant_id": merchant_id,
+                "status": status
+            }
+        )
@@ -42,3 +42,10 @@ class QuotaExceededError(Exception):
             f"超過 {resource} 額度：當前 {current}，上限 {limit}"
         )
 
+
+
+class WebhookSignatureError(Exception):
+    """Webhook 簽章驗證失敗（簽章不符、格式錯誤或時間戳超出容許範圍）"""
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(f"Webhook 簽章驗證失敗：{reason}")
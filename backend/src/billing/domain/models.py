@@ -3,12 +3,18 @@ Billing Context - Domain Layer - Aggregates
 Subscription 訂閱與 Plan 方案聚合
 """
 from dataclasses import dataclass
-from datetime import datetime, timezone as dt_timezone
+from datetime import date, datetime, timezone as dt_timezone
 from decimal import Decimal
 from enum import Enum
 from typing import Optional
 
 from booking.domain.value_objects import Money
+from shared.timezone import to_local
+
+
+def usage_month(at: datetime) -> date:
+    """用量計數的月份（預設時區當月 1 日）"""
+    return to_local(at).date().replace(day=1)
 
 
 class PlanTier(str, Enum):
@@ -27,10 +33,10 @@ class SubscriptionStatus(str, Enum):
     TRIALING = "trialing"
 
 
-@dataclass
+@dataclass(frozen=True)
 class PlanFeatures:
     """
-    方案功能（值物件）
+    方案功能（值物件，不可變）
     
     定義每個方案可使用的功能額度
     """
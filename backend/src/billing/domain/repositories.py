@@ -3,6 +3,7 @@ Billing Context - Domain Layer - Repository Interfaces
 定義 Subscription 和 Plan Repository 抽象介面
 """
 from abc import ABC, abstractmethod
+from datetime import date
 from typing import Optional
 
 from .models import Subscription, Plan
@@ -58,3 +59,31 @@ class PlanRepository(ABC):
         """依等級查詢方案"""
         pass
 
+
+
+class UsageCounterRepository(ABC):
+    """
+    用量計數 Repository 抽象基類
+    
+    每商家每月一列，於預約交易內遞增 / 遞減，額度檢查不必 COUNT bookings
+    """
+    
+    @abstractmethod
+    def increment_bookings(self, merchant_id: str, month: date, limit: int) -> Optional[int]:
+        """
+        預約數 +1（未達 limit 時）
+        
+        Returns:
+            遞增後的預約數；已達上限時返回 None（不遞增）
+        """
+        pass
+    
+    @abstractmethod
+    def decrement_bookings(self, merchant_id: str, month: date) -> None:
+        """預約數 -1（不低於 0）"""
+        pass
+    
+    @abstractmethod
+    def get_bookings(self, merchant_id: str, month: date) -> int:
+        """查詢該月預約數（無紀錄時為 0）"""
+        pass
@@ -3,7 +3,7 @@ Billing Context - Infrastructure Layer - ORM Models
 SQLAlchemy ORM 模型定義
 """
 from sqlalchemy import (
-    Column, String, Integer, Numeric, DateTime, Boolean, Text,
+    Column, String, Integer, Numeric, Date, DateTime, Boolean, Text,
     ForeignKey, CheckConstraint, Index, text
 )
 from sqlalchemy.dialects.postgresql import UUID, JSON
@@ -164,6 +164,128 @@ class SubscriptionORM(Base):
         ),
         Index("idx_subscriptions_merchant_status", "merchant_id", "status"),
         Index("idx_subscriptions_stripe_sub_id", "stripe_subscription_id"),
+        # 到期排程：只索引可能到期的狀態
+        Index(
+            "idx_subscriptions_period_due",
+            "current_period_end",
+            postgresql_where=text("status = 'active'")
+        ),
+        Index(
+            "idx_subscriptions_trial_due",
+            "trial_end",
+            postgresql_where=text("status = 'trialing'")
+        ),
         {"comment": "訂閱表"}
     )
 
+
+class UsageCounterORM(Base):
+    """
+    商家每月用量計數 ORM 模型
+    
+    於預約交易內以 upsert 遞增（INSERT ... ON CONFLICT DO UPDATE），
+    由 scripts/reconcile_usage.py 依 bookings 重新計算校正
+    """
+    __tablename__ = "merchant_usage_counters"
+    
+    merchant_id = Column(UUID(as_uuid=False), primary_key=True, comment="商家 ID")
+    
+    month = Column(Date, primary_key=True, comment="計數月份（當月 1 日，預設時區）")
+    
+    bookings_count = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default=text("0"),
+        comment="本月建立且未取消的預約數"
+    )
+    
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+        onupdate=text("CURRENT_TIMESTAMP"),
+        comment="更新時間"
+    )
+    
+    __table_args__ = (
+        CheckConstraint("bookings_count >= 0", name="chk_usage_bookings_non_negative"),
+        {"comment": "商家每月用量計數表"}
+    )
+
+
+class StripeEventORM(Base):
+    """
+    Stripe webhook 事件收件匣 ORM 模型
+    
+    webhook 端點驗證簽章後只寫入此表（event id 為主鍵，重送的事件 ON CONFLICT DO NOTHING），
+    由背景處理器以 SKIP LOCKED 領取待處理事件，依訂閱分組、依事件建立時間套用
+    """
+    __tablename__ = "stripe_events"
+    
+    id = Column(String(255), primary_key=True, comment="Stripe 事件 ID（evt_...）")
+    
+    type = Column(String(100), nullable=False, comment="事件類型，如 invoice.paid")
+    
+    stripe_subscription_id = Column(
+        String(100),
+        nullable=True,
+        comment="事件所屬 Stripe 訂閱 ID（同訂閱的事件依序處理）"
+    )
+    
+    stripe_created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="Stripe 事件建立時間（處理順序）"
+    )
+    
+    payload = Column(JSON, nullable=False, comment="原始事件內容")
+    
+    status = Column(
+        String(20),
+        nullable=False,
+        default="pending",
+        server_default=text("'pending'"),
+        comment="處理狀態: pending/processed/ignored/failed"
+    )
+    
+    attempts = Column(
+        Integer,
+        nullable=False,
+        default=0,
+        server_default=text("0"),
+        comment="處理失敗次數"
+    )
+    
+    last_error = Column(Text, nullable=True, comment="最近一次處理錯誤")
+    
+    next_attempt_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="失敗後下次可重試時間（指數退避；NULL = 立即可處理）"
+    )
+    
+    received_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+        comment="接收時間"
+    )
+    
+    processed_at = Column(DateTime(timezone=True), nullable=True, comment="處理完成時間")
+    
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('pending', 'processed', 'ignored', 'failed')",
+            name="chk_stripe_event_status"
+        ),
+        # 只索引待處理事件：處理器領取時掃描的範圍不隨歷史事件增長
+        Index(
+            "idx_stripe_events_pending",
+            "stripe_created_at",
+            "received_at",
+            postgresql_where=text("status = 'pending'")
+        ),
+        Index("idx_stripe_events_subscription", "stripe_subscription_id", "stripe_created_at"),
+        {"comment": "Stripe webhook 事件收件匣"}
+    )
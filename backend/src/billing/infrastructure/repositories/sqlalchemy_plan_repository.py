@@ -10,8 +10,10 @@ from billing.domain.models import Plan, PlanTier, PlanFeatures
 from billing.domain.repositories import PlanRepository
 from billing.infrastructure.orm.models import PlanORM
 from booking.domain.value_objects import Money
+from shared.tracing import trace_methods
 
 
+@trace_methods
 class SQLAlchemyPlanRepository(PlanRepository):
     """SQLAlchemy 實作的 Plan Repository"""
     
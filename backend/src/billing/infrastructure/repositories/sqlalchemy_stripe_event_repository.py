@@ -0,0 +1,99 @@
+"""
+Billing Context - Infrastructure Layer - Stripe Event Repository
+Stripe webhook 事件收件匣（stripe_events）的存取
+"""
+from datetime import datetime
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import exists, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from billing.infrastructure.orm.models import StripeEventORM
+from shared.tracing import trace_methods
+
+
+@trace_methods
+class SQLAlchemyStripeEventRepository:
+    """Stripe 事件收件匣 Repository"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def record(
+        self,
+        event_id: str,
+        event_type: str,
+        stripe_subscription_id: Optional[str],
+        stripe_created_at: datetime,
+        payload: dict[str, Any]
+    ) -> bool:
+        """
+        寫入事件；已存在（Stripe 重送）時不變更
+        
+        Returns:
+            True = 新事件，False = 重複事件
+        """
+        stmt = insert(StripeEventORM).values(
+            id=event_id,
+            type=event_type,
+            stripe_subscription_id=stripe_subscription_id,
+            stripe_created_at=stripe_created_at,
+            payload=payload
+        ).on_conflict_do_nothing(index_elements=[StripeEventORM.id]).returning(StripeEventORM.id)
+        
+        return self.db.execute(stmt).scalar_one_or_none() is not None
+    
+    def claim_pending(self, limit: int, now: datetime) -> list[StripeEventORM]:
+        """
+        領取待處理事件（依 Stripe 建立時間排序）
+        
+        失敗退避中（next_attempt_at 未到）的事件不領取；同訂閱的後續事件仍由 has_earlier_pending 擋下
+        FOR UPDATE SKIP LOCKED：多個 worker 同時處理時各自領取不同事件，列鎖持有至交易結束
+        """
+        stmt = (
+            select(StripeEventORM)
+            .where(
+                StripeEventORM.status == "pending",
+                or_(StripeEventORM.next_attempt_at.is_(None), StripeEventORM.next_attempt_at <= now)
+            )
+            .order_by(StripeEventORM.stripe_created_at, StripeEventORM.received_at, StripeEventORM.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(self.db.scalars(stmt))
+    
+    def try_lock_subscription(self, stripe_subscription_id: str) -> bool:
+        """取得訂閱的交易層級 advisory lock（已被其他 worker 持有時返回 False）"""
+        return bool(self.db.scalar(
+            select(func.pg_try_advisory_xact_lock(func.hashtext(stripe_subscription_id)))
+        ))
+    
+    def has_earlier_pending(
+        self,
+        stripe_subscription_id: str,
+        before: StripeEventORM,
+        exclude_ids: Iterable[str]
+    ) -> bool:
+        """
+        同訂閱是否有排在 before 之前、且不在本批次的待處理事件
+        
+        其他 worker 已領取（列鎖中）的較早事件也算在內，此時本批次應讓出該訂閱
+        """
+        stmt = select(exists().where(
+            StripeEventORM.stripe_subscription_id == stripe_subscription_id,
+            StripeEventORM.status == "pending",
+            StripeEventORM.id.notin_(list(exclude_ids)),
+            tuple_(StripeEventORM.stripe_created_at, StripeEventORM.received_at)
+            < tuple_(before.stripe_created_at, before.received_at)
+        ))
+        return bool(self.db.scalar(stmt))
+    
+    def latest_processed_at(self, stripe_subscription_id: str) -> Optional[datetime]:
+        """同訂閱已套用事件中最新的 Stripe 建立時間（判斷遲到的舊事件）"""
+        return self.db.scalar(
+            select(func.max(StripeEventORM.stripe_created_at)).where(
+                StripeEventORM.stripe_subscription_id == stripe_subscription_id,
+                StripeEventORM.status == "processed"
+            )
+        )
@@ -8,8 +8,10 @@ from sqlalchemy.orm import Session
 from billing.domain.models import Subscription, SubscriptionStatus
 from billing.domain.repositories import SubscriptionRepository
 from billing.infrastructure.orm.models import SubscriptionORM
+from shared.tracing import trace_methods
 
 
+@trace_methods
 class SQLAlchemySubscriptionRepository(SubscriptionRepository):
     """SQLAlchemy 實作的 Subscription Repository"""
     
@@ -0,0 +1,72 @@
+"""
+Billing Context - Infrastructure Layer - Usage Counter Repository
+使用 SQLAlchemy 實作 UsageCounterRepository
+"""
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from billing.domain.repositories import UsageCounterRepository
+from billing.infrastructure.orm.models import UsageCounterORM
+from shared.tracing import trace_methods
+
+
+@trace_methods
+class SQLAlchemyUsageCounterRepository(UsageCounterRepository):
+    """SQLAlchemy 實作的 Usage Counter Repository"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def increment_bookings(self, merchant_id: str, month: date, limit: int) -> Optional[int]:
+        """
+        預約數 +1（未達 limit 時）
+        
+        單一 upsert 完成「檢查 + 遞增」：衝突時僅在 bookings_count < limit 才更新，
+        未更新則無 RETURNING 列。取得的列鎖持有至交易結束，同商家同月的並行預約依序通過
+        """
+        if limit <= 0:
+            return None
+        
+        stmt = insert(UsageCounterORM).values(
+            merchant_id=merchant_id,
+            month=month,
+            bookings_count=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UsageCounterORM.merchant_id, UsageCounterORM.month],
+            set_={
+                "bookings_count": UsageCounterORM.bookings_count + 1,
+                "updated_at": func.now()
+            },
+            where=UsageCounterORM.bookings_count < limit
+        ).returning(UsageCounterORM.bookings_count)
+        
+        return self.db.execute(stmt).scalar_one_or_none()
+    
+    def decrement_bookings(self, merchant_id: str, month: date) -> None:
+        """預約數 -1（不低於 0）"""
+        self.db.execute(
+            update(UsageCounterORM)
+            .where(
+                UsageCounterORM.merchant_id == merchant_id,
+                UsageCounterORM.month == month
+            )
+            .values(
+                bookings_count=func.greatest(UsageCounterORM.bookings_count - 1, 0),
+                updated_at=func.now()
+            )
+        )
+    
+    def get_bookings(self, merchant_id: str, month: date) -> int:
+        """查詢該月預約數"""
+        count = self.db.scalar(
+            select(UsageCounterORM.bookings_count).where(
+                UsageCounterORM.merchant_id == merchant_id,
+                UsageCounterORM.month == month
+            )
+        )
+        return count or 0
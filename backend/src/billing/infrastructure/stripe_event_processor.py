@@ -0,0 +1,222 @@
+"""
+Billing Context - Infrastructure Layer - Stripe Event Processor
+背景處理 Stripe webhook 收件匣中的待處理事件
+
+webhook 端點只驗證簽章並寫入 stripe_events；本處理器：
+1. 以 SKIP LOCKED 領取一批待處理事件（依 Stripe 建立時間排序）
+2. 依訂閱分組；每組先取得訂閱的 advisory lock，並確認沒有更早的待處理事件
+   （被其他 worker 領取中），否則整組讓出，維持同訂閱事件的套用順序
+3. 逐筆以 savepoint 套用（BillingService.apply_stripe_event），成功即標記 processed；
+   失敗累計 attempts 並以指數退避設定 next_attempt_at，同組後續事件留待下次（達上限標記 failed 後才繼續）
+4. 比已套用事件更舊的遲到事件標記 ignored，不覆蓋較新的訂閱狀態
+
+狀態變更與事件標記在同一交易提交，重送或重複處理都只會套用一次
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+import logging
+import threading
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from billing.application.services import STRIPE_EVENT_ACTIONS, BillingService
+from billing.application.status_cache import billing_status_cache, plan_catalog
+from billing.infrastructure.repositories.sqlalchemy_plan_repository import SQLAlchemyPlanRepository
+from billing.infrastructure.repositories.sqlalchemy_stripe_event_repository import (
+    SQLAlchemyStripeEventRepository
+)
+from billing.infrastructure.repositories.sqlalchemy_subscription_repository import (
+    SQLAlchemySubscriptionRepository
+)
+from billing.infrastructure.stripe_webhook import event_period_end
+from shared.config import settings
+from shared.database import SessionLocal
+from shared.metrics import STRIPE_EVENTS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+
+def group_by_subscription(events: list) -> list[list]:
+    """
+    依 Stripe 訂閱分組（保留原順序；無訂閱的事件各自一組）
+    """
+    groups: dict[str, list] = {}
+    ungrouped: list[list] = []
+    for event in events:
+        if event.stripe_subscription_id is None:
+            ungrouped.append([event])
+        else:
+            groups.setdefault(event.stripe_subscription_id, []).append(event)
+    return list(groups.values()) + ungrouped
+
+
+def _billing_service(session) -> BillingService:
+    return BillingService(
+        SQLAlchemySubscriptionRepository(session),
+        SQLAlchemyPlanRepository(session),
+        status_cache=billing_status_cache,
+        plan_catalog=plan_catalog
+    )
+
+
+class StripeEventProcessor:
+    """依訂閱分組、依序套用 Stripe 事件"""
+    
+    def __init__(
+        self,
+        session_factory,
+        interval_seconds: float = 5.0,
+        batch_size: int = 100,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 30.0,
+        retry_max_seconds: float = 3600.0,
+        repository_factory: Callable = SQLAlchemyStripeEventRepository,
+        service_factory: Callable[..., BillingService] = _billing_service,
+        clock: Callable[[], float] = time.time
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.repository_factory = repository_factory
+        self.service_factory = service_factory
+        self._clock = clock
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def process_pending(self) -> int:
+        """處理待處理事件直到沒有可領取的事件，回傳完成（非重試）的事件數"""
+        total = 0
+        while True:
+            claimed, done = self._process_batch()
+            total += done
+            # 未滿一批或本批全數讓出 / 重試時停止；重試的事件退避中不會再被領取
+            if claimed < self.batch_size or done == 0:
+                break
+        return total
+    
+    def _process_batch(self) -> tuple[int, int]:
+        with self.session_factory() as session:
+            repo = self.repository_factory(session)
+            service = self.service_factory(session)
+            events = repo.claim_pending(self.batch_size, self._now())
+            claimed_ids = {event.id for event in events}
+            done = 0
+            
+            for group in group_by_subscription(events):
+                key = group[0].stripe_subscription_id
+                if key is not None and (
+                    not repo.try_lock_subscription(key)
+                    or repo.has_earlier_pending(key, group[0], claimed_ids)
+                ):
+                    continue
+                
+                for event in group:
+                    if not self._process_event(session, repo, service, event):
+                        break
+                    done += 1
+            
+            session.commit()
+        
+        # 提交後再發布狀態變更（快取失效）：避免提交前的查詢把舊狀態重新寫入快取
+        service.publish_pending_events()
+        return len(events), done
+    
+    def _process_event(self, session, repo, service, event) -> bool:
+        """套用單一事件；返回 False 表示留待重試（同組後續事件不處理）"""
+        try:
+            with session.begin_nested():
+                outcome = self._apply(repo, service, event)
+        except Exception as e:
+            event.attempts += 1
+            event.last_error = str(e)[:1000]
+            if event.attempts < self.max_attempts:
+                event.status = "pending"
+                event.next_attempt_at = self._now() + self._retry_delay(event.attempts)
+                STRIPE_EVENTS_TOTAL.inc(outcome="retry")
+                logger.warning(
+                    f"Stripe event {event.id} ({event.type}) failed, will retry at "
+                    f"{event.next_attempt_at.isoformat()}: {e}"
+                )
+                return False
+            
+            event.status = "failed"
+            event.processed_at = self._now()
+            STRIPE_EVENTS_TOTAL.inc(outcome="failed")
+            logger.error(f"Stripe event {event.id} ({event.type}) failed after {event.attempts} attempts: {e}")
+            return True
+        
+        STRIPE_EVENTS_TOTAL.inc(outcome=outcome)
+        return True
+    
+    def _retry_delay(self, attempts: int) -> timedelta:
+        """指數退避：第 n 次失敗後等待 base * 2^(n-1) 秒（上限 retry_max_seconds）"""
+        return timedelta(seconds=min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds))
+    
+    def _now(self) -> datetime:
+        return datetime.fromtimestamp(self._clock(), timezone.utc)
+    
+    def _apply(self, repo, service: BillingService, event) -> str:
+        if event.type not in STRIPE_EVENT_ACTIONS or event.stripe_subscription_id is None:
+            return self._mark(event, "ignored")
+        
+        latest = repo.latest_processed_at(event.stripe_subscription_id)
+        if latest is not None and latest > event.stripe_created_at:
+            event.last_error = f"stale: subscription already updated by an event created at {latest.isoformat()}"
+            self._mark(event, "ignored")
+            return "stale"
+        
+        service.apply_stripe_event(
+            event.type,
+            event.stripe_subscription_id,
+            period_end=event_period_end(event.payload)
+        )
+        return self._mark(event, "processed")
+    
+    @staticmethod
+    def _mark(event, status: str) -> str:
+        event.status = status
+        event.processed_at = datetime.now(timezone.utc)
+        return status
+    
+    def notify(self):
+        """喚醒背景執行緒（webhook 寫入新事件後呼叫）"""
+        self._wakeup.set()
+    
+    def start(self) -> "StripeEventProcessor":
+        self._thread = threading.Thread(target=self._run, name="stripe-event-processor", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def _run(self):
+        # 定期輪詢：處理其他 worker 接收或先前失敗待重試的事件
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.interval_seconds)
+            self._wakeup.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                self.process_pending()
+            except SQLAlchemyError as e:
+                logger.warning(f"Stripe event processing failed: {e}")
+
+
+# 全局處理器（api/main.py 啟動時 start；webhook 端點寫入後 notify）
+stripe_event_processor = StripeEventProcessor(
+    SessionLocal,
+    interval_seconds=settings.stripe_event_poll_interval_seconds,
+    batch_size=settings.stripe_event_batch_size,
+    max_attempts=settings.stripe_event_max_attempts,
+    retry_base_seconds=settings.stripe_event_retry_base_seconds,
+    retry_max_seconds=settings.stripe_event_retry_max_seconds
+)
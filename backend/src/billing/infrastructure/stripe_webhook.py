@@ -0,0 +1,130 @@
+"""
+Billing Context - Infrastructure Layer - Stripe Webhook
+Stripe webhook 簽章驗證與事件解析
+
+簽章格式（Stripe-Signature 標頭）：t=<unix 時間戳>,v1=<簽章>[,v1=<簽章>...]
+v1 = HMAC-SHA256(webhook secret, "<t>.<原始 body>")；輪替 secret 期間會帶多個 v1，
+任一相符即通過。時間戳早於容許範圍者拒絕，避免被截取的請求重放
+
+只做 HMAC 比對與 JSON 解析（不建立 stripe SDK 物件），webhook 端點得以在寫入收件匣後立即回應
+"""
+from datetime import datetime, timezone
+from typing import Any, Optional
+import hashlib
+import hmac
+import json
+import time
+
+from billing.domain.exceptions import WebhookSignatureError
+
+
+def compute_signature(payload: bytes, secret: str, timestamp: int) -> str:
+    """計算 v1 簽章"""
+    signed = f"{timestamp}.".encode() + payload
+    return hmac.new(secret.encode(), signed, hashlib.sha256).hexdigest()
+
+
+def sign_payload(payload: bytes, secret: str, timestamp: Optional[int] = None) -> str:
+    """產生 Stripe-Signature 標頭（測試與 scripts/replay_stripe_events.py 使用）"""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    return f"t={timestamp},v1={compute_signature(payload, secret, timestamp)}"
+
+
+def verify_signature(
+    payload: bytes,
+    header: Optional[str],
+    secret: str,
+    tolerance_seconds: int = 300,
+    now: Optional[float] = None
+) -> None:
+    """
+    驗證 Stripe-Signature
+    
+    Args:
+        payload: 原始 request body（不可先經 JSON 解析再序列化）
+        tolerance_seconds: 時間戳容許的最大延遲（<= 0 不檢查）
+    
+    Raises:
+        WebhookSignatureError: 缺少標頭、格式錯誤、簽章不符或時間戳過舊
+    """
+    if not header:
+        raise WebhookSignatureError("缺少 Stripe-Signature 標頭")
+    
+    timestamp: Optional[str] = None
+    signatures: list[str] = []
+    for item in header.split(","):
+        key, _, value = item.strip().partition("=")
+        if key == "t":
+            timestamp = value
+        elif key == "v1":
+            signatures.append(value)
+    
+    if timestamp is None or not timestamp.isdigit():
+        raise WebhookSignatureError("缺少或無效的時間戳")
+    if not signatures:
+        raise WebhookSignatureError("缺少 v1 簽章")
+    
+    expected = compute_signature(payload, secret, int(timestamp))
+    if not any(hmac.compare_digest(expected, signature) for signature in signatures):
+        raise WebhookSignatureError("簽章不符")
+    
+    now = time.time() if now is None else now
+    if tolerance_seconds > 0 and int(timestamp) < now - tolerance_seconds:
+        raise WebhookSignatureError("時間戳超出容許範圍")
+
+
+def parse_event(payload: bytes) -> dict[str, Any]:
+    """
+    解析事件 JSON（只檢查收件匣需要的欄位）
+    
+    Raises:
+        ValueError: 非 JSON 或缺少 id / type / created
+    """
+    event = json.loads(payload)
+    if not isinstance(event, dict) or not all(key in event for key in ("id", "type", "created")):
+        raise ValueError("不是有效的 Stripe 事件")
+    return event
+
+
+def event_created_at(event: dict[str, Any]) -> datetime:
+    """事件建立時間（Stripe created 為 unix 秒）"""
+    return datetime.fromtimestamp(int(event["created"]), tz=timezone.utc)
+
+
+def event_subscription_id(event: dict[str, Any]) -> Optional[str]:
+    """
+    取得事件所屬的 Stripe 訂閱 ID
+    
+    - customer.subscription.*：data.object 即訂閱
+    - invoice.*：data.object.subscription（新版 API 位於 parent.subscription_details）
+    """
+    obj = (event.get("data") or {}).get("object") or {}
+    if event["type"].startswith("customer.subscription."):
+        return obj.get("id")
+    
+    subscription = obj.get("subscription")
+    if subscription is None:
+        details = (obj.get("parent") or {}).get("subscription_details") or {}
+        subscription = details.get("subscription")
+    if isinstance(subscription, dict):  # expand 過的訂閱物件
+        subscription = subscription.get("id")
+    return subscription
+
+
+def event_period_end(event: dict[str, Any]) -> Optional[datetime]:
+    """
+    取得事件帶有的訂閱週期結束時間（續訂用）
+    
+    - customer.subscription.*：current_period_end（新版 API 位於 items）
+    - invoice.*：各明細 period.end 的最大值（invoice 本身的 period_end 是上一週期）
+    """
+    obj = (event.get("data") or {}).get("object") or {}
+    if event["type"].startswith("customer.subscription."):
+        ends = [obj.get("current_period_end")] + [
+            item.get("current_period_end") for item in (obj.get("items") or {}).get("data") or []
+        ]
+    else:
+        ends = [(line.get("period") or {}).get("end") for line in (obj.get("lines") or {}).get("data") or []]
+    
+    ends = [end for end in ends if end]
+    return datetime.fromtimestamp(max(ends), tz=timezone.utc) if ends else None
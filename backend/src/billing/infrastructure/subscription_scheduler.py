@@ -0,0 +1,194 @@
+"""
+Billing Context - Infrastructure Layer - Subscription Expiry Scheduler
+批次處理已到期的訂閱（試用結束、週期結束）
+
+轉換規則（與 Subscription.renew / mark_past_due 相同，以集合式 UPDATE 套用）：
+- 免費方案：自動續訂一個計費週期（新週期自原到期時間起算，狀態 active）
+- 付費方案：到期超過寬限期仍未續費（Stripe invoice.paid 會推進 current_period_end）→ past_due
+
+每批一個交易：
+1. 依部分索引掃描到期訂閱，FOR UPDATE SKIP LOCKED 領取（多個 replica 同時執行時各自領取不同列）
+2. 依方案分為續訂 / 逾期兩組，各以一個 UPDATE ... RETURNING 套用
+3. 提交後一次發布 SubscriptionStatusChanged（訂閱狀態快取據此失效）
+
+套用後的列不再符合到期條件（狀態改變或週期推進），不會被重複處理；
+停機多個週期的免費訂閱會在後續批次中逐期續訂
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import logging
+import threading
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from billing.domain.events import SubscriptionStatusChangedEvent
+from billing.domain.models import SubscriptionStatus
+from billing.infrastructure.orm.models import PlanORM, SubscriptionORM
+from shared.config import settings
+from shared.database import SessionLocal
+from shared.event_bus import event_bus
+from shared.metrics import SUBSCRIPTION_TRANSITIONS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+# 到期欄位：試用中看 trial_end，啟用中看 current_period_end
+_DUE_COLUMNS = {
+    SubscriptionStatus.TRIALING: SubscriptionORM.trial_end,
+    SubscriptionStatus.ACTIVE: SubscriptionORM.current_period_end,
+}
+
+
+@dataclass
+class ScheduleResult:
+    """一次排程的結果"""
+    renewed: int = 0
+    past_due: int = 0
+    events: list = field(default_factory=list)
+    
+    def add(self, other: "ScheduleResult"):
+        self.renewed += other.renewed
+        self.past_due += other.past_due
+        self.events.extend(other.events)
+
+
+class SubscriptionScheduler:
+    """定期續訂免費訂閱、將逾寬限期未續費的付費訂閱標記逾期"""
+    
+    def __init__(
+        self,
+        session_factory,
+        interval_seconds: float = 300.0,
+        batch_size: int = 500,
+        grace_period: timedelta = timedelta(hours=24)
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.grace_period = grace_period
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def run_once(self, now: Optional[datetime] = None) -> ScheduleResult:
+        """處理所有到期訂閱（分批提交），回傳彙總結果"""
+        now = now or datetime.now(timezone.utc)
+        total = ScheduleResult()
+        
+        for status in _DUE_COLUMNS:
+            while True:
+                with self.session_factory() as session:
+                    result, claimed = self.process_batch(session, status, now)
+                    session.commit()
+                
+                # 提交後才發布：快取失效後的查詢才會讀到新狀態
+                event_bus.publish_all(result.events)
+                total.add(result)
+                if claimed < self.batch_size:
+                    break
+        
+        SUBSCRIPTION_TRANSITIONS_TOTAL.inc(total.renewed, transition="renewed")
+        SUBSCRIPTION_TRANSITIONS_TOTAL.inc(total.past_due, transition="past_due")
+        if total.renewed or total.past_due:
+            logger.info(f"Subscription scheduler: renewed={total.renewed}, past_due={total.past_due}")
+        return total
+    
+    def process_batch(self, session, status: SubscriptionStatus, now: datetime) -> tuple[ScheduleResult, int]:
+        """
+        領取並轉換一批到期訂閱（不提交）
+        
+        Returns:
+            (轉換結果, 領取筆數)
+        """
+        due_column = _DUE_COLUMNS[status]
+        rows = session.execute(
+            select(SubscriptionORM.id, PlanORM.price_amount)
+            .join(PlanORM, PlanORM.id == SubscriptionORM.plan_id)
+            .where(
+                SubscriptionORM.status == status.value,
+                due_column <= now - self.grace_period
+            )
+            .order_by(due_column, SubscriptionORM.id)
+            .limit(self.batch_size)
+            .with_for_update(of=SubscriptionORM, skip_locked=True)
+        ).all()
+        
+        free_ids = [row.id for row in rows if row.price_amount == 0]
+        paid_ids = [row.id for row in rows if row.price_amount != 0]
+        
+        result = ScheduleResult()
+        changed = self._renew(session, free_ids, due_column, now) + self._mark_past_due(session, paid_ids, now)
+        result.renewed = len(free_ids)
+        result.past_due = len(paid_ids)
+        result.events = [
+            SubscriptionStatusChangedEvent.create(
+                subscription_id=row.id,
+                merchant_id=row.merchant_id,
+                status=row.status
+            )
+            for row in changed
+        ]
+        return result, len(rows)
+    
+    @staticmethod
+    def _renew(session, ids: list[str], due_column, now: datetime) -> list:
+        """續訂一個計費週期（自原到期時間起算）"""
+        if not ids:
+            return []
+        
+        months = case((PlanORM.billing_interval == "year", 12), else_=1)
+        return session.execute(
+            update(SubscriptionORM)
+            .where(SubscriptionORM.id.in_(ids), PlanORM.id == SubscriptionORM.plan_id)
+            .values(
+                status=SubscriptionStatus.ACTIVE.value,
+                current_period_start=due_column,
+                current_period_end=due_column + func.make_interval(0, months),
+                updated_at=now
+            )
+            .returning(SubscriptionORM.id, SubscriptionORM.merchant_id, SubscriptionORM.status)
+            .execution_options(synchronize_session=False)
+        ).all()
+    
+    @staticmethod
+    def _mark_past_due(session, ids: list[str], now: datetime) -> list:
+        if not ids:
+            return []
+        
+        return session.execute(
+            update(SubscriptionORM)
+            .where(SubscriptionORM.id.in_(ids))
+            .values(status=SubscriptionStatus.PAST_DUE.value, updated_at=now)
+            .returning(SubscriptionORM.id, SubscriptionORM.merchant_id, SubscriptionORM.status)
+            .execution_options(synchronize_session=False)
+        ).all()
+    
+    def start(self) -> "SubscriptionScheduler":
+        self._thread = threading.Thread(target=self._run, name="subscription-scheduler", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except SQLAlchemyError as e:
+                logger.warning(f"Subscription scheduler failed: {e}")
+
+
+def start_subscription_scheduler() -> Optional[SubscriptionScheduler]:
+    """啟動背景訂閱到期排程（間隔 <= 0 時停用）"""
+    if settings.subscription_scheduler_interval_seconds <= 0:
+        return None
+    
+    return SubscriptionScheduler(
+        SessionLocal,
+        interval_seconds=settings.subscription_scheduler_interval_seconds,
+        batch_size=settings.subscription_scheduler_batch_size,
+        grace_period=timedelta(hours=settings.subscription_grace_period_hours)
+    ).start()
@@ -0,0 +1,116 @@
+"""
+Billing Context - Infrastructure Layer - Usage Reconciler
+依 bookings 重新計算商家每月用量計數
+
+計數於預約交易內增減，正常情況下不會偏移；此工作用於上線初始化、
+手動修改資料或故障後校正。依商家 ID 分批（keyset），每批一個交易：
+1. 為批次內商家補上缺少的計數列並以 FOR UPDATE 鎖定（進行中的預約交易提交後才取得）
+2. COUNT 該月建立且未取消的預約
+3. 寫回計數（只更新有差異的列）
+
+鎖定期間同批商家的新預約會等待此交易，批次宜小
+"""
+from datetime import date, datetime, time
+from typing import Optional
+import logging
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from billing.infrastructure.orm.models import UsageCounterORM
+from booking.domain.models import BookingStatus
+from booking.infrastructure.orm.models import BookingORM
+from merchant.infrastructure.orm.models import MerchantORM
+from shared.timezone import make_aware
+
+logger = logging.getLogger(__name__)
+
+
+def _month_range(month: date) -> tuple[datetime, datetime]:
+    """計數月份 → [當月 1 日 00:00, 次月 1 日 00:00)（預設時區）"""
+    next_month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+    return (
+        make_aware(datetime.combine(month, time.min)),
+        make_aware(datetime.combine(next_month, time.min))
+    )
+
+
+class UsageReconciler:
+    """分批重新計算商家每月預約數"""
+    
+    def __init__(self, session_factory, batch_size: int = 200):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+    
+    def reconcile(self, month: date) -> int:
+        """校正指定月份所有商家的計數，回傳被修正的商家數"""
+        corrected = 0
+        after: Optional[str] = None
+        
+        while True:
+            with self.session_factory() as session:
+                merchant_ids = self._next_batch(session, after)
+                if not merchant_ids:
+                    break
+                
+                corrected += self._reconcile_batch(session, month, merchant_ids)
+                session.commit()
+            
+            after = merchant_ids[-1]
+        
+        logger.info(f"Usage counters reconciled for {month:%Y-%m}: {corrected} corrected")
+        return corrected
+    
+    def _next_batch(self, session, after: Optional[str]) -> list[str]:
+        stmt = select(MerchantORM.id).order_by(MerchantORM.id).limit(self.batch_size)
+        if after is not None:
+            stmt = stmt.where(MerchantORM.id > after)
+        return list(session.scalars(stmt))
+    
+    def _reconcile_batch(self, session, month: date, merchant_ids: list[str]) -> int:
+        # 1. 補上缺少的列後鎖定整批（與預約交易的 upsert 互斥）
+        session.execute(
+            insert(UsageCounterORM)
+            .values([{"merchant_id": merchant_id, "month": month} for merchant_id in merchant_ids])
+            .on_conflict_do_nothing()
+        )
+        current = dict(session.execute(
+            select(UsageCounterORM.merchant_id, UsageCounterORM.bookings_count)
+            .where(UsageCounterORM.merchant_id.in_(merchant_ids), UsageCounterORM.month == month)
+            .with_for_update()
+        ).all())
+        
+        # 2. 依 bookings 重新計算
+        start_at, end_at = _month_range(month)
+        actual = dict(session.execute(
+            select(BookingORM.merchant_id, func.count())
+            .where(
+                BookingORM.merchant_id.in_(merchant_ids),
+                BookingORM.created_at >= start_at,
+                BookingORM.created_at < end_at,
+                BookingORM.status != BookingStatus.CANCELLED.value
+            )
+            .group_by(BookingORM.merchant_id)
+        ).all())
+        
+        # 3. 只寫回有差異的列
+        drifted = {
+            merchant_id: actual.get(merchant_id, 0)
+            for merchant_id in merchant_ids
+            if current.get(merchant_id, 0) != actual.get(merchant_id, 0)
+        }
+        for merchant_id, count in drifted.items():
+            logger.warning(
+                f"Usage counter drift: merchant={merchant_id} month={month:%Y-%m} "
+                f"counter={current.get(merchant_id, 0)} actual={count}"
+            )
+            session.execute(
+                update(UsageCounterORM)
+                .where(
+                    UsageCounterORM.merchant_id == merchant_id,
+                    UsageCounterORM.month == month
+                )
+                .values(bookings_count=count, updated_at=func.now())
+            )
+        
+        return len(drifted)
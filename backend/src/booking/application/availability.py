@@ -0,0 +1,94 @@
+"""
+Booking Context - Application Layer - Availability Feed
+可訂狀態推播：LIFF 預約頁訂閱（商家, 員工, 日期），不必輪詢 /slots
+
+- 訂閱 BookingConfirmed / BookingCancelled 與時段暫留事件，轉為時段差異訊息
+  （booked：該區間已被預約；held：該區間暫留中；released：該區間已釋出），
+  客戶端據此更新重疊的時段
+- 未設定跨 worker 橋接時只推播給本 worker；設定 AVAILABILITY_NOTIFY_ENABLED
+  時經 PostgreSQL NOTIFY 轉送，所有 worker 的訂閱者都會收到
+
+事件於請求交易提交後才發布（BookingService.publish_pending_events），回滾的異動不會推播；
+NOTIFY 由橋接的背景執行緒送出，不阻塞請求
+"""
+from datetime import date, datetime
+from typing import Optional, Protocol
+import json
+import logging
+
+from shared.broadcast import Broadcaster, PostgresNotifyBridge
+from shared.config import settings
+from shared.event_bus import DomainEvent, EventBus, event_bus
+from shared.timezone import to_local
+
+logger = logging.getLogger(__name__)
+
+
+_CHANGE_TYPES = {
+    "BookingConfirmed": "booked",
+    "BookingCancelled": "released",
+    "SlotHeld": "held",
+    "SlotHoldReleased": "released",
+}
+
+_ID_KEYS = {
+    "Booking": "booking_id",
+    "BookingLock": "hold_id",
+}
+
+
+class Publisher(Protocol):
+    def publish(self, topic: str, message: str):
+        ...
+
+
+def availability_topic(merchant_id: str, staff_id: int, target_date: date) -> str:
+    return f"availability:{merchant_id}:{staff_id}:{target_date.isoformat()}"
+
+
+class AvailabilityFeed:
+    """預約異動 → 可訂狀態差異推播"""
+    
+    def __init__(self, broadcaster: Broadcaster, publisher: Optional[Publisher] = None):
+        self.broadcaster = broadcaster
+        self.publisher = publisher or broadcaster
+    
+    def handle_booking_changed(self, event: DomainEvent):
+        """事件處理：預約建立 / 取消、時段暫留 / 釋出"""
+        payload = event.payload
+        if not {"staff_id", "start_at", "end_at"} <= payload.keys():
+            return
+        
+        start_at = to_local(datetime.fromisoformat(payload["start_at"]))
+        end_at = to_local(datetime.fromisoformat(payload["end_at"]))
+        topic = availability_topic(payload["merchant_id"], payload["staff_id"], start_at.date())
+        message = json.dumps({
+            "type": _CHANGE_TYPES[event.event_type],
+            _ID_KEYS[event.aggregate_type]: event.aggregate_id,
+            "staff_id": payload["staff_id"],
+            "date": start_at.date().isoformat(),
+            "start_time": start_at.strftime("%H:%M"),
+            "end_time": end_at.strftime("%H:%M"),
+        })
+        self.publisher.publish(topic, message)
+    
+    def subscribe(self, bus: EventBus):
+        for event_type in _CHANGE_TYPES:
+            bus.subscribe(event_type, self.handle_booking_changed)
+
+
+# 全局推播（每個 worker 一份）
+availability_broadcaster = Broadcaster(
+    max_subscribers=settings.sse_max_connections,
+    max_per_topic=settings.sse_max_connections_per_topic
+)
+availability_bridge: Optional[PostgresNotifyBridge] = None
+if settings.availability_notify_enabled:
+    availability_bridge = PostgresNotifyBridge(
+        str(settings.availability_notify_dsn or settings.database_url),
+        settings.availability_notify_channel,
+        availability_broadcaster
+    )
+
+availability_feed = AvailabilityFeed(availability_broadcaster, availability_bridge)
+availability_feed.subscribe(event_bus)
@@ -32,6 +32,7 @@ class CreateBookingRequest(BaseModel):
     start_at: datetime
     items: list[BookingItemRequest] = Field(..., min_length=1)
     notes: Optional[str] = Field(None, max_length=500)
+    hold_id: Optional[str] = Field(None, description="先前 POST /liff/holds 取得的暫留 ID")
     
     @field_validator("start_at")
     @classmethod
@@ -70,6 +71,20 @@ class CreateBookingRequest(BaseModel):
         }
 
 
+class CreateHoldRequest(BaseModel):
+    """暫留時段請求（選定時段後、填寫預約表單前）"""
+    merchant_id: str = Field(..., pattern=r"^[0-9a-f]{8}-([0-9a-f]{4}-){3}[0-9a-f]{12}$")
+    staff_id: int = Field(..., gt=0)
+    start_at: datetime
+    items: list[BookingItemRequest] = Field(..., min_length=1)
+    
+    @field_validator("start_at")
+    @classmethod
+    def validate_start_at(cls, v: datetime) -> datetime:
+        """驗證開始時間（規則同 CreateBookingRequest）"""
+        return CreateBookingRequest.validate_start_at(v)
+
+
 class CancelBookingRequest(BaseModel):
     """取消預約請求"""
     booking_id: str
@@ -122,6 +137,16 @@ class BookingResponse(BaseModel):
         from_attributes = True
 
 
+class HoldResponse(BaseModel):
+    """時段暫留響應"""
+    id: str
+    merchant_id: str
+    staff_id: int
+    start_at: datetime
+    end_at: datetime
+    expires_at: datetime
+
+
 class SlotResponse(BaseModel):
     """可訂時段響應"""
     start_time: str = Field(..., pattern=r"^\d{2}:\d{2}$")
@@ -4,35 +4,50 @@ BookingService: 預約業務邏輯協調者
 """
 from datetime import datetime, date, time, timedelta
 from decimal import Decimal
+from functools import partial
 from typing import Optional
 import logging
 
 from booking.domain.models import Booking, BookingItem, BookingLock, BookingStatus, Customer
-from booking.domain.repositories import BookingRepository, BookingLockRepository
-from booking.domain.value_objects import Money, Duration, TimeSlot
+from booking.domain.repositories import (
+    BookingRepository,
+    BookingLockRepository,
+    BookingReadRepository
+)
+from booking.domain.read_models import BookingListRow
+from booking.domain.value_objects import Money, Duration
+from booking.application.slot_cache import SlotQueryCache
 from booking.domain.events import (
     BookingConfirmedEvent,
     BookingCancelledEvent,
-    BookingCompletedEvent
+    BookingCompletedEvent,
+    SlotHeldEvent,
+    SlotHoldReleasedEvent
 )
 from booking.domain.exceptions import (
     BookingOverlapError,
     StaffInactiveError,
     ServiceInactiveError,
     OutsideWorkingHoursError,
-    InvalidTimeSlotError
+    InvalidTimeSlotError,
+    SlotHoldError
 )
+from billing.domain.exceptions import QuotaExceededError
 from shared.exceptions import (
     EntityNotFoundError,
     MerchantInactiveError,
     SubscriptionPastDueError,
     PermissionDeniedError
 )
-from shared.event_bus import event_bus
+from shared.config import settings
+from shared.event_bus import DomainEvent, event_bus
+from shared.metrics import BOOKING_CREATE_TOTAL, count_outcomes
+from shared.tracing import trace_methods, tracer
 
 logger = logging.getLogger(__name__)
 
 
+@trace_methods
 class BookingService:
     """
     預約應用服務
@@ -50,14 +65,33 @@ class BookingService:
         booking_lock_repo: BookingLockRepository,
         catalog_service: Optional["CatalogService"] = None,  # Catalog Context
         merchant_service: Optional["MerchantService"] = None,  # Merchant Context
-        billing_service: Optional["BillingService"] = None  # Billing Context
+        billing_service: Optional["BillingService"] = None,  # Billing Context
+        notification_service: Optional["NotificationService"] = None,  # Notification Context（預約確認推播）
+        booking_read_repo: Optional[BookingReadRepository] = None,  # 查詢端讀取模型
+        slot_cache: Optional[SlotQueryCache] = None  # 可訂時段查詢快取（None = 每次計算）
     ):
         self.booking_repo = booking_repo
         self.booking_lock_repo = booking_lock_repo
         self.catalog_service = catalog_service
         self.merchant_service = merchant_service
         self.billing_service = billing_service
+        self.notification_service = notification_service
+        self.booking_read_repo = booking_read_repo
+        self.slot_cache = slot_cache
+        # 預約 / 暫留事件於交易提交後才發布（publish_pending_events）：
+        # 時段快取失效與可訂狀態推播（含跨 worker NOTIFY）不會早於提交、也不會在回滾時送出
+        self._pending_events: list[DomainEvent] = []
+        # 預約確認推播同樣待提交後送出：INSERT 於提交時才失敗的預約不會先通知客戶「已確認」
+        self._pending_notifications: list[partial] = []
     
+    @count_outcomes(BOOKING_CREATE_TOTAL, {
+        BookingOverlapError: "overlap",
+        MerchantInactiveError: "inactive",
+        SubscriptionPastDueError: "inactive",
+        StaffInactiveError: "inactive",
+        ServiceInactiveError: "inactive",
+        QuotaExceededError: "quota",
+    })
     async def create_booking(
         self,
         merchant_id: str,
@@ -65,7 +99,9 @@ class BookingService:
         staff_id: int,
         start_at: datetime,
         items_data: list[dict],  # [{"service_id": 1, "option_ids": [1,2]}]
-        notes: Optional[str] = None
+        notes: Optional[str] = None,
+        hold_id: Optional[str] = None,
+        holder_id: Optional[str] = None
     ) -> Booking:
         """
         建立預約
@@ -76,77 +112,206 @@ class BookingService:
         3. 計算總價與總時長
         4. 檢查時段可用性
         5. 建立 BookingLock（EXCLUDE 約束保證無重疊）
-        6. 建立 Booking
+        6. 佔用本月預約額度並建立 Booking
         7. 關聯 Lock 到 Booking
-        8. 發布 BookingConfirmed 事件
-        9. 提交交易
+        8. 暫存 BookingConfirmed 事件
+        9. 提交交易（呼叫端），之後以 publish_pending_events 發布事件
         
         失敗時完全回滾，確保無殘留 lock
         
+        帶 hold_id 時（先前以 hold_slot 暫留時段）：步驟 4-5 改為驗證暫留
+        並將其轉為正式鎖定，不再檢查重疊
+        
         Raises:
             MerchantInactiveError: 商家停用
             SubscriptionPastDueError: 訂閱逾期
+            QuotaExceededError: 超過本月預約額度
             StaffInactiveError: 員工停用
             ServiceInactiveError: 服務停用
             BookingOverlapError: 時段重疊
             OutsideWorkingHoursError: 超出工作時間
+            SlotHoldError: 暫留無效（不存在、已到期、非本人或不涵蓋預約時段）
         """
         
         # === STEP 1: 驗證商家狀態 ===
-        if self.merchant_service:
-            # 使用真實的 MerchantService 驗證商家狀態
-            self.merchant_service.validate_merchant_active(merchant_id)
-        else:
-            # Fallback: 跳過商家驗證（向後相容）
-            pass
+        with tracer.span("BookingService.create_booking.merchant_check"):
+            if self.merchant_service:
+                # 使用真實的 MerchantService 驗證商家狀態
+                self.merchant_service.validate_merchant_active(merchant_id)
+            else:
+                # Fallback: 跳過商家驗證（向後相容）
+                pass
         
         # === STEP 2: 驗證訂閱狀態 ===
-        if self.billing_service:
-            # 使用真實的 BillingService 驗證訂閱狀態
-            self.billing_service.validate_can_create_booking(merchant_id)
-        else:
-            # Fallback: 跳過訂閱驗證（向後相容）
-            pass
+        with tracer.span("BookingService.create_booking.subscription_check"):
+            if self.billing_service:
+                # 使用真實的 BillingService 驗證訂閱狀態
+                self.billing_service.validate_can_create_booking(merchant_id)
+            else:
+                # Fallback: 跳過訂閱驗證（向後相容）
+                pass
         
         # === STEP 3: 驗證員工與服務，計算價格時長 ===
-        booking_items = []
+        with tracer.span("BookingService.create_booking.catalog_validation"):
+            booking_items = await self._build_booking_items(merchant_id, staff_id, items_data)
         
-        if self.catalog_service:
-            # 使用真實的 CatalogService
-            for item_data in items_data:
-                # 驗證員工可執行此服務
-                await self.catalog_service.validate_staff_can_perform_service(
+        # === STEP 4: 計算總時長，確定 end_at ===
+        end_at = start_at + self._total_duration(booking_items).to_timedelta()
+        
+        # === STEP 5: 檢查時段衝突（應用層預檢查）===
+        with tracer.span("BookingService.create_booking.overlap_check"):
+            hold = None
+            if hold_id:
+                # 暫留期間他人無法鎖定重疊時段，只需驗證暫留本身
+                hold = self._get_valid_hold(hold_id, merchant_id, holder_id, staff_id, start_at, end_at)
+            else:
+                overlapping_locks = self.booking_lock_repo.find_overlapping_locks(
+                    merchant_id=merchant_id,
                     staff_id=staff_id,
-                    service_id=item_data["service_id"],
-                    merchant_id=merchant_id
+                    start_at=start_at,
+                    end_at=end_at
                 )
                 
-                # 建構 BookingItem
-                booking_item = await self.catalog_service.build_booking_item(
-                    service_id=item_data["service_id"],
-                    option_ids=item_data.get("option_ids", []),
-                    merchant_id=merchant_id
+                if overlapping_locks:
+                    raise BookingOverlapError(
+                        staff_id=staff_id,
+                        start_at=start_at,
+                        end_at=end_at,
+                        conflicting_booking_id=overlapping_locks[0].booking_id
+                    )
+        
+        # === STEP 6: 建立 BookingLock（DB 層保證）===
+        with tracer.span("BookingService.create_booking.lock_insert"):
+            if hold:
+                # 暫留轉為正式鎖定（期間已到期並被清除時失敗）
+                if not self.booking_lock_repo.confirm_hold(hold.id, start_at, end_at):
+                    raise SlotHoldError(hold.id, "暫留已到期")
+                created_lock = hold
+            else:
+                lock = BookingLock.create_for_booking(
+                    merchant_id=merchant_id,
+                    staff_id=staff_id,
+                    start_at=start_at,
+                    end_at=end_at
                 )
-                booking_items.append(booking_item)
-        else:
-            # Fallback: 使用模擬資料（向後相容）
-            booking_items = self._build_booking_items_mock(items_data)
+                
+                try:
+                    created_lock = self.booking_lock_repo.create_lock(lock)
+                except Exception as e:
+                    # PostgreSQL EXCLUDE 約束違反
+                    if "exclusion" in str(e).lower():
+                        raise BookingOverlapError(
+                            staff_id=staff_id,
+                            start_at=start_at,
+                            end_at=end_at
+                        )
+                    raise
+        
+        # === STEP 7: 佔用預約額度，建立 Booking 聚合 ===
+        with tracer.span("BookingService.create_booking.save"):
+            if self.billing_service:
+                # 用量計數列鎖持有至提交，放在最後以縮短同商家並行預約的等待
+                self.billing_service.reserve_booking_quota(merchant_id)
+            
+            booking = Booking.create_new(
+                merchant_id=merchant_id,
+                customer=customer,
+                staff_id=staff_id,
+                start_at=start_at,
+                items=booking_items,
+                notes=notes
+            )
+            
+            saved_booking = self.booking_repo.save(booking)
         
-        # === STEP 4: 計算總時長，確定 end_at ===
-        total_duration = Duration.zero()
-        for item in booking_items:
-            total_duration = total_duration + item.total_duration()
+        # === STEP 8: 關聯 Lock 到 Booking ===
+        with tracer.span("BookingService.create_booking.link_lock"):
+            self.booking_lock_repo.link_to_booking(
+                lock_id=created_lock.id,
+                booking_id=saved_booking.id
+            )
         
-        end_at = start_at + total_duration.to_timedelta()
+        # === STEP 9: 暫存領域事件（提交後由呼叫端發布）===
+        with tracer.span("BookingService.create_booking.publish_event"):
+            event = BookingConfirmedEvent.create(
+                booking_id=saved_booking.id,
+                merchant_id=merchant_id,
+                payload={
+                    "customer": {
+                        "line_user_id": customer.line_user_id,
+                        "name": customer.name
+                    },
+                    "staff_id": staff_id,
+                    "start_at": start_at.isoformat(),
+                    "end_at": end_at.isoformat(),
+                    "total_price": float(saved_booking.total_price().amount)
+                }
+            )
+            self._pending_events.append(event)
+        
+        # === STEP 10: 暫存通知（LINE 推播，提交後由呼叫端送出）===
+        with tracer.span("BookingService.create_booking.notify"):
+            if self.merchant_service and self.notification_service:
+                try:
+                    merchant = self.merchant_service.get_merchant(merchant_id)
+                    
+                    # 提取服務名稱
+                    service_names = [item.service_name for item in saved_booking.items]
+                    service_name = service_names[0] if service_names else "預約服務"
+                    
+                    self._pending_notifications.append(partial(
+                        self.notification_service.send_booking_confirmed_notification,
+                        merchant=merchant,
+                        customer_line_user_id=customer.line_user_id,
+                        customer_name=customer.name or "客戶",
+                        booking_id=saved_booking.id,
+                        start_at=start_at.strftime("%Y-%m-%d %H:%M"),
+                        service_name=service_name
+                    ))
+                except Exception as e:
+                    # 通知失敗不影響預約建立
+                    logger.warning(f"⚠️  LINE 通知準備失敗（不影響預約）: {e}")
+        
+        logger.info(f"Booking created: {saved_booking.id}")
+        return saved_booking
+    
+    async def hold_slot(
+        self,
+        merchant_id: str,
+        holder_id: str,
+        staff_id: int,
+        start_at: datetime,
+        items_data: list[dict]
+    ) -> BookingLock:
+        """
+        暫留時段（客戶選定時段後、送出預約前）
+        
+        以 booking_locks 寫入有到期時間的鎖定，同一 EXCLUDE 約束保證與預約及其他暫留不重疊；
+        同一客戶在商家下只保留最新的一個暫留（改選時段時釋出先前的暫留）
+        
+        SlotHeld / SlotHoldReleased 事件暫存，呼叫端提交後以 publish_pending_events 發布
+        
+        Raises:
+            MerchantInactiveError: 商家停用
+            StaffInactiveError: 員工停用
+            ServiceInactiveError: 服務停用
+            BookingOverlapError: 時段已被預約或暫留
+        """
+        if self.merchant_service:
+            self.merchant_service.validate_merchant_active(merchant_id)
+        
+        booking_items = await self._build_booking_items(merchant_id, staff_id, items_data)
+        end_at = start_at + self._total_duration(booking_items).to_timedelta()
+        
+        for released in self.booking_lock_repo.delete_holds_by_holder(merchant_id, holder_id):
+            self._queue_hold_released(released, reason="replaced")
         
-        # === STEP 5: 檢查時段衝突（應用層預檢查）===
         overlapping_locks = self.booking_lock_repo.find_overlapping_locks(
             merchant_id=merchant_id,
             staff_id=staff_id,
             start_at=start_at,
             end_at=end_at
         )
-        
         if overlapping_locks:
             raise BookingOverlapError(
                 staff_id=staff_id,
@@ -155,90 +320,128 @@ class BookingService:
                 conflicting_booking_id=overlapping_locks[0].booking_id
             )
         
-        # === STEP 6: 建立 BookingLock（DB 層保證）===
-        lock = BookingLock.create_for_booking(
+        hold = self.booking_lock_repo.create_lock(BookingLock.create_hold(
             merchant_id=merchant_id,
             staff_id=staff_id,
             start_at=start_at,
-            end_at=end_at
-        )
-        
-        try:
-            created_lock = self.booking_lock_repo.create_lock(lock)
-        except Exception as e:
-            # PostgreSQL EXCLUDE 約束違反
-            if "exclusion" in str(e).lower():
-                raise BookingOverlapError(
-                    staff_id=staff_id,
-                    start_at=start_at,
-                    end_at=end_at
-                )
-            raise
+            end_at=end_at,
+            holder_id=holder_id,
+            ttl=timedelta(seconds=settings.slot_hold_ttl_seconds)
+        ))
         
-        # === STEP 7: 建立 Booking 聚合 ===
-        booking = Booking.create_new(
+        self._pending_events.append(SlotHeldEvent.create(
+            hold_id=hold.id,
             merchant_id=merchant_id,
-            customer=customer,
             staff_id=staff_id,
             start_at=start_at,
-            items=booking_items,
-            notes=notes
-        )
+            end_at=end_at
+        ))
         
-        saved_booking = self.booking_repo.save(booking)
+        logger.info(f"Slot held: {hold.id} by {holder_id} until {hold.expires_at}")
+        return hold
+    
+    async def release_hold(self, hold_id: str, merchant_id: str, holder_id: str):
+        """
+        釋出暫留（客戶放棄）；SlotHoldReleased 事件於呼叫端提交後以 publish_pending_events 發布
         
-        # === STEP 8: 關聯 Lock 到 Booking ===
-        self.booking_lock_repo.link_to_booking(
-            lock_id=created_lock.id,
-            booking_id=saved_booking.id
-        )
+        Raises:
+            EntityNotFoundError: 暫留不存在、已轉為預約或已到期
+            PermissionDeniedError: 非暫留者本人
+        """
+        hold = self.booking_lock_repo.find_by_id(hold_id)
         
-        # === STEP 9: 發布領域事件 ===
-        event = BookingConfirmedEvent.create(
-            booking_id=saved_booking.id,
-            merchant_id=merchant_id,
-            payload={
-                "customer": {
-                    "line_user_id": customer.line_user_id,
-                    "name": customer.name
-                },
-                "staff_id": staff_id,
-                "start_at": start_at.isoformat(),
-                "end_at": end_at.isoformat(),
-                "total_price": float(saved_booking.total_price().amount)
-            }
-        )
-        event_bus.publish(event)
+        if not hold or not hold.is_hold or hold.merchant_id != merchant_id:
+            raise EntityNotFoundError("SlotHold", hold_id)
         
-        # === STEP 10: 觸發通知（LINE 推播）===
-        # 簡化版：直接調用 NotificationService（實際環境應由 EventBus 非同步處理）
-        if self.merchant_service:
+        if hold.holder_id != holder_id:
+            raise PermissionDeniedError("只有暫留者可以釋出暫留")
+        
+        self.booking_lock_repo.delete_lock(hold_id)
+        self._queue_hold_released(hold, reason="released")
+    
+    def _get_valid_hold(
+        self,
+        hold_id: str,
+        merchant_id: str,
+        holder_id: Optional[str],
+        staff_id: int,
+        start_at: datetime,
+        end_at: datetime
+    ) -> BookingLock:
+        """驗證暫留可轉為此預約：本人、同商家同員工、未到期且涵蓋預約時段"""
+        hold = self.booking_lock_repo.find_by_id(hold_id)
+        
+        if not hold or not hold.is_hold or hold.merchant_id != merchant_id:
+            raise SlotHoldError(hold_id, "暫留不存在")
+        if hold.holder_id != holder_id:
+            raise SlotHoldError(hold_id, "非暫留者本人")
+        if hold.is_expired():
+            raise SlotHoldError(hold_id, "暫留已到期")
+        if hold.staff_id != staff_id or not (hold.start_at <= start_at and end_at <= hold.end_at):
+            raise SlotHoldError(hold_id, "預約時段不在暫留範圍內")
+        
+        return hold
+    
+    def publish_pending_events(self):
+        """交易提交後發布暫存的事件並送出暫存的通知（回滾時不呼叫，隨服務實例丟棄）"""
+        events, self._pending_events = self._pending_events, []
+        event_bus.publish_all(events)
+        
+        notifications, self._pending_notifications = self._pending_notifications, []
+        for send in notifications:
             try:
-                from notification.application.services import NotificationService
-                
-                merchant = self.merchant_service.get_merchant(merchant_id)
-                notification_service = NotificationService()
-                
-                # 提取服務名稱
-                service_names = [item.service_name for item in saved_booking.items]
-                service_name = service_names[0] if service_names else "預約服務"
-                
-                notification_service.send_booking_confirmed_notification(
-                    merchant=merchant,
-                    customer_line_user_id=customer.line_user_id,
-                    customer_name=customer.name or "客戶",
-                    booking_id=saved_booking.id,
-                    start_at=start_at.strftime("%Y-%m-%d %H:%M"),
-                    service_name=service_name
-                )
-                
-                logger.info(f"✅ LINE 通知已發送: {saved_booking.id}")
+                send()
+                logger.info(f"✅ LINE 通知已發送: {send.keywords.get('booking_id')}")
             except Exception as e:
-                # 通知失敗不影響預約建立
+                # 通知失敗不影響預約（已提交）
                 logger.warning(f"⚠️  LINE 通知發送失敗（不影響預約）: {e}")
+    
+    def _queue_hold_released(self, hold: BookingLock, reason: str):
+        self._pending_events.append(SlotHoldReleasedEvent.create(
+            hold_id=hold.id,
+            merchant_id=hold.merchant_id,
+            staff_id=hold.staff_id,
+            start_at=hold.start_at,
+            end_at=hold.end_at,
+            reason=reason
+        ))
+    
+    async def _build_booking_items(
+        self,
+        merchant_id: str,
+        staff_id: int,
+        items_data: list[dict]
+    ) -> list[BookingItem]:
+        """驗證員工可執行各服務並建構 BookingItem"""
+        if not self.catalog_service:
+            # Fallback: 使用模擬資料（向後相容）
+            return self._build_booking_items_mock(items_data)
         
-        logger.info(f"Booking created: {saved_booking.id}")
-        return saved_booking
+        booking_items = []
+        for item_data in items_data:
+            # 驗證員工可執行此服務
+            await self.catalog_service.validate_staff_can_perform_service(
+                staff_id=staff_id,
+                service_id=item_data["service_id"],
+                merchant_id=merchant_id
+            )
+            
+            # 建構 BookingItem
+            booking_item = await self.catalog_service.build_booking_item(
+                service_id=item_data["service_id"],
+                option_ids=item_data.get("option_ids", []),
+                merchant_id=merchant_id
+            )
+            booking_items.append(booking_item)
+        
+        return booking_items
+    
+    @staticmethod
+    def _total_duration(booking_items: list[BookingItem]) -> Duration:
+        total_duration = Duration.zero()
+        for item in booking_items:
+            total_duration = total_duration + item.total_duration()
+        return total_duration
     
     def _build_booking_items_mock(self, items_data: list[dict]) -> list[BookingItem]:
         """
@@ -306,14 +509,21 @@ class BookingService:
         # 儲存
         updated_booking = self.booking_repo.save(booking)
         
-        # 發布事件
+        # 歸還預約額度（計入預約建立當月）
+        if self.billing_service:
+            self.billing_service.release_booking_quota(merchant_id, booking.created_at)
+        
+        # 暫存事件（提交後由呼叫端發布）
         event = BookingCancelledEvent.create(
             booking_id=booking_id,
             merchant_id=merchant_id,
             cancelled_by=requester_line_id,
-            reason=reason
+            reason=reason,
+            staff_id=booking.staff_id,
+            start_at=booking.start_at,
+            end_at=booking.end_at
         )
-        event_bus.publish(event)
+        self._pending_events.append(event)
         
         logger.info(f"Booking cancelled: {booking_id}")
         return updated_booking
@@ -341,6 +551,76 @@ class BookingService:
             status=status
         )
     
+    async def list_booking_rows(
+        self,
+        merchant_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[BookingStatus] = None,
+        staff_id: Optional[int] = None
+    ) -> list[BookingListRow]:
+        """
+        列出商家的預約（讀取模型，供列表 / 匯出端點使用）
+        
+        未注入 booking_read_repo 時退回聚合查詢並轉為相同的資料列
+        """
+        if self.booking_read_repo:
+            return self.booking_read_repo.list_rows(
+                merchant_id=merchant_id,
+                start_date=start_date,
+                end_date=end_date,
+                status=status,
+                staff_id=staff_id
+            )
+        
+        # Fallback: 聚合查詢（向後相容）
+        bookings = self.booking_repo.find_by_merchant(
+            merchant_id=merchant_id,
+            start_date=start_date,
+            end_date=end_date,
+            status=status
+        )
+        return [
+            self._booking_to_row(booking)
+            for booking in bookings
+            if not staff_id or booking.staff_id == staff_id
+        ]
+    
+    @staticmethod
+    def _booking_to_row(booking: Booking) -> BookingListRow:
+        """Booking 聚合 → 列表資料列（欄位格式與 bookings 表一致）"""
+        total_price = booking.total_price()
+        return BookingListRow(
+            id=booking.id,
+            merchant_id=booking.merchant_id,
+            staff_id=booking.staff_id,
+            status=booking.status.value,
+            start_at=booking.start_at,
+            end_at=booking.end_at,
+            customer={
+                "line_user_id": booking.customer.line_user_id,
+                "name": booking.customer.name,
+                "phone": booking.customer.phone,
+                "email": booking.customer.email
+            },
+            items=[
+                {
+                    "service_id": item.service_id,
+                    "service_name": item.service_name,
+                    "service_price": float(item.service_price.amount),
+                    "service_duration_minutes": item.service_duration.minutes,
+                    "option_ids": item.option_ids,
+                    "option_names": item.option_names
+                }
+                for item in booking.items
+            ],
+            total_price_amount=total_price.amount,
+            total_price_currency=total_price.currency,
+            total_duration_minutes=booking.total_duration().minutes,
+            notes=booking.notes,
+            created_at=booking.created_at
+        )
+    
     async def calculate_available_slots(
         self,
         merchant_id: str,
@@ -362,6 +642,31 @@ class BookingService:
         Returns:
             [{"start_time": "14:00", "end_time": "15:00", "available": True}, ...]
         """
+        if self.slot_cache is None:
+            return await self._compute_available_slots(
+                merchant_id, staff_id, target_date, service_duration_min, interval_min
+            )
+        
+        # 相同查詢合併計算並短暫快取（員工當日有預約異動時失效）
+        return await self.slot_cache.get_or_compute(
+            merchant_id,
+            staff_id,
+            target_date,
+            (service_duration_min, interval_min),
+            lambda: self._compute_available_slots(
+                merchant_id, staff_id, target_date, service_duration_min, interval_min
+            )
+        )
+    
+    async def _compute_available_slots(
+        self,
+        merchant_id: str,
+        staff_id: int,
+        target_date: date,
+        service_duration_min: int,
+        interval_min: int
+    ) -> list[dict]:
+        """計算可訂時段（不經快取）"""
         # 設定時區（台北時間 UTC+8）
         from datetime import timezone, timedelta
         tz = timezone(timedelta(hours=8))  # Asia/Taipei
@@ -404,15 +709,26 @@ class BookingService:
         day_start = datetime.combine(target_date, time(0, 0), tzinfo=tz)
         day_end = datetime.combine(target_date, time(23, 59, 59), tzinfo=tz)
         
-        bookings = self.booking_repo.find_by_staff_and_date_range(
-            merchant_id=merchant_id,
-            staff_id=staff_id,
-            start_at=day_start,
-            end_at=day_end
-        )
-        
-        # 建立已預約時段列表
-        booked_slots = [booking.time_slot() for booking in bookings]
+        if self.booking_read_repo:
+            # 讀取模型：僅查詢 id 與時間範圍，不水合聚合
+            booked_ranges = [
+                (row.start_at, row.end_at)
+                for row in self.booking_read_repo.list_busy_slots(
+                    merchant_id=merchant_id,
+                    staff_id=staff_id,
+                    start_at=day_start,
+                    end_at=day_end
+                )
+            ]
+        else:
+            # Fallback: 聚合查詢（向後相容）
+            bookings = self.booking_repo.find_by_staff_and_date_range(
+                merchant_id=merchant_id,
+                staff_id=staff_id,
+                start_at=day_start,
+                end_at=day_end
+            )
+            booked_ranges = [(booking.start_at, booking.end_at) for booking in bookings]
         
         # 生成所有可能的時段（間隔為 interval_min）
         slots = []
@@ -420,12 +736,11 @@ class BookingService:
         
         while current + timedelta(minutes=service_duration_min) <= working_end:
             slot_end = current + timedelta(minutes=service_duration_min)
-            candidate_slot = TimeSlot(start_at=current, end_at=slot_end)
             
-            # 檢查是否與已預約時段重疊
+            # 檢查是否與已預約時段重疊（規則同 TimeSlot.overlaps）
             is_available = not any(
-                candidate_slot.overlaps(booked_slot)
-                for booked_slot in booked_slots
+                current < booked_end and booked_start < slot_end
+                for booked_start, booked_end in booked_ranges
             )
             
             slots.append({
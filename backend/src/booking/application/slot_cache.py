@@ -0,0 +1,104 @@
+"""
+Booking Context - Application Layer - Slot Query Cache
+可訂時段查詢的合併與短效快取
+
+熱門商家開放新月份時，大量 LIFF 用戶同時查詢相同的（商家, 員工, 日期, 時長）時段：
+- 並行的相同查詢共用一次計算（SingleFlight）
+- 結果快取 slot_cache_ttl_seconds 秒
+- 訂閱 BookingConfirmed / BookingCancelled 與時段暫留 / 釋出，使該員工當日的快取失效
+  （以世代號碼遞增，失效前已開始的計算不會被失效後的請求共用）
+
+快取為單一 worker 內有效；其他 worker（以及事件發布至交易提交之間的查詢）
+最多於 TTL 內回傳舊結果，建立預約時仍有重疊檢查，不會因此超賣
+"""
+from datetime import date, datetime
+from typing import Awaitable, Callable
+import logging
+
+from shared.config import settings
+from shared.event_bus import DomainEvent, EventBus, event_bus
+from shared.metrics import SLOT_QUERY_TOTAL
+from shared.single_flight import MISSING, SingleFlight, TTLCache
+from shared.timezone import to_local
+
+logger = logging.getLogger(__name__)
+
+
+class SlotQueryCache:
+    """可訂時段查詢快取（依員工當日失效）"""
+    
+    def __init__(self, ttl_seconds: float, max_entries: int = 10_000):
+        self.enabled = ttl_seconds > 0
+        self.max_entries = max_entries
+        self._results = TTLCache(ttl_seconds, max_entries)
+        self._flight = SingleFlight()
+        self._generations: dict[tuple, int] = {}
+    
+    async def get_or_compute(
+        self,
+        merchant_id: str,
+        staff_id: int,
+        target_date: date,
+        variant: tuple,
+        compute: Callable[[], Awaitable[list[dict]]]
+    ) -> list[dict]:
+        """
+        取得時段結果（快取命中、加入進行中的計算，或自行計算）
+        
+        Args:
+            variant: 影響結果的其他參數（服務時長、間隔）
+        
+        回傳的 list 由多個請求共用，呼叫端不可修改
+        """
+        staff_day = (merchant_id, staff_id, target_date)
+        key = (staff_day, self._generations.get(staff_day, 0), variant)
+        
+        if self.enabled:
+            cached = self._results.get(key)
+            if cached is not MISSING:
+                SLOT_QUERY_TOTAL.inc(outcome="hit")
+                return cached
+        
+        slots, shared = await self._flight.do(key, compute)
+        if shared:
+            SLOT_QUERY_TOTAL.inc(outcome="coalesced")
+            return slots
+        
+        SLOT_QUERY_TOTAL.inc(outcome="miss")
+        # 計算期間若已失效（世代號碼改變），不寫入快取
+        if self.enabled and key[1] == self._generations.get(staff_day, 0):
+            self._results.set(key, slots)
+        return slots
+    
+    def invalidate(self, merchant_id: str, staff_id: int, start_at: datetime):
+        """員工當日有預約異動：使快取失效"""
+        staff_day = (merchant_id, staff_id, to_local(start_at).date())
+        if len(self._generations) >= self.max_entries:
+            # 世代表過大時整個重置（同時清空結果，避免世代歸零後命中舊結果）
+            self.clear()
+        self._generations[staff_day] = self._generations.get(staff_day, 0) + 1
+        logger.debug(f"Slot cache invalidated: {staff_day}")
+    
+    def handle_booking_changed(self, event: DomainEvent):
+        """事件處理：預約建立 / 取消、時段暫留 / 釋出"""
+        payload = event.payload
+        if "staff_id" not in payload or "start_at" not in payload:
+            return
+        self.invalidate(
+            payload["merchant_id"],
+            payload["staff_id"],
+            datetime.fromisoformat(payload["start_at"])
+        )
+    
+    def subscribe(self, bus: EventBus):
+        for event_type in ("BookingConfirmed", "BookingCancelled", "SlotHeld", "SlotHoldReleased"):
+            bus.subscribe(event_type, self.handle_booking_changed)
+    
+    def clear(self):
+        self._results.clear()
+        self._generations.clear()
+
+
+# 全局時段查詢快取
+slot_cache = SlotQueryCache(settings.slot_cache_ttl_seconds, settings.slot_cache_max_entries)
+slot_cache.subscribe(event_bus)
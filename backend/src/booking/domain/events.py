@@ -4,6 +4,7 @@ Booking Context - Domain Layer - Domain Events
 """
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 from uuid import uuid4
 
 from shared.event_bus import DomainEvent
@@ -56,19 +57,30 @@ class BookingCancelledEvent(DomainEvent):
         booking_id: str,
         merchant_id: str,
         cancelled_by: str,
-        reason: str = ""
+        reason: str = "",
+        staff_id: Optional[int] = None,
+        start_at: Optional[datetime] = None,
+        end_at: Optional[datetime] = None
     ):
+        payload = {
+            "merchant_id": merchant_id,
+            "cancelled_by": cancelled_by,
+            "reason": reason
+        }
+        # 釋出的時段（供時段快取失效與可訂狀態推播）
+        if staff_id is not None and start_at is not None:
+            payload["staff_id"] = staff_id
+            payload["start_at"] = start_at.isoformat()
+        if end_at is not None:
+            payload["end_at"] = end_at.isoformat()
+        
         return cls(
             event_id=str(uuid4()),
             occurred_at=now_utc(),
             aggregate_id=booking_id,
             aggregate_type="Booking",
             event_type="BookingCancelled",
-            payload={
-                "merchant_id": merchant_id,
-                "cancelled_by": cancelled_by,
-                "reason": reason
-            }
+            payload=payload
         )
 
 
@@ -114,3 +126,61 @@ class BookingRescheduledEvent(DomainEvent):
             }
         )
 
+
+
+@dataclass
+class SlotHeldEvent(DomainEvent):
+    """時段暫留事件（客戶選定時段，填寫表單期間他人不可預約）"""
+    
+    @classmethod
+    def create(
+        cls,
+        hold_id: str,
+        merchant_id: str,
+        staff_id: int,
+        start_at: datetime,
+        end_at: datetime
+    ):
+        return cls(
+            event_id=str(uuid4()),
+            occurred_at=now_utc(),
+            aggregate_id=hold_id,
+            aggregate_type="BookingLock",
+            event_type="SlotHeld",
+            payload={
+                "merchant_id": merchant_id,
+                "staff_id": staff_id,
+                "start_at": start_at.isoformat(),
+                "end_at": end_at.isoformat()
+            }
+        )
+
+
+@dataclass
+class SlotHoldReleasedEvent(DomainEvent):
+    """時段暫留釋出事件（客戶放棄或逾時未轉為預約）"""
+    
+    @classmethod
+    def create(
+        cls,
+        hold_id: str,
+        merchant_id: str,
+        staff_id: int,
+        start_at: datetime,
+        end_at: datetime,
+        reason: str
+    ):
+        return cls(
+            event_id=str(uuid4()),
+            occurred_at=now_utc(),
+            aggregate_id=hold_id,
+            aggregate_type="BookingLock",
+            event_type="SlotHoldReleased",
+            payload={
+                "merchant_id": merchant_id,
+                "staff_id": staff_id,
+                "start_at": start_at.isoformat(),
+                "end_at": end_at.isoformat(),
+                "reason": reason
+            }
+        )
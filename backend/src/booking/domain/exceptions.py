@@ -95,3 +95,14 @@ class BookingAlreadyCompletedError(DomainException):
             details={"booking_id": booking_id}
         )
 
+
+
+class SlotHoldError(DomainException):
+    """時段暫留無效異常（不存在、已到期、非本人或與預約內容不符）"""
+    
+    def __init__(self, hold_id: str, reason: str):
+        super().__init__(
+            message=f"時段暫留 {hold_id} 無效: {reason}",
+            error_code="slot_hold_invalid",
+            details={"hold_id": hold_id, "reason": reason}
+        )
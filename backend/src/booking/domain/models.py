@@ -3,7 +3,7 @@ Booking Context - Domain Layer - Aggregate Root
 Booking 聚合：預約的生命週期管理
 """
 from dataclasses import dataclass, field
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Optional
 from uuid import uuid4
@@ -29,6 +29,9 @@ class BookingItem:
     """
     預約項目（值物件）
     包含服務 + 加購選項
+    
+    total_price() / total_duration() 結果會被快取，
+    相關欄位被重新指派時自動失效（清單請以重新指派取代原地修改）
     """
     service_id: int
     service_name: str
@@ -40,17 +43,42 @@ class BookingItem:
     option_durations: list[Duration] = field(default_factory=list)
     
     def total_price(self) -> Money:
-        """計算單項總價"""
-        total = self.service_price
+        """計算單項總價（快取：service_price / option_prices 被重新指派時失效）"""
+        cached = self.__dict__.get("_price_cache")
+        if (
+            cached is not None
+            and cached[0] is self.service_price
+            and cached[1] is self.option_prices
+        ):
+            return cached[2]
+        
+        minor = self.service_price.minor
+        currency = self.service_price.currency
         for option_price in self.option_prices:
-            total = total + option_price
+            if option_price.currency != currency:
+                raise ValueError(
+                    f"不同幣別無法相加: {currency} vs {option_price.currency}"
+                )
+            minor += option_price.minor
+        total = Money.from_minor(minor, currency)
+        self.__dict__["_price_cache"] = (self.service_price, self.option_prices, total)
         return total
     
     def total_duration(self) -> Duration:
-        """計算單項總時長"""
-        total = self.service_duration
+        """計算單項總時長（快取：service_duration / option_durations 被重新指派時失效）"""
+        cached = self.__dict__.get("_duration_cache")
+        if (
+            cached is not None
+            and cached[0] is self.service_duration
+            and cached[1] is self.option_durations
+        ):
+            return cached[2]
+        
+        minutes = self.service_duration.minutes
         for option_dur in self.option_durations:
-            total = total + option_dur
+            minutes += option_dur.minutes
+        total = Duration(minutes)
+        self.__dict__["_duration_cache"] = (self.service_duration, self.option_durations, total)
         return total
 
 
@@ -73,6 +101,9 @@ class Booking:
     3. end_at = start_at + total_duration
     4. 狀態轉移規則必須合法
     5. merchant_id 不可變更（租戶隔離）
+    
+    total_price / total_duration / end_at 為快取計算值，
+    僅在 items 或 start_at 被重新指派時失效
     """
     
     def __init__(
@@ -90,12 +121,17 @@ class Booking:
         completed_at: Optional[datetime] = None,
         notes: Optional[str] = None
     ):
+        # 直接寫入底層欄位，避免建構時經由 setter 重複清除快取
+        self._cached_total_price: Optional[Money] = None
+        self._cached_total_duration: Optional[Duration] = None
+        self._cached_end_at: Optional[datetime] = None
+        self._start_at = start_at
+        self._items = items
+        
         self.id = id
         self.merchant_id = merchant_id
         self.customer = customer
         self.staff_id = staff_id
-        self.start_at = start_at
-        self.items = items
         self.status = status
         self.created_at = created_at or datetime.now(timezone.utc)
         self.updated_at = updated_at
@@ -108,18 +144,40 @@ class Booking:
     
     def _validate_invariants(self):
         """驗證聚合不變式"""
-        if len(self.items) == 0:
+        if len(self._items) == 0:
             raise ValueError("預約必須至少包含一個服務項目")
         
-        if self.start_at.tzinfo is None:
+        if self._start_at.tzinfo is None:
             raise ValueError("start_at 必須包含時區資訊")
         
-        # 驗證 end_at 正確計算
-        calculated_end = self.start_at + self.total_duration().to_timedelta()
-        if hasattr(self, '_end_at') and self._end_at != calculated_end:
-            raise ValueError(
-                f"end_at 計算錯誤: 預期 {calculated_end}, 實際 {self._end_at}"
-            )
+        # 驗證 end_at 可正確計算（結果同時寫入快取）
+        self.end_at
+    
+    @property
+    def items(self) -> list[BookingItem]:
+        """預約項目（重新指派時清除總計快取）"""
+        return self._items
+    
+    @items.setter
+    def items(self, value: list[BookingItem]):
+        self._items = value
+        self._invalidate_totals()
+    
+    @property
+    def start_at(self) -> datetime:
+        """開始時間（重新指派時清除 end_at 快取）"""
+        return self._start_at
+    
+    @start_at.setter
+    def start_at(self, value: datetime):
+        self._start_at = value
+        self._cached_end_at = None
+    
+    def _invalidate_totals(self):
+        """清除總價、總時長與結束時間快取"""
+        self._cached_total_price = None
+        self._cached_total_duration = None
+        self._cached_end_at = None
     
     @property
     def end_at(self) -> datetime:
@@ -127,33 +185,45 @@ class Booking:
         計算結束時間（根據不變式）
         end_at = start_at + total_duration
         """
-        return self.start_at + self.total_duration().to_timedelta()
+        if self._cached_end_at is None:
+            self._cached_end_at = self._start_at + self.total_duration().to_timedelta()
+        return self._cached_end_at
     
     def total_price(self) -> Money:
         """
         計算總價格（根據不變式）
         total_price = Σ(item.total_price())
         """
-        if not self.items:
-            return Money.zero()
-        
-        total = self.items[0].total_price()
-        for item in self.items[1:]:
-            total = total + item.total_price()
-        return total
+        if self._cached_total_price is None:
+            if not self._items:
+                return Money.zero()
+            
+            first = self._items[0].total_price()
+            minor = first.minor
+            for item in self._items[1:]:
+                item_price = item.total_price()
+                if item_price.currency != first.currency:
+                    raise ValueError(
+                        f"不同幣別無法相加: {first.currency} vs {item_price.currency}"
+                    )
+                minor += item_price.minor
+            self._cached_total_price = Money.from_minor(minor, first.currency)
+        return self._cached_total_price
     
     def total_duration(self) -> Duration:
         """
         計算總時長（根據不變式）
         total_duration = Σ(item.total_duration())
         """
-        if not self.items:
-            return Duration.zero()
-        
-        total = self.items[0].total_duration()
-        for item in self.items[1:]:
-            total = total + item.total_duration()
-        return total
+        if self._cached_total_duration is None:
+            if not self._items:
+                return Duration.zero()
+            
+            minutes = 0
+            for item in self._items:
+                minutes += item.total_duration().minutes
+            self._cached_total_duration = Duration(minutes)
+        return self._cached_total_duration
     
     def time_slot(self) -> TimeSlot:
         """取得預約時段"""
@@ -230,6 +300,9 @@ class BookingLock:
     
     用途：在建立 Booking 前先寫入 BookingLock
     PostgreSQL EXCLUDE 約束保證同一員工無重疊
+    
+    暫留（hold）：客戶選定時段後先建立有到期時間的鎖定，填寫表單期間他人無法預約；
+    送出預約時轉為正式鎖定，逾時未轉換者視同不存在並由背景清除
     """
     id: str
     merchant_id: str
@@ -238,6 +311,8 @@ class BookingLock:
     end_at: datetime
     booking_id: Optional[str] = None  # 關聯到 Booking
     created_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None  # 暫留到期時間（None = 正式鎖定）
+    holder_id: Optional[str] = None  # 暫留者（用戶 ID）
     
     @classmethod
     def create_for_booking(
@@ -256,4 +331,38 @@ class BookingLock:
             end_at=end_at,
             created_at=datetime.now(timezone.utc)
         )
+    
+    @classmethod
+    def create_hold(
+        cls,
+        merchant_id: str,
+        staff_id: int,
+        start_at: datetime,
+        end_at: datetime,
+        holder_id: str,
+        ttl: timedelta
+    ) -> "BookingLock":
+        """工廠方法：建立暫留（ttl 後到期）"""
+        now = datetime.now(timezone.utc)
+        return cls(
+            id=str(uuid4()),
+            merchant_id=merchant_id,
+            staff_id=staff_id,
+            start_at=start_at,
+            end_at=end_at,
+            created_at=now,
+            expires_at=now + ttl,
+            holder_id=holder_id
+        )
+    
+    @property
+    def is_hold(self) -> bool:
+        """是否為尚未轉為預約的暫留"""
+        return self.booking_id is None and self.expires_at is not None
+    
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        """暫留是否已到期（正式鎖定永不到期）"""
+        if self.expires_at is None:
+            return False
+        return self.expires_at <= (now or datetime.now(timezone.utc))
 
@@ -0,0 +1,37 @@
+"""
+Booking Context - Domain Layer - Read Models
+查詢端讀取模型：扁平、不可變的資料列，不經過聚合水合與不變式驗證
+
+用途：
+- 時段計算只需要 id 與時間範圍
+- 列表 / 匯出端點只需要扁平欄位
+
+寫入路徑（建立、取消、完成）仍一律使用 Booking 聚合
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+
+class BookingSlotRow(NamedTuple):
+    """已佔用時段（時段計算用）"""
+    id: str
+    start_at: datetime
+    end_at: datetime
+
+
+class BookingListRow(NamedTuple):
+    """預約列表資料列（列表 / 匯出用）"""
+    id: str
+    merchant_id: str
+    staff_id: int
+    status: str
+    start_at: datetime
+    end_at: datetime
+    customer: dict
+    items: list[dict]
+    total_price_amount: Decimal
+    total_price_currency: str
+    total_duration_minutes: int
+    notes: Optional[str]
+    created_at: Optional[datetime]
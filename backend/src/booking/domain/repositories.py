@@ -8,6 +8,7 @@ from typing import Optional
 from uuid import UUID
 
 from .models import Booking, BookingLock, BookingStatus
+from .read_models import BookingListRow, BookingSlotRow
 from .value_objects import TimeSlot
 
 
@@ -102,6 +103,51 @@ class BookingRepository(ABC):
         pass
 
 
+class BookingReadRepository(ABC):
+    """
+    Booking 查詢端倉儲介面（讀取模型）
+    
+    設計原則：
+    - 僅查詢所需欄位，回傳扁平資料列，不水合 Booking 聚合
+    - 供時段計算與列表 / 匯出端點使用；寫入路徑仍使用 BookingRepository
+    """
+    
+    @abstractmethod
+    def list_busy_slots(
+        self,
+        merchant_id: str,
+        staff_id: int,
+        start_at: datetime,
+        end_at: datetime
+    ) -> list[BookingSlotRow]:
+        """
+        查詢員工在時間範圍內已佔用的時段（pending / confirmed 預約與未到期的暫留）
+        
+        Returns:
+            依 start_at 排序的時段資料列
+        """
+        pass
+    
+    @abstractmethod
+    def list_rows(
+        self,
+        merchant_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[BookingStatus] = None,
+        staff_id: Optional[int] = None
+    ) -> list[BookingListRow]:
+        """
+        查詢商家預約列表資料列
+        
+        過濾條件與 BookingRepository.find_by_merchant 一致，另支援 staff_id
+        
+        Returns:
+            依 start_at 降冪排序的資料列
+        """
+        pass
+
+
 class BookingLockRepository(ABC):
     """
     BookingLock 倉儲介面
@@ -115,6 +161,7 @@ class BookingLockRepository(ABC):
         建立預約鎖定
         
         如果與現有鎖定重疊，PostgreSQL EXCLUDE 約束會拋出異常
+        （寫入前先刪除重疊的已到期暫留，不必等背景清除）
         
         Raises:
             psycopg2.errors.ExclusionViolation: 時段重疊
@@ -133,6 +180,8 @@ class BookingLockRepository(ABC):
         查詢重疊的鎖定
         
         用途：應用層的預檢查（雖然 DB 有約束，但提前檢查可提供更好的錯誤訊息）
+        
+        已到期的暫留視同不存在
         """
         pass
     
@@ -158,4 +207,43 @@ class BookingLockRepository(ABC):
         用途：取消預約時釋放鎖定
         """
         pass
+    
+    @abstractmethod
+    def find_by_id(self, lock_id: str) -> Optional[BookingLock]:
+        """依 ID 查詢鎖定（含暫留）"""
+        pass
+    
+    @abstractmethod
+    def confirm_hold(self, lock_id: str, start_at: datetime, end_at: datetime) -> bool:
+        """
+        將暫留轉為正式鎖定
+        
+        清除到期時間，並將區間調整為預約實際時段（只會縮小，不影響 EXCLUDE 約束）
+        
+        Returns:
+            是否成功轉換
+        """
+        pass
+    
+    @abstractmethod
+    def delete_expired_holds(
+        self,
+        now: datetime,
+        limit: int = 500
+    ) -> list[BookingLock]:
+        """
+        刪除已到期的暫留
+        
+        用途：背景清除；回傳被刪除的暫留以便發布釋出事件
+        """
+        pass
+    
+    @abstractmethod
+    def delete_holds_by_holder(self, merchant_id: str, holder_id: str) -> list[BookingLock]:
+        """
+        刪除某用戶在商家下的所有暫留
+        
+        用途：同一客戶改選其他時段時釋出先前的暫留
+        """
+        pass
 
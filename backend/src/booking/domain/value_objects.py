@@ -1,10 +1,13 @@
 """
 Booking Context - Domain Layer - Value Objects
 值物件：不可變、無身份標識、可替換
+
+效能說明：
+- 使用 __slots__ 取代 frozen dataclass，降低每個實例的記憶體與建立成本
+- Money 內部以整數最小單位（分）運算，避免 Decimal 加法的開銷
 """
-from dataclasses import dataclass
-from decimal import Decimal
-from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -16,24 +19,100 @@ else:
         from typing_extensions import Self
 
 
-@dataclass(frozen=True)
-class Money:
+SUPPORTED_CURRENCIES = frozenset({"TWD", "USD", "JPY"})
+
+# 金額最小單位的位數（與 DB Numeric(10, 2) 一致）
+MINOR_UNIT_DIGITS = 2
+_MINOR_FACTOR = 10 ** MINOR_UNIT_DIGITS
+_MINOR_QUANTUM = Decimal(1).scaleb(-MINOR_UNIT_DIGITS)
+
+
+class _ImmutableValueObject:
+    """值物件基礎類別：建立後禁止修改屬性"""
+    __slots__ = ()
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} 為不可變值物件，無法修改 {name}")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} 為不可變值物件，無法刪除 {name}")
+
+
+def _to_minor(amount: Decimal | int | float | str) -> int:
+    """將金額轉換為整數最小單位（四捨五入至分）"""
+    if isinstance(amount, int):
+        return amount * _MINOR_FACTOR
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    scaled = amount.scaleb(MINOR_UNIT_DIGITS)
+    minor = int(scaled)
+    if minor != scaled:
+        minor = int(scaled.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return minor
+
+
+class Money(_ImmutableValueObject):
     """
     金額值物件
     
     不變式：
     - amount >= 0
+    - amount 最多兩位小數（與 minor 一致，相等 / 雜湊以 minor 比較才不會把不同金額視為相同）
     - currency 必須為 ISO 4217 代碼
+    
+    建立時只保存 Decimal；整數最小單位（minor）於首次運算時才計算並快取，
+    由 from_minor 建立者則反之，兩者皆延遲轉換以降低水合成本
     """
-    amount: Decimal
-    currency: str = "TWD"
+    __slots__ = ("_minor", "currency", "_amount")
+    
+    currency: str
     
-    def __post_init__(self):
-        if self.amount < 0:
-            raise ValueError(f"金額不可為負數: {self.amount}")
+    def __init__(self, amount: Decimal | int | str, currency: str = "TWD"):
+        if type(amount) is not Decimal:
+            amount = Decimal(amount) if isinstance(amount, int) else Decimal(str(amount))
+        if amount < 0:
+            raise ValueError(f"金額不可為負數: {amount}")
+        # 指數檢查為快速路徑：DB Numeric(10, 2) 水合的金額不需 quantize
+        if amount.as_tuple().exponent < -MINOR_UNIT_DIGITS and amount != amount.quantize(_MINOR_QUANTUM):
+            raise ValueError(f"金額最多 {MINOR_UNIT_DIGITS} 位小數: {amount}")
+        
+        if currency not in SUPPORTED_CURRENCIES:
+            raise ValueError(f"不支援的幣別: {currency}")
         
-        if self.currency not in ["TWD", "USD", "JPY"]:
-            raise ValueError(f"不支援的幣別: {self.currency}")
+        object.__setattr__(self, "_amount", amount)
+        object.__setattr__(self, "currency", currency)
+    
+    @classmethod
+    def from_minor(cls, minor: int, currency: str = "TWD") -> Self:
+        """
+        從整數最小單位建立金額（內部快速路徑）
+        
+        呼叫端須保證 minor >= 0 且 currency 已驗證
+        """
+        money = object.__new__(cls)
+        object.__setattr__(money, "_minor", minor)
+        object.__setattr__(money, "currency", currency)
+        return money
+    
+    @property
+    def minor(self) -> int:
+        """整數最小單位（分；四捨五入，首次讀取後快取）"""
+        try:
+            return self._minor
+        except AttributeError:
+            minor = _to_minor(self._amount)
+            object.__setattr__(self, "_minor", minor)
+            return minor
+    
+    @property
+    def amount(self) -> Decimal:
+        """金額（Decimal；由 from_minor 建立者固定兩位小數，首次讀取後快取）"""
+        try:
+            return self._amount
+        except AttributeError:
+            amount = Decimal(self._minor).scaleb(-MINOR_UNIT_DIGITS)
+            object.__setattr__(self, "_amount", amount)
+            return amount
     
     def __add__(self, other: Self) -> Self:
         """金額加法（必須同幣別）"""
@@ -41,17 +120,32 @@ class Money:
             raise ValueError(
                 f"不同幣別無法相加: {self.currency} vs {other.currency}"
             )
-        return Money(
-            amount=self.amount + other.amount,
-            currency=self.currency
-        )
+        return Money.from_minor(self.minor + other.minor, self.currency)
     
     def __mul__(self, multiplier: int | Decimal) -> Self:
         """金額乘法"""
-        return Money(
-            amount=self.amount * Decimal(str(multiplier)),
-            currency=self.currency
+        if isinstance(multiplier, int):
+            if multiplier < 0:
+                raise ValueError(f"金額不可為負數: {self.amount * multiplier}")
+            return Money.from_minor(self.minor * multiplier, self.currency)
+        product = (self.amount * Decimal(str(multiplier))).quantize(
+            _MINOR_QUANTUM, rounding=ROUND_HALF_UP
         )
+        return Money(product, self.currency)
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Money):
+            return NotImplemented
+        return self.minor == other.minor and self.currency == other.currency
+    
+    def __hash__(self) -> int:
+        return hash((self.minor, self.currency))
+    
+    def __reduce__(self):
+        return (Money.from_minor, (self.minor, self.currency))
+    
+    def __repr__(self) -> str:
+        return f"Money(amount={self.amount!r}, currency={self.currency!r})"
     
     def __str__(self) -> str:
         return f"{self.currency} ${self.amount:,.2f}"
@@ -62,19 +156,21 @@ class Money:
         return cls(amount=Decimal("0"), currency=currency)
 
 
-@dataclass(frozen=True)
-class Duration:
+class Duration(_ImmutableValueObject):
     """
     時長值物件
     
     不變式：
     - minutes >= 0
     """
+    __slots__ = ("minutes",)
+    
     minutes: int
     
-    def __post_init__(self):
-        if self.minutes < 0:
-            raise ValueError(f"時長不可為負數: {self.minutes}")
+    def __init__(self, minutes: int):
+        if minutes < 0:
+            raise ValueError(f"時長不可為負數: {minutes}")
+        object.__setattr__(self, "minutes", minutes)
     
     def __add__(self, other: Self) -> Self:
         """時長加法"""
@@ -84,11 +180,24 @@ class Duration:
         """時長乘法"""
         return Duration(minutes=self.minutes * multiplier)
     
-    def to_timedelta(self):
+    def to_timedelta(self) -> timedelta:
         """轉換為 Python timedelta"""
-        from datetime import timedelta
         return timedelta(minutes=self.minutes)
     
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Duration):
+            return NotImplemented
+        return self.minutes == other.minutes
+    
+    def __hash__(self) -> int:
+        return hash(self.minutes)
+    
+    def __reduce__(self):
+        return (Duration, (self.minutes,))
+    
+    def __repr__(self) -> str:
+        return f"Duration(minutes={self.minutes!r})"
+    
     def __str__(self) -> str:
         hours = self.minutes // 60
         mins = self.minutes % 60
@@ -110,26 +219,30 @@ class Duration:
         return cls(minutes=int(Decimal(str(hours)) * 60))
 
 
-@dataclass(frozen=True)
-class TimeSlot:
+class TimeSlot(_ImmutableValueObject):
     """
     時段值物件
     
     不變式：
     - start_at < end_at
     """
+    __slots__ = ("start_at", "end_at")
+    
     start_at: datetime
     end_at: datetime
     
-    def __post_init__(self):
-        if self.start_at >= self.end_at:
+    def __init__(self, start_at: datetime, end_at: datetime):
+        if start_at >= end_at:
             raise ValueError(
-                f"結束時間必須晚於開始時間: {self.start_at} >= {self.end_at}"
+                f"結束時間必須晚於開始時間: {start_at} >= {end_at}"
             )
         
         # 確保時區感知
-        if self.start_at.tzinfo is None or self.end_at.tzinfo is None:
+        if start_at.tzinfo is None or end_at.tzinfo is None:
             raise ValueError("時間必須包含時區資訊（timezone-aware）")
+        
+        object.__setattr__(self, "start_at", start_at)
+        object.__setattr__(self, "end_at", end_at)
     
     def overlaps(self, other: Self) -> bool:
         """
@@ -146,6 +259,19 @@ class TimeSlot:
         delta = self.end_at - self.start_at
         return Duration(minutes=int(delta.total_seconds() / 60))
     
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TimeSlot):
+            return NotImplemented
+        return self.start_at == other.start_at and self.end_at == other.end_at
+    
+    def __hash__(self) -> int:
+        return hash((self.start_at, self.end_at))
+    
+    def __reduce__(self):
+        return (TimeSlot, (self.start_at, self.end_at))
+    
+    def __repr__(self) -> str:
+        return f"TimeSlot(start_at={self.start_at!r}, end_at={self.end_at!r})"
+    
     def __str__(self) -> str:
         return f"{self.start_at.strftime('%Y-%m-%d %H:%M')} - {self.end_at.strftime('%H:%M')}"
-
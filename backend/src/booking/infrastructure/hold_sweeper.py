@@ -0,0 +1,89 @@
+"""
+Booking Context - Infrastructure Layer - Slot Hold Sweeper
+背景清除已到期的時段暫留
+
+到期的暫留在查詢與建立鎖定時已視同不存在，清除只是回收資料列並推播釋出事件
+（時段快取失效、SSE 客戶端得知時段重新開放）；多個 worker 同時執行時以
+SKIP LOCKED 分工，不會重複刪除
+"""
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+import threading
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from booking.domain.events import SlotHoldReleasedEvent
+from booking.infrastructure.repositories.sqlalchemy_booking_lock_repository import (
+    SQLAlchemyBookingLockRepository
+)
+from shared.config import settings
+from shared.database import SessionLocal
+from shared.event_bus import event_bus
+
+logger = logging.getLogger(__name__)
+
+
+class HoldSweeper:
+    """定期刪除已到期暫留並發布 SlotHoldReleased 事件"""
+    
+    def __init__(self, session_factory, interval_seconds: float = 30.0, batch_size: int = 500):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """執行一次清除（分批提交），回傳刪除筆數"""
+        now = now or datetime.now(timezone.utc)
+        total = 0
+        
+        while True:
+            with self.session_factory() as session:
+                expired = SQLAlchemyBookingLockRepository(session).delete_expired_holds(now, self.batch_size)
+                session.commit()
+            
+            # 提交後才發布：避免推播「已釋出」後刪除又被回滾
+            for hold in expired:
+                event_bus.publish(SlotHoldReleasedEvent.create(
+                    hold_id=hold.id,
+                    merchant_id=hold.merchant_id,
+                    staff_id=hold.staff_id,
+                    start_at=hold.start_at,
+                    end_at=hold.end_at,
+                    reason="expired"
+                ))
+            
+            total += len(expired)
+            if len(expired) < self.batch_size:
+                break
+        
+        if total:
+            logger.info(f"Swept {total} expired slot holds")
+        return total
+    
+    def start(self) -> "HoldSweeper":
+        self._thread = threading.Thread(target=self._run, name="slot-hold-sweeper", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            try:
+                self.sweep()
+            except SQLAlchemyError as e:
+                logger.warning(f"Slot hold sweep failed: {e}")
+
+
+def start_hold_sweeper() -> Optional[HoldSweeper]:
+    """啟動背景暫留清除（間隔 <= 0 時停用）"""
+    if settings.slot_hold_sweep_interval_seconds <= 0:
+        return None
+    
+    return HoldSweeper(SessionLocal, settings.slot_hold_sweep_interval_seconds).start()
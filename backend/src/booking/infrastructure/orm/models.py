@@ -8,7 +8,6 @@ from sqlalchemy import (
 )
 from sqlalchemy.dialects.postgresql import UUID, TSTZRANGE
 from sqlalchemy.orm import relationship
-from datetime import datetime
 
 from shared.database import Base
 
@@ -103,7 +102,7 @@ class BookingORM(Base):
     updated_at = Column(
         DateTime(timezone=True),
         nullable=True,
-        onupdate=datetime.utcnow,
+        onupdate=text("CURRENT_TIMESTAMP"),
         comment="更新時間"
     )
     cancelled_at = Column(
@@ -122,6 +121,11 @@ class BookingORM(Base):
         Index("idx_bookings_merchant_staff_time", "merchant_id", "staff_id", "start_at"),
         Index("idx_bookings_merchant_status", "merchant_id", "status"),
         Index("idx_bookings_customer_line_id", "merchant_id", text("(customer->>'line_user_id')")),
+        Index(
+            "idx_bookings_active_start_at",
+            "start_at",
+            postgresql_where=text("status IN ('pending', 'confirmed')")
+        ),
         CheckConstraint("status IN ('pending', 'confirmed', 'completed', 'cancelled')", name="chk_booking_status"),
         CheckConstraint("start_at < end_at", name="chk_booking_time_order"),
         CheckConstraint("total_duration_minutes > 0", name="chk_booking_duration_positive"),
@@ -172,18 +176,34 @@ class BookingLockORM(Base):
         comment="關聯的預約 ID"
     )
     
+    # 僅用於 flush 排序：同一次 flush 中先 INSERT booking 再寫入 booking_id
+    booking = relationship("BookingORM", lazy="noload")
+    
     created_at = Column(
         DateTime(timezone=True),
         nullable=False,
         server_default=text("CURRENT_TIMESTAMP")
     )
     
+    expires_at = Column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="暫留到期時間（NULL = 正式鎖定）"
+    )
+    
+    holder_id = Column(String(100), nullable=True, comment="暫留者（用戶 ID）")
+    
     # ⚠️ 重要：EXCLUDE 約束在 Alembic migration 中定義
     # 無法直接在 SQLAlchemy 宣告式模型中定義
     # 見: migrations/versions/002_add_exclude_constraint.py
     
     __table_args__ = (
         Index("idx_booking_locks_merchant_staff", "merchant_id", "staff_id"),
+        Index(
+            "idx_booking_locks_hold_expiry",
+            "expires_at",
+            postgresql_where=text("booking_id IS NULL")
+        ),
         CheckConstraint("start_at < end_at", name="chk_lock_time_order"),
         {"comment": "預約鎖定表（EXCLUDE 約束防重疊）"}
     )
@@ -6,17 +6,22 @@ from typing import Optional
 import logging
 
 from sqlalchemy.orm import Session
-from sqlalchemy import select, and_, text
+from sqlalchemy import select, delete, update, and_, or_, func
 from psycopg2.errors import ExclusionViolation
 
 from booking.domain.models import BookingLock
 from booking.domain.repositories import BookingLockRepository
 from booking.domain.exceptions import BookingOverlapError
 from booking.infrastructure.orm.models import BookingLockORM
+from shared.tracing import trace_methods
 
 logger = logging.getLogger(__name__)
 
+# 有效鎖定：正式鎖定，或尚未到期的暫留
+_NOT_EXPIRED = or_(BookingLockORM.expires_at.is_(None), BookingLockORM.expires_at > func.now())
 
+
+@trace_methods
 class SQLAlchemyBookingLockRepository(BookingLockRepository):
     """SQLAlchemy 實作的 BookingLock Repository"""
     
@@ -31,12 +36,13 @@ class SQLAlchemyBookingLockRepository(BookingLockRepository):
         Application Service 需捕捉並轉換為 BookingOverlapError
         """
         orm_lock = self._domain_to_orm(lock)
+        self._purge_expired_holds(lock.merchant_id, lock.staff_id, lock.start_at, lock.end_at)
         
         try:
             self.session.add(orm_lock)
             self.session.flush()  # 立即執行以觸發約束檢查
             logger.info(f"Created booking lock: {lock.id}")
-            return self._orm_to_domain(orm_lock)
+            return lock  # 欄位皆由 Domain 提供，無需重新讀取
         except Exception as e:
             # 檢查是否為 EXCLUDE 約束違反
             if isinstance(e.__cause__, ExclusionViolation):
@@ -67,7 +73,8 @@ class SQLAlchemyBookingLockRepository(BookingLockRepository):
                 BookingLockORM.staff_id == staff_id,
                 # 重疊條件：NOT (a.end <= b.start OR b.end <= a.start)
                 BookingLockORM.start_at < end_at,
-                BookingLockORM.end_at > start_at
+                BookingLockORM.end_at > start_at,
+                _NOT_EXPIRED
             )
         )
         
@@ -75,14 +82,18 @@ class SQLAlchemyBookingLockRepository(BookingLockRepository):
         return [self._orm_to_domain(orm) for orm in orm_locks]
     
     def link_to_booking(self, lock_id: str, booking_id: str) -> bool:
-        """將鎖定關聯到預約"""
+        """
+        將鎖定關聯到預約
+        
+        不立即 flush：預約本身也延後至 commit 寫入，
+        由 BookingLockORM.booking 關聯確保 INSERT booking 先於 UPDATE lock
+        """
         orm_lock = self.session.get(BookingLockORM, lock_id)
         
         if not orm_lock:
             return False
         
         orm_lock.booking_id = booking_id
-        self.session.flush()
         logger.info(f"Linked lock {lock_id} to booking {booking_id}")
         return True
     
@@ -97,6 +108,99 @@ class SQLAlchemyBookingLockRepository(BookingLockRepository):
         self.session.flush()
         return True
     
+    def find_by_id(self, lock_id: str) -> Optional[BookingLock]:
+        """依 ID 查詢鎖定"""
+        orm_lock = self.session.get(BookingLockORM, lock_id)
+        return self._orm_to_domain(orm_lock) if orm_lock else None
+    
+    def confirm_hold(self, lock_id: str, start_at: datetime, end_at: datetime) -> bool:
+        """
+        將暫留轉為正式鎖定
+        
+        條件式 UPDATE：暫留已到期或已被清除時不更新（回傳 False）；
+        更新取得的列鎖使背景清除（SKIP LOCKED）略過此列
+        """
+        stmt = (
+            update(BookingLockORM)
+            .where(
+                BookingLockORM.id == lock_id,
+                BookingLockORM.booking_id.is_(None),
+                BookingLockORM.expires_at > func.now()
+            )
+            .values(start_at=start_at, end_at=end_at, expires_at=None)
+            .execution_options(synchronize_session="fetch")
+        )
+        confirmed = self.session.execute(stmt).rowcount == 1
+        if confirmed:
+            logger.info(f"Confirmed hold {lock_id}")
+        return confirmed
+    
+    def delete_expired_holds(
+        self,
+        now: datetime,
+        limit: int = 500
+    ) -> list[BookingLock]:
+        """
+        刪除已到期的暫留（每次最多 limit 筆）
+        
+        FOR UPDATE SKIP LOCKED：多個 worker 同時清除時互不等待，
+        也不會刪除正在轉為預約的暫留
+        """
+        expired_ids = (
+            select(BookingLockORM.id)
+            .where(
+                BookingLockORM.booking_id.is_(None),
+                BookingLockORM.expires_at <= now
+            )
+            .order_by(BookingLockORM.expires_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        stmt = (
+            delete(BookingLockORM)
+            .where(BookingLockORM.id.in_(expired_ids.scalar_subquery()))
+            .returning(BookingLockORM)
+            .execution_options(synchronize_session=False)
+        )
+        return [self._orm_to_domain(orm) for orm in self.session.scalars(stmt).all()]
+    
+    def delete_holds_by_holder(self, merchant_id: str, holder_id: str) -> list[BookingLock]:
+        """刪除用戶在商家下的所有暫留"""
+        stmt = (
+            delete(BookingLockORM)
+            .where(
+                BookingLockORM.merchant_id == merchant_id,
+                BookingLockORM.holder_id == holder_id,
+                BookingLockORM.booking_id.is_(None),
+                BookingLockORM.expires_at.is_not(None)
+            )
+            .returning(BookingLockORM)
+            .execution_options(synchronize_session="fetch")
+        )
+        return [self._orm_to_domain(orm) for orm in self.session.scalars(stmt).all()]
+    
+    def _purge_expired_holds(
+        self,
+        merchant_id: str,
+        staff_id: int,
+        start_at: datetime,
+        end_at: datetime
+    ):
+        """刪除與區間重疊的已到期暫留（否則仍會觸發 EXCLUDE 約束）"""
+        stmt = (
+            delete(BookingLockORM)
+            .where(
+                BookingLockORM.merchant_id == merchant_id,
+                BookingLockORM.staff_id == staff_id,
+                BookingLockORM.start_at < end_at,
+                BookingLockORM.end_at > start_at,
+                BookingLockORM.booking_id.is_(None),
+                BookingLockORM.expires_at <= func.now()
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self.session.execute(stmt)
+    
     # === ORM ↔ Domain 轉換 ===
     
     def _orm_to_domain(self, orm: BookingLockORM) -> BookingLock:
@@ -108,7 +212,9 @@ class SQLAlchemyBookingLockRepository(BookingLockRepository):
             start_at=orm.start_at,
             end_at=orm.end_at,
             booking_id=orm.booking_id,
-            created_at=orm.created_at
+            created_at=orm.created_at,
+            expires_at=orm.expires_at,
+            holder_id=orm.holder_id
         )
     
     def _domain_to_orm(self, domain: BookingLock) -> BookingLockORM:
@@ -120,6 +226,8 @@ class SQLAlchemyBookingLockRepository(BookingLockRepository):
             start_at=domain.start_at,
             end_at=domain.end_at,
             booking_id=domain.booking_id,
-            created_at=domain.created_at
+            created_at=domain.created_at,
+            expires_at=domain.expires_at,
+            holder_id=domain.holder_id
         )
 
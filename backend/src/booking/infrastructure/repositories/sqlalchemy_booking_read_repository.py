@@ -0,0 +1,125 @@
+"""
+Booking Context - Infrastructure Layer - Read Repository
+查詢端實作：Core select() 明確欄位，直接回傳資料列（不建立 ORM 實例與 Domain 聚合）
+"""
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select, and_, func, union_all
+
+from booking.domain.models import BookingStatus
+from booking.domain.read_models import BookingListRow, BookingSlotRow
+from booking.domain.repositories import BookingReadRepository
+from booking.infrastructure.orm.models import BookingLockORM, BookingORM
+from shared.timezone import make_aware
+from shared.tracing import trace_methods
+
+
+# 佔用時段的狀態（與 SQLAlchemyBookingRepository.find_by_staff_and_date_range 一致）
+_ACTIVE_STATUSES = (BookingStatus.CONFIRMED.value, BookingStatus.PENDING.value)
+
+_SLOT_COLUMNS = (
+    BookingORM.id,
+    BookingORM.start_at,
+    BookingORM.end_at,
+)
+
+_HOLD_SLOT_COLUMNS = (
+    BookingLockORM.id,
+    BookingLockORM.start_at,
+    BookingLockORM.end_at,
+)
+
+_LIST_COLUMNS = (
+    BookingORM.id,
+    BookingORM.merchant_id,
+    BookingORM.staff_id,
+    BookingORM.status,
+    BookingORM.start_at,
+    BookingORM.end_at,
+    BookingORM.customer,
+    BookingORM.items,
+    BookingORM.total_price_amount,
+    BookingORM.total_price_currency,
+    BookingORM.total_duration_minutes,
+    BookingORM.notes,
+    BookingORM.created_at,
+)
+
+
+@trace_methods
+class SQLAlchemyBookingReadRepository(BookingReadRepository):
+    """
+    SQLAlchemy 實作的 Booking 查詢端 Repository
+    
+    欄位順序與 read_models 中的 NamedTuple 定義一致，
+    以 _make 直接由資料列建立讀取模型
+    """
+    
+    def __init__(self, session: Session):
+        self.session = session
+    
+    def list_busy_slots(
+        self,
+        merchant_id: str,
+        staff_id: int,
+        start_at: datetime,
+        end_at: datetime
+    ) -> list[BookingSlotRow]:
+        """
+        查詢員工在時間範圍內已佔用的時段
+        
+        預約與未到期的暫留以 UNION ALL 一次查詢；已轉為預約的鎖定由預約本身代表
+        """
+        bookings = select(*_SLOT_COLUMNS).where(
+            and_(
+                BookingORM.merchant_id == merchant_id,
+                BookingORM.staff_id == staff_id,
+                BookingORM.start_at < end_at,
+                BookingORM.end_at > start_at,
+                BookingORM.status.in_(_ACTIVE_STATUSES)
+            )
+        )
+        holds = select(*_HOLD_SLOT_COLUMNS).where(
+            and_(
+                BookingLockORM.merchant_id == merchant_id,
+                BookingLockORM.staff_id == staff_id,
+                BookingLockORM.start_at < end_at,
+                BookingLockORM.end_at > start_at,
+                BookingLockORM.booking_id.is_(None),
+                BookingLockORM.expires_at > func.now()
+            )
+        )
+        stmt = union_all(bookings, holds).order_by("start_at")
+        
+        return [BookingSlotRow._make(row) for row in self.session.execute(stmt)]
+    
+    def list_rows(
+        self,
+        merchant_id: str,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[BookingStatus] = None,
+        staff_id: Optional[int] = None
+    ) -> list[BookingListRow]:
+        """查詢商家預約列表資料列"""
+        stmt = select(*_LIST_COLUMNS).where(
+            BookingORM.merchant_id == merchant_id
+        )
+        
+        if start_date:
+            stmt = stmt.where(BookingORM.start_at >= make_aware(datetime.combine(start_date, datetime.min.time())))
+        
+        if end_date:
+            stmt = stmt.where(BookingORM.end_at <= make_aware(datetime.combine(end_date, datetime.max.time())))
+        
+        if status:
+            stmt = stmt.where(BookingORM.status == status.value)
+        
+        if staff_id:
+            stmt = stmt.where(BookingORM.staff_id == staff_id)
+        
+        stmt = stmt.order_by(BookingORM.start_at.desc())
+        
+        return [BookingListRow._make(row) for row in self.session.execute(stmt)]
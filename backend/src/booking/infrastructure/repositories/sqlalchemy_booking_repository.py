@@ -14,10 +14,14 @@ from booking.domain.models import Booking, BookingItem, BookingStatus, Customer
 from booking.domain.repositories import BookingRepository
 from booking.domain.value_objects import Money, Duration
 from booking.infrastructure.orm.models import BookingORM
+from shared.unit_of_work import UnitOfWork
+from shared.timezone import make_aware
+from shared.tracing import trace_methods
 
 logger = logging.getLogger(__name__)
 
 
+@trace_methods
 class SQLAlchemyBookingRepository(BookingRepository):
     """
     SQLAlchemy 實作的 Booking Repository
@@ -26,33 +30,47 @@ class SQLAlchemyBookingRepository(BookingRepository):
     1. Domain Model ↔ ORM Model 轉換
     2. 資料庫 CRUD 操作
     3. 租戶隔離（merchant_id 過濾）
+    
+    透過 UnitOfWork 維護識別映射：同一 Session 內已載入的預約不再重新查詢，
+    save 僅更新 ORM 狀態，實際寫入延後至 commit
     """
     
     def __init__(self, session: Session):
         self.session = session
+        self.uow = UnitOfWork.for_session(session)
     
     def save(self, booking: Booking) -> Booking:
-        """儲存預約"""
-        # 檢查是否已存在
-        existing = self.session.get(BookingORM, booking.id)
+        """
+        儲存預約
+        
+        已由此 Session 載入（或儲存）的預約直接更新；識別映射未命中時以主鍵查詢一次
+        （由其他 Session 載入的預約），存在則更新，否則新增；
+        不 flush、不重新查詢，直接回傳記憶體中的聚合
+        """
+        existing = self.uow.get_orm(Booking, booking.id)
+        if existing is None:
+            existing = self.session.get(BookingORM, booking.id)
+            if existing is not None:
+                self.uow.register_clean(booking, existing)
         
-        if existing:
+        if existing is not None:
             # 更新
             self._update_orm_from_domain(existing, booking)
+            self.uow.register_dirty(booking)
             logger.info(f"Updated booking: {booking.id}")
         else:
-            # 新增
-            orm_booking = self._domain_to_orm(booking)
-            self.session.add(orm_booking)
+            # 新增（client 端生成 UUID，無需 flush 取得 ID）
+            self.uow.register_new(booking, self._domain_to_orm(booking))
             logger.info(f"Created booking: {booking.id}")
         
-        self.session.flush()  # 刷新以取得 DB 生成欄位
-        
-        # 重新查詢以確保取得最新狀態
-        return self.find_by_id(booking.id, booking.merchant_id)
+        return booking
     
     def find_by_id(self, booking_id: str, merchant_id: str) -> Optional[Booking]:
         """根據 ID 查詢（含租戶隔離）"""
+        cached = self.uow.get(Booking, booking_id)
+        if cached is not None:
+            return cached if cached.merchant_id == merchant_id else None
+        
         stmt = select(BookingORM).where(
             and_(
                 BookingORM.id == booking_id,
@@ -65,7 +83,7 @@ class SQLAlchemyBookingRepository(BookingRepository):
         if not orm_booking:
             return None
         
-        return self._orm_to_domain(orm_booking)
+        return self._load(orm_booking)
     
     def find_by_merchant(
         self,
@@ -80,10 +98,10 @@ class SQLAlchemyBookingRepository(BookingRepository):
         )
         
         if start_date:
-            stmt = stmt.where(BookingORM.start_at >= datetime.combine(start_date, datetime.min.time()))
+            stmt = stmt.where(BookingORM.start_at >= make_aware(datetime.combine(start_date, datetime.min.time())))
         
         if end_date:
-            stmt = stmt.where(BookingORM.end_at <= datetime.combine(end_date, datetime.max.time()))
+            stmt = stmt.where(BookingORM.end_at <= make_aware(datetime.combine(end_date, datetime.max.time())))
         
         if status:
             stmt = stmt.where(BookingORM.status == status.value)
@@ -91,7 +109,7 @@ class SQLAlchemyBookingRepository(BookingRepository):
         stmt = stmt.order_by(BookingORM.start_at.desc())
         
         orm_bookings = self.session.scalars(stmt).all()
-        return [self._orm_to_domain(orm) for orm in orm_bookings]
+        return [self._load(orm) for orm in orm_bookings]
     
     def find_by_staff_and_date_range(
         self,
@@ -112,26 +130,36 @@ class SQLAlchemyBookingRepository(BookingRepository):
         )
         
         orm_bookings = self.session.scalars(stmt).all()
-        return [self._orm_to_domain(orm) for orm in orm_bookings]
+        return [self._load(orm) for orm in orm_bookings]
     
     def delete(self, booking_id: str, merchant_id: str) -> bool:
         """刪除預約（硬刪除）"""
-        stmt = select(BookingORM).where(
-            and_(
-                BookingORM.id == booking_id,
-                BookingORM.merchant_id == merchant_id
-            )
-        )
+        orm_booking = self.uow.get_orm(Booking, booking_id)
         
-        orm_booking = self.session.scalar(stmt)
+        if orm_booking is None or orm_booking.merchant_id != merchant_id:
+            stmt = select(BookingORM).where(
+                and_(
+                    BookingORM.id == booking_id,
+                    BookingORM.merchant_id == merchant_id
+                )
+            )
+            orm_booking = self.session.scalar(stmt)
         
         if not orm_booking:
             return False
         
         self.session.delete(orm_booking)
         self.session.flush()
+        self.uow.discard(Booking, booking_id)
         return True
     
+    def _load(self, orm: BookingORM) -> Booking:
+        """水合並登記至識別映射（已載入者直接回傳既有實例）"""
+        cached = self.uow.get(Booking, orm.id)
+        if cached is not None:
+            return cached
+        return self.uow.register_clean(self._orm_to_domain(orm), orm)
+    
     # === ORM ↔ Domain 轉換 ===
     
     def _orm_to_domain(self, orm: BookingORM) -> Booking:
@@ -2,16 +2,19 @@
 Booking Context - Infrastructure Layer - LIFF API Router
 LIFF 客戶端使用的預約 API
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 
 from booking.application.services import BookingService
 from booking.application.dtos import (
     CreateBookingRequest,
-    BookingResponse
+    CreateHoldRequest,
+    BookingResponse,
+    HoldResponse
 )
 from booking.domain.exceptions import (
     BookingOverlapError,
+    SlotHoldError,
     StaffInactiveError,
     ServiceInactiveError
 )
@@ -22,6 +25,9 @@ from booking.infrastructure.repositories.sqlalchemy_booking_repository import (
 from booking.infrastructure.repositories.sqlalchemy_booking_lock_repository import (
     SQLAlchemyBookingLockRepository
 )
+from booking.infrastructure.repositories.sqlalchemy_booking_read_repository import (
+    SQLAlchemyBookingReadRepository
+)
 from catalog.application.services import CatalogService
 from catalog.infrastructure.repositories.sqlalchemy_service_repository import (
     SQLAlchemyServiceRepository
@@ -34,13 +40,24 @@ from merchant.infrastructure.repositories.sqlalchemy_merchant_repository import
     SQLAlchemyMerchantRepository
 )
 from billing.application.services import BillingService
+from billing.application.status_cache import billing_status_cache, plan_catalog
 from billing.infrastructure.repositories.sqlalchemy_subscription_repository import (
     SQLAlchemySubscriptionRepository
 )
 from billing.infrastructure.repositories.sqlalchemy_plan_repository import (
     SQLAlchemyPlanRepository
 )
-from shared.database import get_db
+from billing.infrastructure.repositories.sqlalchemy_usage_counter_repository import (
+    SQLAlchemyUsageCounterRepository
+)
+from billing.domain.exceptions import QuotaExceededError
+from notification.application.services import NotificationService
+from notification.infrastructure.notification_record_writer import notification_record_writer
+from notification.infrastructure.repositories.sqlalchemy_message_template_repository import (
+    SQLAlchemyMessageTemplateRepository
+)
+from shared.database import get_db, get_read_db, remember_write
+from shared.serialization import PydanticJSONResponse
 from shared.exceptions import (
     MerchantInactiveError,
     SubscriptionPastDueError,
@@ -68,10 +85,11 @@ def validate_merchant_access(user: User, merchant_id: str):
 
 
 def get_booking_service(db: Session = Depends(get_db)) -> BookingService:
-    """Dependency: 建立 BookingService 實例（含 Catalog + Merchant + Billing 整合）"""
+    """Dependency: 建立 BookingService 實例（含 Catalog + Merchant + Billing + Notification 整合）"""
     # Booking Repositories
     booking_repo = SQLAlchemyBookingRepository(db)
     booking_lock_repo = SQLAlchemyBookingLockRepository(db)
+    booking_read_repo = SQLAlchemyBookingReadRepository(db)
     
     # Catalog Repositories
     from catalog.infrastructure.repositories.sqlalchemy_holiday_repository import SQLAlchemyHolidayRepository
@@ -85,25 +103,49 @@ def get_booking_service(db: Session = Depends(get_db)) -> BookingService:
     # Billing Repositories
     subscription_repo = SQLAlchemySubscriptionRepository(db)
     plan_repo = SQLAlchemyPlanRepository(db)
+    usage_repo = SQLAlchemyUsageCounterRepository(db)
     
     # Application Services
     catalog_service = CatalogService(service_repo, staff_repo, holiday_repo)
     merchant_service = MerchantService(merchant_repo)
-    billing_service = BillingService(subscription_repo, plan_repo)
+    billing_service = BillingService(
+        subscription_repo,
+        plan_repo,
+        status_cache=billing_status_cache,
+        plan_catalog=plan_catalog,
+        usage_repo=usage_repo
+    )
+    # 預約確認推播使用商家自訂模板（未自訂時為系統預設）
+    notification_service = NotificationService(
+        SQLAlchemyMessageTemplateRepository(db),
+        record_sink=notification_record_writer.submit
+    )
     
-    # BookingService（整合 Catalog + Merchant + Billing）
+    # BookingService（整合 Catalog + Merchant + Billing + Notification）
     return BookingService(
         booking_repo,
         booking_lock_repo,
         catalog_service,
         merchant_service,
-        billing_service
+        billing_service,
+        booking_read_repo,
+        notification_service=notification_service
+    )
+
+
+def get_read_booking_service(db: Session = Depends(get_read_db)) -> BookingService:
+    """Dependency: 建立唯讀 BookingService（查詢端點，走唯讀庫）"""
+    return BookingService(
+        SQLAlchemyBookingRepository(db),
+        SQLAlchemyBookingLockRepository(db),
+        booking_read_repo=SQLAlchemyBookingReadRepository(db)
     )
 
 
 @router.post("/bookings", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
 async def create_booking(
     request: CreateBookingRequest,
+    response: Response,
     current_user: User = Depends(get_current_user),
     service: BookingService = Depends(get_booking_service),
     db: Session = Depends(get_db)
@@ -115,14 +157,14 @@ async def create_booking(
     1. **驗證租戶訪問權限** 🔒
     2. 驗證商家與訂閱狀態
     3. 計算價格與時長
-    4. 檢查時段衝突
+    4. 檢查時段衝突（帶 hold_id 時改為驗證暫留並轉為正式鎖定）
     5. 建立 BookingLock + Booking
     6. 發布 BookingConfirmed 事件
-    7. LINE 推播（異步）
+    7. 提交後 LINE 推播
     
     Raises:
-        403: 無權訪問商家、商家停用或訂閱逾期
-        400: 員工停用、服務停用、時段衝突
+        403: 無權訪問商家、商家停用、訂閱逾期或超過本月預約額度
+        400: 員工停用、服務停用、時段衝突、暫留無效或已到期
     """
     # 驗證租戶訪問權限
     validate_merchant_access(current_user, request.merchant_id)
@@ -146,11 +188,17 @@ async def create_booking(
                 {"service_id": item.service_id, "option_ids": item.option_ids}
                 for item in request.items
             ],
-            notes=request.notes
+            notes=request.notes,
+            hold_id=request.hold_id,
+            holder_id=current_user.id
         )
         
-        # 提交交易
+        # 提交交易後才發布領域事件、送出確認推播
         db.commit()
+        service.publish_pending_events()
+        
+        # 之後短時間內的查詢改走主庫（read-your-writes）
+        remember_write(response)
         
         # 轉換為響應 DTO
         return _booking_to_response(booking)
@@ -163,7 +211,11 @@ async def create_booking(
         db.rollback()
         raise HTTPException(status_code=403, detail=str(e))
     
-    except (BookingOverlapError, StaffInactiveError, ServiceInactiveError) as e:
+    except QuotaExceededError as e:
+        db.rollback()
+        raise HTTPException(status_code=403, detail=str(e))
+    
+    except (BookingOverlapError, SlotHoldError, StaffInactiveError, ServiceInactiveError) as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     
@@ -172,14 +224,109 @@ async def create_booking(
         raise HTTPException(status_code=500, detail=f"建立預約失敗: {str(e)}")
 
 
+@router.post("/holds", response_model=HoldResponse, status_code=status.HTTP_201_CREATED)
+async def create_hold(
+    request: CreateHoldRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    service: BookingService = Depends(get_booking_service),
+    db: Session = Depends(get_db)
+):
+    """
+    暫留時段（LIFF 客戶端選定時段後呼叫）
+    
+    暫留 SLOT_HOLD_TTL_SECONDS 秒，期間其他客戶查詢不到此時段、也無法預約；
+    送出預約時帶入 hold_id 即轉為正式預約。同一客戶再次暫留時，先前的暫留自動釋出
+    
+    Raises:
+        403: 無權訪問商家或商家停用
+        400: 員工停用、服務停用、時段已被預約或暫留
+    """
+    validate_merchant_access(current_user, request.merchant_id)
+    
+    try:
+        hold = await service.hold_slot(
+            merchant_id=request.merchant_id,
+            holder_id=current_user.id,
+            staff_id=request.staff_id,
+            start_at=request.start_at,
+            items_data=[
+                {"service_id": item.service_id, "option_ids": item.option_ids}
+                for item in request.items
+            ]
+        )
+        db.commit()
+        service.publish_pending_events()
+        remember_write(response)
+        
+        return HoldResponse(
+            id=hold.id,
+            merchant_id=hold.merchant_id,
+            staff_id=hold.staff_id,
+            start_at=hold.start_at,
+            end_at=hold.end_at,
+            expires_at=hold.expires_at
+        )
+    
+    except MerchantInactiveError as e:
+        db.rollback()
+        raise HTTPException(status_code=403, detail=str(e))
+    
+    except (BookingOverlapError, StaffInactiveError, ServiceInactiveError) as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"暫留時段失敗: {str(e)}")
+
+
+@router.delete("/holds/{hold_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def release_hold(
+    hold_id: str,
+    response: Response,
+    merchant_id: str = Query(..., description="商家 ID"),
+    current_user: User = Depends(get_current_user),
+    service: BookingService = Depends(get_booking_service),
+    db: Session = Depends(get_db)
+):
+    """
+    釋出暫留（客戶離開預約頁或改選時段）
+    
+    Raises:
+        403: 無權訪問商家、非暫留者本人
+        404: 暫留不存在、已轉為預約或已到期
+    """
+    validate_merchant_access(current_user, merchant_id)
+    
+    try:
+        await service.release_hold(hold_id, merchant_id, current_user.id)
+        db.commit()
+        service.publish_pending_events()
+        remember_write(response)
+        return None
+    
+    except EntityNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="暫留不存在或已到期"
+        )
+    
+    except PermissionDeniedError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e)
+        )
+
+
 # ✅ 已移除舊版 DELETE 端點（使用 body）- 改用下方的 Query 參數版本
 
 
-@router.get("/bookings", response_model=list[BookingResponse])
+@router.get("/bookings", response_model=list[BookingResponse], response_class=PydanticJSONResponse)
 async def list_bookings(
     merchant_id: str = Query(..., description="商家 ID"),
     current_user: User = Depends(get_current_user),
-    service: BookingService = Depends(get_booking_service)
+    service: BookingService = Depends(get_read_booking_service)
 ):
     """
     查詢預約列表
@@ -196,15 +343,15 @@ async def list_bookings(
         merchant_id=merchant_id
     )
     
-    return [_booking_to_response(b) for b in bookings]
+    return PydanticJSONResponse([_booking_to_dict(b) for b in bookings])
 
 
-@router.get("/bookings/{booking_id}", response_model=BookingResponse)
+@router.get("/bookings/{booking_id}", response_model=BookingResponse, response_class=PydanticJSONResponse)
 async def get_booking(
     booking_id: str,
     merchant_id: str = Query(..., description="商家 ID"),
     current_user: User = Depends(get_current_user),
-    service: BookingService = Depends(get_booking_service)
+    service: BookingService = Depends(get_read_booking_service)
 ):
     """
     查詢預約詳情
@@ -223,17 +370,19 @@ async def get_booking(
     if not booking:
         raise HTTPException(status_code=404, detail="預約不存在")
     
-    return _booking_to_response(booking)
+    return PydanticJSONResponse(_booking_to_dict(booking))
 
 
 @router.delete("/bookings/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def cancel_booking(
     booking_id: str,
+    response: Response,
     merchant_id: str = Query(..., description="商家 ID"),
     requester_line_id: str = Query("customer", description="請求者 LINE ID"),
     reason: str = Query("", description="取消原因"),
     current_user: User = Depends(get_current_user),
-    service: BookingService = Depends(get_booking_service)
+    service: BookingService = Depends(get_booking_service),
+    db: Session = Depends(get_db)
 ):
     """
     取消預約（LIFF 客戶端）
@@ -263,7 +412,10 @@ async def cancel_booking(
             requester_line_id=requester_line_id,
             reason=reason
         )
+        db.commit()
+        service.publish_pending_events()
         
+        remember_write(response)
         return None
     
     except EntityNotFoundError:
@@ -289,41 +441,42 @@ async def cancel_booking(
 
 def _booking_to_response(booking) -> BookingResponse:
     """Domain Booking → Response DTO"""
-    from booking.application.dtos import BookingItemResponse, CustomerDTO
-    
-    items_response = []
-    for item in booking.items:
-        items_response.append(BookingItemResponse(
-            service_id=item.service_id,
-            service_name=item.service_name,
-            service_price=item.service_price.amount,
-            service_duration_minutes=item.service_duration.minutes,
-            option_ids=item.option_ids,
-            option_names=item.option_names,
-            total_price=item.total_price().amount,
-            total_duration_minutes=item.total_duration().minutes
-        ))
-    
-    return BookingResponse(
-        id=booking.id,
-        merchant_id=booking.merchant_id,
-        customer=CustomerDTO(
-            line_user_id=booking.customer.line_user_id,
-            name=booking.customer.name,
-            phone=booking.customer.phone,
-            email=booking.customer.email
-        ),
-        staff_id=booking.staff_id,
-        status=booking.status.value,
-        start_at=booking.start_at,
-        end_at=booking.end_at,
-        items=items_response,
-        total_price=booking.total_price().amount,
-        total_duration_minutes=booking.total_duration().minutes,
-        notes=booking.notes,
-        created_at=booking.created_at,
-        updated_at=booking.updated_at,
-        cancelled_at=booking.cancelled_at,
-        completed_at=booking.completed_at
-    )
+    return BookingResponse.model_validate(_booking_to_dict(booking))
+
 
+def _booking_to_dict(booking) -> dict:
+    """Domain Booking → BookingResponse 欄位的 dict（列表 / 詳情以 PydanticJSONResponse 直接編碼）"""
+    return {
+        "id": booking.id,
+        "merchant_id": booking.merchant_id,
+        "customer": {
+            "line_user_id": booking.customer.line_user_id,
+            "name": booking.customer.name,
+            "phone": booking.customer.phone,
+            "email": booking.customer.email
+        },
+        "staff_id": booking.staff_id,
+        "status": booking.status.value,
+        "start_at": booking.start_at,
+        "end_at": booking.end_at,
+        "items": [
+            {
+                "service_id": item.service_id,
+                "service_name": item.service_name,
+                "service_price": item.service_price.amount,
+                "service_duration_minutes": item.service_duration.minutes,
+                "option_ids": item.option_ids,
+                "option_names": item.option_names,
+                "total_price": item.total_price().amount,
+                "total_duration_minutes": item.total_duration().minutes
+            }
+            for item in booking.items
+        ],
+        "total_price": booking.total_price().amount,
+        "total_duration_minutes": booking.total_duration().minutes,
+        "notes": booking.notes,
+        "created_at": booking.created_at,
+        "updated_at": booking.updated_at,
+        "cancelled_at": booking.cancelled_at,
+        "completed_at": booking.completed_at
+    }
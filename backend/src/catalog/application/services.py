@@ -16,10 +16,12 @@ from catalog.domain.exceptions import (
 )
 from booking.domain.value_objects import Money, Duration
 from booking.domain.models import BookingItem
+from shared.tracing import trace_methods
 
 logger = logging.getLogger(__name__)
 
 
+@trace_methods
 class CatalogService:
     """
     Catalog 應用服務
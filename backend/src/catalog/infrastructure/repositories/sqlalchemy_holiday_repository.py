@@ -7,8 +7,10 @@ from sqlalchemy.orm import Session
 
 from catalog.domain.holiday import Holiday
 from catalog.infrastructure.orm.models import HolidayORM
+from shared.tracing import trace_methods
 
 
+@trace_methods
 class SQLAlchemyHolidayRepository:
     """休假日 Repository - SQLAlchemy 實作"""
     
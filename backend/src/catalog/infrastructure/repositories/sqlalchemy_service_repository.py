@@ -12,10 +12,12 @@ from catalog.domain.models import Service, ServiceOption
 from catalog.domain.repositories import ServiceRepository
 from catalog.infrastructure.orm.models import ServiceORM, ServiceOptionORM
 from booking.domain.value_objects import Money, Duration
+from shared.tracing import trace_methods
 
 logger = logging.getLogger(__name__)
 
 
+@trace_methods
 class SQLAlchemyServiceRepository(ServiceRepository):
     """SQLAlchemy 實作的 Service Repository"""
     
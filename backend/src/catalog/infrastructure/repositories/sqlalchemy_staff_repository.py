@@ -11,33 +11,63 @@ from sqlalchemy import select, and_, or_
 from catalog.domain.models import Staff, StaffWorkingHours, DayOfWeek
 from catalog.domain.repositories import StaffRepository
 from catalog.infrastructure.orm.models import StaffORM, StaffWorkingHoursORM
+from shared.unit_of_work import UnitOfWork
+from shared.tracing import trace_methods
 
 logger = logging.getLogger(__name__)
 
 
+@trace_methods
 class SQLAlchemyStaffRepository(StaffRepository):
-    """SQLAlchemy 實作的 Staff Repository"""
+    """
+    SQLAlchemy 實作的 Staff Repository
+    
+    透過 UnitOfWork 維護識別映射，更新延後至 commit 寫入
+    """
     
     def __init__(self, session: Session):
         self.session = session
+        self.uow = UnitOfWork.for_session(session)
     
     def save(self, staff: Staff) -> Staff:
-        """儲存員工"""
-        existing = self.session.get(StaffORM, staff.id)
-        
-        if existing:
+        """
+        儲存員工
+        
+        更新：僅更新 ORM 狀態，延後至 commit 寫入（識別映射未命中時以主鍵查詢一次）
+        新增：ID 由資料庫生成，需 flush 一次取得 ID
+        皆直接回傳記憶體中的聚合，不重新查詢
+        """
+        existing = self.uow.get_orm(Staff, staff.id) if staff.id else None
+        if existing is None and staff.id:
+            existing = self.session.get(StaffORM, staff.id)
+            if existing is not None:
+                self.uow.register_clean(staff, existing)
+        
+        if existing is not None:
             self._update_orm_from_domain(existing, staff)
+            self.uow.register_dirty(staff)
             logger.info(f"Updated staff: {staff.id}")
         else:
             orm_staff = self._domain_to_orm(staff)
-            self.session.add(orm_staff)
+            if not staff.id:
+                orm_staff.id = None  # 交由資料庫自動生成
+            self.uow.register_new(staff, orm_staff)
+            
+            if not staff.id:
+                old_id = staff.id
+                self.uow.flush()
+                staff.id = orm_staff.id
+                self.uow.rekey(staff, old_id)
             logger.info(f"Created staff: {staff.id}")
         
-        self.session.flush()
-        return self.find_by_id(staff.id, staff.merchant_id)
+        return staff
     
     def find_by_id(self, staff_id: int, merchant_id: str) -> Optional[Staff]:
         """根據 ID 查詢員工"""
+        cached = self.uow.get(Staff, staff_id)
+        if cached is not None:
+            return cached if cached.merchant_id == merchant_id else None
+        
         stmt = select(StaffORM).options(
             joinedload(StaffORM.working_hours)
         ).where(
@@ -52,7 +82,7 @@ class SQLAlchemyStaffRepository(StaffRepository):
         if not orm_staff:
             return None
         
-        return self._orm_to_domain(orm_staff)
+        return self._load(orm_staff)
     
     def find_by_merchant(self, merchant_id: str, is_active_only: bool = True) -> list[Staff]:
         """查詢商家的所有員工"""
@@ -68,7 +98,7 @@ class SQLAlchemyStaffRepository(StaffRepository):
         stmt = stmt.order_by(StaffORM.id)
         
         orm_staff_list = self.session.scalars(stmt).unique().all()
-        return [self._orm_to_domain(orm) for orm in orm_staff_list]
+        return [self._load(orm) for orm in orm_staff_list]
     
     def find_by_service(self, service_id: int, merchant_id: str) -> list[Staff]:
         """查詢可執行特定服務的員工"""
@@ -84,7 +114,7 @@ class SQLAlchemyStaffRepository(StaffRepository):
         )
         
         orm_staff_list = self.session.scalars(stmt).unique().all()
-        return [self._orm_to_domain(orm) for orm in orm_staff_list]
+        return [self._load(orm) for orm in orm_staff_list]
     
     def delete(self, staff_id: int, merchant_id: str) -> bool:
         """刪除員工"""
@@ -102,10 +132,14 @@ class SQLAlchemyStaffRepository(StaffRepository):
         
         self.session.delete(orm_staff)
         self.session.flush()
+        self.uow.discard(Staff, staff_id)
         return True
     
     def clear_working_hours(self, staff_id: int) -> None:
         """清除員工的所有工時設定"""
+        # 直接修改工時資料列，已載入的聚合不再可信
+        self.uow.discard(Staff, staff_id)
+        
         stmt = select(StaffWorkingHoursORM).where(
             StaffWorkingHoursORM.staff_id == staff_id
         )
@@ -120,6 +154,9 @@ class SQLAlchemyStaffRepository(StaffRepository):
         """新增員工工時"""
         from datetime import time, date
         
+        # 直接新增工時資料列，已載入的聚合不再可信
+        self.uow.discard(Staff, staff_id)
+        
         orm_hour = StaffWorkingHoursORM(
             staff_id=staff_id,
             day_of_week=day_of_week,
@@ -137,20 +174,23 @@ class SQLAlchemyStaffRepository(StaffRepository):
         from catalog.domain.models import StaffHoliday
         from catalog.infrastructure.orm.models import StaffHolidayORM
         
+        # session.get 先查 Session 識別映射；由 find_staff_holiday_by_id 載入者不會再查詢
         existing = self.session.get(StaffHolidayORM, holiday.id) if holiday.id else None
         
         if existing:
+            # 更新延後至 commit 寫入
             self._update_holiday_orm_from_domain(existing, holiday)
         else:
             orm_holiday = self._holiday_domain_to_orm(holiday)
             self.session.add(orm_holiday)
-            self.session.flush()
+            self.session.flush()  # ID 由資料庫生成
             holiday.id = orm_holiday.id
         
-        # 載入美甲師名稱
-        staff = self.session.get(StaffORM, holiday.staff_id)
-        if staff:
-            holiday.staff_name = staff.name
+        # 載入美甲師名稱（呼叫端已設定時不再查詢）
+        if holiday.staff_name is None:
+            staff = self.session.get(StaffORM, holiday.staff_id)
+            if staff:
+                holiday.staff_name = staff.name
         
         return holiday
     
@@ -268,6 +308,13 @@ class SQLAlchemyStaffRepository(StaffRepository):
         orm.name = domain.name
         orm.is_recurring = domain.is_recurring
     
+    def _load(self, orm: StaffORM) -> Staff:
+        """水合並登記至識別映射（已載入者直接回傳既有實例）"""
+        cached = self.uow.get(Staff, orm.id)
+        if cached is not None:
+            return cached
+        return self.uow.register_clean(self._orm_to_domain(orm), orm)
+    
     # === ORM ↔ Domain 轉換 ===
     
     def _orm_to_domain(self, orm: StaffORM) -> Staff:
@@ -325,7 +372,18 @@ class SQLAlchemyStaffRepository(StaffRepository):
         orm.skills = domain.skills
         orm.is_active = domain.is_active
         
-        # 更新工時（簡化：刪除後重建）
+        # 更新工時（簡化：有變動時刪除後重建，未變動則不產生 DELETE/INSERT）
+        current_hours = [
+            (orm_wh.day_of_week, orm_wh.start_time, orm_wh.end_time)
+            for orm_wh in orm.working_hours
+        ]
+        new_hours = [
+            (wh.day_of_week.value, wh.start_time, wh.end_time)
+            for wh in domain.working_hours
+        ]
+        if current_hours == new_hours:
+            return
+        
         orm.working_hours.clear()
         for wh in domain.working_hours:
             orm_wh = StaffWorkingHoursORM(
@@ -1,11 +1,11 @@
 """
 Identity Context - Domain Layer - Auth Service (值服務)
 密碼雜湊與 JWT Token 處理
+
+passlib / jose 於第一次使用時才匯入（縮短 worker 啟動時間；公開端點不需要）
 """
 from datetime import datetime, timedelta, timezone as dt_timezone
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 
 from shared.config import settings
 
@@ -13,17 +13,25 @@ from shared.config import settings
 class PasswordService:
     """密碼服務（值服務）"""
     
-    _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    _pwd_context = None
+    
+    @classmethod
+    def _context(cls):
+        if cls._pwd_context is None:
+            from passlib.context import CryptContext
+            
+            cls._pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        return cls._pwd_context
     
     @classmethod
     def hash_password(cls, plain_password: str) -> str:
         """雜湊密碼"""
-        return cls._pwd_context.hash(plain_password)
+        return cls._context().hash(plain_password)
     
     @classmethod
     def verify_password(cls, plain_password: str, hashed_password: str) -> bool:
         """驗證密碼"""
-        return cls._pwd_context.verify(plain_password, hashed_password)
+        return cls._context().verify(plain_password, hashed_password)
 
 
 class TokenService:
@@ -63,6 +71,8 @@ class TokenService:
             "type": "access"
         }
         
+        from jose import jwt
+        
         encoded_jwt = jwt.encode(
             to_encode,
             settings.jwt_secret_key,
@@ -85,6 +95,8 @@ class TokenService:
         Raises:
             JWTError: Token 無效或過期
         """
+        from jose import JWTError, jwt
+        
         try:
             payload = jwt.decode(
                 token,
@@ -98,6 +110,8 @@ class TokenService:
     @classmethod
     def get_user_id_from_token(cls, token: str) -> Optional[str]:
         """從 Token 提取用戶 ID"""
+        from jose import JWTError
+        
         try:
             payload = cls.decode_token(token)
             return payload.get("sub")
@@ -107,6 +121,8 @@ class TokenService:
     @classmethod
     def get_merchant_id_from_token(cls, token: str) -> Optional[str]:
         """從 Token 提取商家 ID"""
+        from jose import JWTError
+        
         try:
             payload = cls.decode_token(token)
             return payload.get("merchant_id")
@@ -19,7 +19,6 @@ from identity.domain.exceptions import (
     TenantBoundaryViolationError
 )
 from shared.database import get_db
-from jose import JWTError
 
 
 security = HTTPBearer(auto_error=False)
@@ -52,6 +51,8 @@ async def get_current_user(
     
     token = credentials.credentials
     
+    from jose import JWTError  # 第一次驗證時才匯入
+    
     try:
         user = identity_service.get_user_from_token(token)
     except (JWTError, UserNotFoundError):
@@ -11,8 +11,10 @@ from merchant.domain.exceptions import (
     MerchantInactiveError,
     MerchantSlugDuplicateError
 )
+from shared.tracing import trace_methods
 
 
+@trace_methods
 class MerchantService:
     """
     MerchantService 應用服務
@@ -8,8 +8,10 @@ from sqlalchemy.orm import Session
 from merchant.domain.models import Merchant, MerchantStatus, LineCredentials
 from merchant.domain.repositories import MerchantRepository
 from merchant.infrastructure.orm.models import MerchantORM
+from shared.tracing import trace_methods
 
 
+@trace_methods
 class SQLAlchemyMerchantRepository(MerchantRepository):
     """SQLAlchemy 實作的 Merchant Repository"""
     
@@ -0,0 +1,183 @@
+"""
+Notification Context - Application Layer - LINE Webhook
+LINE webhook 事件的佇列化處理
+
+webhook 端點驗證簽章後只把事件放入有界佇列並立即回應；背景 worker：
+- 依商家分片（同商家固定由同一 worker 處理，維持事件順序）
+- 每次取出佇列中累積的事件（至多 batch_size 筆），依商家分批交給處理器
+- 佇列滿時 submit 返回 False，端點回應 503（LINE 開啟重送時稍後重送）
+
+處理器以 webhookEventId 去重（LINE 重送的事件 ID 不變），再發布為領域事件
+"""
+from typing import Any, Callable, Optional
+import logging
+import queue
+import threading
+import time
+import zlib
+
+from notification.domain.events import LineUserEvent
+from shared.config import settings
+from shared.event_bus import EventBus, event_bus
+from shared.metrics import LINE_WEBHOOK_EVENTS_TOTAL
+from shared.single_flight import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[str, list[dict[str, Any]]], None]
+
+_STOP = object()
+
+
+class LineWebhookQueue:
+    """依商家分片、分批處理的有界事件佇列"""
+    
+    def __init__(
+        self,
+        handler: BatchHandler,
+        workers: int = 4,
+        max_pending: int = 10_000,
+        batch_size: int = 100
+    ):
+        self.handler = handler
+        self.batch_size = batch_size
+        # 每個分片各自有界，總量不超過 max_pending
+        self._queues = [queue.Queue(maxsize=max(1, max_pending // workers)) for _ in range(workers)]
+        self._threads: list[threading.Thread] = []
+    
+    def _shard(self, merchant_id: str) -> queue.Queue:
+        return self._queues[zlib.crc32(merchant_id.encode()) % len(self._queues)]
+    
+    def submit(self, merchant_id: str, events: list[dict[str, Any]]) -> bool:
+        """放入一次 webhook 請求的事件（不阻塞）；佇列已滿返回 False"""
+        try:
+            self._shard(merchant_id).put_nowait((merchant_id, events))
+        except queue.Full:
+            LINE_WEBHOOK_EVENTS_TOTAL.inc(len(events), outcome="queue_full")
+            return False
+        
+        LINE_WEBHOOK_EVENTS_TOTAL.inc(len(events), outcome="queued")
+        return True
+    
+    def pending(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+    
+    def start(self) -> "LineWebhookQueue":
+        for index, shard in enumerate(self._queues):
+            thread = threading.Thread(
+                target=self._run, args=(shard,), name=f"line-webhook-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+    
+    def stop(self):
+        """處理完已放入的事件後停止"""
+        if not self._threads:
+            return
+        for shard in self._queues:
+            shard.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+    
+    def _run(self, shard: queue.Queue):
+        while True:
+            item = shard.get()
+            stopping = item is _STOP
+            items = [] if stopping else [item]
+            
+            # 一併取出已累積的事件（不等待），合併同商家的事件
+            while not stopping and len(items) < self.batch_size:
+                try:
+                    item = shard.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                else:
+                    items.append(item)
+            
+            for merchant_id, events in self._group(items).items():
+                try:
+                    self.handler(merchant_id, events)
+                except Exception:
+                    LINE_WEBHOOK_EVENTS_TOTAL.inc(len(events), outcome="error")
+                    logger.exception(f"LINE webhook batch failed: merchant={merchant_id}, events={len(events)}")
+            
+            if stopping:
+                return
+    
+    @staticmethod
+    def _group(items: list[tuple[str, list]]) -> dict[str, list]:
+        grouped: dict[str, list] = {}
+        for merchant_id, events in items:
+            grouped.setdefault(merchant_id, []).extend(events)
+        return grouped
+
+
+class LineEventPublisher:
+    """去重後將 LINE 事件發布為領域事件（LineFollowed / LineMessageReceived ...）"""
+    
+    def __init__(self, bus: EventBus, dedupe_ttl_seconds: float = 3600, max_entries: int = 100_000):
+        self.bus = bus
+        self._seen = TTLCache(dedupe_ttl_seconds, max_entries)
+    
+    def __call__(self, merchant_id: str, events: list[dict[str, Any]]):
+        # 同一批次內依 LINE 事件時間排序（不同請求可能交錯到達）
+        for line_event in sorted(events, key=lambda e: e.get("timestamp") or 0):
+            event_id = line_event.get("webhookEventId")
+            if event_id is not None:
+                if self._seen.get(event_id) is not MISSING:
+                    LINE_WEBHOOK_EVENTS_TOTAL.inc(outcome="duplicate")
+                    continue
+                self._seen.set(event_id, True)
+            
+            domain_event = LineUserEvent.from_webhook(merchant_id, line_event)
+            if domain_event is None:
+                LINE_WEBHOOK_EVENTS_TOTAL.inc(outcome="ignored")
+                continue
+            
+            self.bus.publish(domain_event)
+            LINE_WEBHOOK_EVENTS_TOTAL.inc(outcome="published")
+
+
+class ChannelSecretStore:
+    """
+    商家 LINE channel secret 快取
+    
+    webhook 每次請求都需要 secret，快取避免每次查詢商家；
+    簽章不符時以 refresh=True 重新載入（商家剛更新 secret）。偽造簽章的請求不可每次都打到資料庫：
+    每個商家每 refresh_interval_seconds 至多重新載入一次，期間內直接回傳快取值
+    """
+    
+    def __init__(
+        self,
+        loader: Callable[[str], Optional[str]],
+        ttl_seconds: float = 300,
+        refresh_interval_seconds: float = 10,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.loader = loader
+        self._secrets = TTLCache(ttl_seconds, clock=clock)
+        self._refreshed = TTLCache(refresh_interval_seconds, clock=clock)
+    
+    def get(self, merchant_id: str, refresh: bool = False) -> Optional[str]:
+        cached = self._secrets.get(merchant_id)
+        if cached is not MISSING:
+            if not refresh or self._refreshed.get(merchant_id) is not MISSING:
+                return cached
+            self._refreshed.set(merchant_id, True)
+        
+        secret = self.loader(merchant_id)
+        self._secrets.set(merchant_id, secret)
+        return secret
+
+
+# 全局佇列（api/main.py 啟動時 start，關閉時處理完剩餘事件）
+line_webhook_queue = LineWebhookQueue(
+    LineEventPublisher(event_bus),
+    workers=settings.line_webhook_workers,
+    max_pending=settings.line_webhook_max_pending,
+    batch_size=settings.line_webhook_batch_size
+)
@@ -2,13 +2,15 @@
 Notification Context - Application Layer - Services
 NotificationService 協調訊息發送邏輯
 """
-from typing import Optional
+from typing import Callable, Optional
 import logging
 from uuid import uuid4
 
+from notification.application.template_catalog import TemplateCatalog, template_catalog
 from notification.domain.models import (
-    MessageTemplate, NotificationType, ChannelType, NotificationRecord
+    MessageTemplate, NotificationType, ChannelType, NotificationRecord, DueReminder
 )
+from notification.domain.repositories import MessageTemplateRepository
 from notification.domain.line_service import LineMessagingService
 from notification.domain.exceptions import (
     TemplateNotFoundError,
@@ -17,6 +19,8 @@ from notification.domain.exceptions import (
     LineCredentialsNotConfiguredError
 )
 from merchant.domain.models import Merchant
+from shared.metrics import NOTIFICATION_SEND_TOTAL
+from shared.timezone import to_local
 
 
 logger = logging.getLogger(__name__)
@@ -35,12 +39,19 @@ class NotificationService:
     
     def __init__(
         self,
-        # template_repo: MessageTemplateRepository,  # 簡化：不使用 Repository
-        # notification_repo: NotificationRepository
+        template_repo: Optional[MessageTemplateRepository] = None,
+        template_catalog: TemplateCatalog = template_catalog,
+        record_sink: Optional[Callable[[NotificationRecord], bool]] = None
     ):
-        # self.template_repo = template_repo
-        # self.notification_repo = notification_repo
-        pass
+        """
+        Args:
+            template_repo: 商家自訂模板（未提供時只使用系統預設模板）
+            template_catalog: 已編譯模板快取
+            record_sink: 通知記錄的寫入端（如 NotificationRecordWriter.submit；不阻塞），未提供時不記錄
+        """
+        self.template_repo = template_repo
+        self.template_catalog = template_catalog
+        self.record_sink = record_sink
     
     def send_booking_confirmed_notification(
         self,
@@ -65,8 +76,7 @@ class NotificationService:
         Returns:
             是否發送成功
         """
-        # 建立預設模板（實際環境從 Repository 讀取）
-        template = self._get_default_template(
+        template = self._get_template(
             NotificationType.BOOKING_CONFIRMED,
             merchant.id
         )
@@ -96,17 +106,34 @@ class NotificationService:
                     message=message
                 )
                 
-                # 記錄通知（簡化：僅 log）
                 logger.info(
                     f"預約確認通知已發送: {booking_id} -> {customer_line_user_id}"
                 )
                 
+                NOTIFICATION_SEND_TOTAL.inc(
+                    notification_type="booking_confirmed",
+                    outcome="sent" if success else "failed"
+                )
+                self._record(
+                    merchant.id, customer_line_user_id, NotificationType.BOOKING_CONFIRMED, message.text,
+                    error=None if success else "LINE 發送失敗", booking_id=booking_id
+                )
                 return success
             except Exception as e:
                 logger.error(f"LINE 發送失敗: {e}")
+                NOTIFICATION_SEND_TOTAL.inc(notification_type="booking_confirmed", outcome="failed")
+                self._record(
+                    merchant.id, customer_line_user_id, NotificationType.BOOKING_CONFIRMED, message.text,
+                    error=str(e), booking_id=booking_id
+                )
                 return False
         else:
             logger.warning(f"商家 {merchant.id} 未配置 LINE 憑證，跳過推播")
+            NOTIFICATION_SEND_TOTAL.inc(notification_type="booking_confirmed", outcome="skipped")
+            self._record(
+                merchant.id, customer_line_user_id, NotificationType.BOOKING_CONFIRMED, message.text,
+                error="商家未配置 LINE 憑證", booking_id=booking_id
+            )
             return False
     
     def send_booking_cancelled_notification(
@@ -119,7 +146,7 @@ class NotificationService:
         service_name: str
     ) -> bool:
         """發送預約取消通知"""
-        template = self._get_default_template(
+        template = self._get_template(
             NotificationType.BOOKING_CANCELLED,
             merchant.id
         )
@@ -150,64 +177,126 @@ class NotificationService:
                     f"預約取消通知已發送: {booking_id} -> {customer_line_user_id}"
                 )
                 
+                NOTIFICATION_SEND_TOTAL.inc(
+                    notification_type="booking_cancelled",
+                    outcome="sent" if success else "failed"
+                )
+                self._record(
+                    merchant.id, customer_line_user_id, NotificationType.BOOKING_CANCELLED, message.text,
+                    error=None if success else "LINE 發送失敗", booking_id=booking_id
+                )
                 return success
             except Exception as e:
                 logger.error(f"LINE 發送失敗: {e}")
+                NOTIFICATION_SEND_TOTAL.inc(notification_type="booking_cancelled", outcome="failed")
+                self._record(
+                    merchant.id, customer_line_user_id, NotificationType.BOOKING_CANCELLED, message.text,
+                    error=str(e), booking_id=booking_id
+                )
                 return False
         else:
             logger.warning(f"商家 {merchant.id} 未配置 LINE 憑證，跳過推播")
+            NOTIFICATION_SEND_TOTAL.inc(notification_type="booking_cancelled", outcome="skipped")
+            self._record(
+                merchant.id, customer_line_user_id, NotificationType.BOOKING_CANCELLED, message.text,
+                error="商家未配置 LINE 憑證", booking_id=booking_id
+            )
             return False
     
-    def _get_default_template(
-        self,
-        template_type: NotificationType,
-        merchant_id: str
-    ) -> MessageTemplate:
+    def send_booking_reminder_notification(self, reminder: DueReminder) -> bool:
         """
-        取得預設模板（簡化版）
+        發送預約提醒（由 ReminderScheduler 呼叫；提醒已附帶商家名稱與 LINE token）
         
-        實際環境應從 Repository 讀取客製化模板
+        Returns:
+            是否發送成功
         """
-        templates = {
-            NotificationType.BOOKING_CONFIRMED: """
-🎉 預約確認通知
-
-親愛的 {customer_name}，您好！
-
-您在 {merchant_name} 的預約已確認：
-
-📅 預約時間: {start_at}
-💅 服務項目: {service_name}
-🔖 預約編號: {booking_id}
-
-期待您的光臨！如需取消或變更，請提前聯繫我們。
-
-{merchant_name} 敬上
-            """.strip(),
-            
-            NotificationType.BOOKING_CANCELLED: """
-❌ 預約取消通知
-
-親愛的 {customer_name}，您好！
-
-您的預約已成功取消：
-
-📅 原預約時間: {start_at}
-💅 服務項目: {service_name}
-🔖 預約編號: {booking_id}
-
-如有需要，歡迎隨時再次預約！
-
-{merchant_name} 敬上
-            """.strip()
-        }
+        template = self._get_template(
+            NotificationType.BOOKING_REMINDER,
+            reminder.merchant_id
+        )
+        
+        try:
+            message = template.create_line_message(
+                customer_name=reminder.customer_name,
+                merchant_name=reminder.merchant_name,
+                service_name=reminder.service_name,
+                start_at=to_local(reminder.start_at).strftime("%Y-%m-%d %H:%M"),
+                reminder_label=self._reminder_label(reminder.offset_minutes)
+            )
+        except Exception as e:
+            raise TemplateRenderError(template.template_key.value, str(e))
         
-        return MessageTemplate(
-            id=0,
+        line_service = LineMessagingService(channel_access_token=reminder.channel_access_token)
+        error = None
+        try:
+            success = line_service.send_message(to=reminder.line_user_id, message=message)
+        except NotificationSendError as e:
+            logger.error(f"LINE 發送失敗: {e}")
+            success, error = False, str(e)
+        
+        NOTIFICATION_SEND_TOTAL.inc(
+            notification_type="booking_reminder",
+            outcome="sent" if success else "failed"
+        )
+        self._record(
+            reminder.merchant_id, reminder.line_user_id, NotificationType.BOOKING_REMINDER, message.text,
+            error=None if success else (error or "LINE 發送失敗"), booking_id=reminder.booking_id
+        )
+        return success
+    
+    def _record(
+        self,
+        merchant_id: str,
+        recipient: str,
+        notification_type: NotificationType,
+        message: str,
+        error: Optional[str],
+        booking_id: Optional[str] = None
+    ):
+        """交給記錄寫入端（背景批次寫入，不影響發送結果）"""
+        if self.record_sink is None:
+            return
+        
+        record = NotificationRecord(
+            id=str(uuid4()),
             merchant_id=merchant_id,
-            template_key=template_type,
+            recipient=recipient,
             channel_type=ChannelType.LINE,
-            template=templates.get(template_type, "預設訊息模板"),
-            is_active=True
+            notification_type=notification_type,
+            message=message,
+            booking_id=booking_id
         )
-
+        if error is None:
+            record.mark_as_sent()
+        else:
+            record.mark_as_failed(error)
+        self.record_sink(record)
+    
+    @staticmethod
+    def _reminder_label(offset_minutes: int) -> str:
+        """提醒時點 → 訊息用語（1440 → 明天、120 → 2 小時後）"""
+        if offset_minutes % 1440 == 0:
+            return "明天" if offset_minutes == 1440 else f"{offset_minutes // 1440} 天後"
+        if offset_minutes % 60 == 0:
+            return f"{offset_minutes // 60} 小時後"
+        return f"{offset_minutes} 分鐘後"
+    
+    def _get_template(
+        self,
+        template_type: NotificationType,
+        merchant_id: str
+    ) -> MessageTemplate:
+        """取得商家模板（自訂模板優先，否則使用系統預設模板；已編譯並快取）"""
+        return self.template_catalog.get(merchant_id, template_type, self.template_repo)
+    
+    def save_template(self, template: MessageTemplate) -> MessageTemplate:
+        """
+        儲存商家自訂模板（版本遞增）並使本 worker 的快取失效
+        
+        呼叫端負責提交交易
+        """
+        if self.template_repo is None:
+            raise ValueError("未設定模板 Repository")
+        saved = self.template_repo.save(template)
+        self.template_catalog.invalidate(template.merchant_id, template.template_key)
+        return saved
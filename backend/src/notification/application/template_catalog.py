@@ -0,0 +1,165 @@
+"""
+Notification Context - Application Layer - Template Catalog
+行程內訊息模板目錄（預設模板與商家自訂模板的已編譯快取）
+
+- 系統預設模板於載入模組時編譯一次，所有商家共用
+- 商家目前的模板版本快取 ttl_seconds 秒（未自訂也快取，發送時不必每次查詢）
+- 已編譯的自訂模板以 (merchant_id, 類型, version) 為 key 放入 LRU：
+  TTL 到期後只查詢版本，版本未變即沿用，不重新載入與編譯
+
+本 worker 儲存模板後立即失效；其他 worker 最遲於 TTL 後改用新版本
+"""
+from collections import OrderedDict
+from typing import Callable, Optional
+import threading
+import time
+
+from notification.domain.models import ChannelType, MessageTemplate, NotificationType
+from notification.domain.repositories import MessageTemplateRepository
+from shared.config import settings
+from shared.single_flight import MISSING, TTLCache
+
+
+def _default_template(template_type: NotificationType, template: str) -> MessageTemplate:
+    return MessageTemplate(
+        id=0,
+        merchant_id="",
+        template_key=template_type,
+        channel_type=ChannelType.LINE,
+        template=template.strip(),
+        is_active=True
+    )
+
+
+DEFAULT_TEMPLATES: dict[NotificationType, MessageTemplate] = {
+    NotificationType.BOOKING_CONFIRMED: _default_template(NotificationType.BOOKING_CONFIRMED, """
+🎉 預約確認通知
+
+親愛的 {customer_name}，您好！
+
+您在 {merchant_name} 的預約已確認：
+
+📅 預約時間: {start_at}
+💅 服務項目: {service_name}
+🔖 預約編號: {booking_id}
+
+期待您的光臨！如需取消或變更，請提前聯繫我們。
+
+{merchant_name} 敬上
+    """),
+    
+    NotificationType.BOOKING_CANCELLED: _default_template(NotificationType.BOOKING_CANCELLED, """
+❌ 預約取消通知
+
+親愛的 {customer_name}，您好！
+
+您的預約已成功取消：
+
+📅 原預約時間: {start_at}
+💅 服務項目: {service_name}
+🔖 預約編號: {booking_id}
+
+如有需要，歡迎隨時再次預約！
+
+{merchant_name} 敬上
+    """),
+    
+    NotificationType.BOOKING_REMINDER: _default_template(NotificationType.BOOKING_REMINDER, """
+⏰ 預約提醒
+
+親愛的 {customer_name}，您好！
+
+提醒您，{reminder_label}在 {merchant_name} 有預約：
+
+📅 預約時間: {start_at}
+💅 服務項目: {service_name}
+
+如需取消或變更，請提前聯繫我們。
+
+{merchant_name} 敬上
+    """),
+}
+
+
+def default_template(template_type: NotificationType) -> MessageTemplate:
+    """取得系統預設模板（未定義的類型使用通用訊息）"""
+    template = DEFAULT_TEMPLATES.get(template_type)
+    if template is None:
+        template = _default_template(template_type, "預設訊息模板")
+        DEFAULT_TEMPLATES[template_type] = template
+    return template
+
+
+class TemplateCatalog:
+    """訊息模板目錄（回傳的 MessageTemplate 由所有請求共用，呼叫端不可修改）"""
+    
+    def __init__(self, ttl_seconds: float, max_entries: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._versions = TTLCache(ttl_seconds, max_entries, clock)
+        self._compiled: OrderedDict[tuple, MessageTemplate] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(
+        self,
+        merchant_id: str,
+        template_type: NotificationType,
+        template_repo: Optional[MessageTemplateRepository] = None
+    ) -> MessageTemplate:
+        """
+        取得商家的模板（未自訂或未提供 Repository 時為系統預設模板）
+        """
+        if template_repo is None:
+            return default_template(template_type)
+        
+        key = (merchant_id, template_type)
+        version = self._versions.get(key)
+        if version is MISSING:
+            version = template_repo.find_active_version(merchant_id, template_type)
+            self._versions.set(key, version)
+        if version is None:
+            return default_template(template_type)
+        
+        template = self._lookup((merchant_id, template_type, version))
+        if template is not None:
+            return template
+        
+        template = template_repo.find_active(merchant_id, template_type)
+        if template is None:
+            # 查詢版本後被停用
+            self._versions.set(key, None)
+            return default_template(template_type)
+        if template.version != version:
+            self._versions.set(key, template.version)
+        return self._store(template)
+    
+    def invalidate(self, merchant_id: str, template_type: NotificationType):
+        """商家模板已修改：下次取得時重新查詢版本"""
+        self._versions.delete((merchant_id, template_type))
+    
+    def clear(self):
+        self._versions.clear()
+        with self._lock:
+            self._compiled.clear()
+    
+    def _lookup(self, key: tuple) -> Optional[MessageTemplate]:
+        with self._lock:
+            template = self._compiled.get(key)
+            if template is not None:
+                self._compiled.move_to_end(key)
+            return template
+    
+    def _store(self, template: MessageTemplate) -> MessageTemplate:
+        key = (template.merchant_id, template.template_key, template.version)
+        with self._lock:
+            self._compiled[key] = template
+            self._compiled.move_to_end(key)
+            while len(self._compiled) > self.max_entries:
+                self._compiled.popitem(last=False)
+        return template
+
+
+# 全局訊息模板目錄
+template_catalog = TemplateCatalog(
+    settings.message_template_cache_ttl_seconds,
+    settings.message_template_cache_max_entries
+)
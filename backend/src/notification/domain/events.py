@@ -0,0 +1,52 @@
+"""
+Notification Context - Domain Layer - Domain Events
+LINE 官方帳號收到的用戶事件（follow / unfollow / message / postback）
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import uuid4
+
+from shared.event_bus import DomainEvent
+
+
+# LINE webhook 事件類型 → 領域事件類型（其餘類型不發布）
+LINE_EVENT_TYPES = {
+    "follow": "LineFollowed",
+    "unfollow": "LineUnfollowed",
+    "message": "LineMessageReceived",
+    "postback": "LinePostbackReceived",
+}
+
+
+@dataclass
+class LineUserEvent(DomainEvent):
+    """LINE 用戶事件（aggregate_id 為 LINE User ID）"""
+    
+    @classmethod
+    def from_webhook(cls, merchant_id: str, line_event: dict[str, Any]) -> Optional["LineUserEvent"]:
+        """由 LINE webhook 事件建立；不處理的類型或無用戶來源時返回 None"""
+        event_type = LINE_EVENT_TYPES.get(line_event.get("type"))
+        line_user_id = (line_event.get("source") or {}).get("userId")
+        if event_type is None or line_user_id is None:
+            return None
+        
+        timestamp = line_event.get("timestamp")
+        occurred_at = (
+            datetime.fromtimestamp(timestamp / 1000, tz=timezone.utc)
+            if timestamp else datetime.now(timezone.utc)
+        )
+        return cls(
+            event_id=line_event.get("webhookEventId") or str(uuid4()),
+            occurred_at=occurred_at,
+            aggregate_id=line_user_id,
+            aggregate_type="LineUser",
+            event_type=event_type,
+            payload={
+                "merchant_id": merchant_id,
+                "line_user_id": line_user_id,
+                "reply_token": line_event.get("replyToken"),
+                "message": line_event.get("message"),
+                "postback": line_event.get("postback"),
+            }
+        )
@@ -2,8 +2,15 @@
 Notification Context - Domain Layer - LINE Messaging Service
 LINE Messaging API 封裝（值服務）
 """
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+import base64
+import hashlib
+import hmac
+import json
 import logging
+import urllib.error
+import urllib.request
 
 # LINE SDK（在實際環境需安裝：pip install line-bot-sdk）
 # from linebot import LineBotApi
@@ -16,6 +23,27 @@ from notification.domain.exceptions import NotificationSendError
 
 logger = logging.getLogger(__name__)
 
+LINE_API_BASE_URL = "https://api.line.me"
+MULTICAST_MAX_RECIPIENTS = 500
+
+
+@dataclass(frozen=True)
+class MulticastResult:
+    """multicast 呼叫結果"""
+    status_code: int  # 0 = 連線失敗
+    error: Optional[str] = None
+    retry_after_seconds: Optional[float] = None
+    
+    @property
+    def accepted(self) -> bool:
+        """200，或 409（相同 retry key 的請求先前已被接受）"""
+        return self.status_code in (200, 409)
+    
+    @property
+    def retryable(self) -> bool:
+        """限流、伺服器錯誤或連線失敗：以相同 retry key 重送"""
+        return self.status_code in (0, 429) or self.status_code >= 500
+
 
 class LineMessagingService:
     """
@@ -26,9 +54,13 @@ class LineMessagingService:
     
     def __init__(
         self,
-        channel_access_token: Optional[str] = None
+        channel_access_token: Optional[str] = None,
+        api_base_url: str = LINE_API_BASE_URL,
+        timeout_seconds: float = 10.0
     ):
         self.channel_access_token = channel_access_token
+        self.api_base_url = api_base_url.rstrip("/")
+        self.timeout_seconds = timeout_seconds
         # self.line_bot_api = LineBotApi(channel_access_token) if channel_access_token else None
     
     def send_message(
@@ -87,32 +119,82 @@ class LineMessagingService:
         message = LineMessage(text=text)
         return self.send_message(to, message)
     
-    def verify_webhook_signature(
+    def multicast(
         self,
-        body: str,
-        signature: str,
+        to: Sequence[str],
+        messages: Sequence[LineMessage],
+        retry_key: Optional[str] = None
+    ) -> MulticastResult:
+        """
+        一次發送給多位收件者（POST /v2/bot/message/multicast，至多 500 位）
+        
+        Args:
+            to: LINE User ID 列表
+            messages: 訊息（至多 5 則）
+            retry_key: X-Line-Retry-Key（UUID）；重送時帶相同值，LINE 回應 409 表示先前已接受
+        
+        Raises:
+            ValueError: 收件者超過上限
+        """
+        if len(to) > MULTICAST_MAX_RECIPIENTS:
+            raise ValueError(f"multicast 收件者至多 {MULTICAST_MAX_RECIPIENTS} 位")
+        if not self.channel_access_token:
+            return MulticastResult(status_code=401, error="LINE 憑證未配置")
+        
+        body = json.dumps({
+            "to": list(to),
+            "messages": [message.to_dict() for message in messages],
+        }).encode("utf-8")
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.channel_access_token}",
+        }
+        if retry_key:
+            headers["X-Line-Retry-Key"] = retry_key
+        request = urllib.request.Request(
+            f"{self.api_base_url}/v2/bot/message/multicast",
+            data=body,
+            headers=headers,
+            method="POST"
+        )
+        
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout_seconds) as response:
+                return MulticastResult(status_code=response.status)
+        except urllib.error.HTTPError as e:
+            retry_after = e.headers.get("Retry-After") if e.headers else None
+            return MulticastResult(
+                status_code=e.code,
+                error=e.read().decode("utf-8", errors="replace")[:500],
+                retry_after_seconds=float(retry_after) if retry_after and retry_after.isdigit() else None
+            )
+        except (urllib.error.URLError, OSError) as e:
+            return MulticastResult(status_code=0, error=str(e))
+    
+    @staticmethod
+    def verify_webhook_signature(
+        body: Union[bytes, str],
+        signature: Optional[str],
         channel_secret: str
     ) -> bool:
         """
         驗證 Webhook 簽章
         
+        X-Line-Signature = Base64(HMAC-SHA256(channel secret, 原始 body))；
+        直接以原始 bytes 計算（不先解析 JSON），並以固定時間比較避免時序側通道
+        
         Args:
-            body: Request body
+            body: Request body（原始 bytes；str 以 UTF-8 編碼）
             signature: X-Line-Signature header
             channel_secret: LINE Channel Secret
         
         Returns:
             簽章是否有效
         """
-        # 實際環境使用 LINE SDK
-        # from linebot import WebhookParser
-        # parser = WebhookParser(channel_secret)
-        # try:
-        #     parser.parse(body, signature)
-        #     return True
-        # except Exception:
-        #     return False
+        if not signature or not channel_secret:
+            return False
         
-        # 開發環境：總是返回 True
-        return True
-
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        digest = hmac.new(channel_secret.encode("utf-8"), body, hashlib.sha256).digest()
+        return hmac.compare_digest(base64.b64encode(digest), signature.encode("utf-8"))
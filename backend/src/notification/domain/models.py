@@ -3,9 +3,11 @@ Notification Context - Domain Layer - Aggregates
 MessageTemplate 訊息模板聚合
 """
 from dataclasses import dataclass
-from datetime import datetime, timezone as dt_timezone
+from datetime import datetime, timedelta, timezone as dt_timezone
 from enum import Enum
-from typing import Optional
+from typing import Any, Iterable, Mapping, Optional
+
+from .templates import CompiledTemplate
 
 
 class NotificationType(str, Enum):
@@ -46,9 +48,10 @@ class MessageTemplate:
     MessageTemplate 聚合根（訊息模板）
     
     不變式：
-    1. template_key 唯一識別模板
+    1. (merchant_id, template_key, channel_type) 唯一識別模板
     2. channel_type 決定發送渠道
-    3. template 包含變數佔位符（如 {customer_name}）
+    3. template 包含變數佔位符（如 {customer_name}），建立時即編譯（格式錯誤拋出 ValueError）
+    4. version 於每次修改時遞增（快取以版本區分新舊模板）
     """
     
     def __init__(
@@ -60,6 +63,7 @@ class MessageTemplate:
         template: str,
         subject: Optional[str] = None,
         is_active: bool = True,
+        version: int = 1,
         created_at: Optional[datetime] = None,
         updated_at: Optional[datetime] = None
     ):
@@ -70,6 +74,7 @@ class MessageTemplate:
         self.template = template
         self.subject = subject
         self.is_active = is_active
+        self.version = version
         self.created_at = created_at or datetime.now(dt_timezone.utc)
         self.updated_at = updated_at
         
@@ -79,6 +84,7 @@ class MessageTemplate:
         """驗證不變式"""
         if not self.template:
             raise ValueError("訊息模板內容不可為空")
+        self.compiled = CompiledTemplate(self.template)
     
     def render(self, **kwargs) -> str:
         """
@@ -90,7 +96,11 @@ class MessageTemplate:
         Returns:
             渲染後的訊息
         """
-        return self.template.format(**kwargs)
+        return self.compiled.render(kwargs)
+    
+    def render_many(self, rows: Iterable[Mapping[str, Any]], **common: Any) -> list[str]:
+        """批次渲染（每位收件者一組變數，common 為共用變數）"""
+        return self.compiled.render_many(rows, **common)
     
     def create_line_message(self, **kwargs) -> LineMessage:
         """
@@ -106,7 +116,33 @@ class MessageTemplate:
         return LineMessage(text=text)
     
     def __repr__(self) -> str:
-        return f"<MessageTemplate(id={self.id}, key={self.template_key.value})>"
+        return f"<MessageTemplate(id={self.id}, key={self.template_key.value}, version={self.version})>"
+
+
+@dataclass(frozen=True)
+class DueReminder:
+    """
+    待發送的預約提醒（讀取模型）
+    
+    由 bookings 於提醒時間前載入，附帶發送所需的客戶、商家資料，發送時不必再查詢
+    """
+    booking_id: str
+    merchant_id: str
+    offset_minutes: int  # 預約開始前幾分鐘提醒
+    start_at: datetime
+    line_user_id: str
+    customer_name: str
+    service_name: str
+    merchant_name: str
+    channel_access_token: str
+    
+    @property
+    def key(self) -> tuple[str, int]:
+        return (self.booking_id, self.offset_minutes)
+    
+    @property
+    def due_at(self) -> datetime:
+        return self.start_at - timedelta(minutes=self.offset_minutes)
 
 
 @dataclass
@@ -114,7 +150,7 @@ class NotificationRecord:
     """
     通知記錄（實體）
     
-    記錄每次發送的通知，用於追蹤與除錯
+    記錄每次發送的通知，用於追蹤與除錯（「預約確認有沒有送出？」依預約或客戶查詢）
     """
     id: str  # UUID
     merchant_id: str
@@ -126,6 +162,7 @@ class NotificationRecord:
     sent_at: Optional[datetime] = None
     error_message: Optional[str] = None
     created_at: datetime = None
+    booking_id: Optional[str] = None
     
     def __post_init__(self):
         if self.created_at is None:
@@ -140,4 +177,85 @@ class NotificationRecord:
         """標記為失敗"""
         self.status = "failed"
         self.error_message = error
+    
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "booking_id": self.booking_id,
+            "recipient": self.recipient,
+            "channel_type": self.channel_type.value,
+            "notification_type": self.notification_type.value,
+            "message": self.message,
+            "status": self.status,
+            "error_message": self.error_message,
+            "sent_at": self.sent_at.isoformat() if self.sent_at else None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class CampaignStatus(str, Enum):
+    """推播活動狀態"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"  # 所有分批皆已送出
+    FAILED = "failed"  # 有分批發送失敗，或無法發送（LINE 未設定）；可續傳重試
+
+
+class CampaignChunkStatus(str, Enum):
+    """推播分批狀態"""
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
 
+@dataclass
+class Campaign:
+    """
+    推播活動（聚合根）
+    
+    收件者不預先展開：發送時依 line_user_id 順序分批讀取，每批寫入 CampaignChunk 並推進 recipient_cursor，
+    中斷後從游標續傳（已建立但未送出的分批以相同 retry key 重送，LINE 不會重複投遞）
+    """
+    id: str
+    merchant_id: str
+    message: str
+    status: CampaignStatus = CampaignStatus.PENDING
+    recipient_cursor: Optional[str] = None  # 已分批的最後一個 line_user_id
+    recipients_exhausted: bool = False  # 收件者已全部分批（續傳時不再讀取新客戶）
+    chunk_count: int = 0
+    recipient_count: int = 0
+    sent_count: int = 0
+    failed_count: int = 0
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    
+    def __post_init__(self):
+        if not self.message or not self.message.strip():
+            raise ValueError("推播訊息不可為空")
+        if self.created_at is None:
+            self.created_at = datetime.now(dt_timezone.utc)
+    
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "merchant_id": self.merchant_id,
+            "status": self.status.value,
+            "chunk_count": self.chunk_count,
+            "recipient_count": self.recipient_count,
+            "sent_count": self.sent_count,
+            "failed_count": self.failed_count,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+        }
+
+
+@dataclass
+class CampaignChunk:
+    """推播分批（一次 multicast 呼叫，至多 500 位收件者）"""
+    campaign_id: str
+    seq: int
+    recipients: list[str]
+    retry_key: str  # X-Line-Retry-Key：重送同一分批時 LINE 以此去重
+    status: CampaignChunkStatus = CampaignChunkStatus.PENDING
+    attempts: int = 0
+    error_message: Optional[str] = None
@@ -0,0 +1,174 @@
+"""
+Notification Context - Domain Layer - Repository Interfaces
+定義訊息模板、預約提醒、推播活動、通知記錄 Repository 抽象介面
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Iterable, Optional
+
+from .models import (
+    Campaign, CampaignChunk, CampaignChunkStatus, ChannelType, DueReminder, MessageTemplate, NotificationRecord,
+    NotificationType
+)
+
+
+class MessageTemplateRepository(ABC):
+    """
+    訊息模板 Repository 抽象基類
+    
+    只儲存商家自訂的模板；未自訂時使用系統預設模板
+    """
+    
+    @abstractmethod
+    def find_active(
+        self,
+        merchant_id: str,
+        template_key: NotificationType,
+        channel_type: ChannelType = ChannelType.LINE
+    ) -> Optional[MessageTemplate]:
+        """查詢商家啟用中的自訂模板"""
+        pass
+    
+    @abstractmethod
+    def find_active_version(
+        self,
+        merchant_id: str,
+        template_key: NotificationType,
+        channel_type: ChannelType = ChannelType.LINE
+    ) -> Optional[int]:
+        """查詢商家啟用中自訂模板的版本（只讀版本欄位；快取以此判斷已編譯的模板是否仍有效）"""
+        pass
+    
+    @abstractmethod
+    def save(self, template: MessageTemplate) -> MessageTemplate:
+        """新增或覆寫商家模板（版本遞增），回傳儲存後的模板"""
+        pass
+
+
+class ReminderRepository(ABC):
+    """
+    預約提醒 Repository 抽象基類
+    
+    提醒不預先建立資料列：由 bookings 依開始時間推算，發送前才寫入發送紀錄
+    （以 (booking_id, offset_minutes) 唯一，多個 replica 同時觸發時只有一個取得發送權）
+    """
+    
+    @abstractmethod
+    def find_due(
+        self,
+        due_from: datetime,
+        due_until: datetime,
+        offsets_minutes: Iterable[int],
+        booking_ids: Optional[Iterable[str]] = None
+    ) -> list[DueReminder]:
+        """
+        查詢提醒時間落在 [due_from, due_until) 且尚未發送的提醒
+        
+        只包含有效預約（pending / confirmed）、已設定 LINE 的商家，
+        且預約建立於提醒時間之前（臨時預約不補發）
+        """
+        pass
+    
+    @abstractmethod
+    def claim(self, reminder: DueReminder) -> bool:
+        """
+        取得發送權（寫入發送紀錄；預約已取消或已有紀錄時返回 False）
+        """
+        pass
+    
+    @abstractmethod
+    def mark_result(self, reminder: DueReminder, sent: bool, error: Optional[str] = None) -> None:
+        """記錄發送結果"""
+        pass
+
+
+class CampaignRepository(ABC):
+    """推播活動 Repository 抽象基類"""
+    
+    @abstractmethod
+    def create(self, campaign: Campaign) -> Campaign:
+        pass
+    
+    @abstractmethod
+    def find_by_id(self, campaign_id: str, merchant_id: str) -> Optional[Campaign]:
+        """根據 ID 查詢（含租戶隔離）"""
+        pass
+    
+    @abstractmethod
+    def claim(self, campaign_id: str, lease_seconds: float) -> Optional[Campaign]:
+        """
+        取得執行權（pending / failed，或執行中但心跳已逾時）並標記為 running
+        
+        Returns:
+            None 表示其他 worker 正在執行、已完成或不存在
+        """
+        pass
+    
+    @abstractmethod
+    def heartbeat(self, campaign_id: str) -> None:
+        """更新心跳（執行中定期呼叫，避免被其他 worker 接手）"""
+        pass
+    
+    @abstractmethod
+    def next_recipients(self, merchant_id: str, after: Optional[str], limit: int) -> list[str]:
+        """依 line_user_id 順序讀取下一批不重複的收件者（曾預約的客戶）"""
+        pass
+    
+    @abstractmethod
+    def add_chunk(self, chunk: CampaignChunk) -> None:
+        """寫入分批並推進活動的收件者游標"""
+        pass
+    
+    @abstractmethod
+    def mark_recipients_exhausted(self, campaign_id: str) -> None:
+        pass
+    
+    @abstractmethod
+    def find_unsent_chunks(self, campaign_id: str) -> list[CampaignChunk]:
+        """查詢尚未送出的分批（pending / failed；續傳時重送）"""
+        pass
+    
+    @abstractmethod
+    def mark_chunk(
+        self,
+        chunk: CampaignChunk,
+        status: CampaignChunkStatus,
+        error: Optional[str] = None
+    ) -> None:
+        """記錄分批發送結果（attempts 取 chunk.attempts）"""
+        pass
+    
+    @abstractmethod
+    def finish(self, campaign_id: str, aborted: bool = False) -> Campaign:
+        """
+        依分批結果彙總計數並結束活動（有失敗分批或 aborted 時為 failed，可再續傳）
+        """
+        pass
+
+
+class NotificationRecordRepository(ABC):
+    """
+    通知記錄 Repository 抽象基類
+    
+    記錄由背景寫入器分批新增（不在請求路徑上），超過保留期限的記錄分批刪除
+    """
+    
+    @abstractmethod
+    def add_many(self, records: list[NotificationRecord]) -> None:
+        """批次新增通知記錄（單一多列 INSERT）"""
+        pass
+    
+    @abstractmethod
+    def find_by_booking(self, merchant_id: str, booking_id: str) -> list[NotificationRecord]:
+        """查詢預約的所有通知（依建立時間新到舊）"""
+        pass
+    
+    @abstractmethod
+    def find_by_recipient(self, merchant_id: str, recipient: str, limit: int = 50) -> list[NotificationRecord]:
+        """查詢客戶最近的通知（依建立時間新到舊）"""
+        pass
+    
+    @abstractmethod
+    def delete_created_before(self, cutoff: datetime, limit: int) -> int:
+        """刪除建立時間早於 cutoff 的記錄（至多 limit 筆），回傳刪除筆數"""
+        pass
@@ -0,0 +1,81 @@
+"""
+Notification Context - Domain Layer - Template Compilation
+將訊息模板預先編譯為渲染函式
+
+模板語法同 str.format，但只允許具名的簡單變數（{customer_name}、{total:,.0f}、{name!r}）；
+屬性 / 索引存取（{x.__class__}、{x[0]}）與位置參數在編譯時即拒絕，商家自訂模板無法藉此讀取物件內部。
+
+編譯時解析一次格式字串並產生對應的 lambda，渲染時只剩變數查找與字串串接，
+大量發送（推播活動）時不必逐則重新解析
+"""
+from string import Formatter
+from typing import Any, Callable, Iterable, Mapping
+
+RenderFunction = Callable[[Mapping[str, Any]], str]
+
+_CONVERSIONS = {"s": "str", "r": "repr", "a": "ascii"}
+_RENDER_GLOBALS = {"__builtins__": {}, "format": format, "str": str, "repr": repr, "ascii": ascii}
+
+
+class CompiledTemplate:
+    """已編譯的模板（不可變，可由多個執行緒共用）"""
+    
+    __slots__ = ("source", "fields", "_render")
+    
+    def __init__(self, source: str):
+        self.source = source
+        self.fields, self._render = _compile(source)
+    
+    def render(self, variables: Mapping[str, Any]) -> str:
+        """渲染模板；缺少變數時拋出 KeyError"""
+        return self._render(variables)
+    
+    def render_many(self, rows: Iterable[Mapping[str, Any]], **common: Any) -> list[str]:
+        """
+        批次渲染（推播活動：每位收件者一組變數）
+        
+        Args:
+            rows: 每則訊息的變數
+            **common: 所有訊息共用的變數（rows 中同名變數優先）
+        """
+        render = self._render
+        if not common:
+            return [render(row) for row in rows]
+        return [render({**common, **row}) for row in rows]
+
+
+def _compile(source: str) -> tuple[frozenset[str], RenderFunction]:
+    parts: list[str] = []
+    fields: set[str] = set()
+    
+    try:
+        parsed = list(Formatter().parse(source))
+    except ValueError as e:
+        raise ValueError(f"模板格式錯誤: {e}")
+    
+    for literal, field_name, format_spec, conversion in parsed:
+        if literal:
+            parts.append(repr(literal))
+        if field_name is None:
+            continue
+        if not field_name.isidentifier():
+            raise ValueError(f"模板變數只能是具名的簡單變數: {{{field_name}}}")
+        if format_spec and "{" in format_spec:
+            raise ValueError(f"模板格式不支援巢狀變數: {{{field_name}:{format_spec}}}")
+        if conversion and conversion not in _CONVERSIONS:
+            raise ValueError(f"模板格式錯誤: 不支援的轉換 !{conversion}")
+        
+        fields.add(field_name)
+        value = f"v[{field_name!r}]"
+        if conversion:
+            value = f"{_CONVERSIONS[conversion]}({value})"
+        parts.append(f"format({value}, {format_spec or ''!r})")
+    
+    if not parts:
+        body = "''"
+    elif len(parts) == 1:
+        body = parts[0]
+    else:
+        body = f"''.join(({', '.join(parts)},))"
+    
+    return frozenset(fields), eval(f"lambda v: {body}", dict(_RENDER_GLOBALS))
@@ -0,0 +1,227 @@
+"""
+Notification Context - Infrastructure Layer - Campaign Sender
+LINE 推播活動：以 multicast 分批發送給商家所有曾預約的客戶
+
+1. 取得執行權（條件式 UPDATE；執行中的活動心跳逾時才可由其他 worker 接手）
+2. 續傳：先送出先前已建立但未送出的分批（相同 X-Line-Retry-Key，LINE 不會重複投遞）
+3. 依 line_user_id 游標讀取下一批不重複的收件者，寫入分批並推進游標後才發送
+4. 多個分批並行發送（concurrency），每次呼叫前向商家的令牌桶取得額度；
+   429 / 5xx / 連線失敗以相同 retry key 退避重送，其他 4xx 視為失敗
+5. 全部送出後依分批結果彙總；有失敗分批時為 failed，可再次續傳重送
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+from uuid import uuid4
+import logging
+import threading
+import time
+
+from merchant.infrastructure.repositories.sqlalchemy_merchant_repository import SQLAlchemyMerchantRepository
+from notification.domain.line_service import LineMessagingService
+from notification.domain.models import Campaign, CampaignChunk, CampaignChunkStatus, LineMessage
+from notification.infrastructure.repositories.sqlalchemy_campaign_repository import SQLAlchemyCampaignRepository
+from shared.config import settings
+from shared.database import SessionLocal
+from shared.metrics import LINE_MULTICAST_REQUESTS_TOTAL
+from shared.rate_limit import InMemoryRateLimitBackend, RateLimitBackend
+
+logger = logging.getLogger(__name__)
+
+
+def load_channel_access_token(session_factory, merchant_id: str) -> Optional[str]:
+    """載入商家的 LINE channel access token（未設定時返回 None）"""
+    with session_factory() as session:
+        merchant = SQLAlchemyMerchantRepository(session).find_by_id(merchant_id)
+    if merchant is None or not merchant.line_credentials or not merchant.line_credentials.is_configured():
+        return None
+    return merchant.line_credentials.channel_access_token
+
+
+class CampaignSender:
+    """分批、並行、可續傳的 LINE 推播活動發送器"""
+    
+    def __init__(
+        self,
+        session_factory,
+        client_factory: Callable[[str], LineMessagingService] = LineMessagingService,
+        chunk_size: int = 500,
+        concurrency: int = 4,
+        rate_per_second: float = 20.0,
+        burst: int = 20,
+        max_attempts: int = 5,
+        backoff_seconds: float = 1.0,
+        lease_seconds: float = 300.0,
+        repository_factory=SQLAlchemyCampaignRepository,
+        token_loader: Optional[Callable[[str], Optional[str]]] = None,
+        rate_limiter: Optional[RateLimitBackend] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.session_factory = session_factory
+        self.client_factory = client_factory
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.lease_seconds = lease_seconds
+        self.repository_factory = repository_factory
+        self.token_loader = token_loader or (
+            lambda merchant_id: load_channel_access_token(session_factory, merchant_id)
+        )
+        self.rate_limiter = rate_limiter or InMemoryRateLimitBackend()
+        self._sleep = sleep
+    
+    def start(self, campaign_id: str) -> threading.Thread:
+        """於背景執行緒執行（中斷後由續傳 API 重新啟動）"""
+        thread = threading.Thread(target=self.run, args=(campaign_id,), name=f"campaign-{campaign_id}", daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self, campaign_id: str) -> Optional[Campaign]:
+        """
+        執行（或續傳）推播活動
+        
+        Returns:
+            結束後的活動；未取得執行權（其他 worker 執行中、已完成）時返回 None
+        """
+        with self.session_factory() as session:
+            campaign = self.repository_factory(session).claim(campaign_id, self.lease_seconds)
+            session.commit()
+        if campaign is None:
+            logger.info(f"Campaign not claimed (running elsewhere or finished): {campaign_id}")
+            return None
+        
+        token = self.token_loader(campaign.merchant_id)
+        if token is None:
+            logger.warning(f"Campaign {campaign_id}: 商家 {campaign.merchant_id} 未配置 LINE 憑證")
+            return self._finish(campaign_id, aborted=True)
+        
+        client = self.client_factory(token)
+        messages = [LineMessage(text=campaign.message)]
+        in_flight: set[Future] = set()
+        
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix=f"campaign-{campaign_id[:8]}") as pool:
+            def submit(chunk: CampaignChunk):
+                # 最多 2 × concurrency 個分批等待發送，避免收件者讀取遠超過發送速度
+                while len(in_flight) >= self.concurrency * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._collect(done, in_flight)
+                in_flight.add(pool.submit(self._send_chunk, client, campaign.merchant_id, chunk, messages))
+            
+            with self.session_factory() as session:
+                unsent = self.repository_factory(session).find_unsent_chunks(campaign_id)
+            for chunk in unsent:
+                submit(chunk)
+            
+            if not campaign.recipients_exhausted:
+                for chunk in self._new_chunks(campaign):
+                    submit(chunk)
+            
+            done, _ = wait(in_flight)
+            self._collect(done, in_flight)
+        
+        return self._finish(campaign_id)
+    
+    def _new_chunks(self, campaign: Campaign):
+        """依游標讀取收件者並寫入分批（寫入並提交後才交給發送端）"""
+        cursor, seq = campaign.recipient_cursor, campaign.chunk_count
+        while True:
+            with self.session_factory() as session:
+                repo = self.repository_factory(session)
+                recipients = repo.next_recipients(campaign.merchant_id, cursor, self.chunk_size)
+                chunk = None
+                if recipients:
+                    chunk = CampaignChunk(campaign.id, seq, recipients, retry_key=str(uuid4()))
+                    repo.add_chunk(chunk)
+                if len(recipients) < self.chunk_size:
+                    repo.mark_recipients_exhausted(campaign.id)
+                session.commit()
+            
+            if chunk is not None:
+                yield chunk
+            if len(recipients) < self.chunk_size:
+                return
+            cursor, seq = recipients[-1], seq + 1
+    
+    def _send_chunk(
+        self,
+        client: LineMessagingService,
+        merchant_id: str,
+        chunk: CampaignChunk,
+        messages: list[LineMessage]
+    ) -> CampaignChunkStatus:
+        status, error = CampaignChunkStatus.FAILED, None
+        
+        for attempt in range(self.max_attempts):
+            self._acquire(merchant_id)
+            chunk.attempts += 1
+            result = client.multicast(chunk.recipients, messages, retry_key=chunk.retry_key)
+            if result.accepted:
+                status, error = CampaignChunkStatus.SENT, None
+                LINE_MULTICAST_REQUESTS_TOTAL.inc(outcome="accepted")
+                break
+            
+            error = f"HTTP {result.status_code}: {result.error}"
+            if not result.retryable:
+                LINE_MULTICAST_REQUESTS_TOTAL.inc(outcome="rejected")
+                break
+            LINE_MULTICAST_REQUESTS_TOTAL.inc(outcome="retried")
+            if attempt + 1 < self.max_attempts:
+                self._sleep(result.retry_after_seconds or min(self.backoff_seconds * 2 ** attempt, 30.0))
+        
+        if error:
+            logger.warning(f"Campaign {chunk.campaign_id} chunk {chunk.seq} failed: {error}")
+        with self.session_factory() as session:
+            repo = self.repository_factory(session)
+            repo.mark_chunk(chunk, status, error)
+            repo.heartbeat(chunk.campaign_id)
+            session.commit()
+        return status
+    
+    def _acquire(self, merchant_id: str):
+        """等待商家（LINE channel）的發送額度"""
+        while True:
+            decision = self.rate_limiter.take(f"line-multicast:{merchant_id}", self.rate_per_second, self.burst)
+            if decision.allowed:
+                return
+            self._sleep(decision.retry_after_seconds)
+    
+    @staticmethod
+    def _collect(done: set[Future], in_flight: set[Future]):
+        for future in done:
+            in_flight.discard(future)
+            if future.exception() is not None:
+                # 分批維持 pending，彙總時計為失敗，續傳時重送
+                logger.error(f"Campaign chunk failed unexpectedly: {future.exception()}")
+    
+    def _finish(self, campaign_id: str, aborted: bool = False) -> Campaign:
+        with self.session_factory() as session:
+            campaign = self.repository_factory(session).finish(campaign_id, aborted)
+            session.commit()
+        logger.info(
+            f"Campaign {campaign_id} {campaign.status.value}: "
+            f"sent={campaign.sent_count}, failed={campaign.failed_count}"
+        )
+        return campaign
+
+
+def _line_client(channel_access_token: str) -> LineMessagingService:
+    return LineMessagingService(
+        channel_access_token,
+        api_base_url=settings.line_api_base_url,
+        timeout_seconds=settings.line_api_timeout_seconds
+    )
+
+
+# 全局推播活動發送器
+campaign_sender = CampaignSender(
+    SessionLocal,
+    client_factory=_line_client,
+    chunk_size=settings.line_campaign_chunk_size,
+    concurrency=settings.line_campaign_concurrency,
+    rate_per_second=settings.line_campaign_rate_per_second,
+    burst=settings.line_campaign_burst,
+    max_attempts=settings.line_campaign_max_attempts,
+    lease_seconds=settings.line_campaign_lease_seconds
+)
@@ -0,0 +1,171 @@
+"""
+Notification Context - Infrastructure Layer - Notification Record Writer
+通知記錄的緩衝批次寫入
+
+發送端只把記錄放入有界佇列（不阻塞、不佔用請求的資料庫交易）；背景執行緒：
+1. 取出佇列中已累積的記錄（至多 batch_size 筆），以一次多列 INSERT 寫入
+   （發送量大時自然成批；佇列空時每 flush_seconds 醒來一次）
+2. 每 prune_interval_seconds 分批刪除超過 retention_days 的記錄
+
+佇列滿或寫入失敗時捨棄記錄（只影響查詢歷史，不影響發送），以指標觀察
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import logging
+import queue
+import threading
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from notification.domain.models import NotificationRecord
+from notification.infrastructure.repositories.sqlalchemy_notification_record_repository import (
+    SQLAlchemyNotificationRecordRepository
+)
+from shared.config import settings
+from shared.database import SessionLocal
+from shared.metrics import NOTIFICATION_RECORDS_TOTAL
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class NotificationRecordWriter:
+    """有界佇列 + 背景批次寫入的通知記錄器"""
+    
+    def __init__(
+        self,
+        session_factory,
+        batch_size: int = 500,
+        flush_seconds: float = 1.0,
+        max_pending: int = 10_000,
+        retention_days: int = 90,
+        prune_interval_seconds: float = 3600.0,
+        prune_batch_size: int = 5000,
+        repository_factory=SQLAlchemyNotificationRecordRepository
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.retention_days = retention_days
+        self.prune_interval_seconds = prune_interval_seconds
+        self.prune_batch_size = prune_batch_size
+        self.repository_factory = repository_factory
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread: Optional[threading.Thread] = None
+    
+    def submit(self, record: NotificationRecord) -> bool:
+        """放入一筆記錄（不阻塞）；佇列已滿返回 False"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            NOTIFICATION_RECORDS_TOTAL.inc(outcome="dropped")
+            return False
+        return True
+    
+    def pending(self) -> int:
+        return self._queue.qsize()
+    
+    def flush(self) -> int:
+        """在呼叫端執行緒寫入佇列中所有記錄（未啟動背景執行緒時使用），回傳寫入筆數"""
+        written = 0
+        while True:
+            batch, _ = self._drain([])
+            if not batch:
+                return written
+            written += self._write(batch)
+    
+    def prune(self, now: Optional[datetime] = None) -> int:
+        """刪除超過保留期限的記錄（分批提交），回傳刪除筆數"""
+        cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=self.retention_days)
+        total = 0
+        while True:
+            with self.session_factory() as session:
+                deleted = self.repository_factory(session).delete_created_before(cutoff, self.prune_batch_size)
+                session.commit()
+            total += deleted
+            if deleted < self.prune_batch_size:
+                break
+        
+        if total:
+            NOTIFICATION_RECORDS_TOTAL.inc(total, outcome="pruned")
+            logger.info(f"Pruned {total} notification records created before {cutoff.isoformat()}")
+        return total
+    
+    def start(self) -> "NotificationRecordWriter":
+        self._thread = threading.Thread(target=self._run, name="notification-record-writer", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """寫入已放入的記錄後停止"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+    
+    def _drain(self, batch: list) -> tuple[list, bool]:
+        """不等待地取出已累積的記錄，直到 batch_size；遇到停止訊號時返回 (batch, True)"""
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+    
+    def _write(self, batch: list[NotificationRecord]) -> int:
+        try:
+            with self.session_factory() as session:
+                self.repository_factory(session).add_many(batch)
+                session.commit()
+        except SQLAlchemyError as e:
+            NOTIFICATION_RECORDS_TOTAL.inc(len(batch), outcome="error")
+            logger.warning(f"Notification record write failed ({len(batch)} records): {e}")
+            return 0
+        
+        NOTIFICATION_RECORDS_TOTAL.inc(len(batch), outcome="written")
+        return len(batch)
+    
+    def _run(self):
+        next_prune = time.monotonic() + self.prune_interval_seconds
+        
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                first = None
+            
+            stopping = first is _STOP
+            batch = [] if first is None or stopping else [first]
+            if not stopping:
+                batch, stopping = self._drain(batch)
+            if batch:
+                self._write(batch)
+            
+            if stopping:
+                # 寫入停止訊號之後仍放入的記錄
+                self.flush()
+                return
+            
+            if self.prune_interval_seconds > 0 and time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + self.prune_interval_seconds
+                try:
+                    self.prune()
+                except SQLAlchemyError as e:
+                    logger.warning(f"Notification record prune failed: {e}")
+
+
+# 全局通知記錄器（api/main.py 啟動時 start，關閉時寫入剩餘記錄）
+notification_record_writer = NotificationRecordWriter(
+    SessionLocal,
+    batch_size=settings.notification_record_batch_size,
+    flush_seconds=settings.notification_record_flush_seconds,
+    max_pending=settings.notification_record_max_pending,
+    retention_days=settings.notification_record_retention_days,
+    prune_interval_seconds=settings.notification_record_prune_interval_seconds
+)
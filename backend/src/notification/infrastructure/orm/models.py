@@ -0,0 +1,225 @@
+"""
+Notification Context - Infrastructure Layer - ORM Models
+SQLAlchemy ORM 模型定義
+"""
+from sqlalchemy import (
+    Column, Integer, String, DateTime, Text, Boolean, ForeignKey, CheckConstraint, Index, UniqueConstraint, text
+)
+from sqlalchemy.dialects.postgresql import JSON, UUID
+
+from shared.database import Base
+
+
+class MessageTemplateORM(Base):
+    """
+    商家自訂訊息模板 ORM 模型
+    
+    每個商家、通知類型、渠道至多一筆；覆寫時 version 遞增
+    """
+    __tablename__ = "message_templates"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="模板 ID")
+    
+    merchant_id = Column(
+        UUID(as_uuid=False),
+        ForeignKey("merchants.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="商家 ID"
+    )
+    
+    template_key = Column(String(50), nullable=False, comment="通知類型，如 booking_confirmed")
+    
+    channel_type = Column(String(20), nullable=False, default="line", comment="渠道: line/email/sms")
+    
+    template = Column(Text, nullable=False, comment="模板內容（str.format 具名變數）")
+    
+    subject = Column(String(200), nullable=True, comment="主旨（Email）")
+    
+    version = Column(Integer, nullable=False, default=1, comment="版本（每次覆寫遞增）")
+    
+    is_active = Column(Boolean, nullable=False, default=True, comment="是否啟用")
+    
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+        comment="建立時間"
+    )
+    
+    updated_at = Column(DateTime(timezone=True), nullable=True, comment="更新時間")
+    
+    __table_args__ = (
+        UniqueConstraint("merchant_id", "template_key", "channel_type", name="uq_message_templates_merchant_key"),
+        CheckConstraint("version > 0", name="chk_message_template_version_positive"),
+        {"comment": "商家自訂訊息模板"}
+    )
+
+
+class BookingReminderORM(Base):
+    """
+    預約提醒發送紀錄 ORM 模型
+    
+    提醒由 bookings 推算，不預先建立；觸發時先寫入 status='sending' 取得發送權
+    （主鍵衝突即已由其他 replica 發送），發送後更新為 sent / failed
+    """
+    __tablename__ = "booking_reminders"
+    
+    booking_id = Column(
+        UUID(as_uuid=False),
+        ForeignKey("bookings.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="預約 ID"
+    )
+    
+    offset_minutes = Column(Integer, primary_key=True, comment="預約開始前幾分鐘提醒")
+    
+    merchant_id = Column(UUID(as_uuid=False), nullable=False, comment="商家 ID")
+    
+    status = Column(
+        String(20),
+        nullable=False,
+        default="sending",
+        comment="狀態: sending/sent/failed"
+    )
+    
+    error_message = Column(Text, nullable=True, comment="發送失敗原因")
+    
+    claimed_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+        comment="取得發送權時間"
+    )
+    
+    sent_at = Column(DateTime(timezone=True), nullable=True, comment="發送完成時間")
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('sending', 'sent', 'failed')", name="chk_booking_reminder_status"),
+        Index("idx_booking_reminders_merchant_claimed", "merchant_id", "claimed_at"),
+        {"comment": "預約提醒發送紀錄"}
+    )
+
+
+class CampaignORM(Base):
+    """
+    推播活動 ORM 模型
+    
+    收件者依 line_user_id 順序分批寫入 campaign_chunks，recipient_cursor 記錄已分批的位置（續傳用）
+    """
+    __tablename__ = "campaigns"
+    
+    id = Column(UUID(as_uuid=False), primary_key=True, comment="活動 ID")
+    
+    merchant_id = Column(
+        UUID(as_uuid=False),
+        ForeignKey("merchants.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="商家 ID"
+    )
+    
+    message = Column(Text, nullable=False, comment="推播訊息")
+    
+    status = Column(
+        String(20),
+        nullable=False,
+        default="pending",
+        comment="狀態: pending/running/completed/failed"
+    )
+    
+    recipient_cursor = Column(String(100), nullable=True, comment="已分批的最後一個 line_user_id")
+    recipients_exhausted = Column(Boolean, nullable=False, default=False, comment="收件者是否已全部分批")
+    
+    chunk_count = Column(Integer, nullable=False, default=0, comment="分批數")
+    recipient_count = Column(Integer, nullable=False, default=0, comment="收件者數")
+    sent_count = Column(Integer, nullable=False, default=0, comment="已送出收件者數")
+    failed_count = Column(Integer, nullable=False, default=0, comment="發送失敗收件者數")
+    
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True, comment="執行中心跳（逾時可由其他 worker 接手）")
+    
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=text("CURRENT_TIMESTAMP"),
+        comment="建立時間"
+    )
+    
+    completed_at = Column(DateTime(timezone=True), nullable=True, comment="完成時間")
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'running', 'completed', 'failed')", name="chk_campaign_status"),
+        Index("idx_campaigns_merchant_created", "merchant_id", "created_at"),
+        {"comment": "LINE 推播活動"}
+    )
+
+
+class CampaignChunkORM(Base):
+    """推播分批 ORM 模型（一次 multicast 呼叫）"""
+    __tablename__ = "campaign_chunks"
+    
+    campaign_id = Column(
+        UUID(as_uuid=False),
+        ForeignKey("campaigns.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="活動 ID"
+    )
+    
+    seq = Column(Integer, primary_key=True, comment="分批序號")
+    
+    recipients = Column(JSON, nullable=False, comment="收件者 line_user_id 列表")
+    recipient_count = Column(Integer, nullable=False, comment="收件者數")
+    
+    retry_key = Column(UUID(as_uuid=False), nullable=False, comment="X-Line-Retry-Key（重送時 LINE 以此去重）")
+    
+    status = Column(String(20), nullable=False, default="pending", comment="狀態: pending/sent/failed")
+    attempts = Column(Integer, nullable=False, default=0, comment="呼叫次數")
+    error_message = Column(Text, nullable=True, comment="最近一次錯誤")
+    sent_at = Column(DateTime(timezone=True), nullable=True, comment="送出時間")
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'sent', 'failed')", name="chk_campaign_chunk_status"),
+        {"comment": "LINE 推播分批"}
+    )
+
+
+class NotificationRecordORM(Base):
+    """
+    通知記錄 ORM 模型
+    
+    只新增不修改（發送結果確定後才寫入）；依預約、依客戶查詢，依建立時間清除過期記錄
+    """
+    __tablename__ = "notification_records"
+    
+    id = Column(UUID(as_uuid=False), primary_key=True, comment="記錄 ID")
+    
+    merchant_id = Column(
+        UUID(as_uuid=False),
+        ForeignKey("merchants.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="商家 ID"
+    )
+    
+    # 不設外鍵：記錄保留期間預約可能已刪除，且批次寫入不必等待預約交易
+    booking_id = Column(UUID(as_uuid=False), nullable=True, comment="預約 ID")
+    
+    recipient = Column(String(100), nullable=False, comment="收件者（LINE User ID / Email / 電話）")
+    channel_type = Column(String(20), nullable=False, comment="渠道: line/email/sms")
+    notification_type = Column(String(50), nullable=False, comment="通知類型")
+    message = Column(Text, nullable=False, comment="發送內容")
+    
+    status = Column(String(20), nullable=False, comment="狀態: pending/sent/failed")
+    error_message = Column(Text, nullable=True, comment="失敗原因")
+    sent_at = Column(DateTime(timezone=True), nullable=True, comment="送出時間")
+    
+    created_at = Column(DateTime(timezone=True), nullable=False, comment="建立時間")
+    
+    __table_args__ = (
+        CheckConstraint("status IN ('pending', 'sent', 'failed')", name="chk_notification_record_status"),
+        Index(
+            "idx_notification_records_booking",
+            "merchant_id", "booking_id", "created_at",
+            postgresql_where=text("booking_id IS NOT NULL")
+        ),
+        Index("idx_notification_records_recipient", "merchant_id", "recipient", "created_at"),
+        Index("idx_notification_records_created", "created_at"),
+        {"comment": "通知發送記錄"}
+    )
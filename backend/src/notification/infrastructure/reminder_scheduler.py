@@ -0,0 +1,304 @@
+"""
+Notification Context - Infrastructure Layer - Booking Reminder Scheduler
+預約提醒排程（時間輪）
+
+提醒不預先建立資料列，而是由 bookings 依開始時間推算：
+1. 每 reload_seconds 載入提醒時間落在 [now - catchup, now + window) 的未發送提醒，放入記憶體時間輪
+   （重啟後重新載入即可恢復；catchup 內錯過的提醒立即補發）
+2. 每個 tick 推進時間輪，到期的提醒交給 worker 發送
+3. 發送前寫入 booking_reminders（(booking_id, offset_minutes) 唯一）取得發送權，
+   多個 replica 同時載入相同提醒時只有一個發送；預約已取消時寫入失敗、不發送
+4. 每個商家以令牌桶限制發送速率（LINE push API 依 channel 限流），超過時延後重排
+
+BookingConfirmed 的預約於下一個 tick 補載入；BookingCancelled 直接自時間輪移除
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, Optional
+import logging
+import queue
+import threading
+import time
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from notification.application.services import NotificationService
+from notification.domain.models import DueReminder
+from notification.infrastructure.notification_record_writer import notification_record_writer
+from notification.infrastructure.repositories.sqlalchemy_message_template_repository import (
+    SQLAlchemyMessageTemplateRepository
+)
+from notification.infrastructure.repositories.sqlalchemy_reminder_repository import (
+    SQLAlchemyReminderRepository
+)
+from shared.config import settings
+from shared.database import SessionLocal
+from shared.event_bus import DomainEvent, EventBus
+from shared.metrics import BOOKING_REMINDERS_TOTAL
+from shared.rate_limit import InMemoryRateLimitBackend, RateLimitBackend
+from shared.timing_wheel import TimingWheel
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class ReminderScheduler:
+    """以時間輪排程預約提醒，依商家限速發送"""
+    
+    def __init__(
+        self,
+        session_factory,
+        send: Callable[[DueReminder], bool],
+        offsets_minutes: Iterable[int] = (1440, 120),
+        window: timedelta = timedelta(hours=1),
+        catchup: timedelta = timedelta(minutes=30),
+        reload_seconds: float = 300.0,
+        tick_seconds: float = 1.0,
+        workers: int = 4,
+        merchant_rate_per_second: float = 10.0,
+        merchant_burst: int = 50,
+        repository_factory=SQLAlchemyReminderRepository,
+        rate_limiter: Optional[RateLimitBackend] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        if window.total_seconds() <= reload_seconds:
+            raise ValueError("提醒載入視窗必須大於重新載入間隔")
+        
+        self.session_factory = session_factory
+        self.send = send
+        self.offsets_minutes = tuple(offsets_minutes)
+        self.window = window
+        self.catchup = catchup
+        self.reload_seconds = reload_seconds
+        self.tick_seconds = tick_seconds
+        self.workers = workers
+        self.merchant_rate_per_second = merchant_rate_per_second
+        self.merchant_burst = merchant_burst
+        self.repository_factory = repository_factory
+        self.rate_limiter = rate_limiter or InMemoryRateLimitBackend()
+        self._clock = clock
+        
+        self._wheel = TimingWheel(tick_seconds, wheel_size=60, levels=3, start=clock())
+        self._lock = threading.Lock()
+        self._ready: queue.Queue = queue.Queue()
+        self._queued: set[tuple[str, int]] = set()  # 已交給 worker、尚未完成的提醒
+        self._pending_bookings: set[str] = set()
+        self._loaded_until: Optional[datetime] = None
+        self._stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+    
+    def __len__(self) -> int:
+        """時間輪中等待的提醒數"""
+        with self._lock:
+            return len(self._wheel)
+    
+    def reload(self, now: float, booking_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        載入視窗內未發送的提醒並排程，回傳載入筆數
+        
+        Args:
+            booking_ids: 只載入指定預約（新確認的預約；視窗沿用上次完整載入的範圍）
+        """
+        current = datetime.fromtimestamp(now, timezone.utc)
+        due_from = current - self.catchup
+        if booking_ids is None:
+            due_until = current + self.window
+        elif self._loaded_until is None:
+            return 0
+        else:
+            due_until = self._loaded_until
+        
+        with self.session_factory() as session:
+            reminders = self.repository_factory(session).find_due(
+                due_from, due_until, self.offsets_minutes, booking_ids
+            )
+        
+        for reminder in reminders:
+            self.schedule(reminder)
+        if booking_ids is None:
+            self._loaded_until = due_until
+        return len(reminders)
+    
+    def schedule(self, reminder: DueReminder, at: Optional[float] = None):
+        """排程提醒（預設於提醒時間）；已到期時直接交給 worker"""
+        deadline = at if at is not None else reminder.due_at.timestamp()
+        with self._lock:
+            if reminder.key in self._queued:
+                return
+            try:
+                if self._wheel.add(reminder.key, deadline, reminder):
+                    return
+            except ValueError:
+                # 超出時間輪範圍：之後的重新載入會再排入
+                return
+            self._queued.add(reminder.key)
+        self._ready.put(reminder)
+    
+    def cancel_booking(self, booking_id: str) -> int:
+        """移除預約的所有提醒，回傳移除筆數"""
+        with self._lock:
+            self._pending_bookings.discard(booking_id)
+            return sum(
+                self._wheel.remove((booking_id, offset)) for offset in self.offsets_minutes
+            )
+    
+    def tick(self, now: float) -> int:
+        """推進時間輪，將到期的提醒交給 worker，回傳筆數"""
+        with self._lock:
+            due = self._wheel.advance(now)
+            self._queued.update(reminder.key for reminder in due)
+        for reminder in due:
+            self._ready.put(reminder)
+        return len(due)
+    
+    def dispatch(self, reminder: DueReminder) -> str:
+        """
+        發送一則提醒
+        
+        Returns:
+            sent / failed / duplicate（已由其他 replica 發送或預約已取消）/ deferred（限流，已延後重排）
+        """
+        try:
+            decision = self.rate_limiter.take(
+                f"reminder:{reminder.merchant_id}",
+                self.merchant_rate_per_second,
+                self.merchant_burst
+            )
+            if not decision.allowed:
+                with self._lock:
+                    self._queued.discard(reminder.key)
+                delay = max(decision.retry_after_seconds, self.tick_seconds)
+                self.schedule(reminder, at=self._clock() + delay)
+                outcome = "deferred"
+            else:
+                outcome = self._claim_and_send(reminder)
+        finally:
+            with self._lock:
+                self._queued.discard(reminder.key)
+        
+        BOOKING_REMINDERS_TOTAL.inc(outcome=outcome)
+        return outcome
+    
+    def _claim_and_send(self, reminder: DueReminder) -> str:
+        with self.session_factory() as session:
+            claimed = self.repository_factory(session).claim(reminder)
+            session.commit()
+        if not claimed:
+            return "duplicate"
+        
+        error = None
+        try:
+            sent = self.send(reminder)
+        except Exception as e:
+            logger.error(f"Booking reminder failed: {reminder.key}: {e}")
+            sent, error = False, str(e)
+        
+        with self.session_factory() as session:
+            self.repository_factory(session).mark_result(reminder, sent, error)
+            session.commit()
+        return "sent" if sent else "failed"
+    
+    def run_pending(self) -> Counter:
+        """在呼叫端執行緒發送所有已到期的提醒（未啟動 worker 時使用）"""
+        outcomes: Counter = Counter()
+        while True:
+            try:
+                reminder = self._ready.get_nowait()
+            except queue.Empty:
+                return outcomes
+            if reminder is not _STOP:
+                outcomes[self.dispatch(reminder)] += 1
+    
+    def handle_booking_confirmed(self, event: DomainEvent):
+        """事件處理：新確認的預約於下一個 tick 載入"""
+        with self._lock:
+            self._pending_bookings.add(event.aggregate_id)
+    
+    def handle_booking_cancelled(self, event: DomainEvent):
+        """事件處理：取消的預約移除提醒"""
+        self.cancel_booking(event.aggregate_id)
+    
+    def subscribe(self, bus: EventBus):
+        bus.subscribe("BookingConfirmed", self.handle_booking_confirmed)
+        bus.subscribe("BookingCancelled", self.handle_booking_cancelled)
+    
+    def _reload_pending_bookings(self, now: float):
+        with self._lock:
+            booking_ids, self._pending_bookings = self._pending_bookings, set()
+        if booking_ids:
+            self.reload(now, booking_ids)
+    
+    def start(self, bus: EventBus) -> "ReminderScheduler":
+        self.subscribe(bus)
+        self._threads = [threading.Thread(target=self._run_ticker, name="reminder-ticker", daemon=True)]
+        self._threads += [
+            threading.Thread(target=self._run_worker, name=f"reminder-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+    
+    def stop(self):
+        """停止 tick 並等待 worker 發送完已到期的提醒（時間輪中的提醒於重啟後重新載入）"""
+        self._stop_event.set()
+        for _ in range(self.workers):
+            self._ready.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+    
+    def _run_ticker(self):
+        next_reload = 0.0
+        while not self._stop_event.is_set():
+            now = self._clock()
+            try:
+                if now >= next_reload:
+                    next_reload = now + self.reload_seconds
+                    loaded = self.reload(now)
+                    logger.debug(f"Booking reminders loaded: {loaded}")
+                else:
+                    self._reload_pending_bookings(now)
+            except SQLAlchemyError as e:
+                logger.warning(f"Booking reminder reload failed: {e}")
+            self.tick(now)
+            self._stop_event.wait(self.tick_seconds)
+    
+    def _run_worker(self):
+        while True:
+            reminder = self._ready.get()
+            if reminder is _STOP:
+                return
+            try:
+                self.dispatch(reminder)
+            except SQLAlchemyError as e:
+                # 未取得發送權：仍在 catchup 內時由下次重新載入補發
+                logger.warning(f"Booking reminder dispatch failed: {reminder.key}: {e}")
+
+
+def send_reminder(reminder: DueReminder) -> bool:
+    """以商家模板發送提醒（模板多數命中快取，session 只在未命中時取得連線）"""
+    with SessionLocal() as session:
+        service = NotificationService(
+            SQLAlchemyMessageTemplateRepository(session),
+            record_sink=notification_record_writer.submit
+        )
+        return service.send_booking_reminder_notification(reminder)
+
+
+def start_reminder_scheduler(bus: EventBus) -> Optional[ReminderScheduler]:
+    """啟動背景預約提醒排程（未啟用時返回 None）"""
+    if not settings.booking_reminders_enabled:
+        return None
+    
+    return ReminderScheduler(
+        SessionLocal,
+        send=send_reminder,
+        offsets_minutes=settings.booking_reminder_offsets_minutes,
+        window=timedelta(minutes=settings.booking_reminder_window_minutes),
+        catchup=timedelta(minutes=settings.booking_reminder_catchup_minutes),
+        reload_seconds=settings.booking_reminder_reload_seconds,
+        workers=settings.booking_reminder_workers,
+        merchant_rate_per_second=settings.booking_reminder_merchant_rate_per_second,
+        merchant_burst=settings.booking_reminder_merchant_burst
+    ).start(bus)
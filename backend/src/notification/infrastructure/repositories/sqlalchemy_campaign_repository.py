@@ -0,0 +1,192 @@
+"""
+Notification Context - Infrastructure Layer - Campaign Repository
+使用 SQLAlchemy 實作 CampaignRepository
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import String, and_, func, literal_column, or_, select, update
+from sqlalchemy.orm import Session
+
+from booking.infrastructure.orm.models import BookingORM
+from notification.domain.models import Campaign, CampaignChunk, CampaignChunkStatus, CampaignStatus
+from notification.domain.repositories import CampaignRepository
+from notification.infrastructure.orm.models import CampaignChunkORM, CampaignORM
+from shared.tracing import trace_methods
+
+
+@trace_methods
+class SQLAlchemyCampaignRepository(CampaignRepository):
+    """SQLAlchemy 實作的 Campaign Repository"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def create(self, campaign: Campaign) -> Campaign:
+        self.db.add(CampaignORM(
+            id=campaign.id,
+            merchant_id=campaign.merchant_id,
+            message=campaign.message,
+            status=campaign.status.value,
+            created_at=campaign.created_at
+        ))
+        return campaign
+    
+    def find_by_id(self, campaign_id: str, merchant_id: str) -> Optional[Campaign]:
+        campaign_orm = self.db.execute(
+            select(CampaignORM).where(CampaignORM.id == campaign_id, CampaignORM.merchant_id == merchant_id)
+        ).scalar_one_or_none()
+        return self._to_domain(campaign_orm) if campaign_orm else None
+    
+    def claim(self, campaign_id: str, lease_seconds: float) -> Optional[Campaign]:
+        """單一條件式 UPDATE：同時續傳時只有一個 worker 取得執行權"""
+        now = datetime.now(timezone.utc)
+        campaign_orm = self.db.execute(
+            update(CampaignORM)
+            .where(
+                CampaignORM.id == campaign_id,
+                or_(
+                    CampaignORM.status.in_([CampaignStatus.PENDING.value, CampaignStatus.FAILED.value]),
+                    and_(
+                        CampaignORM.status == CampaignStatus.RUNNING.value,
+                        CampaignORM.heartbeat_at < now - timedelta(seconds=lease_seconds)
+                    )
+                )
+            )
+            .values(status=CampaignStatus.RUNNING.value, heartbeat_at=now, completed_at=None)
+            .returning(CampaignORM)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        return self._to_domain(campaign_orm) if campaign_orm else None
+    
+    def heartbeat(self, campaign_id: str) -> None:
+        self.db.execute(
+            update(CampaignORM)
+            .where(CampaignORM.id == campaign_id)
+            .values(heartbeat_at=datetime.now(timezone.utc))
+        )
+    
+    def next_recipients(self, merchant_id: str, after: Optional[str], limit: int) -> list[str]:
+        """
+        DISTINCT + 游標分頁，走 idx_bookings_customer_line_id (merchant_id, customer->>'line_user_id')
+        """
+        # 與索引運算式一致（customer->>'line_user_id'，不經 CAST），否則無法使用索引
+        line_user_id = BookingORM.customer.op("->>", return_type=String)(literal_column("'line_user_id'"))
+        stmt = (
+            select(line_user_id)
+            .where(BookingORM.merchant_id == merchant_id, line_user_id.isnot(None), line_user_id != "")
+            .distinct()
+            .order_by(line_user_id)
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(line_user_id > after)
+        return list(self.db.execute(stmt).scalars())
+    
+    def add_chunk(self, chunk: CampaignChunk) -> None:
+        self.db.add(CampaignChunkORM(
+            campaign_id=chunk.campaign_id,
+            seq=chunk.seq,
+            recipients=chunk.recipients,
+            recipient_count=len(chunk.recipients),
+            retry_key=chunk.retry_key,
+            status=chunk.status.value,
+            attempts=chunk.attempts
+        ))
+        self.db.execute(
+            update(CampaignORM)
+            .where(CampaignORM.id == chunk.campaign_id)
+            .values(
+                recipient_cursor=chunk.recipients[-1],
+                chunk_count=CampaignORM.chunk_count + 1,
+                recipient_count=CampaignORM.recipient_count + len(chunk.recipients),
+                heartbeat_at=datetime.now(timezone.utc)
+            )
+        )
+    
+    def mark_recipients_exhausted(self, campaign_id: str) -> None:
+        self.db.execute(
+            update(CampaignORM).where(CampaignORM.id == campaign_id).values(recipients_exhausted=True)
+        )
+    
+    def find_unsent_chunks(self, campaign_id: str) -> list[CampaignChunk]:
+        rows = self.db.execute(
+            select(CampaignChunkORM)
+            .where(
+                CampaignChunkORM.campaign_id == campaign_id,
+                CampaignChunkORM.status != CampaignChunkStatus.SENT.value
+            )
+            .order_by(CampaignChunkORM.seq)
+        ).scalars()
+        return [
+            CampaignChunk(
+                campaign_id=str(row.campaign_id),
+                seq=row.seq,
+                recipients=list(row.recipients),
+                retry_key=str(row.retry_key),
+                status=CampaignChunkStatus(row.status),
+                attempts=row.attempts,
+                error_message=row.error_message
+            )
+            for row in rows
+        ]
+    
+    def mark_chunk(
+        self,
+        chunk: CampaignChunk,
+        status: CampaignChunkStatus,
+        error: Optional[str] = None
+    ) -> None:
+        self.db.execute(
+            update(CampaignChunkORM)
+            .where(CampaignChunkORM.campaign_id == chunk.campaign_id, CampaignChunkORM.seq == chunk.seq)
+            .values(
+                status=status.value,
+                attempts=chunk.attempts,
+                error_message=error,
+                sent_at=datetime.now(timezone.utc) if status == CampaignChunkStatus.SENT else None
+            )
+        )
+    
+    def finish(self, campaign_id: str, aborted: bool = False) -> Campaign:
+        sent, failed = self.db.execute(
+            select(
+                func.coalesce(func.sum(CampaignChunkORM.recipient_count).filter(
+                    CampaignChunkORM.status == CampaignChunkStatus.SENT.value
+                ), 0),
+                func.coalesce(func.sum(CampaignChunkORM.recipient_count).filter(
+                    CampaignChunkORM.status != CampaignChunkStatus.SENT.value
+                ), 0)
+            ).where(CampaignChunkORM.campaign_id == campaign_id)
+        ).one()
+        
+        campaign_orm = self.db.execute(
+            update(CampaignORM)
+            .where(CampaignORM.id == campaign_id)
+            .values(
+                status=(CampaignStatus.FAILED if failed or aborted else CampaignStatus.COMPLETED).value,
+                sent_count=sent,
+                failed_count=failed,
+                completed_at=datetime.now(timezone.utc)
+            )
+            .returning(CampaignORM)
+            .execution_options(populate_existing=True)
+        ).scalar_one()
+        return self._to_domain(campaign_orm)
+    
+    @staticmethod
+    def _to_domain(campaign_orm: CampaignORM) -> Campaign:
+        return Campaign(
+            id=str(campaign_orm.id),
+            merchant_id=str(campaign_orm.merchant_id),
+            message=campaign_orm.message,
+            status=CampaignStatus(campaign_orm.status),
+            recipient_cursor=campaign_orm.recipient_cursor,
+            recipients_exhausted=campaign_orm.recipients_exhausted,
+            chunk_count=campaign_orm.chunk_count,
+            recipient_count=campaign_orm.recipient_count,
+            sent_count=campaign_orm.sent_count,
+            failed_count=campaign_orm.failed_count,
+            created_at=campaign_orm.created_at,
+            completed_at=campaign_orm.completed_at
+        )
@@ -0,0 +1,95 @@
+"""
+Notification Context - Infrastructure Layer - Message Template Repository
+使用 SQLAlchemy 實作 MessageTemplateRepository
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from notification.domain.models import ChannelType, MessageTemplate, NotificationType
+from notification.domain.repositories import MessageTemplateRepository
+from notification.infrastructure.orm.models import MessageTemplateORM
+from shared.tracing import trace_methods
+
+
+@trace_methods
+class SQLAlchemyMessageTemplateRepository(MessageTemplateRepository):
+    """SQLAlchemy 實作的 MessageTemplate Repository"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def find_active(
+        self,
+        merchant_id: str,
+        template_key: NotificationType,
+        channel_type: ChannelType = ChannelType.LINE
+    ) -> Optional[MessageTemplate]:
+        """查詢商家啟用中的自訂模板（走 uq_message_templates_merchant_key）"""
+        stmt = select(MessageTemplateORM).where(*self._active(merchant_id, template_key, channel_type))
+        template_orm = self.db.execute(stmt).scalar_one_or_none()
+        return self._to_domain(template_orm) if template_orm else None
+    
+    def find_active_version(
+        self,
+        merchant_id: str,
+        template_key: NotificationType,
+        channel_type: ChannelType = ChannelType.LINE
+    ) -> Optional[int]:
+        """只查詢版本欄位"""
+        stmt = select(MessageTemplateORM.version).where(*self._active(merchant_id, template_key, channel_type))
+        return self.db.execute(stmt).scalar_one_or_none()
+    
+    @staticmethod
+    def _active(merchant_id: str, template_key: NotificationType, channel_type: ChannelType) -> tuple:
+        return (
+            MessageTemplateORM.merchant_id == merchant_id,
+            MessageTemplateORM.template_key == template_key.value,
+            MessageTemplateORM.channel_type == channel_type.value,
+            MessageTemplateORM.is_active.is_(True)
+        )
+    
+    def save(self, template: MessageTemplate) -> MessageTemplate:
+        """新增或覆寫（單一 upsert；覆寫時 version 遞增）"""
+        now = datetime.now(timezone.utc)
+        stmt = insert(MessageTemplateORM).values(
+            merchant_id=template.merchant_id,
+            template_key=template.template_key.value,
+            channel_type=template.channel_type.value,
+            template=template.template,
+            subject=template.subject,
+            is_active=template.is_active,
+            version=1,
+            updated_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_message_templates_merchant_key",
+            set_={
+                "template": stmt.excluded.template,
+                "subject": stmt.excluded.subject,
+                "is_active": stmt.excluded.is_active,
+                "version": MessageTemplateORM.version + 1,
+                "updated_at": now,
+            }
+        ).returning(MessageTemplateORM).execution_options(populate_existing=True)
+        
+        template_orm = self.db.execute(stmt).scalar_one()
+        return self._to_domain(template_orm)
+    
+    @staticmethod
+    def _to_domain(template_orm: MessageTemplateORM) -> MessageTemplate:
+        return MessageTemplate(
+            id=template_orm.id,
+            merchant_id=str(template_orm.merchant_id),
+            template_key=NotificationType(template_orm.template_key),
+            channel_type=ChannelType(template_orm.channel_type),
+            template=template_orm.template,
+            subject=template_orm.subject,
+            is_active=template_orm.is_active,
+            version=template_orm.version,
+            created_at=template_orm.created_at,
+            updated_at=template_orm.updated_at
+        )
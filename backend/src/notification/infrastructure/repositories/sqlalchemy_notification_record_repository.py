@@ -0,0 +1,90 @@
+"""
+Notification Context - Infrastructure Layer - Notification Record Repository
+使用 SQLAlchemy 實作 NotificationRecordRepository
+"""
+from datetime import datetime
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from notification.domain.models import ChannelType, NotificationRecord, NotificationType
+from notification.domain.repositories import NotificationRecordRepository
+from notification.infrastructure.orm.models import NotificationRecordORM
+from shared.tracing import trace_methods
+
+
+@trace_methods
+class SQLAlchemyNotificationRecordRepository(NotificationRecordRepository):
+    """SQLAlchemy 實作的 Notification Record Repository"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def add_many(self, records: list[NotificationRecord]) -> None:
+        """以 Core insert 批次寫入（不建立 ORM 物件，SQLAlchemy 合併為多列 INSERT ... VALUES）"""
+        if not records:
+            return
+        self.db.execute(insert(NotificationRecordORM), [
+            {
+                "id": record.id,
+                "merchant_id": record.merchant_id,
+                "booking_id": record.booking_id,
+                "recipient": record.recipient,
+                "channel_type": record.channel_type.value,
+                "notification_type": record.notification_type.value,
+                "message": record.message,
+                "status": record.status,
+                "error_message": record.error_message,
+                "sent_at": record.sent_at,
+                "created_at": record.created_at,
+            }
+            for record in records
+        ])
+    
+    def find_by_booking(self, merchant_id: str, booking_id: str) -> list[NotificationRecord]:
+        rows = self.db.execute(
+            select(NotificationRecordORM)
+            .where(NotificationRecordORM.merchant_id == merchant_id, NotificationRecordORM.booking_id == booking_id)
+            .order_by(NotificationRecordORM.created_at.desc())
+        ).scalars()
+        return [self._to_domain(row) for row in rows]
+    
+    def find_by_recipient(self, merchant_id: str, recipient: str, limit: int = 50) -> list[NotificationRecord]:
+        rows = self.db.execute(
+            select(NotificationRecordORM)
+            .where(NotificationRecordORM.merchant_id == merchant_id, NotificationRecordORM.recipient == recipient)
+            .order_by(NotificationRecordORM.created_at.desc())
+            .limit(limit)
+        ).scalars()
+        return [self._to_domain(row) for row in rows]
+    
+    def delete_created_before(self, cutoff: datetime, limit: int) -> int:
+        """分批刪除（走 idx_notification_records_created），避免單一交易鎖住大量資料列"""
+        expired = (
+            select(NotificationRecordORM.id)
+            .where(NotificationRecordORM.created_at < cutoff)
+            .limit(limit)
+            .scalar_subquery()
+        )
+        result = self.db.execute(
+            delete(NotificationRecordORM)
+            .where(NotificationRecordORM.id.in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
+    @staticmethod
+    def _to_domain(row: NotificationRecordORM) -> NotificationRecord:
+        return NotificationRecord(
+            id=str(row.id),
+            merchant_id=str(row.merchant_id),
+            booking_id=str(row.booking_id) if row.booking_id else None,
+            recipient=row.recipient,
+            channel_type=ChannelType(row.channel_type),
+            notification_type=NotificationType(row.notification_type),
+            message=row.message,
+            status=row.status,
+            error_message=row.error_message,
+            sent_at=row.sent_at,
+            created_at=row.created_at
+        )
@@ -0,0 +1,126 @@
+"""
+Notification Context - Infrastructure Layer - Reminder Repository
+使用 SQLAlchemy 實作 ReminderRepository
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import exists, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from booking.domain.models import BookingStatus
+from booking.infrastructure.orm.models import BookingORM
+from merchant.infrastructure.orm.models import MerchantORM
+from notification.domain.models import DueReminder
+from notification.domain.repositories import ReminderRepository
+from notification.infrastructure.orm.models import BookingReminderORM
+from shared.tracing import trace_methods
+
+
+_ACTIVE_STATUSES = (BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value)
+
+
+@trace_methods
+class SQLAlchemyReminderRepository(ReminderRepository):
+    """SQLAlchemy 實作的 Reminder Repository"""
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def find_due(
+        self,
+        due_from: datetime,
+        due_until: datetime,
+        offsets_minutes: Iterable[int],
+        booking_ids: Optional[Iterable[str]] = None
+    ) -> list[DueReminder]:
+        """
+        查詢提醒時間落在 [due_from, due_until) 且尚未發送的提醒
+        
+        每個提醒時點一次範圍查詢（start_at 介於視窗 + offset），走 idx_bookings_active_start_at
+        """
+        reminders: list[DueReminder] = []
+        
+        for offset in offsets_minutes:
+            delta = timedelta(minutes=offset)
+            stmt = (
+                select(
+                    BookingORM.id,
+                    BookingORM.merchant_id,
+                    BookingORM.start_at,
+                    BookingORM.customer,
+                    BookingORM.items,
+                    MerchantORM.name,
+                    MerchantORM.line_channel_access_token
+                )
+                .join(MerchantORM, MerchantORM.id == BookingORM.merchant_id)
+                .where(
+                    BookingORM.start_at >= due_from + delta,
+                    BookingORM.start_at < due_until + delta,
+                    BookingORM.status.in_(_ACTIVE_STATUSES),
+                    BookingORM.created_at < BookingORM.start_at - delta,
+                    MerchantORM.status == "active",
+                    MerchantORM.line_channel_access_token.isnot(None),
+                    ~exists().where(
+                        BookingReminderORM.booking_id == BookingORM.id,
+                        BookingReminderORM.offset_minutes == offset
+                    )
+                )
+                .order_by(BookingORM.start_at)
+            )
+            if booking_ids is not None:
+                stmt = stmt.where(BookingORM.id.in_(list(booking_ids)))
+            
+            for row in self.db.execute(stmt):
+                customer = row.customer or {}
+                if not customer.get("line_user_id"):
+                    continue
+                items = row.items or []
+                reminders.append(DueReminder(
+                    booking_id=str(row.id),
+                    merchant_id=str(row.merchant_id),
+                    offset_minutes=offset,
+                    start_at=row.start_at,
+                    line_user_id=customer["line_user_id"],
+                    customer_name=customer.get("name") or "客戶",
+                    service_name=items[0].get("service_name", "服務") if items else "服務",
+                    merchant_name=row.name,
+                    channel_access_token=row.line_channel_access_token
+                ))
+        
+        return reminders
+    
+    def claim(self, reminder: DueReminder) -> bool:
+        """寫入發送紀錄（同一 INSERT 內確認預約仍有效）"""
+        stmt = insert(BookingReminderORM).from_select(
+            ["booking_id", "offset_minutes", "merchant_id", "status"],
+            select(
+                BookingORM.id,
+                literal(reminder.offset_minutes),
+                BookingORM.merchant_id,
+                literal("sending")
+            ).where(
+                BookingORM.id == reminder.booking_id,
+                BookingORM.status.in_(_ACTIVE_STATUSES)
+            )
+        ).on_conflict_do_nothing(
+            index_elements=[BookingReminderORM.booking_id, BookingReminderORM.offset_minutes]
+        ).returning(BookingReminderORM.booking_id)
+        
+        return self.db.execute(stmt).scalar_one_or_none() is not None
+    
+    def mark_result(self, reminder: DueReminder, sent: bool, error: Optional[str] = None) -> None:
+        """記錄發送結果"""
+        self.db.execute(
+            update(BookingReminderORM)
+            .where(
+                BookingReminderORM.booking_id == reminder.booking_id,
+                BookingReminderORM.offset_minutes == reminder.offset_minutes
+            )
+            .values(
+                status="sent" if sent else "failed",
+                error_message=error,
+                sent_at=func.now() if sent else None
+            )
+        )
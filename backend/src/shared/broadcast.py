@@ -0,0 +1,259 @@
+"""
+Shared Kernel - Broadcast
+行程內主題推播（fan-out）與跨 worker 的 PostgreSQL LISTEN/NOTIFY 橋接
+
+- Broadcaster：主題 → 訂閱者佇列；publish 可由任何執行緒呼叫
+  - 連線上限：每個 worker 總數與每個主題各自限制，超過時 TooManySubscribersError
+  - 慢速訂閱者（佇列滿）直接關閉，由客戶端重連並重新查詢，不拖慢其他訂閱者
+- PostgresNotifyBridge：publish 放入佇列後立即返回，由背景執行緒以 NOTIFY 送出；每個 worker 的
+  LISTEN 執行緒收到後再交給本地 Broadcaster，所有 worker 的訂閱者都會收到
+"""
+from collections import defaultdict
+from typing import Optional
+import asyncio
+import json
+import logging
+import queue
+import select
+import threading
+
+from .exceptions import TooManySubscribersError
+from .metrics import BROADCAST_SUBSCRIBERS, BROADCAST_SUBSCRIBERS_DROPPED
+
+logger = logging.getLogger(__name__)
+
+
+# 訂閱被關閉（佇列滿或服務關閉）的標記
+CLOSED = object()
+
+
+class Subscription:
+    """單一訂閱者（綁定於建立時的事件迴圈）"""
+    
+    def __init__(self, broadcaster: "Broadcaster", topic: str, queue_size: int):
+        self.broadcaster = broadcaster
+        self.topic = topic
+        self.closed = False
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    
+    async def get(self, timeout: Optional[float] = None):
+        """
+        等待下一則訊息
+        
+        Returns:
+            訊息字串；逾時回傳 None；訂閱已關閉回傳 CLOSED
+        """
+        if self.closed and self._queue.empty():
+            return CLOSED
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+    
+    def _deliver(self, message: str):
+        """於訂閱者的事件迴圈中執行"""
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.info(f"Dropping slow subscriber on {self.topic}")
+            BROADCAST_SUBSCRIBERS_DROPPED.inc()
+            self.broadcaster.unsubscribe(self)
+            self._wake_closed()
+    
+    def _wake_closed(self):
+        """放入關閉標記（於訂閱者的事件迴圈中執行；客戶端將 resync，未送出的訊息直接丟棄）"""
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(CLOSED)
+
+
+class Broadcaster:
+    """行程內主題推播"""
+    
+    def __init__(self, max_subscribers: int = 1000, max_per_topic: int = 200, queue_size: int = 32):
+        self.max_subscribers = max_subscribers
+        self.max_per_topic = max_per_topic
+        self.queue_size = queue_size
+        self._topics: dict[str, set[Subscription]] = defaultdict(set)
+        self._count = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def subscriber_count(self) -> int:
+        return self._count
+    
+    def subscribe(self, topic: str) -> Subscription:
+        """訂閱主題（須於事件迴圈中呼叫）"""
+        with self._lock:
+            if self._count >= self.max_subscribers or len(self._topics[topic]) >= self.max_per_topic:
+                if not self._topics[topic]:
+                    del self._topics[topic]
+                raise TooManySubscribersError(topic)
+            subscription = Subscription(self, topic, self.queue_size)
+            self._topics[topic].add(subscription)
+            self._count += 1
+        BROADCAST_SUBSCRIBERS.inc()
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription.closed:
+                return
+            subscription.closed = True
+            subscribers = self._topics.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[subscription.topic]
+            self._count -= 1
+        BROADCAST_SUBSCRIBERS.dec()
+    
+    def publish(self, topic: str, message: str) -> int:
+        """
+        推播至本 worker 的訂閱者（任何執行緒皆可呼叫）
+        
+        Returns:
+            訂閱者數
+        """
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._deliver, message)
+            except RuntimeError:
+                # 事件迴圈已關閉
+                self.unsubscribe(subscription)
+        return len(subscribers)
+    
+    def close_all(self):
+        """關閉所有訂閱（服務關閉時）"""
+        with self._lock:
+            subscribers = [s for topic in self._topics.values() for s in topic]
+        for subscription in subscribers:
+            self.unsubscribe(subscription)
+            try:
+                subscription._loop.call_soon_threadsafe(subscription._wake_closed)
+            except RuntimeError:
+                pass
+
+
+class PostgresNotifyBridge:
+    """
+    以 PostgreSQL LISTEN/NOTIFY 轉送推播至所有 worker
+    
+    - publish()：放入有界佇列後立即返回（不阻塞事件迴圈）；背景執行緒以專用的 autocommit 連線
+      執行 pg_notify（payload 上限約 8KB）。呼叫端須於交易提交後才發布（BookingService.publish_pending_events），
+      因此其他 worker 不會收到未提交或已回滾的異動
+    - start()：背景執行緒 LISTEN，收到通知後交給本地 Broadcaster；斷線時自動重連
+    """
+    
+    def __init__(
+        self,
+        dsn: str,
+        channel: str,
+        broadcaster: Broadcaster,
+        reconnect_seconds: float = 2.0,
+        max_pending: int = 10_000
+    ):
+        self.dsn = dsn
+        self.channel = channel
+        self.broadcaster = broadcaster
+        self.reconnect_seconds = reconnect_seconds
+        self._publish_conn = None
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._sender: Optional[threading.Thread] = None
+    
+    def _connect(self):
+        import psycopg2
+        
+        conn = psycopg2.connect(self.dsn)
+        conn.autocommit = True
+        return conn
+    
+    def publish(self, topic: str, message: str):
+        """放入傳送佇列（任何執行緒皆可呼叫，不等待資料庫）；佇列滿時只推播給本 worker"""
+        try:
+            self._pending.put_nowait((topic, message))
+        except queue.Full:
+            logger.warning(f"NOTIFY queue full, delivering locally only: {topic}")
+            self.broadcaster.publish(topic, message)
+    
+    def _send(self, topic: str, message: str):
+        payload = json.dumps({"topic": topic, "message": message}, ensure_ascii=False)
+        for attempt in range(2):
+            try:
+                if self._publish_conn is None or self._publish_conn.closed:
+                    self._publish_conn = self._connect()
+                with self._publish_conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+                return
+            except Exception as e:
+                self._publish_conn = None
+                if attempt == 1:
+                    # NOTIFY 失敗時至少推播給本 worker 的訂閱者
+                    logger.warning(f"NOTIFY failed, delivering locally only: {e}")
+                    self.broadcaster.publish(topic, message)
+    
+    def _run_sender(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            self._send(*item)
+        if self._publish_conn is not None:
+            self._publish_conn.close()
+    
+    def start(self) -> "PostgresNotifyBridge":
+        self._sender = threading.Thread(target=self._run_sender, name="broadcast-notify", daemon=True)
+        self._sender.start()
+        self._thread = threading.Thread(target=self._run, name="broadcast-listen", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """停止 LISTEN；已排入佇列的訊息送出後才結束傳送執行緒"""
+        self._stop_event.set()
+        if self._sender is not None:
+            self._pending.put(None)
+            self._sender.join(timeout=self.reconnect_seconds + 1)
+        if self._thread is not None:
+            self._thread.join(timeout=self.reconnect_seconds + 1)
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+            except Exception as e:
+                logger.warning(f"LISTEN {self.channel} failed, reconnecting: {e}")
+                self._stop_event.wait(self.reconnect_seconds)
+    
+    def _listen(self):
+        conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            logger.info(f"Listening on {self.channel}")
+            while not self._stop_event.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self.dispatch(conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
+    
+    def dispatch(self, payload: str):
+        """將收到的通知交給本地 Broadcaster"""
+        try:
+            data = json.loads(payload)
+            self.broadcaster.publish(data["topic"], data["message"])
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Invalid broadcast payload on {self.channel}: {e}")
@@ -30,6 +30,21 @@ class Settings(BaseSettings):
     database_pool_size: int = 20
     database_max_overflow: int = 0
     database_echo: bool = False
+    # 連線池模式：queue（直連 PostgreSQL）/ pgbouncer（transaction pooling）/ null
+    database_pool_mode: str = Field(default="queue", pattern="^(queue|pgbouncer|null)$")
+    database_pool_timeout_seconds: float = 30.0
+    database_pool_recycle_seconds: int = 300  # pgbouncer 模式：連線最長使用時間
+    database_liveness_interval_seconds: float = 10.0  # pgbouncer 模式：背景存活檢查間隔
+    
+    # Read Replica（唯讀端點路由；未設定時一律使用主庫）
+    database_replica_url: Optional[PostgresDsn] = None
+    replica_retry_after_seconds: float = 30.0  # 唯讀庫連線失敗後改走主庫的時間
+    read_your_writes_seconds: float = 10.0  # 客戶寫入後，唯讀請求改走主庫的時間
+    
+    # Query Statistics（每請求查詢統計 / N+1 偵測 / 慢查詢）
+    query_stats_enabled: bool = True
+    slow_query_threshold_ms: float = 200.0
+    n_plus_one_threshold: int = 5  # 同一語句於單一請求內重複次數達此值即警告
     
     # Redis
     redis_url: RedisDsn = Field(default="redis://localhost:6379/0")
@@ -45,10 +60,41 @@ class Settings(BaseSettings):
     # LINE Integration
     line_channel_secret: Optional[str] = None
     line_channel_access_token: Optional[str] = None
+    # webhook 驗證後放入有界佇列立即回應，由背景 worker 依商家分批處理
+    line_webhook_workers: int = 4
+    line_webhook_max_pending: int = 10_000  # 佇列滿時回應 503
+    line_webhook_batch_size: int = 100
+    line_channel_secret_cache_ttl_seconds: float = 300.0
+    line_channel_secret_refresh_interval_seconds: float = 10.0  # 簽章不符時每個商家重新載入 secret 的最短間隔
+    line_api_base_url: str = "https://api.line.me"
+    line_api_timeout_seconds: float = 10.0
+    # 推播活動（multicast 每次至多 500 位收件者；各商家 channel 的呼叫速率以令牌桶限制）
+    line_campaign_chunk_size: int = Field(default=500, ge=1, le=500)
+    line_campaign_concurrency: int = 4
+    line_campaign_rate_per_second: float = 20.0
+    line_campaign_burst: int = 20
+    line_campaign_max_attempts: int = 5
+    line_campaign_lease_seconds: float = 300.0  # 執行中活動的心跳逾時後可由續傳接手
+    # 已編譯訊息模板快取（商家修改模板後其他 worker 最遲於 TTL 後使用新版本）
+    message_template_cache_ttl_seconds: float = 60.0
+    message_template_cache_max_entries: int = 10_000
+    # 通知記錄：發送端放入佇列，背景分批寫入；超過保留天數的記錄定期刪除
+    notification_record_batch_size: int = 500
+    notification_record_flush_seconds: float = 1.0
+    notification_record_max_pending: int = 10_000  # 佇列滿時捨棄記錄（不影響發送）
+    notification_record_retention_days: int = 90
+    notification_record_prune_interval_seconds: float = 3600.0  # 0 = 不清除
     
     # Stripe Integration
     stripe_api_key: Optional[str] = None
     stripe_webhook_secret: Optional[str] = None
+    stripe_webhook_tolerance_seconds: int = 300  # Stripe-Signature 時間戳容許誤差（防重放）
+    # webhook 事件先寫入 stripe_events 後立即回應，由背景處理器依訂閱分組、依序套用
+    stripe_event_poll_interval_seconds: float = 5.0  # 0 = 不啟動背景處理器
+    stripe_event_batch_size: int = 100
+    stripe_event_max_attempts: int = 5  # 超過後標記 failed，不再重試
+    stripe_event_retry_base_seconds: float = 30.0  # 失敗重試的指數退避基數（30s、60s、120s...）
+    stripe_event_retry_max_seconds: float = 3600.0  # 退避上限
     
     # AWS S3
     aws_access_key_id: Optional[str] = None
@@ -71,13 +117,77 @@ class Settings(BaseSettings):
     # Timezone
     default_timezone: str = "Asia/Taipei"
     
-    # Rate Limiting
+    # Rate Limiting（令牌桶：每分鐘補充 per_minute 個，最多累積 burst 個）
     rate_limit_enabled: bool = True
-    rate_limit_per_minute: int = 60
+    rate_limit_per_minute: int = 60  # 每個 IP
+    rate_limit_burst: int = 60
+    rate_limit_user_per_minute: int = 60  # 每個登入用戶（JWT sub）
+    rate_limit_merchant_per_minute: int = 1200  # 每個商家（slug / merchant_id），所有客戶合計
+    rate_limit_merchant_burst: int = 200
+    rate_limit_backend: str = Field(default="memory", pattern="^(memory|redis)$")  # redis 使用 REDIS_URL
+    rate_limit_trust_forwarded_for: bool = False  # 位於反向代理後方時以 X-Forwarded-For 取得客戶 IP
+    
+    # 可訂時段查詢快取（0 = 只合併並行查詢，不快取結果）
+    slot_cache_ttl_seconds: float = 5.0
+    slot_cache_max_entries: int = 10_000
+    
+    # 訂閱狀態快取（預約路徑的訂閱驗證；最遲於 current_period_end 失效）與方案目錄
+    billing_status_cache_ttl_seconds: float = 60.0
+    plan_catalog_ttl_seconds: float = 300.0
+    
+    # 訂閱到期排程（免費方案自動續訂、付費方案逾寬限期未續費標記逾期）
+    subscription_scheduler_interval_seconds: float = 300.0  # 0 = 不啟動（改由 scripts/expire_subscriptions.py 排程）
+    subscription_scheduler_batch_size: int = 500
+    subscription_grace_period_hours: float = 24.0  # 週期 / 試用結束後等待續費事件的時間
+    
+    # 預約提醒（由 bookings 推算，載入視窗內的提醒至記憶體時間輪；多個 replica 以發送紀錄去重）
+    booking_reminders_enabled: bool = True
+    booking_reminder_offsets_minutes: list[int] = [1440, 120]  # 預約開始前幾分鐘提醒
+    booking_reminder_window_minutes: int = 60  # 每次載入的提醒時間範圍
+    booking_reminder_reload_seconds: float = 300.0  # 須小於載入視窗
+    booking_reminder_catchup_minutes: int = 30  # 重啟後補發多久以內錯過的提醒
+    booking_reminder_workers: int = 4
+    booking_reminder_merchant_rate_per_second: float = 10.0  # 每個商家（LINE channel）的發送速率
+    booking_reminder_merchant_burst: int = 50
+    
+    # 時段暫留（選定時段後保留給該客戶填寫表單）
+    slot_hold_ttl_seconds: int = Field(default=300, ge=30, le=1800)
+    slot_hold_sweep_interval_seconds: float = 30.0
+    
+    # 可訂狀態推播（SSE）
+    sse_max_connections: int = 1000  # 每個 worker
+    sse_max_connections_per_topic: int = 200  # 每個（商家, 員工, 日期）
+    sse_heartbeat_seconds: float = 15.0
+    availability_notify_enabled: bool = False  # 經 PostgreSQL LISTEN/NOTIFY 推播至所有 worker
+    availability_notify_channel: str = "availability"
+    # LISTEN 需要 session 層級連線：經 PgBouncer（transaction pooling）時需指定直連 PostgreSQL 的 DSN
+    availability_notify_dsn: Optional[PostgresDsn] = None
+    
+    # Admission Control（連線池借出等待過久時，以 503 拒絕公開查詢）
+    admission_control_enabled: bool = True
+    admission_shed_wait_ms: float = 100.0
+    admission_retry_after_seconds: int = 2
     
     # Observability
     sentry_dsn: Optional[str] = None
     log_level: str = "INFO"
+    
+    # Metrics（/metrics 端點）
+    metrics_enabled: bool = True
+    metrics_multiproc_dir: Optional[str] = None  # 多 worker 時的快照共用目錄
+    metrics_publish_interval_seconds: float = 5.0
+    
+    # Profiling（管理員按需剖析單一請求）
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0  # 0~1，隨機抽樣比例（不需管理員標頭）
+    profiling_interval_ms: float = 5.0  # CPU 取樣間隔
+    profiling_dir: str = "/tmp/nail-booking-profiles"
+    profiling_max_profiles: int = 50  # 僅保留最近 N 份
+    
+    # Tracing（行程內 span，輸出 OTLP/JSON 檔）
+    tracing_enabled: bool = False
+    tracing_export_path: str = "/tmp/nail-booking-spans.jsonl"
+    tracing_service_name: str = "nail-booking-api"
 
 
 # 全局設定實例
@@ -1,51 +1,370 @@
 """
 Shared Kernel - Database Connection
 SQLAlchemy Engine 與 Session 管理
+
+- 連線池模式（DATABASE_POOL_MODE）：queue（直連）/ pgbouncer / null，見 _pool_options
+- 引擎於應用啟動時（或第一次開啟 Session 時）才建立，匯入本模組不載入資料庫驅動
+- 連線不帶 session 狀態（不執行 SET ...），可搭配 PgBouncer transaction pooling
+- get_db：讀寫 Session（主庫），請求結束時 commit
+- get_read_db：唯讀 Session，路由至唯讀庫（未設定或無法連線時改走主庫），
+  以 READ ONLY 交易執行且不 commit；客戶剛寫入後短時間內改走主庫（read-your-writes）
 """
-from typing import Generator
-from sqlalchemy import create_engine, event
+from typing import Callable, Generator, Optional
+import logging
+import threading
+import time
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from sqlalchemy.pool import NullPool, QueuePool
 
 from .config import settings
+from .query_stats import install_query_hooks
+from .metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_LIVENESS_FAILURES,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_POOL_WAIT
+)
+from .rate_limit import pool_wait_tracker
+from .timezone import get_default_timezone
+
+logger = logging.getLogger(__name__)
 
 
 # SQLAlchemy Base for ORM models
 Base = declarative_base()
 
 
+class InstrumentedQueuePool(QueuePool):
+    """記錄取得連線等待時間的 QueuePool（指標與准入控制）"""
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            DB_POOL_WAIT.observe(waited)
+            pool_wait_tracker.observe(waited)
+
+
+def register_pool_metrics(pool) -> None:
+    """註冊連線池狀態 gauge（於 /metrics 輸出時取值）"""
+    if not isinstance(pool, QueuePool):
+        return
+    DB_POOL_SIZE.set_function(pool.size)
+    DB_POOL_CHECKED_OUT.set_function(pool.checkedout)
+    DB_POOL_OVERFLOW.set_function(lambda: max(pool.overflow(), 0))
+
+
+_TIMESTAMPTZ_OID = 1184
+_timestamptz_type = None
+
+
+def _timestamptz_local_type():
+    """psycopg2 timestamptz 型別轉換：解析後轉為預設時區（首次使用時建立）"""
+    global _timestamptz_type
+    if _timestamptz_type is None:
+        import psycopg2.extensions
+        
+        local_tz = get_default_timezone()
+        
+        def cast(value, cursor):
+            parsed = psycopg2.extensions.PYDATETIMETZ(value, cursor)
+            if parsed is None or parsed.tzinfo is None:
+                return parsed
+            return parsed.astimezone(local_tz)
+        
+        _timestamptz_type = psycopg2.extensions.new_type(
+            (_TIMESTAMPTZ_OID,), "TIMESTAMPTZ_LOCAL", cast
+        )
+    return _timestamptz_type
+
+
+def _localize_timestamptz_results(dbapi_conn, connection_record):
+    """
+    timestamptz 查詢結果轉為預設時區（僅在 client 端註冊型別轉換）
+    
+    取代 connect 時的 SET TIME ZONE：連線不帶 session 狀態，
+    PgBouncer transaction pooling 下不會把時區設定漏到其他 client 的連線
+    """
+    import psycopg2.extensions
+    
+    psycopg2.extensions.register_type(_timestamptz_local_type(), dbapi_conn)
+
+
+# 連線池模式
+POOL_MODE_QUEUE = "queue"  # 直連 PostgreSQL：QueuePool + 每次借出前 pre-ping
+POOL_MODE_PGBOUNCER = "pgbouncer"  # 經 PgBouncer（transaction pooling）：小池、LIFO、背景存活檢查
+POOL_MODE_NULL = "null"  # 不在 client 端保留連線（完全交給 PgBouncer）
+
+
+def _pool_options(pool_mode: str) -> dict:
+    """各連線池模式的 create_engine 參數"""
+    if pool_mode == POOL_MODE_NULL:
+        return {"poolclass": NullPool}
+    
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout_seconds,
+    }
+    if pool_mode == POOL_MODE_PGBOUNCER:
+        # 不做 pre-ping（省去每次借出的來回），改由 PoolLivenessChecker 背景檢查；
+        # LIFO 讓閒置連線自然被 PgBouncer / 伺服器端回收
+        options.update(
+            pool_pre_ping=False,
+            pool_use_lifo=True,
+            pool_recycle=settings.database_pool_recycle_seconds,
+        )
+    else:
+        options["pool_pre_ping"] = True  # 驗證連線有效性
+    return options
+
+
 # Database Engine
-def create_db_engine():
-    """建立資料庫引擎"""
+def create_db_engine(
+    database_url: Optional[str] = None,
+    register_metrics: bool = True,
+    pool_mode: Optional[str] = None
+):
+    """
+    建立資料庫引擎
+    
+    Args:
+        database_url: 連線字串（預設為主庫 settings.database_url）
+        register_metrics: 是否註冊連線池 gauge（僅主庫）
+        pool_mode: 連線池模式（預設為 settings.database_pool_mode；debug 時為 null）
+    """
+    if pool_mode is None:
+        pool_mode = POOL_MODE_NULL if settings.debug else settings.database_pool_mode
+    
     engine = create_engine(
-        str(settings.database_url),
-        poolclass=QueuePool if not settings.debug else NullPool,
-        pool_size=settings.database_pool_size,
-        max_overflow=settings.database_max_overflow,
+        str(database_url or settings.database_url),
         echo=settings.database_echo,
-        pool_pre_ping=True,  # 驗證連線有效性
+        **_pool_options(pool_mode)
     )
     
-    # 設定 PostgreSQL 時區
-    @event.listens_for(engine, "connect")
-    def set_timezone(dbapi_conn, connection_record):
-        cursor = dbapi_conn.cursor()
-        cursor.execute(f"SET TIME ZONE '{settings.default_timezone}'")
-        cursor.close()
+    # 時區：於 client 端轉換 timestamptz 結果，不使用 SET TIME ZONE
+    if engine.dialect.driver == "psycopg2":
+        event.listen(engine, "connect", _localize_timestamptz_results)
+    
+    # 連線池指標
+    if settings.metrics_enabled and register_metrics:
+        register_pool_metrics(engine.pool)
+    
+    # 每請求查詢統計與慢查詢記錄
+    if settings.query_stats_enabled:
+        install_query_hooks(engine, slow_threshold_ms=settings.slow_query_threshold_ms)
     
     return engine
 
 
-# Create engine instance
-engine = create_db_engine()
+class PoolLivenessChecker:
+    """
+    背景連線存活檢查（取代每次借出的 pre-ping）
+    
+    定期借出一條連線執行 SELECT 1；遇到斷線錯誤時 SQLAlchemy 會將整個池標記失效，
+    此前建立的連線都會在下次借出時重建，請求不必自己撞上斷線
+    """
+    
+    def __init__(self, engine, interval_seconds: float = 10.0):
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def check(self) -> bool:
+        """執行一次檢查，回傳連線是否正常"""
+        try:
+            with self.engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            return True
+        except DBAPIError as e:
+            DB_POOL_LIVENESS_FAILURES.inc()
+            if e.connection_invalidated:
+                logger.warning(f"Database connection lost, pool invalidated: {e}")
+            else:
+                logger.warning(f"Database liveness check failed: {e}")
+            return False
+    
+    def start(self) -> "PoolLivenessChecker":
+        self._thread = threading.Thread(target=self._run, name="db-pool-liveness", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+    
+    def _run(self):
+        while not self._stop_event.wait(self.interval_seconds):
+            self.check()
+
+
+_engine_lock = threading.Lock()
+_engine = None
+_replica_engine = None
+
+
+def get_engine():
+    """主庫引擎（第一次呼叫時建立）"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_db_engine()
+    return _engine
+
+
+def get_replica_engine():
+    """唯讀庫引擎（未設定時為 None；第一次呼叫時建立）"""
+    global _replica_engine
+    if _replica_engine is None and settings.database_replica_url:
+        with _engine_lock:
+            if _replica_engine is None:
+                _replica_engine = create_db_engine(str(settings.database_replica_url), register_metrics=False)
+    return _replica_engine
+
+
+def __getattr__(name: str):
+    # 相容 `from shared.database import engine`（匯入時才建立引擎）
+    if name == "engine":
+        return get_engine()
+    if name == "replica_engine":
+        return get_replica_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LazySessionFactory:
+    """
+    第一次開啟 Session 時才綁定引擎的 sessionmaker
+    
+    用法與 sessionmaker 相同：SessionLocal() / with SessionLocal() as session
+    """
+    
+    def __init__(self, engine_getter: Callable[[], object], **kwargs):
+        self._engine_getter = engine_getter
+        self._maker = sessionmaker(**kwargs)
+        self._bound = False
+    
+    def __call__(self, **kwargs) -> Session:
+        if not self._bound:
+            self._maker.configure(bind=self._engine_getter())
+            self._bound = True
+        return self._maker(**kwargs)
 
 
 # Session Factory
-SessionLocal = sessionmaker(
+SessionLocal = LazySessionFactory(
+    get_engine,
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+ReadSessionLocal = LazySessionFactory(
+    get_replica_engine,
     autocommit=False,
     autoflush=False,
-    bind=engine,
     expire_on_commit=False
+) if settings.database_replica_url else None
+
+
+# read-your-writes：寫入端點回應此標頭（值為「此時間前改走主庫」的 epoch 秒），前端於到期前在請求中帶回
+# （LIFF 前端與 API 不同源且 fetch 不帶 cookie，故不用 cookie；CORS 需 expose 此標頭）
+READ_YOUR_WRITES_HEADER = "X-DB-Primary-Until"
+
+
+class ReadSessionRouter:
+    """
+    唯讀 Session 路由
+    
+    - 預設使用唯讀庫；未設定唯讀庫、客戶剛寫入、或唯讀庫近期連線失敗時改走主庫
+    - Session 以 READ ONLY 交易開始（PostgreSQL），結束時 rollback，不 commit
+    - read-your-writes 由客戶端帶回 X-DB-Primary-Until 標頭，不需跨 worker 共享狀態；
+      標頭被竄改最多只會讓請求多走主庫，不影響正確性
+    """
+    
+    def __init__(
+        self,
+        primary_factory: Callable[[], Session],
+        replica_factory: Optional[Callable[[], Session]],
+        read_your_writes_seconds: float = 10.0,
+        replica_retry_after_seconds: float = 30.0
+    ):
+        self.primary_factory = primary_factory
+        self.replica_factory = replica_factory
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.replica_retry_after_seconds = replica_retry_after_seconds
+        self._replica_down_until = 0.0
+    
+    def remember_write(self, response: Response) -> None:
+        """標記此客戶剛寫入（之後短時間內的唯讀請求改走主庫）"""
+        if self.read_your_writes_seconds <= 0:
+            return
+        response.headers[READ_YOUR_WRITES_HEADER] = str(int(time.time() + self.read_your_writes_seconds) + 1)
+    
+    def _recently_wrote(self, request: Optional[Request]) -> bool:
+        if request is None:
+            return False
+        try:
+            primary_until = float(request.headers.get(READ_YOUR_WRITES_HEADER, 0))
+        except ValueError:
+            return False
+        return time.time() < primary_until
+    
+    def _use_replica(self, request: Optional[Request]) -> bool:
+        return (
+            self.replica_factory is not None
+            and time.time() >= self._replica_down_until
+            and not self._recently_wrote(request)
+        )
+    
+    def open(self, request: Optional[Request] = None) -> Session:
+        """開啟唯讀 Session（已進入 READ ONLY 交易）"""
+        if self._use_replica(request):
+            db = self.replica_factory()
+            try:
+                _begin_read_only(db)
+                db.info["read_target"] = "replica"
+                return db
+            except DBAPIError as e:
+                db.close()
+                self._replica_down_until = time.time() + self.replica_retry_after_seconds
+                logger.warning(
+                    f"Read replica unavailable, falling back to primary "
+                    f"for {self.replica_retry_after_seconds:.0f}s: {e}"
+                )
+        
+        db = self.primary_factory()
+        try:
+            _begin_read_only(db)
+        except Exception:
+            db.close()
+            raise
+        db.info["read_target"] = "primary"
+        return db
+
+
+def _begin_read_only(db: Session) -> None:
+    """以唯讀交易開始（必須是交易中的第一個語句）"""
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SET TRANSACTION READ ONLY"))
+    else:
+        db.connection()
+
+
+read_session_router = ReadSessionRouter(
+    SessionLocal,
+    ReadSessionLocal,
+    read_your_writes_seconds=settings.read_your_writes_seconds,
+    replica_retry_after_seconds=settings.replica_retry_after_seconds
 )
 
 
@@ -69,12 +388,47 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """
+    FastAPI Dependency - 取得唯讀 Session
+    
+    用於純查詢端點（/public/*、預約查詢）；不 commit，請求結束時 rollback
+    
+    用法：
+        @router.get("/merchants/{slug}/slots")
+        def get_slots(db: Session = Depends(get_read_db)):
+            ...
+    """
+    db = read_session_router.open(request)
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.close()
+
+
+def remember_write(response: Response) -> None:
+    """寫入端點成功後呼叫，讓此客戶接下來的唯讀請求讀得到自己的寫入"""
+    read_session_router.remember_write(response)
+
+
+def start_pool_liveness_checker() -> Optional[PoolLivenessChecker]:
+    """pgbouncer 模式：啟動主庫（與唯讀庫）的背景存活檢查"""
+    if settings.debug or settings.database_pool_mode != POOL_MODE_PGBOUNCER:
+        return None
+    
+    checker = PoolLivenessChecker(get_engine(), settings.database_liveness_interval_seconds).start()
+    if get_replica_engine() is not None:
+        PoolLivenessChecker(get_replica_engine(), settings.database_liveness_interval_seconds).start()
+    return checker
+
+
 def create_all_tables():
     """建立所有資料表（僅用於開發環境）"""
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
 
 
 def drop_all_tables():
     """刪除所有資料表（僅用於測試環境）"""
-    Base.metadata.drop_all(bind=engine)
+    Base.metadata.drop_all(bind=get_engine())
 
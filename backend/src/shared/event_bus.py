@@ -7,6 +7,9 @@ from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 import logging
+import time
+
+from .metrics import EVENT_HANDLER_DURATION
 
 logger = logging.getLogger(__name__)
 
@@ -53,20 +56,47 @@ class EventBus:
             event = BookingConfirmedEvent(...)
             event_bus.publish(event)
         """
+        logger.info(f"Publishing event: {event.event_type} (aggregate_id={event.aggregate_id})")
+        self._dispatch(event)
+    
+    def publish_all(self, events: list[DomainEvent]):
+        """
+        依序發布多個事件（批次作業使用；只記錄一行日誌）
+        
+        用法：
+            event_bus.publish_all([SubscriptionStatusChangedEvent.create(...), ...])
+        """
+        if not events:
+            return
+        
+        logger.info(f"Publishing {len(events)} events: {sorted({event.event_type for event in events})}")
+        for event in events:
+            self._dispatch(event)
+    
+    def _dispatch(self, event: DomainEvent):
         event_type = event.event_type
         handlers = self._handlers.get(event_type, [])
         
-        logger.info(f"Publishing event: {event_type} (aggregate_id={event.aggregate_id})")
-        
         for handler in handlers:
+            handler_name = getattr(handler, "__name__", type(handler).__name__)
+            started = time.perf_counter()
+            outcome = "success"
             try:
                 handler(event)
             except Exception as e:
+                outcome = "error"
                 logger.error(
-                    f"Event handler failed: {handler.__name__} for {event_type}",
+                    f"Event handler failed: {handler_name} for {event_type}",
                     exc_info=e
                 )
                 # 不中斷其他 handler
+            finally:
+                EVENT_HANDLER_DURATION.observe(
+                    time.perf_counter() - started,
+                    event_type=event_type,
+                    handler=handler_name,
+                    outcome=outcome
+                )
     
     def clear_handlers(self):
         """清除所有 handler（用於測試）"""
@@ -132,3 +132,12 @@ class PermissionDeniedError(ApplicationException):
             error_code="permission_denied"
         )
 
+
+
+# === 基礎設施異常 ===
+
+class TooManySubscribersError(InfrastructureException):
+    """推播訂閱數已達上限"""
+    def __init__(self, topic: str):
+        self.topic = topic
+        super().__init__(f"推播連線數已達上限: {topic}")
@@ -0,0 +1,509 @@
+"""
+Shared Kernel - Metrics
+輕量級行程內指標收集（Prometheus 文字格式輸出）
+
+設計：
+- Counter / Gauge / Histogram 皆以 threading.Lock 保護，熱路徑只做 dict 查找與加法
+- Gauge 可註冊回呼，於輸出時才取值（例如連線池狀態）
+- 多 worker：各 worker 定期將快照寫入共用目錄（metrics_multiproc_dir），
+  /metrics 輸出時合併所有 worker 的快照（同名同標籤相加）
+"""
+from typing import Callable, Iterable, Optional
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# 預設延遲分桶（秒）
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Metric:
+    """指標基礎類別"""
+    
+    type_name = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: dict) -> tuple:
+        if len(labels) != len(self.labelnames) or not all(name in labels for name in self.labelnames):
+            raise ValueError(f"{self.name} 需要標籤 {self.labelnames}，收到 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def samples(self) -> list:
+        """回傳可 JSON 序列化的樣本列表"""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """單調遞增計數器"""
+    
+    type_name = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+    
+    def samples(self) -> list:
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+
+class Gauge(_Metric):
+    """可增減的量測值；亦可註冊回呼於輸出時取值"""
+    
+    type_name = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+        self._callbacks: dict[tuple, Callable[[], float]] = {}
+    
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+    
+    def set_function(self, callback: Callable[[], float], **labels):
+        """註冊回呼（輸出時呼叫）"""
+        key = self._key(labels)
+        with self._lock:
+            self._callbacks[key] = callback
+    
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._callbacks:
+            return self._callbacks[key]()
+        return self._values.get(key, 0.0)
+    
+    def samples(self) -> list:
+        with self._lock:
+            values = dict(self._values)
+            callbacks = dict(self._callbacks)
+        for key, callback in callbacks.items():
+            try:
+                values[key] = float(callback())
+            except Exception as e:
+                logger.warning(f"Gauge callback failed: {self.name}: {e}")
+        return [[list(key), value] for key, value in values.items()]
+
+
+class Histogram(_Metric):
+    """分桶統計（累積分桶於輸出時計算）"""
+    
+    type_name = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key → [各分桶計數..., +Inf 計數, sum]
+        self._values: dict[tuple, list[float]] = {}
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                index = i
+                break
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            state[index] += 1
+            state[-1] += value
+    
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return int(sum(state[:-1])) if state else 0
+    
+    def samples(self) -> list:
+        with self._lock:
+            return [[list(key), list(state)] for key, state in self._values.items()]
+
+
+class MetricsRegistry:
+    """
+    指標註冊表
+    
+    用法：
+        requests = metrics.counter("app_requests_total", "請求數", ["route"])
+        requests.inc(route="/health")
+        text = metrics.render()
+    """
+    
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"指標名稱重複且型別不同: {metric.name}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+    
+    # === 快照（多 worker 合併用）===
+    
+    def snapshot(self) -> dict:
+        """目前所有指標的可序列化快照"""
+        snapshot = {}
+        for metric in list(self._metrics.values()):
+            entry = {
+                "type": metric.type_name,
+                "help": metric.documentation,
+                "labelnames": list(metric.labelnames),
+                "samples": metric.samples(),
+            }
+            if isinstance(metric, Histogram):
+                entry["buckets"] = list(metric.buckets)
+            snapshot[metric.name] = entry
+        return snapshot
+    
+    def render(self, other_snapshots: Iterable[dict] = ()) -> str:
+        """輸出 Prometheus 文字格式（合併其他 worker 的快照）"""
+        merged = _merge_snapshots([self.snapshot(), *other_snapshots])
+        lines: list[str] = []
+        for name in sorted(merged):
+            entry = merged[name]
+            lines.append(f"# HELP {name} {entry['help']}")
+            lines.append(f"# TYPE {name} {entry['type']}")
+            labelnames = entry["labelnames"]
+            for key, value in sorted(entry["samples"].items()):
+                labels = dict(zip(labelnames, key))
+                if entry["type"] == "histogram":
+                    lines.extend(_render_histogram(name, labels, entry["buckets"], value))
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    """同名同標籤的樣本相加（counter / gauge / histogram 皆適用）"""
+    merged: dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, entry in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                target = {
+                    "type": entry["type"],
+                    "help": entry["help"],
+                    "labelnames": entry["labelnames"],
+                    "buckets": entry.get("buckets"),
+                    "samples": {},
+                }
+                merged[name] = target
+            elif target["type"] != entry["type"] or target.get("buckets") != entry.get("buckets"):
+                continue
+            samples = target["samples"]
+            for key, value in entry["samples"]:
+                key = tuple(key)
+                if entry["type"] == "histogram":
+                    current = samples.get(key)
+                    samples[key] = value if current is None else [a + b for a, b in zip(current, value)]
+                else:
+                    samples[key] = samples.get(key, 0.0) + value
+    return merged
+
+
+def _render_histogram(name: str, labels: dict, buckets: list[float], state: list[float]) -> list[str]:
+    lines = []
+    cumulative = 0.0
+    for upper, count in zip(buckets, state):
+        cumulative += count
+        bucket_labels = {**labels, "le": _format_value(upper)}
+        lines.append(f"{name}_bucket{_format_labels(bucket_labels)} {_format_value(cumulative)}")
+    cumulative += state[len(buckets)]
+    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {_format_value(cumulative)}")
+    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(state[-1])}")
+    lines.append(f"{name}_count{_format_labels(labels)} {_format_value(cumulative)}")
+    return lines
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# === 多 worker 快照 ===
+
+def publish_snapshot(registry: MetricsRegistry, directory: str) -> None:
+    """將本 worker 的快照寫入共用目錄（原子替換）"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"published_at": time.time(), "metrics": registry.snapshot()}, f)
+    os.replace(tmp_path, path)
+
+
+def load_peer_snapshots(directory: str, max_age_seconds: float) -> list[dict]:
+    """讀取其他 worker 的快照（略過本 worker 與過期檔案）"""
+    if not directory or not os.path.isdir(directory):
+        return []
+    
+    own_file = f"metrics-{os.getpid()}.json"
+    now = time.time()
+    snapshots = []
+    for filename in os.listdir(directory):
+        if not filename.startswith("metrics-") or not filename.endswith(".json") or filename == own_file:
+            continue
+        try:
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if now - data.get("published_at", 0) > max_age_seconds:
+            continue
+        snapshots.append(data["metrics"])
+    return snapshots
+
+
+def start_snapshot_publisher(
+    registry: MetricsRegistry,
+    directory: str,
+    interval_seconds: float
+) -> threading.Thread:
+    """啟動背景執行緒，定期發布本 worker 的快照"""
+    def run():
+        while True:
+            try:
+                publish_snapshot(registry, directory)
+            except Exception as e:
+                logger.warning(f"Metrics snapshot publish failed: {e}")
+            time.sleep(interval_seconds)
+    
+    thread = threading.Thread(target=run, name="metrics-snapshot-publisher", daemon=True)
+    thread.start()
+    return thread
+
+
+def count_outcomes(
+    counter: Counter,
+    outcomes: dict[type, str],
+    success: str = "success",
+    default: str = "error"
+):
+    """
+    裝飾器：依函式結果累加 counter（標籤 outcome）
+    
+    Args:
+        counter: 具 outcome 標籤的 Counter
+        outcomes: 例外型別 → outcome 標籤
+        success: 正常返回時的標籤
+        default: 未列出的例外標籤
+    """
+    def classify(exc: BaseException) -> str:
+        for exc_type, outcome in outcomes.items():
+            if isinstance(exc, exc_type):
+                return outcome
+        return default
+    
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    counter.inc(outcome=classify(e))
+                    raise
+                counter.inc(outcome=success)
+                return result
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                counter.inc(outcome=classify(e))
+                raise
+            counter.inc(outcome=success)
+            return result
+        return wrapper
+    
+    return decorator
+
+
+# 全局指標註冊表
+metrics = MetricsRegistry()
+
+
+# === 應用指標定義 ===
+
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "http_request_duration_seconds",
+    "HTTP 請求處理時間（秒）",
+    ["method", "route", "status"]
+)
+HTTP_REQUESTS_IN_FLIGHT = metrics.gauge(
+    "http_requests_in_flight",
+    "處理中的 HTTP 請求數"
+)
+
+DB_POOL_SIZE = metrics.gauge("db_pool_size", "連線池大小")
+DB_POOL_CHECKED_OUT = metrics.gauge("db_pool_checked_out", "已借出的連線數")
+DB_POOL_OVERFLOW = metrics.gauge("db_pool_overflow", "超出 pool_size 的溢出連線數")
+DB_POOL_WAIT = metrics.histogram(
+    "db_pool_wait_seconds",
+    "取得連線的等待時間（秒）",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+DB_POOL_LIVENESS_FAILURES = metrics.counter(
+    "db_pool_liveness_failures_total",
+    "背景連線存活檢查失敗次數"
+)
+
+RATE_LIMITED_TOTAL = metrics.counter(
+    "http_rate_limited_total",
+    "被限流拒絕的請求數（429）",
+    ["scope"]
+)
+ADMISSION_SHED_TOTAL = metrics.counter(
+    "http_admission_shed_total",
+    "連線池壅塞時拒絕的低優先請求數（503）"
+)
+
+BOOKING_CREATE_TOTAL = metrics.counter(
+    "booking_create_total",
+    "建立預約結果（success / overlap / inactive / quota / error）",
+    ["outcome"]
+)
+
+SLOT_QUERY_TOTAL = metrics.counter(
+    "slot_query_total",
+    "可訂時段查詢來源（hit 快取 / coalesced 共用進行中計算 / miss 自行計算）",
+    ["outcome"]
+)
+
+BILLING_STATUS_CACHE_TOTAL = metrics.counter(
+    "billing_status_cache_total",
+    "訂閱狀態快取查詢結果（hit / miss）",
+    ["outcome"]
+)
+
+STRIPE_EVENTS_TOTAL = metrics.counter(
+    "stripe_events_total",
+    "Stripe webhook 事件（received / duplicate / invalid_signature / processed / ignored / stale / retry / failed）",
+    ["outcome"]
+)
+
+SUBSCRIPTION_TRANSITIONS_TOTAL = metrics.counter(
+    "subscription_scheduled_transitions_total",
+    "到期排程套用的訂閱轉換（renewed / past_due）",
+    ["transition"]
+)
+
+LINE_WEBHOOK_EVENTS_TOTAL = metrics.counter(
+    "line_webhook_events_total",
+    "LINE webhook 事件（queued / queue_full / invalid_signature / duplicate / published / ignored / error）",
+    ["outcome"]
+)
+
+BROADCAST_SUBSCRIBERS = metrics.gauge(
+    "broadcast_subscribers",
+    "推播（SSE）訂閱連線數"
+)
+BROADCAST_SUBSCRIBERS_DROPPED = metrics.counter(
+    "broadcast_subscribers_dropped_total",
+    "佇列滿而被關閉的慢速訂閱者數"
+)
+
+EVENT_HANDLER_DURATION = metrics.histogram(
+    "event_bus_handler_duration_seconds",
+    "事件處理器執行時間（秒）",
+    ["event_type", "handler", "outcome"]
+)
+
+NOTIFICATION_SEND_TOTAL = metrics.counter(
+    "notification_send_total",
+    "通知發送結果（sent / failed / skipped）",
+    ["notification_type", "outcome"]
+)
+
+NOTIFICATION_RECORDS_TOTAL = metrics.counter(
+    "notification_records_total",
+    "通知記錄寫入（written / dropped / error / pruned）",
+    ["outcome"]
+)
+
+LINE_MULTICAST_REQUESTS_TOTAL = metrics.counter(
+    "line_multicast_requests_total",
+    "推播活動 multicast 呼叫結果（accepted / retried / rejected）",
+    ["outcome"]
+)
+
+BOOKING_REMINDERS_TOTAL = metrics.counter(
+    "booking_reminders_total",
+    "預約提醒處理結果（sent / failed / duplicate / deferred）",
+    ["outcome"]
+)
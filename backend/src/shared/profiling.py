@@ -0,0 +1,287 @@
+"""
+Shared Kernel - Request Profiling
+按需剖析單一請求：統計式 CPU 取樣 + tracemalloc 記憶體配置快照
+
+設計：
+- CPU：背景執行緒每 interval 讀取 sys._current_frames()，只取樣處理請求的執行緒
+  （事件迴圈執行緒 + AnyIO worker thread），略過閒置中的堆疊
+- 記憶體：請求前後各取一次 tracemalloc 快照，比較差異
+- 同一時間只剖析一個請求（tracemalloc 為全域狀態），忙碌時直接略過
+- 結果以 JSON 存於本機目錄，只保留最近 N 份
+"""
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+from uuid import uuid4
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# 處理同步端點的執行緒名稱（anyio.to_thread）
+_WORKER_THREAD_NAME = "AnyIO worker thread"
+
+# 葉節點位於這些檔案時視為閒置（等待工作 / 等待 I/O）
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+_PROFILE_ID_PATTERN = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+# 報告中保留的函式 / 配置筆數
+_TOP_N = 30
+
+# tracemalloc 追蹤的堆疊深度
+_TRACEMALLOC_FRAMES = 10
+
+
+def _frame_label(frame) -> str:
+    """堆疊節點標籤：縮短的檔案路徑 + 函式限定名"""
+    code = frame.f_code
+    filename = code.co_filename
+    for marker in ("site-packages" + os.sep, "src" + os.sep):
+        index = filename.rfind(marker)
+        if index != -1:
+            filename = filename[index + len(marker):]
+            break
+    return f"{filename}:{code.co_qualname}"
+
+
+class SamplingProfiler:
+    """
+    統計式 CPU 取樣器
+    
+    用法：
+        profiler = SamplingProfiler(interval_seconds=0.005)
+        profiler.start()
+        ...
+        report = profiler.stop()
+    """
+    
+    def __init__(self, interval_seconds: float = 0.005, thread_ids: Optional[set[int]] = None):
+        self.interval_seconds = interval_seconds
+        # 額外指定要取樣的執行緒（預設為呼叫 start() 的執行緒）
+        self.thread_ids = set(thread_ids or ())
+        self.stacks: Counter[str] = Counter()
+        self.sample_count = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        self.thread_ids.add(threading.get_ident())
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> dict:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.report()
+    
+    def _sampled_threads(self) -> set[int]:
+        thread_ids = set(self.thread_ids)
+        for thread in threading.enumerate():
+            if thread.name.startswith(_WORKER_THREAD_NAME) and thread.ident is not None:
+                thread_ids.add(thread.ident)
+        return thread_ids
+    
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval_seconds):
+            thread_ids = self._sampled_threads()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or thread_id not in thread_ids:
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(labels))] += 1
+                self.sample_count += 1
+    
+    def report(self) -> dict:
+        """彙整取樣結果：collapsed stacks（可轉火焰圖）+ self / total 排行"""
+        self_counts: Counter[str] = Counter()
+        total_counts: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for label in set(frames):
+                total_counts[label] += count
+        
+        return {
+            "interval_ms": self.interval_seconds * 1000,
+            "samples": self.sample_count,
+            "top_self": self_counts.most_common(_TOP_N),
+            "top_total": total_counts.most_common(_TOP_N),
+            "stacks": dict(self.stacks),
+        }
+
+
+def _allocation_report(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> list[dict]:
+    """請求期間新增的記憶體配置（依程式行彙總）"""
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ]
+    before = before.filter_traces(filters)
+    after = after.filter_traces(filters)
+    
+    allocations = []
+    for stat in after.compare_to(before, "lineno")[:_TOP_N]:
+        if stat.size_diff <= 0:
+            continue
+        frame = stat.traceback[0]
+        allocations.append({
+            "location": f"{frame.filename}:{frame.lineno}",
+            "size_diff_bytes": stat.size_diff,
+            "count_diff": stat.count_diff,
+        })
+    return allocations
+
+
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def profile_request(interval_seconds: float = 0.005) -> Iterator[Optional[dict]]:
+    """
+    剖析一段程式（通常為一個請求）
+    
+    產出 dict，區塊結束後填入 cpu / memory / duration_ms；
+    若已有其他請求在剖析中則產出 None（不剖析）
+    """
+    if not _profile_lock.acquire(blocking=False):
+        yield None
+        return
+    
+    result: dict = {}
+    started_tracing = not tracemalloc.is_tracing()
+    try:
+        if started_tracing:
+            tracemalloc.start(_TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        
+        profiler = SamplingProfiler(interval_seconds)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            yield result
+        finally:
+            result["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            result["cpu"] = profiler.stop()
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            result["memory"] = {
+                "peak_traced_bytes": peak,
+                "allocations": _allocation_report(before, after),
+            }
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+
+class ProfileStore:
+    """剖析結果的本機儲存（JSON 檔，只保留最近 max_profiles 份）"""
+    
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+    
+    @staticmethod
+    def new_id() -> str:
+        """產生 profile_id（毫秒時間戳 + 隨機碼，可依時間排序）"""
+        return f"{time.time_ns() // 1_000_000}-{uuid4().hex[:8]}"
+    
+    def save(self, profile: dict, profile_id: Optional[str] = None) -> str:
+        """儲存剖析結果，回傳 profile_id"""
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = profile_id or self.new_id()
+        profile = {
+            "id": profile_id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            **profile,
+        }
+        
+        path = self.path(profile_id)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(profile, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        
+        self._prune()
+        return profile_id
+    
+    def path(self, profile_id: str) -> str:
+        if not _PROFILE_ID_PATTERN.match(profile_id):
+            raise ValueError(f"Invalid profile id: {profile_id}")
+        return os.path.join(self.directory, f"{profile_id}.json")
+    
+    def _profile_ids(self) -> list[str]:
+        """依時間由新到舊排列"""
+        if not os.path.isdir(self.directory):
+            return []
+        ids = [
+            filename[:-len(".json")]
+            for filename in os.listdir(self.directory)
+            if filename.endswith(".json") and _PROFILE_ID_PATTERN.match(filename[:-len(".json")])
+        ]
+        return sorted(ids, key=lambda profile_id: int(profile_id.split("-")[0]), reverse=True)
+    
+    def _prune(self):
+        for profile_id in self._profile_ids()[self.max_profiles:]:
+            try:
+                os.remove(self.path(profile_id))
+            except OSError:
+                pass
+    
+    def load(self, profile_id: str) -> Optional[dict]:
+        try:
+            with open(self.path(profile_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def list_summaries(self, limit: int = 50) -> list[dict]:
+        """最近的剖析摘要（不含堆疊明細）"""
+        summaries = []
+        for profile_id in self._profile_ids()[:limit]:
+            profile = self.load(profile_id)
+            if profile is None:
+                continue
+            summaries.append({
+                "id": profile["id"],
+                "created_at": profile["created_at"],
+                "method": profile.get("method"),
+                "route": profile.get("route"),
+                "path": profile.get("path"),
+                "query_params": profile.get("query_params", {}),
+                "status": profile.get("status"),
+                "trigger": profile.get("trigger"),
+                "duration_ms": profile.get("duration_ms"),
+                "cpu_samples": profile.get("cpu", {}).get("samples", 0),
+                "peak_traced_bytes": profile.get("memory", {}).get("peak_traced_bytes"),
+            })
+        return summaries
+
+
+def collapsed_stacks(profile: dict) -> str:
+    """輸出 collapsed stack 文字（flamegraph.pl / speedscope 可直接讀取）"""
+    stacks = profile.get("cpu", {}).get("stacks", {})
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+
+
+# 全局剖析結果儲存
+profile_store = ProfileStore(settings.profiling_dir, settings.profiling_max_profiles)
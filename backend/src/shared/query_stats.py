@@ -0,0 +1,147 @@
+"""
+Shared Kernel - Query Statistics
+SQL 查詢統計：每個請求的查詢次數 / 耗時、重複語句（N+1）偵測、慢查詢歸因
+
+做法：
+- SQLAlchemy engine 事件（before/after_cursor_execute）計時每一條語句
+- 以 contextvars 綁定「目前的統計範圍」，請求中介層與測試 fixture 各自開啟範圍
+- 慢查詢一律記錄 log，並附上發起的路由
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from weakref import WeakKeyDictionary
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+# log 中語句的最大長度
+_STATEMENT_PREVIEW_CHARS = 200
+
+
+class QueryStats:
+    """
+    單一範圍（通常為一個 HTTP 請求）內的查詢統計
+    
+    SQLAlchemy 送出的語句已參數化，因此相同字串即代表相同形狀的查詢；
+    同一語句重複多次通常就是 N+1
+    """
+    
+    def __init__(self, route: Optional[str] = None):
+        self.route = route
+        self.count = 0
+        self.total_ms = 0.0
+        self.statements: Counter[str] = Counter()
+        self.slow: list[tuple[str, float]] = []
+    
+    def record(self, statement: str, elapsed_ms: float, slow_threshold_ms: Optional[float]):
+        """記錄一條語句"""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.statements[statement] += 1
+        if slow_threshold_ms is not None and elapsed_ms >= slow_threshold_ms:
+            self.slow.append((statement, elapsed_ms))
+    
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """回傳執行次數 >= threshold 的語句（疑似 N+1）"""
+        return [
+            (statement, times)
+            for statement, times in self.statements.most_common()
+            if times >= threshold
+        ]
+    
+    def summary(self) -> str:
+        """單行摘要（用於 log）"""
+        return f"{self.count} queries in {self.total_ms:.1f}ms"
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# engine → 慢查詢門檻（毫秒）
+_slow_thresholds: "WeakKeyDictionary[Engine, Optional[float]]" = WeakKeyDictionary()
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """取得目前範圍的查詢統計（不在範圍內時為 None）"""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(route: Optional[str] = None) -> Iterator[QueryStats]:
+    """
+    開啟查詢統計範圍
+    
+    用法：
+        with track_queries("GET /merchant/bookings") as stats:
+            ...
+        print(stats.count)
+    """
+    stats = QueryStats(route)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def preview(statement: str) -> str:
+    """壓縮空白並截斷語句（用於 log 與錯誤訊息）"""
+    compact = " ".join(statement.split())
+    if len(compact) > _STATEMENT_PREVIEW_CHARS:
+        return compact[:_STATEMENT_PREVIEW_CHARS] + "…"
+    return compact
+
+
+def install_query_hooks(engine: Engine, slow_threshold_ms: Optional[float] = None) -> None:
+    """
+    於 engine 註冊計時事件（重複呼叫僅更新慢查詢門檻）
+    
+    Args:
+        engine: SQLAlchemy Engine
+        slow_threshold_ms: 慢查詢門檻（毫秒），None 表示不記錄慢查詢
+    """
+    _slow_thresholds[engine] = slow_threshold_ms
+    
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_times")
+    if not start_times:
+        return
+    elapsed_ms = (time.perf_counter() - start_times.pop()) * 1000
+    slow_threshold_ms = _slow_thresholds.get(conn.engine)
+    
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms, slow_threshold_ms)
+    
+    if slow_threshold_ms is not None and elapsed_ms >= slow_threshold_ms:
+        logger.warning(
+            f"Slow query ({elapsed_ms:.1f}ms) "
+            f"route={stats.route if stats else None}: {preview(statement)}"
+        )
+
+
+def _handle_error(exception_context):
+    # 語句失敗時不會觸發 after_cursor_execute，需清除計時堆疊
+    conn = exception_context.connection
+    if conn is not None:
+        start_times = conn.info.get("query_start_times")
+        if start_times:
+            start_times.pop()
@@ -0,0 +1,276 @@
+"""
+Shared Kernel - Rate Limiting & Admission Control
+令牌桶限流與連線池感知的准入控制
+
+- TokenBucketLimiter：依 key（ip:… / user:… / merchant:…）各自一個令牌桶
+  - InMemoryRateLimitBackend：單一 worker 內共享（也是測試與本地開發用的替身）
+  - RedisRateLimitBackend：多 worker / 多機共享，以 Lua 腳本原子更新
+- PoolWaitTracker：連線池借出等待時間的指數衰減平均（由 InstrumentedQueuePool 回報）
+- AdmissionController：等待時間超過門檻時拒絕低優先請求（公開查詢），讓預約寫入保有連線
+"""
+from dataclasses import dataclass
+from typing import Optional, Protocol
+import logging
+import math
+import threading
+import time
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """限流判定結果"""
+    allowed: bool
+    remaining: int
+    retry_after_seconds: float
+
+
+class RateLimitBackend(Protocol):
+    """
+    令牌桶儲存
+    
+    blocking = True 表示 take 會做網路 I/O，非同步呼叫端須移至執行緒池，不可在 event loop 上直接呼叫
+    """
+    blocking: bool
+    
+    def take(self, key: str, rate_per_second: float, capacity: int, cost: int = 1) -> RateLimitDecision:
+        ...
+
+
+def _refill(tokens: float, updated_at: float, now: float, rate_per_second: float, capacity: int) -> float:
+    return min(capacity, tokens + max(now - updated_at, 0.0) * rate_per_second)
+
+
+def _decide(tokens: float, rate_per_second: float, cost: int) -> tuple[float, RateLimitDecision]:
+    """扣除令牌；不足時回傳需等待的秒數（不扣除）"""
+    if tokens >= cost:
+        tokens -= cost
+        return tokens, RateLimitDecision(True, int(tokens), 0.0)
+    retry_after = (cost - tokens) / rate_per_second
+    return tokens, RateLimitDecision(False, int(tokens), retry_after)
+
+
+class InMemoryRateLimitBackend:
+    """
+    行程內令牌桶
+    
+    key 數量超過 max_keys 時丟棄最久未更新的一半（滿桶的 key 丟掉等同重置，不影響正確性）
+    """
+    
+    blocking = False
+    
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._lock = threading.Lock()
+    
+    def take(self, key: str, rate_per_second: float, capacity: int, cost: int = 1) -> RateLimitDecision:
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens = capacity if bucket is None else _refill(*bucket, now, rate_per_second, capacity)
+            tokens, decision = _decide(tokens, rate_per_second, cost)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._evict()
+        return decision
+    
+    def _evict(self):
+        by_age = sorted(self._buckets.items(), key=lambda item: item[1][1])
+        for key, _ in by_age[:len(by_age) // 2]:
+            del self._buckets[key]
+
+
+# KEYS[1] = bucket key；ARGV = rate_per_second, capacity, cost, ttl_seconds
+# 回傳 {allowed, remaining, retry_after_ms}；時間取 Redis 伺服器時鐘，避免各機器時鐘誤差
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1])
+if tokens == nil then
+    tokens = capacity
+else
+    tokens = math.min(capacity, tokens + math.max(now - tonumber(bucket[2]), 0) * rate)
+end
+local allowed = 0
+local retry_after_ms = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after_ms = math.ceil((cost - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {allowed, math.floor(tokens), retry_after_ms}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    Redis 令牌桶（多 worker / 多機共享）
+    
+    Redis 無法連線時放行（fail open），限流不應讓服務整個停擺
+    同步 client 最長阻塞 socket_timeout，中介層以執行緒池呼叫
+    """
+    
+    blocking = True
+    
+    def __init__(self, client, key_prefix: str = "ratelimit:"):
+        self.client = client
+        self.key_prefix = key_prefix
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+    
+    @classmethod
+    def from_url(cls, url: str) -> "RedisRateLimitBackend":
+        import redis  # 選用依賴：僅在設定 RATE_LIMIT_BACKEND=redis 時需要
+        
+        return cls(redis.Redis.from_url(url, socket_timeout=0.05))
+    
+    def take(self, key: str, rate_per_second: float, capacity: int, cost: int = 1) -> RateLimitDecision:
+        ttl_seconds = max(math.ceil(capacity / rate_per_second), 1)
+        try:
+            allowed, remaining, retry_after_ms = self._script(
+                keys=[self.key_prefix + key],
+                args=[rate_per_second, capacity, cost, ttl_seconds]
+            )
+        except Exception as e:
+            logger.warning(f"Rate limit backend unavailable, allowing request: {e}")
+            return RateLimitDecision(True, capacity, 0.0)
+        return RateLimitDecision(bool(allowed), int(remaining), retry_after_ms / 1000)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """限流規則：每分鐘 per_minute 次，允許瞬間 burst 次"""
+    per_minute: int
+    burst: int
+    
+    @property
+    def rate_per_second(self) -> float:
+        return self.per_minute / 60
+
+
+class TokenBucketLimiter:
+    """
+    多維度令牌桶限流
+    
+    用法：
+        limited_scope, decision = limiter.check({"ip": "1.2.3.4", "user": "u-1", "merchant": "nail-shop"})
+    任一維度不足即拒絕（回傳該維度）；全部通過時回傳剩餘令牌最少的維度結果
+    """
+    
+    def __init__(self, backend: RateLimitBackend, rules: dict[str, RateLimitRule]):
+        self.backend = backend
+        self.rules = rules
+    
+    @property
+    def blocking(self) -> bool:
+        """check 是否會阻塞（後端做網路 I/O）"""
+        return self.backend.blocking
+    
+    def check(self, identities: dict[str, Optional[str]]) -> tuple[Optional[str], RateLimitDecision]:
+        """
+        Returns:
+            (被拒絕的維度或 None, 判定結果)
+        """
+        tightest: Optional[RateLimitDecision] = None
+        for scope, identity in identities.items():
+            rule = self.rules.get(scope)
+            if identity is None or rule is None:
+                continue
+            decision = self.backend.take(f"{scope}:{identity}", rule.rate_per_second, rule.burst)
+            if not decision.allowed:
+                return scope, decision
+            if tightest is None or decision.remaining < tightest.remaining:
+                tightest = decision
+        return None, tightest or RateLimitDecision(True, 0, 0.0)
+
+
+class PoolWaitTracker:
+    """
+    連線池借出等待時間的指數衰減平均（秒）
+    
+    以時間而非樣本數衰減：請求都被拒絕、沒有新樣本時，數值仍會隨時間回落，准入控制不會卡在拒絕狀態
+    """
+    
+    def __init__(self, half_life_seconds: float = 5.0, clock=time.monotonic):
+        self.half_life_seconds = half_life_seconds
+        self._clock = clock
+        self._value = 0.0
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+    
+    def _decayed(self, now: float) -> float:
+        return self._value * 0.5 ** ((now - self._updated_at) / self.half_life_seconds)
+    
+    def observe(self, wait_seconds: float):
+        now = self._clock()
+        with self._lock:
+            # 新樣本權重 20%：單次離群值不會觸發拒絕，持續壅塞時數十個樣本內即反映
+            self._value = self._decayed(now) * 0.8 + wait_seconds * 0.2
+            self._updated_at = now
+    
+    def current(self) -> float:
+        with self._lock:
+            return self._decayed(self._clock())
+
+
+class AdmissionController:
+    """
+    連線池感知的准入控制
+    
+    只拒絕低優先請求（公開查詢）；預約寫入與管理端點一律放行
+    """
+    
+    def __init__(
+        self,
+        wait_tracker: PoolWaitTracker,
+        shed_wait_seconds: float = 0.1,
+        low_priority_prefixes: tuple[str, ...] = ("/api/v1/public/",),
+        retry_after_seconds: int = 2
+    ):
+        self.wait_tracker = wait_tracker
+        self.shed_wait_seconds = shed_wait_seconds
+        self.low_priority_prefixes = low_priority_prefixes
+        self.retry_after_seconds = retry_after_seconds
+    
+    def is_low_priority(self, method: str, path: str) -> bool:
+        return method in ("GET", "HEAD") and path.startswith(self.low_priority_prefixes)
+    
+    def should_shed(self, method: str, path: str) -> bool:
+        if not self.is_low_priority(method, path):
+            return False
+        return self.wait_tracker.current() > self.shed_wait_seconds
+
+
+def create_rate_limiter() -> TokenBucketLimiter:
+    """依設定建立限流器（RATE_LIMIT_BACKEND=memory / redis）"""
+    if settings.rate_limit_backend == "redis":
+        backend = RedisRateLimitBackend.from_url(str(settings.redis_url))
+    else:
+        backend = InMemoryRateLimitBackend()
+    
+    return TokenBucketLimiter(
+        backend,
+        {
+            "ip": RateLimitRule(settings.rate_limit_per_minute, settings.rate_limit_burst),
+            "user": RateLimitRule(settings.rate_limit_user_per_minute, settings.rate_limit_burst),
+            "merchant": RateLimitRule(
+                settings.rate_limit_merchant_per_minute,
+                settings.rate_limit_merchant_burst
+            ),
+        }
+    )
+
+
+# 全局連線池等待追蹤（InstrumentedQueuePool 回報）
+pool_wait_tracker = PoolWaitTracker()
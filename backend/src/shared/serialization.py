@@ -0,0 +1,53 @@
+"""
+Shared Kernel - Serialization
+大型列表響應的 JSON 序列化
+
+FastAPI 端點直接回傳 list / dict（未設定 response_model）時，會先以 jsonable_encoder
+逐欄位走訪轉換，再以標準庫 json 編碼；一萬筆預約約需 1 秒。
+FastJSONResponse 改以 orjson 直接編碼端點組好的 dict：
+- datetime / date / UUID / dataclass 由 orjson 原生處理（輸出與 isoformat() 相同），端點不需逐欄轉字串
+- Decimal 依 jsonable_encoder 的規則轉換（整數值輸出 int，其餘 float），輸出與原本一致
+
+以 response_model（pydantic DTO）定義響應格式的端點（LIFF 預約）改用 PydanticJSONResponse：
+端點組好 dict，由 pydantic-core 直接編碼，輸出與 response_model 驗證後序列化的結果相同
+（Decimal 為字串、UTC 時間為 Z），但不逐筆建立 / 驗證 DTO
+
+回傳 Response 物件時 FastAPI 不再驗證 / 轉換內容，只適用於服務端自行組成的資料（預約、目錄列表）
+"""
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+def _default(value: Any) -> Any:
+    """orjson 不支援的型別"""
+    if isinstance(value, Decimal):
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """編碼為 JSON bytes（UTF-8，不跳脫非 ASCII 字元）"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """以 orjson 編碼的 JSONResponse（端點需直接回傳此物件，才會略過 jsonable_encoder）"""
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class PydanticJSONResponse(JSONResponse):
+    """以 pydantic-core 編碼的 JSONResponse（格式與 response_model 序列化相同）"""
+    
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -0,0 +1,109 @@
+"""
+Shared Kernel - Single Flight & TTL Cache
+合併相同的並行計算（single-flight）與短效結果快取
+
+- SingleFlight：同一 key 同時只執行一次，其他呼叫者等待同一個 future
+- TTLCache：有上限的 LRU + 到期時間，適合秒級快取熱門查詢結果
+"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+import asyncio
+import threading
+import time
+
+
+MISSING = object()
+
+
+class SingleFlight:
+    """
+    合併相同 key 的並行非同步計算
+    
+    用法：
+        result, shared = await flight.do(key, lambda: compute(...))
+    
+    - 領頭者執行 func，跟隨者 await 同一個 future（shared=True）
+    - 領頭者失敗時例外傳給所有跟隨者；領頭者被取消時跟隨者自行重新計算
+    """
+    
+    def __init__(self):
+        self._calls: dict[Hashable, asyncio.Future] = {}
+    
+    def in_flight(self) -> int:
+        return len(self._calls)
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        future = self._calls.get(key)
+        if future is not None:
+            try:
+                # shield：跟隨者被取消不影響領頭者與其他跟隨者
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await self.do(key, func)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 沒有跟隨者時避免 "exception was never retrieved"
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+
+class TTLCache:
+    """
+    有上限的 LRU 快取，項目於 ttl_seconds 後失效（執行緒安全）
+    
+    取值時順便檢查到期；超過 max_entries 時淘汰最久未使用者
+    """
+    
+    def __init__(self, ttl_seconds: float, max_entries: int = 10_000, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable) -> Any:
+        """取值；不存在或已到期時回傳 MISSING"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """寫入；ttl_seconds 可覆寫此項目的存活秒數"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
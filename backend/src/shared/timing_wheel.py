@@ -0,0 +1,106 @@
+"""
+Shared Kernel - Hierarchical Timing Wheel
+階層式時間輪：大量計時項目的 O(1) 新增 / 取消，每個 tick 只處理到期的格子
+
+- 第 0 層每格 1 tick，第 L 層每格 wheel_size^L tick；可排程的範圍為 wheel_size^levels tick
+- 項目放入「與目前位置相差不到一圈」的最低層；高層格子輪到時下放（cascade）到較低層
+- 以 key 識別項目：重複新增視為改期，可依 key 取消
+
+非執行緒安全，由呼叫端加鎖
+"""
+from typing import Any, Hashable
+
+
+class TimingWheel:
+    """階層式時間輪"""
+    
+    def __init__(self, tick_seconds: float = 1.0, wheel_size: int = 60, levels: int = 3, start: float = 0.0):
+        self.tick_seconds = tick_seconds
+        self.wheel_size = wheel_size
+        self.levels = levels
+        self._current = int(start // tick_seconds)
+        self._buckets: list[list[dict[Hashable, tuple[int, Any]]]] = [
+            [{} for _ in range(wheel_size)] for _ in range(levels)
+        ]
+        self._index: dict[Hashable, tuple[int, int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+    
+    @property
+    def span_seconds(self) -> float:
+        """可排程的最長延遲（秒）"""
+        return self.tick_seconds * self.wheel_size ** self.levels
+    
+    def add(self, key: Hashable, deadline: float, item: Any) -> bool:
+        """
+        排程項目（同 key 已存在時改期）
+        
+        Returns:
+            False 表示已到期（deadline 不晚於目前 tick），未放入，由呼叫端立即處理
+        
+        Raises:
+            ValueError: 超出可排程範圍
+        """
+        self.remove(key)
+        return self._place(key, int(deadline // self.tick_seconds), item)
+    
+    def _place(self, key: Hashable, deadline_tick: int, item: Any) -> bool:
+        if deadline_tick <= self._current:
+            return False
+        
+        for level in range(self.levels):
+            unit = self.wheel_size ** level
+            if deadline_tick // unit - self._current // unit < self.wheel_size:
+                slot = (deadline_tick // unit) % self.wheel_size
+                self._buckets[level][slot][key] = (deadline_tick, item)
+                self._index[key] = (level, slot)
+                return True
+        
+        raise ValueError(f"超出時間輪範圍（{self.span_seconds} 秒）")
+    
+    def remove(self, key: Hashable) -> bool:
+        """取消項目；不存在時返回 False"""
+        position = self._index.pop(key, None)
+        if position is None:
+            return False
+        level, slot = position
+        del self._buckets[level][slot][key]
+        return True
+    
+    def advance(self, now: float) -> list[Any]:
+        """推進至 now，回傳期間到期的項目（依 tick 順序）"""
+        target = int(now // self.tick_seconds)
+        if not self._index:
+            self._current = max(self._current, target)
+            return []
+        
+        expired: list[Any] = []
+        while self._current < target:
+            self._current += 1
+            
+            # 高層格子輪到時下放至較低層（剛好到期者直接回傳）
+            for level in range(self.levels - 1, 0, -1):
+                unit = self.wheel_size ** level
+                if self._current % unit == 0:
+                    bucket = self._buckets[level][(self._current // unit) % self.wheel_size]
+                    entries = list(bucket.items())
+                    bucket.clear()
+                    for key, (deadline_tick, item) in entries:
+                        del self._index[key]
+                        if not self._place(key, deadline_tick, item):
+                            expired.append(item)
+            
+            bucket = self._buckets[0][self._current % self.wheel_size]
+            for key, (_, item) in bucket.items():
+                del self._index[key]
+                expired.append(item)
+            bucket.clear()
+            
+            if not self._index:
+                self._current = target
+        
+        return expired
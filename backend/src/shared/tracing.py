@@ -0,0 +1,343 @@
+"""
+Shared Kernel - Tracing
+行程內追蹤 span：以 contextvars 串接父子關係，輸出 OpenTelemetry（OTLP/JSON）格式檔案
+
+設計：
+- 停用時 tracer.span() 直接回傳共用的 no-op 物件，@traced 只多一次旗標判斷
+- 啟用時每個 span 記錄 trace_id / span_id / parent、起訖時間（ns）、屬性與狀態
+- FileSpanExporter 於根 span 結束時（或緩衝滿時）寫出一行 OTLP/JSON
+  （與 OpenTelemetry Collector file exporter 相同格式，可直接匯入 Jaeger / Tempo）
+- summarize_spans() 依 span 名稱彙總 p50 / p99，用於找出交易中的慢步驟
+"""
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Any, Iterable, Optional
+import functools
+import inspect
+import json
+import logging
+import random
+import threading
+import time
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# OTLP 常數
+SPAN_KIND_INTERNAL = 1
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+
+class Span:
+    """單一追蹤區段"""
+    
+    __slots__ = (
+        "name", "trace_id", "span_id", "parent_span_id",
+        "start_time_ns", "end_time_ns", "attributes", "status_code", "status_message"
+    )
+    
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_span_id = parent_span_id
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status_code = STATUS_CODE_OK
+        self.status_message = ""
+    
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_time_ns if self.end_time_ns is not None else time.time_ns()
+        return (end - self.start_time_ns) / 1_000_000
+    
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+    
+    def record_exception(self, exc: BaseException):
+        self.status_code = STATUS_CODE_ERROR
+        self.status_message = str(exc)
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+    
+    def to_otlp(self) -> dict:
+        """轉為 OTLP/JSON span"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class _NoopSpan:
+    """停用時使用的共用 span（所有操作皆為 no-op）"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def set_attribute(self, key: str, value: Any):
+        pass
+    
+    def record_exception(self, exc: BaseException):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _ActiveSpan:
+    """啟用時的 span context manager（設定 / 還原目前 span）"""
+    
+    __slots__ = ("_tracer", "_span", "_token")
+    
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self._span = span
+        self._token = None
+    
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self._span)
+        return self._span
+    
+    def __exit__(self, exc_type, exc, tb):
+        span = self._span
+        span.end_time_ns = time.time_ns()
+        if exc is not None:
+            span.record_exception(exc)
+        _current_span.reset(self._token)
+        self._tracer._finish(span)
+        return False
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """取得目前的 span（未追蹤時為 None）"""
+    return _current_span.get()
+
+
+class FileSpanExporter:
+    """
+    OTLP/JSON 檔案輸出器
+    
+    每行一個 ExportTraceServiceRequest（resourceSpans → scopeSpans → spans）
+    """
+    
+    def __init__(self, path: str, service_name: str = "nail-booking-api", max_buffer: int = 512):
+        self.path = path
+        self.service_name = service_name
+        self.max_buffer = max_buffer
+        self._buffer: list[Span] = []
+        self._lock = threading.Lock()
+    
+    def export(self, span: Span):
+        with self._lock:
+            self._buffer.append(span)
+            if span.parent_span_id is not None and len(self._buffer) < self.max_buffer:
+                return
+            spans, self._buffer = self._buffer, []
+        self._write(spans)
+    
+    def flush(self):
+        with self._lock:
+            spans, self._buffer = self._buffer, []
+        if spans:
+            self._write(spans)
+    
+    def _write(self, spans: list[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": {
+                    "attributes": [_otlp_attribute("service.name", self.service_name)]
+                },
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+        line = json.dumps(request, ensure_ascii=False)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to export spans: {e}")
+
+
+class Tracer:
+    """
+    追蹤器
+    
+    用法：
+        with tracer.span("create_booking.overlap_check", staff_id=1):
+            ...
+    """
+    
+    def __init__(self, enabled: bool = False, exporter: Optional[FileSpanExporter] = None):
+        self.enabled = enabled
+        self.exporter = exporter
+    
+    def span(self, name: str, **attributes):
+        """開啟 span（停用時回傳 no-op）"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        parent = _current_span.get()
+        if parent is None:
+            trace_id = f"{random.getrandbits(128):032x}"
+            parent_span_id = None
+        else:
+            trace_id = parent.trace_id
+            parent_span_id = parent.span_id
+        return _ActiveSpan(self, Span(name, trace_id, parent_span_id, attributes))
+    
+    def _finish(self, span: Span):
+        if self.exporter is not None:
+            self.exporter.export(span)
+
+
+def traced(name: Optional[str] = None):
+    """
+    裝飾器：以全局 tracer 的 span 包住函式（同步 / 非同步皆可）
+    
+    Args:
+        name: span 名稱（預設為函式限定名，如 BookingService.create_booking）
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.span(span_name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    
+    return decorator
+
+
+def trace_methods(cls):
+    """
+    類別裝飾器：為類別自身定義的公開方法加上 @traced
+    
+    span 名稱為「類別名.方法名」，例如 SQLAlchemyBookingRepository.save
+    """
+    for attr_name, attr in list(vars(cls).items()):
+        if attr_name.startswith("_") or not inspect.isfunction(attr):
+            continue
+        setattr(cls, attr_name, traced(f"{cls.__name__}.{attr_name}")(attr))
+    return cls
+
+
+# === 彙總 ===
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    """nearest-rank 百分位數"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(-(-percentile * len(sorted_values) // 100)), 1)
+    return sorted_values[rank - 1]
+
+
+def iter_exported_spans(path: str) -> Iterable[dict]:
+    """逐一讀取 OTLP/JSON 檔案中的 span"""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            for resource_spans in request.get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    yield from scope_spans.get("spans", [])
+
+
+def summarize_spans(spans: Iterable[dict]) -> list[dict]:
+    """
+    依 span 名稱彙總耗時（毫秒）
+    
+    Returns:
+        [{"name", "count", "errors", "p50_ms", "p99_ms", "max_ms", "total_ms"}]，依 total_ms 由大到小
+    """
+    durations: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    for span in spans:
+        duration_ms = (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1_000_000
+        durations[span["name"]].append(duration_ms)
+        if span.get("status", {}).get("code") == STATUS_CODE_ERROR:
+            errors[span["name"]] += 1
+    
+    summaries = []
+    for name, values in durations.items():
+        values.sort()
+        summaries.append({
+            "name": name,
+            "count": len(values),
+            "errors": errors[name],
+            "p50_ms": round(_percentile(values, 50), 3),
+            "p99_ms": round(_percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3),
+            "total_ms": round(sum(values), 3),
+        })
+    return sorted(summaries, key=lambda summary: summary["total_ms"], reverse=True)
+
+
+def format_summary(summaries: list[dict]) -> str:
+    """彙總結果轉為文字表格"""
+    width = max([len(summary["name"]) for summary in summaries] + [4])
+    lines = [
+        f"{'span':<{width}}  {'count':>7}  {'errors':>6}  {'p50 ms':>9}  {'p99 ms':>9}  {'max ms':>9}"
+    ]
+    for summary in summaries:
+        lines.append(
+            f"{summary['name']:<{width}}  {summary['count']:>7}  {summary['errors']:>6}  "
+            f"{summary['p50_ms']:>9.3f}  {summary['p99_ms']:>9.3f}  {summary['max_ms']:>9.3f}"
+        )
+    return "\n".join(lines)
+
+
+# 全局追蹤器
+tracer = Tracer(
+    enabled=settings.tracing_enabled,
+    exporter=FileSpanExporter(settings.tracing_export_path, settings.tracing_service_name)
+)
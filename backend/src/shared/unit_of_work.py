@@ -0,0 +1,136 @@
+"""
+Shared Kernel - Unit of Work
+綁定於單一 SQLAlchemy Session 的 Unit of Work 與聚合識別映射（Identity Map）
+"""
+from typing import Any, Optional
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWork:
+    """
+    Unit of Work + Identity Map
+    
+    職責：
+    1. 識別映射：同一 Session 內，同一聚合只水合一次，重複查詢回傳記憶體中的同一實例
+    2. 追蹤新增（new）與變更（dirty）的聚合及其 ORM 實例
+    3. 變更延後至 commit 時一次 flush；儲存後直接回傳記憶體狀態，不再重新查詢
+    
+    同一 Session 內的所有 Repository 共用同一個 UnitOfWork（存放於 session.info），
+    因此 get_db 的 commit 即為整個請求的交易邊界。
+    
+    用法：
+        uow = UnitOfWork.for_session(session)
+        orm = uow.get_orm(Booking, booking.id)
+    """
+    
+    SESSION_KEY = "unit_of_work"
+    
+    def __init__(self, session: Session):
+        self.session = session
+        self._identity_map: dict[tuple[type, Any], tuple[Any, Any]] = {}
+        self._new: dict[tuple[type, Any], Any] = {}
+        self._dirty: dict[tuple[type, Any], Any] = {}
+        
+        event.listen(session, "after_commit", self._after_commit)
+        event.listen(session, "after_soft_rollback", self._after_rollback)
+    
+    @classmethod
+    def for_session(cls, session: Session) -> "UnitOfWork":
+        """取得（或建立）綁定於此 Session 的 UnitOfWork"""
+        uow = session.info.get(cls.SESSION_KEY)
+        if uow is None:
+            uow = cls(session)
+            session.info[cls.SESSION_KEY] = uow
+        return uow
+    
+    # === 識別映射 ===
+    
+    def get(self, aggregate_type: type, aggregate_id: Any) -> Optional[Any]:
+        """取得已載入的聚合（未載入回傳 None，不查詢資料庫）"""
+        entry = self._identity_map.get((aggregate_type, aggregate_id))
+        return entry[0] if entry else None
+    
+    def get_orm(self, aggregate_type: type, aggregate_id: Any) -> Optional[Any]:
+        """取得聚合對應的 ORM 實例（未載入回傳 None，不查詢資料庫）"""
+        entry = self._identity_map.get((aggregate_type, aggregate_id))
+        return entry[1] if entry else None
+    
+    def register_clean(self, aggregate: Any, orm: Any) -> Any:
+        """
+        登記由資料庫載入的聚合
+        
+        若識別映射中已有同一聚合，回傳既有實例（保證同一 Session 內身份唯一）
+        """
+        key = (type(aggregate), aggregate.id)
+        entry = self._identity_map.get(key)
+        if entry is not None:
+            return entry[0]
+        
+        self._identity_map[key] = (aggregate, orm)
+        return aggregate
+    
+    def register_new(self, aggregate: Any, orm: Any) -> None:
+        """登記新增的聚合（加入 Session，延後至 commit 時 INSERT）"""
+        self.session.add(orm)
+        key = (type(aggregate), aggregate.id)
+        self._identity_map[key] = (aggregate, orm)
+        self._new[key] = aggregate
+    
+    def register_dirty(self, aggregate: Any) -> None:
+        """登記變更的聚合（ORM 欄位已更新，延後至 commit 時 UPDATE）"""
+        key = (type(aggregate), aggregate.id)
+        if key not in self._new:
+            self._dirty[key] = aggregate
+    
+    def discard(self, aggregate_type: type, aggregate_id: Any) -> None:
+        """自識別映射移除聚合（資料列被直接修改或刪除時使用）"""
+        key = (aggregate_type, aggregate_id)
+        self._identity_map.pop(key, None)
+        self._new.pop(key, None)
+        self._dirty.pop(key, None)
+    
+    def rekey(self, aggregate: Any, old_id: Any) -> None:
+        """聚合 ID 由資料庫生成後，更新識別映射的鍵"""
+        old_key = (type(aggregate), old_id)
+        new_key = (type(aggregate), aggregate.id)
+        for mapping in (self._identity_map, self._new, self._dirty):
+            if old_key in mapping:
+                mapping[new_key] = mapping.pop(old_key)
+    
+    @property
+    def has_pending_changes(self) -> bool:
+        """是否有尚未提交的新增或變更"""
+        return bool(self._new or self._dirty)
+    
+    # === 交易邊界 ===
+    
+    def flush(self) -> None:
+        """立即寫入所有待處理變更（僅在需要資料庫生成欄位或約束檢查時使用）"""
+        self.session.flush()
+    
+    def commit(self) -> None:
+        """一次 flush 所有變更並提交交易"""
+        self.session.commit()
+    
+    def rollback(self) -> None:
+        """回滾交易並清空識別映射"""
+        self.session.rollback()
+    
+    def _after_commit(self, session: Session) -> None:
+        if self._new or self._dirty:
+            logger.debug(
+                f"UnitOfWork committed: {len(self._new)} new, {len(self._dirty)} dirty"
+            )
+        self._new.clear()
+        self._dirty.clear()
+    
+    def _after_rollback(self, session: Session, previous_transaction) -> None:
+        # 回滾後記憶體中的聚合可能與資料庫不一致，全部捨棄
+        self._identity_map.clear()
+        self._new.clear()
+        self._dirty.clear()
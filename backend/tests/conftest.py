@@ -2,6 +2,8 @@
 Pytest Configuration - 全局 Fixtures
 """
 import pytest
+from contextlib import contextmanager
+from typing import Optional
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from datetime import datetime
@@ -9,6 +11,7 @@ from decimal import Decimal
 from zoneinfo import ZoneInfo
 
 from shared.database import Base
+from shared.query_stats import install_query_hooks, preview, track_queries
 from booking.domain.models import Booking, BookingItem, Customer
 from booking.domain.value_objects import Money, Duration
 
@@ -22,6 +25,7 @@ TZ = ZoneInfo("Asia/Taipei")
 def test_engine():
     """測試資料庫引擎（Session 級別，整個測試期間共用）"""
     engine = create_engine(TEST_DATABASE_URL, echo=False)
+    install_query_hooks(engine)
     Base.metadata.create_all(bind=engine)
     yield engine
     Base.metadata.drop_all(bind=engine)
@@ -82,3 +86,33 @@ def sample_booking(sample_customer, sample_booking_item) -> Booking:
         notes="測試預約"
     )
 
+
+
+@pytest.fixture
+def query_budget():
+    """
+    SQL 查詢預算（N+1 回歸偵測）
+    
+    區塊內查詢總數超過 max_queries，或同一語句執行超過 max_repeats 次即測試失敗。
+    需先以 install_query_hooks 於使用的 engine 註冊事件（測試用 engine fixture 已註冊）。
+    
+    用法：
+        def test_list(query_budget, db_session):
+            with query_budget(max_queries=2) as stats:
+                repo.find_by_merchant(merchant_id)
+    """
+    @contextmanager
+    def budget(max_queries: Optional[int] = None, max_repeats: int = 1):
+        with track_queries("test") as stats:
+            yield stats
+        
+        problems = []
+        if max_queries is not None and stats.count > max_queries:
+            problems.append(f"查詢次數 {stats.count} 超過預算 {max_queries}")
+        for statement, times in stats.repeated(max_repeats + 1):
+            problems.append(f"疑似 N+1：{times}x {preview(statement)}")
+        
+        if problems:
+            pytest.fail("\n".join(problems))
+    
+    return budget
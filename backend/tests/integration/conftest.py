@@ -9,6 +9,7 @@ from datetime import datetime
 
 from shared.database import Base
 from shared.config import settings
+from shared.query_stats import install_query_hooks
 
 
 # PostgreSQL 連線引擎（整合測試用）
@@ -23,6 +24,7 @@ def db_engine():
         echo=False,  # 關閉 SQL 日誌（測試時太多）
         pool_pre_ping=True  # 測試連線是否有效
     )
+    install_query_hooks(engine)  # 供 query_budget fixture 統計查詢
     
     yield engine
     
@@ -0,0 +1,96 @@
+"""
+整合測試 - 預約提醒 Repository
+測試依開始時間推算到期提醒、發送權只能取得一次，以及已取消的預約不發送
+"""
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from booking.domain.models import Booking, BookingItem, BookingStatus, Customer
+from booking.domain.value_objects import Duration, Money
+from booking.infrastructure.repositories.sqlalchemy_booking_repository import (
+    SQLAlchemyBookingRepository
+)
+from merchant.infrastructure.orm.models import MerchantORM
+from notification.infrastructure.repositories.sqlalchemy_reminder_repository import (
+    SQLAlchemyReminderRepository
+)
+
+
+def add_merchant(db_session) -> str:
+    merchant = MerchantORM(
+        id=str(uuid4()),
+        slug=f"reminder-{uuid4().hex[:8]}",
+        name="提醒測試美甲",
+        status="active",
+        line_channel_access_token="token"
+    )
+    db_session.add(merchant)
+    db_session.flush()
+    return merchant.id
+
+
+def add_booking(db_session, merchant_id: str, start_at: datetime, status=BookingStatus.CONFIRMED) -> Booking:
+    booking = Booking(
+        id=str(uuid4()),
+        merchant_id=merchant_id,
+        customer=Customer(line_user_id="U123456789", name="王小明"),
+        staff_id=1,
+        start_at=start_at,
+        items=[
+            BookingItem(
+                service_id=1,
+                service_name="Gel Basic",
+                service_price=Money(Decimal("800"), "TWD"),
+                service_duration=Duration(60)
+            )
+        ],
+        status=status
+    )
+    SQLAlchemyBookingRepository(db_session).save(booking)
+    db_session.flush()
+    return booking
+
+
+class TestReminderRepository:
+    """提醒 Repository 測試"""
+    
+    def test_find_due_and_claim_once(self, db_session):
+        """✅ 測試案例：提醒時間落在視窗內的預約被載入；取得發送權後不再載入、不能再次取得"""
+        now = datetime.now(timezone.utc)
+        merchant_id = add_merchant(db_session)
+        due = add_booking(db_session, merchant_id, now + timedelta(hours=2, minutes=10))
+        later = add_booking(db_session, merchant_id, now + timedelta(hours=5))
+        repo = SQLAlchemyReminderRepository(db_session)
+        
+        reminders = repo.find_due(now, now + timedelta(hours=1), [120])
+        
+        found = {reminder.booking_id: reminder for reminder in reminders}
+        assert due.id in found
+        assert later.id not in found
+        assert found[due.id].service_name == "Gel Basic"
+        assert found[due.id].channel_access_token == "token"
+        
+        assert repo.claim(found[due.id])
+        assert not repo.claim(found[due.id])
+        repo.mark_result(found[due.id], sent=True)
+        assert due.id not in {
+            reminder.booking_id for reminder in repo.find_due(now, now + timedelta(hours=1), [120])
+        }
+    
+    def test_cancelled_booking_not_claimed(self, db_session):
+        """❌ 測試案例：已取消的預約不載入，載入後才取消的也無法取得發送權"""
+        now = datetime.now(timezone.utc)
+        merchant_id = add_merchant(db_session)
+        cancelled = add_booking(db_session, merchant_id, now + timedelta(hours=2, minutes=5), BookingStatus.CANCELLED)
+        booking = add_booking(db_session, merchant_id, now + timedelta(hours=2, minutes=5))
+        repo = SQLAlchemyReminderRepository(db_session)
+        
+        reminders = repo.find_due(now, now + timedelta(hours=1), [120], booking_ids=[cancelled.id, booking.id])
+        assert [reminder.booking_id for reminder in reminders] == [booking.id]
+        
+        booking.status = BookingStatus.CANCELLED
+        SQLAlchemyBookingRepository(db_session).save(booking)
+        db_session.flush()
+        
+        assert not repo.claim(reminders[0])
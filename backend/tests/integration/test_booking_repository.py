@@ -7,12 +7,17 @@ from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 from uuid import uuid4
 
+from sqlalchemy.orm import Session
+
 from booking.infrastructure.repositories.sqlalchemy_booking_repository import (
     SQLAlchemyBookingRepository
 )
 from booking.infrastructure.repositories.sqlalchemy_booking_lock_repository import (
     SQLAlchemyBookingLockRepository
 )
+from booking.infrastructure.repositories.sqlalchemy_booking_read_repository import (
+    SQLAlchemyBookingReadRepository
+)
 from booking.domain.models import Booking, BookingItem, Customer, BookingStatus
 from booking.domain.value_objects import Money, Duration
 
@@ -96,6 +101,40 @@ class TestBookingRepository:
         retrieved = repo.find_by_id(booking.id, test_merchant_id)
         assert retrieved.status == BookingStatus.CONFIRMED
     
+    def test_save_booking_loaded_by_other_session(self, db_session_commit):
+        """✅ 測試案例：識別映射未命中（由其他 Session 載入）的預約 save 時更新而非新增"""
+        booking = Booking(
+            id=str(uuid4()),
+            merchant_id=str(uuid4()),
+            customer=Customer(line_user_id="U123", name="Test"),
+            staff_id=1,
+            start_at=datetime(2025, 10, 16, 10, 0, tzinfo=TZ),
+            items=[
+                BookingItem(
+                    service_id=1,
+                    service_name="Test",
+                    service_price=Money(Decimal("500")),
+                    service_duration=Duration(30)
+                )
+            ],
+            status=BookingStatus.PENDING
+        )
+        SQLAlchemyBookingRepository(db_session_commit).save(booking)
+        db_session_commit.commit()
+        
+        session = Session(bind=db_session_commit.get_bind(), expire_on_commit=False)
+        try:
+            booking.confirm()
+            SQLAlchemyBookingRepository(session).save(booking)
+            session.commit()
+            
+            retrieved = SQLAlchemyBookingRepository(Session(bind=session.get_bind())).find_by_id(
+                booking.id, booking.merchant_id
+            )
+            assert retrieved.status == BookingStatus.CONFIRMED
+        finally:
+            session.close()
+    
     def test_list_bookings_by_merchant(self, db_session_commit):
         """✅ 測試案例：依商家 ID 列出預約"""
         # Arrange
@@ -217,6 +256,79 @@ class TestBookingRepository:
         assert retrieved is None
 
 
+class TestBookingReadRepository:
+    """BookingReadRepository 整合測試（讀取模型）"""
+    
+    def _make_booking(self, merchant_id: str, staff_id: int, hour: int) -> Booking:
+        return Booking(
+            id=str(uuid4()),
+            merchant_id=merchant_id,
+            customer=Customer(line_user_id="U123", name="王小明"),
+            staff_id=staff_id,
+            start_at=datetime(2025, 10, 16, hour, 0, tzinfo=TZ),
+            items=[
+                BookingItem(
+                    service_id=1,
+                    service_name="Gel Basic",
+                    service_price=Money(Decimal("800"), "TWD"),
+                    service_duration=Duration(60)
+                )
+            ],
+            status=BookingStatus.CONFIRMED
+        )
+    
+    def test_list_busy_slots_returns_time_ranges(self, db_session_commit):
+        """✅ 測試案例：時段查詢僅回傳 id 與時間範圍，排除已取消預約"""
+        # Arrange
+        repo = SQLAlchemyBookingRepository(db_session_commit)
+        read_repo = SQLAlchemyBookingReadRepository(db_session_commit)
+        merchant_id = str(uuid4())
+        
+        active = self._make_booking(merchant_id, staff_id=1, hour=10)
+        cancelled = self._make_booking(merchant_id, staff_id=1, hour=14)
+        cancelled.cancel(cancelled_by="merchant")
+        repo.save(active)
+        repo.save(cancelled)
+        db_session_commit.commit()
+        
+        # Act
+        slots = read_repo.list_busy_slots(
+            merchant_id=merchant_id,
+            staff_id=1,
+            start_at=datetime(2025, 10, 16, 0, 0, tzinfo=TZ),
+            end_at=datetime(2025, 10, 16, 23, 59, tzinfo=TZ)
+        )
+        
+        # Assert
+        assert [(s.id, s.start_at, s.end_at) for s in slots] == [
+            (active.id, active.start_at, active.end_at)
+        ]
+    
+    def test_list_rows_filters_by_staff(self, db_session_commit, query_budget):
+        """✅ 測試案例：列表資料列支援員工過濾，欄位與聚合一致"""
+        # Arrange
+        repo = SQLAlchemyBookingRepository(db_session_commit)
+        read_repo = SQLAlchemyBookingReadRepository(db_session_commit)
+        merchant_id = str(uuid4())
+        
+        booking = self._make_booking(merchant_id, staff_id=1, hour=10)
+        repo.save(booking)
+        repo.save(self._make_booking(merchant_id, staff_id=2, hour=10))
+        db_session_commit.commit()
+        
+        # Act - 單一查詢，不因資料列數量產生額外查詢
+        with query_budget(max_queries=1):
+            rows = read_repo.list_rows(merchant_id=merchant_id, staff_id=1)
+        
+        # Assert
+        assert len(rows) == 1
+        assert rows[0].id == booking.id
+        assert rows[0].status == "confirmed"
+        assert rows[0].total_price_amount == Decimal("800")
+        assert rows[0].total_duration_minutes == 60
+        assert rows[0].customer["line_user_id"] == "U123"
+
+
 class TestBookingLockRepository:
     """BookingLockRepository 整合測試（簡化版）"""
     
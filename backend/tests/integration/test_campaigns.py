@@ -0,0 +1,96 @@
+"""
+整合測試 - 推播活動 Repository
+測試收件者游標分頁去重、分批寫入推進游標、執行權只能取得一次，以及結束時依分批結果彙總
+"""
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from booking.domain.models import Booking, BookingItem, Customer
+from booking.domain.value_objects import Duration, Money
+from booking.infrastructure.repositories.sqlalchemy_booking_repository import (
+    SQLAlchemyBookingRepository
+)
+from merchant.infrastructure.orm.models import MerchantORM
+from notification.domain.models import Campaign, CampaignChunk, CampaignChunkStatus, CampaignStatus
+from notification.infrastructure.repositories.sqlalchemy_campaign_repository import (
+    SQLAlchemyCampaignRepository
+)
+
+
+def add_merchant(db_session) -> str:
+    merchant = MerchantORM(
+        id=str(uuid4()),
+        slug=f"campaign-{uuid4().hex[:8]}",
+        name="推播測試美甲",
+        status="active",
+        line_channel_access_token="token"
+    )
+    db_session.add(merchant)
+    db_session.flush()
+    return merchant.id
+
+
+def add_booking(db_session, merchant_id: str, line_user_id: str, days: int):
+    booking = Booking(
+        id=str(uuid4()),
+        merchant_id=merchant_id,
+        customer=Customer(line_user_id=line_user_id, name="王小明"),
+        staff_id=1,
+        start_at=datetime.now(timezone.utc) + timedelta(days=days),
+        items=[
+            BookingItem(
+                service_id=1,
+                service_name="Gel Basic",
+                service_price=Money(Decimal("800"), "TWD"),
+                service_duration=Duration(60)
+            )
+        ]
+    )
+    SQLAlchemyBookingRepository(db_session).save(booking)
+    db_session.flush()
+
+
+class TestCampaignRepository:
+    """推播活動 Repository 測試"""
+    
+    def test_recipients_are_distinct_and_paged_by_cursor(self, db_session):
+        """✅ 測試案例：同一客戶多次預約只收到一次；游標之後才是下一批"""
+        merchant_id = add_merchant(db_session)
+        other_merchant_id = add_merchant(db_session)
+        for days, line_user_id in enumerate(["U3", "U1", "U2", "U1", "U3"]):
+            add_booking(db_session, merchant_id, line_user_id, days + 1)
+        add_booking(db_session, other_merchant_id, "U0", 1)
+        repo = SQLAlchemyCampaignRepository(db_session)
+        
+        assert repo.next_recipients(merchant_id, None, 2) == ["U1", "U2"]
+        assert repo.next_recipients(merchant_id, "U2", 2) == ["U3"]
+    
+    def test_claim_chunks_and_finish(self, db_session):
+        """✅ 測試案例：取得執行權後不能重複取得；分批推進游標，結束時依分批結果彙總"""
+        merchant_id = add_merchant(db_session)
+        repo = SQLAlchemyCampaignRepository(db_session)
+        campaign = repo.create(Campaign(id=str(uuid4()), merchant_id=merchant_id, message="週年慶"))
+        db_session.flush()
+        
+        assert repo.claim(campaign.id, lease_seconds=300).status == CampaignStatus.RUNNING
+        assert repo.claim(campaign.id, lease_seconds=300) is None
+        
+        sent = CampaignChunk(campaign.id, 0, ["U1", "U2"], retry_key=str(uuid4()))
+        failed = CampaignChunk(campaign.id, 1, ["U3"], retry_key=str(uuid4()))
+        repo.add_chunk(sent)
+        repo.add_chunk(failed)
+        sent.attempts = failed.attempts = 1
+        repo.mark_chunk(sent, CampaignChunkStatus.SENT)
+        repo.mark_chunk(failed, CampaignChunkStatus.FAILED, "HTTP 500")
+        
+        assert [chunk.seq for chunk in repo.find_unsent_chunks(campaign.id)] == [1]
+        
+        finished = repo.finish(campaign.id)
+        assert finished.status == CampaignStatus.FAILED
+        assert (finished.chunk_count, finished.recipient_count) == (2, 3)
+        assert (finished.sent_count, finished.failed_count) == (2, 1)
+        assert finished.recipient_cursor == "U3"
+        
+        # 失敗的活動可再次取得執行權續傳
+        assert repo.claim(campaign.id, lease_seconds=300) is not None
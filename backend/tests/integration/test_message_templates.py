@@ -0,0 +1,56 @@
+"""
+整合測試 - 訊息模板 Repository
+測試商家模板 upsert 時版本遞增，以及停用的模板不再被查詢到
+"""
+from uuid import uuid4
+
+from merchant.infrastructure.orm.models import MerchantORM
+from notification.domain.models import ChannelType, MessageTemplate, NotificationType
+from notification.infrastructure.repositories.sqlalchemy_message_template_repository import (
+    SQLAlchemyMessageTemplateRepository
+)
+
+
+def add_merchant(db_session) -> str:
+    merchant = MerchantORM(id=str(uuid4()), slug=f"template-{uuid4().hex[:8]}", name="模板測試美甲", status="active")
+    db_session.add(merchant)
+    db_session.flush()
+    return merchant.id
+
+
+def make_template(merchant_id: str, text: str, is_active: bool = True) -> MessageTemplate:
+    return MessageTemplate(
+        id=0,
+        merchant_id=merchant_id,
+        template_key=NotificationType.BOOKING_CONFIRMED,
+        channel_type=ChannelType.LINE,
+        template=text,
+        is_active=is_active
+    )
+
+
+class TestMessageTemplateRepository:
+    """訊息模板 Repository 測試"""
+    
+    def test_save_bumps_version(self, db_session):
+        """✅ 測試案例：首次儲存為版本 1，覆寫後版本遞增並回傳新內容"""
+        merchant_id = add_merchant(db_session)
+        repo = SQLAlchemyMessageTemplateRepository(db_session)
+        
+        first = repo.save(make_template(merchant_id, "v1 {customer_name}"))
+        second = repo.save(make_template(merchant_id, "v2 {customer_name}"))
+        
+        assert (first.version, second.version) == (1, 2)
+        assert second.id == first.id
+        assert repo.find_active_version(merchant_id, NotificationType.BOOKING_CONFIRMED) == 2
+        assert repo.find_active(merchant_id, NotificationType.BOOKING_CONFIRMED).render(customer_name="A") == "v2 A"
+    
+    def test_inactive_template_not_found(self, db_session):
+        """❌ 測試案例：停用的模板視同未自訂"""
+        merchant_id = add_merchant(db_session)
+        repo = SQLAlchemyMessageTemplateRepository(db_session)
+        
+        repo.save(make_template(merchant_id, "停用 {customer_name}", is_active=False))
+        
+        assert repo.find_active(merchant_id, NotificationType.BOOKING_CONFIRMED) is None
+        assert repo.find_active_version(merchant_id, NotificationType.BOOKING_CONFIRMED) is None
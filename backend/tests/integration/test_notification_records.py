@@ -0,0 +1,79 @@
+"""
+整合測試 - 通知記錄 Repository
+測試批次寫入後依預約、依客戶查詢，以及分批刪除過期記錄
+"""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from merchant.infrastructure.orm.models import MerchantORM
+from notification.domain.models import ChannelType, NotificationRecord, NotificationType
+from notification.infrastructure.repositories.sqlalchemy_notification_record_repository import (
+    SQLAlchemyNotificationRecordRepository
+)
+
+
+def add_merchant(db_session) -> str:
+    merchant = MerchantORM(
+        id=str(uuid4()),
+        slug=f"records-{uuid4().hex[:8]}",
+        name="記錄測試美甲",
+        status="active"
+    )
+    db_session.add(merchant)
+    db_session.flush()
+    return merchant.id
+
+
+def make_record(merchant_id: str, booking_id, recipient: str, created_at: datetime) -> NotificationRecord:
+    record = NotificationRecord(
+        id=str(uuid4()),
+        merchant_id=merchant_id,
+        recipient=recipient,
+        channel_type=ChannelType.LINE,
+        notification_type=NotificationType.BOOKING_CONFIRMED,
+        message="預約確認",
+        booking_id=booking_id,
+        created_at=created_at
+    )
+    record.mark_as_sent()
+    return record
+
+
+class TestNotificationRecordRepository:
+    """通知記錄 Repository 測試"""
+    
+    def test_add_many_and_lookup(self, db_session):
+        """✅ 測試案例：批次寫入後可依預約、依客戶查詢（新到舊，限定商家）"""
+        now = datetime.now(timezone.utc)
+        merchant_id = add_merchant(db_session)
+        other_merchant_id = add_merchant(db_session)
+        booking_id = str(uuid4())
+        repo = SQLAlchemyNotificationRecordRepository(db_session)
+        
+        older = make_record(merchant_id, booking_id, "U1", now - timedelta(hours=1))
+        newer = make_record(merchant_id, booking_id, "U1", now)
+        other_booking = make_record(merchant_id, str(uuid4()), "U1", now)
+        other_merchant = make_record(other_merchant_id, booking_id, "U1", now)
+        repo.add_many([older, newer, other_booking, other_merchant])
+        db_session.flush()
+        
+        assert [record.id for record in repo.find_by_booking(merchant_id, booking_id)] == [newer.id, older.id]
+        assert len(repo.find_by_recipient(merchant_id, "U1")) == 3
+        assert len(repo.find_by_recipient(merchant_id, "U1", limit=1)) == 1
+        assert repo.find_by_booking(merchant_id, booking_id)[0].status == "sent"
+    
+    def test_delete_created_before(self, db_session):
+        """✅ 測試案例：只刪除早於 cutoff 的記錄，每次至多 limit 筆"""
+        now = datetime.now(timezone.utc)
+        merchant_id = add_merchant(db_session)
+        repo = SQLAlchemyNotificationRecordRepository(db_session)
+        repo.add_many(
+            [make_record(merchant_id, None, "U1", now - timedelta(days=100)) for _ in range(3)]
+            + [make_record(merchant_id, None, "U1", now)]
+        )
+        db_session.flush()
+        
+        cutoff = now - timedelta(days=90)
+        assert repo.delete_created_before(cutoff, limit=2) == 2
+        assert repo.delete_created_before(cutoff, limit=2) == 1
+        assert len(repo.find_by_recipient(merchant_id, "U1")) == 1
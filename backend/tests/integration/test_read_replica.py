@@ -0,0 +1,69 @@
+"""
+整合測試 - 唯讀庫路由
+需要兩個 PostgreSQL 實例（docker compose --profile replica up -d），
+並設定 DATABASE_REPLICA_URL；未設定時略過
+"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+
+from shared.config import settings
+from shared.database import ReadSessionRouter
+
+
+pytestmark = pytest.mark.skipif(
+    settings.database_replica_url is None,
+    reason="需要 DATABASE_REPLICA_URL（第二個 PostgreSQL 實例）"
+)
+
+
+@pytest.fixture
+def factories(db_engine):
+    """主庫 / 唯讀庫各建立一個 marker 表，標記資料來源"""
+    replica_engine = create_engine(str(settings.database_replica_url))
+    engines = {"primary": db_engine, "replica": replica_engine}
+    
+    for source, engine in engines.items():
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS read_routing_marker"))
+            conn.execute(text("CREATE TABLE read_routing_marker (source TEXT)"))
+            conn.execute(text("INSERT INTO read_routing_marker VALUES (:source)"), {"source": source})
+    
+    yield {
+        source: sessionmaker(bind=engine, expire_on_commit=False)
+        for source, engine in engines.items()
+    }
+    
+    for engine in engines.values():
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS read_routing_marker"))
+    replica_engine.dispose()
+
+
+class TestReadReplicaRouting:
+    """唯讀庫路由整合測試"""
+    
+    def test_reads_routed_to_replica(self, factories):
+        """✅ 測試案例：唯讀 Session 讀取唯讀庫"""
+        router = ReadSessionRouter(factories["primary"], factories["replica"])
+        
+        db = router.open()
+        try:
+            source = db.execute(text("SELECT source FROM read_routing_marker")).scalar()
+        finally:
+            db.close()
+        
+        assert source == "replica"
+    
+    def test_read_session_rejects_writes(self, factories):
+        """❌ 測試案例：唯讀交易中寫入會被 PostgreSQL 拒絕"""
+        router = ReadSessionRouter(factories["primary"], None)
+        
+        db = router.open()
+        try:
+            with pytest.raises(DBAPIError, match="read-only transaction"):
+                db.execute(text("INSERT INTO read_routing_marker VALUES ('write')"))
+        finally:
+            db.rollback()
+            db.close()
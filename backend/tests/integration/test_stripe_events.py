@@ -0,0 +1,63 @@
+"""
+整合測試 - Stripe webhook 事件收件匣
+測試 event id 去重、依建立時間領取待處理事件，以及同訂閱較早的待處理事件判斷
+"""
+from datetime import datetime, timedelta, timezone
+
+from billing.infrastructure.repositories.sqlalchemy_stripe_event_repository import (
+    SQLAlchemyStripeEventRepository
+)
+
+
+T0 = datetime(2025, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def record(repo, event_id, seconds, subscription_id="sub_it_1"):
+    return repo.record(
+        event_id=event_id,
+        event_type="invoice.paid",
+        stripe_subscription_id=subscription_id,
+        stripe_created_at=T0 + timedelta(seconds=seconds),
+        payload={"id": event_id}
+    )
+
+
+class TestStripeEventRepository:
+    """收件匣 Repository 測試"""
+    
+    def test_duplicate_event_ignored(self, db_session):
+        """✅ 測試案例：重送的事件不重複寫入"""
+        repo = SQLAlchemyStripeEventRepository(db_session)
+        
+        assert record(repo, "evt_it_dup", 0) is True
+        assert record(repo, "evt_it_dup", 0) is False
+    
+    def test_claim_in_created_order(self, db_session):
+        """✅ 測試案例：依 Stripe 建立時間領取；本批次外較早的待處理事件可被察覺"""
+        repo = SQLAlchemyStripeEventRepository(db_session)
+        record(repo, "evt_it_late", 10)
+        record(repo, "evt_it_early", 0)
+        
+        claimed = [event for event in repo.claim_pending(100, T0) if event.id.startswith("evt_it_")]
+        
+        assert [event.id for event in claimed] == ["evt_it_early", "evt_it_late"]
+        assert repo.has_earlier_pending("sub_it_1", claimed[1], exclude_ids=[claimed[1].id]) is True
+        assert repo.has_earlier_pending("sub_it_1", claimed[1], exclude_ids=[e.id for e in claimed]) is False
+        assert repo.try_lock_subscription("sub_it_1") is True
+    
+    def test_backed_off_event_not_claimed(self, db_session):
+        """✅ 測試案例：退避中的事件到 next_attempt_at 才被領取，仍擋住同訂閱較晚的事件"""
+        repo = SQLAlchemyStripeEventRepository(db_session)
+        record(repo, "evt_it_retry", 0, subscription_id="sub_it_2")
+        record(repo, "evt_it_next", 10, subscription_id="sub_it_2")
+        retry = next(event for event in repo.claim_pending(100, T0) if event.id == "evt_it_retry")
+        retry.next_attempt_at = T0 + timedelta(seconds=30)
+        db_session.flush()
+        
+        claimed = [event for event in repo.claim_pending(100, T0) if event.id.startswith("evt_it_")]
+        
+        assert [event.id for event in claimed] == ["evt_it_next"]
+        assert repo.has_earlier_pending("sub_it_2", claimed[0], exclude_ids=[claimed[0].id]) is True
+        assert "evt_it_retry" in {
+            event.id for event in repo.claim_pending(100, T0 + timedelta(seconds=30))
+        }
@@ -0,0 +1,72 @@
+"""
+整合測試 - 訂閱到期排程
+測試免費方案逾寬限期自動續訂、付費方案標記逾期，以及寬限期內與已被鎖定的訂閱不處理
+"""
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+from billing.domain.models import SubscriptionStatus
+from billing.infrastructure.orm.models import PlanORM, SubscriptionORM
+from billing.infrastructure.subscription_scheduler import SubscriptionScheduler
+
+
+NOW = datetime(2025, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+def get_or_create_plan(db_session, tier: str, price: str) -> PlanORM:
+    plan = db_session.query(PlanORM).filter_by(tier=tier).first()
+    if plan is None:
+        plan = PlanORM(
+            tier=tier, name=tier, price_amount=Decimal(price), price_currency="TWD",
+            billing_interval="month", features={}
+        )
+        db_session.add(plan)
+        db_session.flush()
+    return plan
+
+
+def add_subscription(db_session, plan: PlanORM, status: str, period_end: datetime, trial_end=None) -> SubscriptionORM:
+    subscription = SubscriptionORM(
+        id=str(uuid4()),
+        merchant_id=str(uuid4()),
+        plan_id=plan.id,
+        status=status,
+        current_period_start=period_end - timedelta(days=30),
+        current_period_end=period_end,
+        trial_end=trial_end
+    )
+    db_session.add(subscription)
+    db_session.flush()
+    return subscription
+
+
+class TestSubscriptionScheduler:
+    """到期排程測試"""
+    
+    def test_free_renewed_and_paid_marked_past_due(self, db_session):
+        """✅ 測試案例：免費方案續訂一個月；付費方案（含試用結束）標記逾期；寬限期內不處理"""
+        free_plan = get_or_create_plan(db_session, "free", "0")
+        paid_plan = get_or_create_plan(db_session, "pro", "1999")
+        expired_at = NOW - timedelta(days=2)
+        
+        free = add_subscription(db_session, free_plan, "active", expired_at)
+        paid = add_subscription(db_session, paid_plan, "active", expired_at)
+        trial = add_subscription(db_session, paid_plan, "trialing", NOW + timedelta(days=30), trial_end=expired_at)
+        in_grace = add_subscription(db_session, paid_plan, "active", NOW - timedelta(hours=1))
+        
+        scheduler = SubscriptionScheduler(None, grace_period=timedelta(hours=24))
+        active_result, _ = scheduler.process_batch(db_session, SubscriptionStatus.ACTIVE, NOW)
+        trial_result, _ = scheduler.process_batch(db_session, SubscriptionStatus.TRIALING, NOW)
+        db_session.expire_all()
+        
+        assert free.status == "active"
+        assert free.current_period_start == expired_at
+        assert free.current_period_end.month == (expired_at + timedelta(days=31)).month
+        assert paid.status == "past_due"
+        assert trial.status == "past_due"
+        assert in_grace.status == "active"
+        
+        changed = {event.aggregate_id for event in active_result.events + trial_result.events}
+        assert {free.id, paid.id, trial.id} <= changed
+        assert in_grace.id not in changed
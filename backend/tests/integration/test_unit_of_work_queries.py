@@ -0,0 +1,142 @@
+"""
+整合測試 - Unit of Work 查詢次數回歸測試
+確保建立預約與更新員工流程不再「儲存後重新查詢」
+"""
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from booking.application.services import BookingService
+from booking.domain.models import Customer
+from booking.infrastructure.repositories.sqlalchemy_booking_repository import (
+    SQLAlchemyBookingRepository
+)
+from booking.infrastructure.repositories.sqlalchemy_booking_lock_repository import (
+    SQLAlchemyBookingLockRepository
+)
+from catalog.application.services import CatalogService
+from catalog.domain.models import Staff
+from catalog.infrastructure.repositories.sqlalchemy_service_repository import (
+    SQLAlchemyServiceRepository
+)
+from catalog.infrastructure.repositories.sqlalchemy_staff_repository import (
+    SQLAlchemyStaffRepository
+)
+
+
+TZ = timezone(timedelta(hours=8))
+
+
+@contextmanager
+def count_statements(session):
+    """計算區塊內 Session 實際送出的 SQL（依語句類型分類）"""
+    executed: list[str] = []
+    engine = session.get_bind()
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement.split()[0].upper())
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield executed
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+class TestUnitOfWorkQueryCount:
+    """Unit of Work 查詢次數回歸測試"""
+    
+    def test_create_booking_does_not_reload(self, db_session_commit, test_merchant_id):
+        """✅ 測試案例：建立預約不再 session.get + find_by_id 重新讀取"""
+        service = BookingService(
+            SQLAlchemyBookingRepository(db_session_commit),
+            SQLAlchemyBookingLockRepository(db_session_commit)
+        )
+        
+        with count_statements(db_session_commit) as executed:
+            booking = asyncio.run(
+                service.create_booking(
+                    merchant_id=test_merchant_id,
+                    customer=Customer(line_user_id="U123", name="王小明"),
+                    staff_id=1,
+                    start_at=datetime(2025, 10, 16, 10, 0, tzinfo=TZ),
+                    items_data=[{"service_id": 1, "option_ids": []}]
+                )
+            )
+            db_session_commit.commit()
+        
+        # 重疊預檢查與 save 的主鍵查詢各 1 次 SELECT；lock INSERT（約束檢查）；commit 時 booking INSERT + lock UPDATE
+        assert executed.count("SELECT") == 2
+        assert executed.count("INSERT") == 2
+        assert executed.count("UPDATE") == 1
+        
+        # 同一 Session 內再次查詢直接命中識別映射
+        repo = SQLAlchemyBookingRepository(db_session_commit)
+        with count_statements(db_session_commit) as executed:
+            assert repo.find_by_id(booking.id, test_merchant_id) is booking
+        assert executed == []
+    
+    def test_save_aggregate_loaded_by_other_session_updates(self, db_session_commit, test_merchant_id):
+        """✅ 測試案例：識別映射未命中（由其他 Session 載入）的聚合 save 時更新，不重複新增"""
+        staff_repo = SQLAlchemyStaffRepository(db_session_commit)
+        staff = staff_repo.save(
+            Staff(id=0, merchant_id=test_merchant_id, name="Amy", skills=[1])
+        )
+        db_session_commit.commit()
+        
+        session = Session(bind=db_session_commit.get_bind(), expire_on_commit=False)
+        try:
+            staff.name = "Amy Chen"
+            with count_statements(session) as executed:
+                SQLAlchemyStaffRepository(session).save(staff)
+                session.commit()
+            
+            assert executed.count("INSERT") == 0
+            assert executed.count("UPDATE") == 1
+            assert SQLAlchemyStaffRepository(session).find_by_id(staff.id, test_merchant_id).name == "Amy Chen"
+        finally:
+            session.close()
+            staff_repo.delete(staff.id, test_merchant_id)
+            db_session_commit.commit()
+    
+    def test_update_staff_writes_once_at_commit(self, db_session_commit, test_merchant_id):
+        """✅ 測試案例：更新員工只查詢一次，變更於 commit 時一次寫入"""
+        staff_repo = SQLAlchemyStaffRepository(db_session_commit)
+        staff = staff_repo.save(
+            Staff(id=0, merchant_id=test_merchant_id, name="Amy", skills=[1])
+        )
+        db_session_commit.commit()
+        staff_id = staff.id
+        
+        # 新的 Session 模擬下一個請求
+        session = Session(bind=db_session_commit.get_bind(), expire_on_commit=False)
+        catalog_service = CatalogService(
+            SQLAlchemyServiceRepository(session),
+            SQLAlchemyStaffRepository(session)
+        )
+        
+        try:
+            with count_statements(session) as executed:
+                updated = asyncio.run(
+                    catalog_service.update_staff(
+                        staff_id=staff_id,
+                        merchant_id=test_merchant_id,
+                        name="Amy Chen",
+                        phone="0912345678"
+                    )
+                )
+                session.commit()
+            
+            assert updated.name == "Amy Chen"
+            # get_staff 1 次 SELECT；工時未變動，commit 時僅 1 次 UPDATE
+            assert executed.count("SELECT") == 1
+            assert executed.count("UPDATE") == 1
+            assert executed.count("DELETE") == 0
+            assert executed.count("INSERT") == 0
+        finally:
+            session.close()
+            staff_repo.delete(staff_id, test_merchant_id)
+            db_session_commit.commit()
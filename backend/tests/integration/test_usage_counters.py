@@ -0,0 +1,36 @@
+"""
+整合測試 - 商家每月用量計數
+測試 upsert 遞增於達上限時不再遞增、遞減不低於 0
+"""
+from datetime import date
+
+from billing.infrastructure.repositories.sqlalchemy_usage_counter_repository import (
+    SQLAlchemyUsageCounterRepository
+)
+
+
+MONTH = date(2025, 10, 1)
+
+
+class TestUsageCounterRepository:
+    """用量計數 upsert 測試"""
+    
+    def test_increment_stops_at_limit(self, db_session, test_merchant_id):
+        """✅ 測試案例：首次遞增建立計數列；達上限後返回 None 且不遞增"""
+        repo = SQLAlchemyUsageCounterRepository(db_session)
+        
+        results = [repo.increment_bookings(test_merchant_id, MONTH, limit=2) for _ in range(3)]
+        
+        assert results == [1, 2, None]
+        assert repo.get_bookings(test_merchant_id, MONTH) == 2
+    
+    def test_decrement_not_below_zero(self, db_session, test_merchant_id):
+        """✅ 測試案例：取消後歸還額度；計數不低於 0"""
+        repo = SQLAlchemyUsageCounterRepository(db_session)
+        repo.increment_bookings(test_merchant_id, MONTH, limit=10)
+        
+        repo.decrement_bookings(test_merchant_id, MONTH)
+        repo.decrement_bookings(test_merchant_id, MONTH)
+        
+        assert repo.get_bookings(test_merchant_id, MONTH) == 0
+        assert repo.get_bookings(test_merchant_id, date(2025, 11, 1)) == 0
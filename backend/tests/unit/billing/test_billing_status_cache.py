@@ -0,0 +1,181 @@
+"""
+Billing Context - Unit Tests - Billing Status Cache & Plan Catalog
+測試訂閱狀態快取（命中、依週期結束到期、狀態變更時失效）與行程內方案目錄
+"""
+import dataclasses
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+
+from billing.application.services import BillingService
+from billing.application.status_cache import (
+    BillingStatus,
+    BillingStatusCache,
+    PlanCatalog,
+    billing_status_cache
+)
+from billing.domain.exceptions import QuotaExceededError, SubscriptionPastDueError
+from billing.domain.models import Plan, PlanTier, Subscription, SubscriptionStatus
+from booking.domain.value_objects import Money
+
+
+MERCHANT_ID = "merchant-001"
+NOW = datetime(2025, 10, 16, 12, 0, tzinfo=dt_timezone.utc)
+
+
+class FakeClock:
+    """可手動推進的時鐘"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingSubscriptionRepository:
+    """記錄查詢次數的 Subscription Repository"""
+    
+    def __init__(self, subscription: Subscription):
+        self.subscription = subscription
+        self.active_lookups = 0
+    
+    def find_active_by_merchant(self, merchant_id):
+        self.active_lookups += 1
+        return self.subscription
+    
+    def find_by_id(self, subscription_id):
+        return self.subscription
+    
+    def save(self, subscription):
+        pass
+
+
+class CountingPlanRepository:
+    """記錄查詢次數的 Plan Repository（方案 9 為停用方案）"""
+    
+    def __init__(self):
+        self.plans = {
+            1: Plan(id=1, tier=PlanTier.FREE, name="免費方案", price=Money(Decimal("0"), "TWD")),
+            2: Plan(id=2, tier=PlanTier.PRO, name="專業方案", price=Money(Decimal("1999"), "TWD")),
+            9: Plan(id=9, tier=PlanTier.BASIC, name="舊方案", price=Money(Decimal("499"), "TWD"), is_active=False),
+        }
+        self.calls = 0
+    
+    def find_all_active(self):
+        self.calls += 1
+        return [plan for plan in self.plans.values() if plan.is_active]
+    
+    def find_by_id(self, plan_id):
+        self.calls += 1
+        return self.plans.get(plan_id)
+
+
+def make_subscription(status=SubscriptionStatus.ACTIVE, period_end=None) -> Subscription:
+    return Subscription(
+        id="sub-001",
+        merchant_id=MERCHANT_ID,
+        plan_id=1,
+        status=status,
+        current_period_start=NOW - timedelta(days=1),
+        current_period_end=period_end or datetime.now(dt_timezone.utc) + timedelta(days=30)
+    )
+
+
+@pytest.fixture
+def cached_service():
+    """使用全局快取（由 event_bus 失效）的 BillingService"""
+    billing_status_cache.clear()
+    subscription_repo = CountingSubscriptionRepository(make_subscription())
+    service = BillingService(
+        subscription_repo,
+        CountingPlanRepository(),
+        status_cache=billing_status_cache,
+        plan_catalog=PlanCatalog(ttl_seconds=300)
+    )
+    yield service
+    billing_status_cache.clear()
+
+
+class TestBillingStatusCache:
+    """訂閱狀態快取測試"""
+    
+    def test_repeated_validation_hits_cache(self, cached_service):
+        """✅ 測試案例：重複驗證與額度檢查只查詢一次訂閱與方案"""
+        for _ in range(3):
+            cached_service.validate_can_create_booking(MERCHANT_ID)
+        
+        with pytest.raises(QuotaExceededError):
+            cached_service.check_booking_quota(MERCHANT_ID, current_month_bookings=30)
+        
+        assert cached_service.subscription_repo.active_lookups == 1
+        assert cached_service.plan_repo.calls == 1
+    
+    def test_status_change_invalidates(self, cached_service):
+        """❌ 測試案例：標記逾期並提交後立即拒絕建立預約"""
+        cached_service.validate_can_create_booking(MERCHANT_ID)
+        
+        cached_service.mark_subscription_past_due("sub-001")
+        # 提交前快取仍有效（失效事件於提交後發布）
+        cached_service.validate_can_create_booking(MERCHANT_ID)
+        assert cached_service.subscription_repo.active_lookups == 1
+        
+        cached_service.publish_pending_events()
+        
+        with pytest.raises(SubscriptionPastDueError):
+            cached_service.validate_can_create_booking(MERCHANT_ID)
+        assert cached_service.subscription_repo.active_lookups == 2
+    
+    def test_expiry_capped_by_period_end(self):
+        """✅ 測試案例：存活時間不超過訂閱週期結束；週期已結束時不快取"""
+        clock = FakeClock()
+        cache = BillingStatusCache(ttl_seconds=60, clock=clock)
+        plan = CountingPlanRepository().plans[1]
+        
+        status = BillingStatus.of(make_subscription(period_end=NOW + timedelta(seconds=10)), plan)
+        
+        cache.set(status, now=NOW)
+        assert cache.get(MERCHANT_ID) is not None
+        
+        clock.now += 10
+        assert cache.get(MERCHANT_ID) is None
+        
+        cache.set(status, now=NOW + timedelta(seconds=20))
+        assert cache.get(MERCHANT_ID) is None
+
+
+class TestPlanCatalog:
+    """方案目錄測試"""
+    
+    def test_loaded_once_and_reloaded_after_ttl(self):
+        """✅ 測試案例：方案目錄載入一次後共用，TTL 後重新載入"""
+        clock = FakeClock()
+        catalog = PlanCatalog(ttl_seconds=300, clock=clock)
+        repo = CountingPlanRepository()
+        
+        assert catalog.get(1, repo).name == "免費方案"
+        assert [plan.id for plan in catalog.list_active(repo)] == [1, 2]
+        assert repo.calls == 1
+        
+        clock.now += 300
+        catalog.get(2, repo)
+        assert repo.calls == 2
+    
+    def test_inactive_plan_loaded_on_demand(self):
+        """✅ 測試案例：停用方案（既有訂閱仍引用）於首次查詢時補入目錄"""
+        catalog = PlanCatalog(ttl_seconds=300)
+        repo = CountingPlanRepository()
+        
+        assert catalog.get(9, repo).name == "舊方案"
+        assert catalog.get(9, repo).name == "舊方案"
+        assert catalog.get(404, repo) is None
+        assert repo.calls == 3
+        assert [plan.id for plan in catalog.list_active(repo)] == [1, 2]
+    
+    def test_plan_features_are_immutable(self):
+        """❌ 測試案例：共用的方案功能不可修改"""
+        plan = CountingPlanRepository().plans[1]
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            plan.features.max_bookings_per_month = 9999
@@ -0,0 +1,183 @@
+"""
+Billing Context - Unit Tests - Booking Quota
+測試建立預約時以用量計數佔用額度、超過額度拒絕、取消時歸還至建立當月
+"""
+import asyncio
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from api.routers.merchant_router import get_booking_service
+from billing.application.services import BillingService
+from billing.domain.exceptions import QuotaExceededError
+from billing.domain.models import Plan, PlanTier, Subscription, SubscriptionStatus, usage_month
+from booking.application.services import BookingService
+from booking.domain.models import Booking, BookingItem, Customer
+from booking.domain.value_objects import Duration, Money
+
+
+MERCHANT_ID = "merchant-001"
+TZ = dt_timezone(timedelta(hours=8))
+
+
+class InMemoryUsageCounterRepository:
+    """以 dict 模擬 merchant_usage_counters"""
+    
+    def __init__(self):
+        self.counts: dict[tuple, int] = {}
+    
+    def increment_bookings(self, merchant_id, month, limit):
+        current = self.counts.get((merchant_id, month), 0)
+        if current >= limit:
+            return None
+        self.counts[(merchant_id, month)] = current + 1
+        return current + 1
+    
+    def decrement_bookings(self, merchant_id, month):
+        key = (merchant_id, month)
+        if key in self.counts:
+            self.counts[key] = max(self.counts[key] - 1, 0)
+    
+    def get_bookings(self, merchant_id, month):
+        return self.counts.get((merchant_id, month), 0)
+
+
+class StubSubscriptionRepository:
+    def find_active_by_merchant(self, merchant_id):
+        return Subscription(
+            id="sub-001",
+            merchant_id=merchant_id,
+            plan_id=1,
+            status=SubscriptionStatus.ACTIVE,
+            current_period_end=datetime.now(dt_timezone.utc) + timedelta(days=30)
+        )
+
+
+class StubPlanRepository:
+    def find_by_id(self, plan_id):
+        return Plan(id=plan_id, tier=PlanTier.FREE, name="免費方案", price=Money(Decimal("0"), "TWD"))
+
+
+class FakeBookingRepository:
+    """以 dict 保存的 Booking Repository"""
+    
+    def __init__(self):
+        self.bookings = {}
+    
+    def save(self, booking):
+        self.bookings[booking.id] = booking
+        return booking
+    
+    def find_by_id(self, booking_id, merchant_id):
+        return self.bookings.get(booking_id)
+
+
+class NoOverlapLockRepository:
+    def find_overlapping_locks(self, merchant_id, staff_id, start_at, end_at):
+        return []
+    
+    def create_lock(self, lock):
+        return lock
+    
+    def link_to_booking(self, lock_id, booking_id):
+        return True
+
+
+@pytest.fixture
+def usage_repo():
+    return InMemoryUsageCounterRepository()
+
+
+@pytest.fixture
+def billing_service(usage_repo):
+    return BillingService(StubSubscriptionRepository(), StubPlanRepository(), usage_repo=usage_repo)
+
+
+class TestUsageMonth:
+    """計數月份測試"""
+    
+    def test_month_in_default_timezone(self):
+        """✅ 測試案例：UTC 月底 16:00 後已屬台北次月"""
+        assert usage_month(datetime(2025, 10, 31, 15, 59, tzinfo=dt_timezone.utc)) == date(2025, 10, 1)
+        assert usage_month(datetime(2025, 10, 31, 16, 0, tzinfo=dt_timezone.utc)) == date(2025, 11, 1)
+
+
+class TestBookingQuota:
+    """預約額度測試"""
+    
+    def test_reserve_until_plan_limit(self, billing_service, usage_repo):
+        """❌ 測試案例：免費方案 30 筆用完後拒絕，並回報目前用量"""
+        at = datetime(2025, 10, 16, 12, 0, tzinfo=TZ)
+        for expected in range(1, 31):
+            assert billing_service.reserve_booking_quota(MERCHANT_ID, at) == expected
+        
+        with pytest.raises(QuotaExceededError) as exc_info:
+            billing_service.reserve_booking_quota(MERCHANT_ID, at)
+        
+        assert (exc_info.value.limit, exc_info.value.current) == (30, 30)
+    
+    def test_release_goes_to_creation_month(self, billing_service, usage_repo):
+        """✅ 測試案例：取消上月建立的預約時歸還上月額度"""
+        billing_service.reserve_booking_quota(MERCHANT_ID, datetime(2025, 9, 30, 12, 0, tzinfo=TZ))
+        billing_service.reserve_booking_quota(MERCHANT_ID, datetime(2025, 10, 1, 12, 0, tzinfo=TZ))
+        
+        billing_service.release_booking_quota(MERCHANT_ID, datetime(2025, 9, 30, 12, 0, tzinfo=TZ))
+        
+        assert usage_repo.counts == {
+            (MERCHANT_ID, date(2025, 9, 1)): 0,
+            (MERCHANT_ID, date(2025, 10, 1)): 1,
+        }
+    
+    def test_booking_service_enforces_and_releases_quota(self, billing_service, usage_repo):
+        """✅ 測試案例：建立預約佔用額度、取消歸還；額度用完時拒絕建立"""
+        service = BookingService(FakeBookingRepository(), NoOverlapLockRepository(), billing_service=billing_service)
+        month = usage_month(datetime.now(dt_timezone.utc))
+        
+        async def create():
+            return await service.create_booking(
+                merchant_id=MERCHANT_ID,
+                customer=Customer(line_user_id="U123", name="王小明"),
+                staff_id=1,
+                start_at=datetime(2030, 1, 15, 10, 0, tzinfo=TZ),
+                items_data=[{"service_id": 1}]
+            )
+        
+        booking = asyncio.run(create())
+        assert usage_repo.get_bookings(MERCHANT_ID, month) == 1
+        
+        asyncio.run(service.cancel_booking(booking.id, MERCHANT_ID, "merchant"))
+        assert usage_repo.get_bookings(MERCHANT_ID, month) == 0
+        
+        usage_repo.counts[(MERCHANT_ID, month)] = 30
+        with pytest.raises(QuotaExceededError):
+            asyncio.run(create())
+    
+    def test_merchant_cancel_releases_quota(self, usage_repo):
+        """✅ 測試案例：商家端依賴組出的 BookingService 取消預約時同樣歸還額度"""
+        service = get_booking_service(Session())
+        assert service.billing_service is not None
+        service.booking_repo = FakeBookingRepository()
+        service.billing_service.usage_repo = usage_repo
+        
+        created_at = datetime(2025, 10, 16, 12, 0, tzinfo=TZ)
+        booking = Booking.create_new(
+            merchant_id=MERCHANT_ID,
+            customer=Customer(line_user_id="U123", name="王小明"),
+            staff_id=1,
+            start_at=datetime(2030, 1, 15, 10, 0, tzinfo=TZ),
+            items=[BookingItem(
+                service_id=1,
+                service_name="凝膠指甲",
+                service_price=Money(Decimal("800")),
+                service_duration=Duration(60)
+            )]
+        )
+        booking.created_at = created_at
+        service.booking_repo.save(booking)
+        usage_repo.counts[(MERCHANT_ID, usage_month(created_at))] = 5
+        
+        asyncio.run(service.cancel_booking(booking.id, MERCHANT_ID, "merchant", "商家取消"))
+        
+        assert usage_repo.get_bookings(MERCHANT_ID, usage_month(created_at)) == 4
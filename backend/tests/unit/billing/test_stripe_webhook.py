@@ -0,0 +1,345 @@
+"""
+Billing Context - Unit Tests - Stripe Webhook
+測試簽章驗證、事件解析，以及背景處理器依訂閱依序套用、重試、遲到事件與讓出被鎖定的訂閱
+"""
+import json
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+
+from billing.application.services import BillingService
+from billing.domain.exceptions import WebhookSignatureError
+from billing.domain.models import Subscription, SubscriptionStatus
+from billing.infrastructure.stripe_event_processor import StripeEventProcessor, group_by_subscription
+from billing.infrastructure.stripe_webhook import (
+    event_period_end,
+    event_subscription_id,
+    parse_event,
+    sign_payload,
+    verify_signature
+)
+from shared.event_bus import EventBus
+
+
+SECRET = "whsec_test"
+PAYLOAD = json.dumps({"id": "evt_1", "type": "invoice.paid", "created": 1700000000}).encode()
+T0 = datetime(2025, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class TestSignature:
+    """Stripe-Signature 驗證測試"""
+    
+    def test_valid_signature(self):
+        """✅ 測試案例：正確簽章通過；輪替 secret 期間任一 v1 相符即可"""
+        header = sign_payload(PAYLOAD, SECRET, timestamp=1000)
+        verify_signature(PAYLOAD, header, SECRET, now=1000)
+        
+        rotated = sign_payload(PAYLOAD, "whsec_old", timestamp=1000) + "," + header.split(",")[1]
+        verify_signature(PAYLOAD, rotated, SECRET, now=1000)
+    
+    @pytest.mark.parametrize("header, reason", [
+        (None, "缺少 Stripe-Signature"),
+        ("v1=abc", "時間戳"),
+        ("t=1000", "缺少 v1"),
+    ])
+    def test_malformed_header(self, header, reason):
+        """❌ 測試案例：缺少標頭、時間戳或簽章"""
+        with pytest.raises(WebhookSignatureError, match=reason):
+            verify_signature(PAYLOAD, header, SECRET, now=1000)
+    
+    def test_tampered_or_replayed(self):
+        """❌ 測試案例：內容被竄改或時間戳超出容許範圍"""
+        header = sign_payload(PAYLOAD, SECRET, timestamp=1000)
+        
+        with pytest.raises(WebhookSignatureError, match="簽章不符"):
+            verify_signature(PAYLOAD + b" ", header, SECRET, now=1000)
+        with pytest.raises(WebhookSignatureError, match="時間戳超出"):
+            verify_signature(PAYLOAD, header, SECRET, tolerance_seconds=300, now=1301)
+
+
+class TestParseEvent:
+    """事件解析測試"""
+    
+    def test_subscription_id_by_event_type(self):
+        """✅ 測試案例：訂閱事件取 object.id；帳單事件取 subscription（含新版 parent 位置）"""
+        assert event_subscription_id({
+            "type": "customer.subscription.deleted", "data": {"object": {"id": "sub_1"}}
+        }) == "sub_1"
+        assert event_subscription_id({
+            "type": "invoice.paid", "data": {"object": {"subscription": "sub_2"}}
+        }) == "sub_2"
+        assert event_subscription_id({
+            "type": "invoice.paid",
+            "data": {"object": {"parent": {"subscription_details": {"subscription": "sub_3"}}}}
+        }) == "sub_3"
+        assert event_subscription_id({"type": "charge.refunded", "data": {"object": {}}}) is None
+    
+    def test_period_end_for_renewal(self):
+        """✅ 測試案例：帳單取明細的最晚週期結束；訂閱事件取 current_period_end"""
+        invoice = {"type": "invoice.paid", "data": {"object": {
+            "period_end": 1000,
+            "lines": {"data": [{"period": {"end": 2000}}, {"period": {"end": 3000}}]},
+        }}}
+        subscription = {"type": "customer.subscription.updated", "data": {"object": {"current_period_end": 4000}}}
+        
+        assert event_period_end(invoice) == datetime.fromtimestamp(3000, tz=timezone.utc)
+        assert event_period_end(subscription) == datetime.fromtimestamp(4000, tz=timezone.utc)
+        assert event_period_end({"type": "invoice.paid", "data": {"object": {}}}) is None
+    
+    def test_invalid_event_rejected(self):
+        """❌ 測試案例：缺少 id / type / created 的內容不寫入收件匣"""
+        with pytest.raises(ValueError):
+            parse_event(b'{"id": "evt_1"}')
+
+
+@dataclass
+class FakeEvent:
+    """stripe_events 資料列"""
+    id: str
+    type: str
+    stripe_subscription_id: Optional[str]
+    stripe_created_at: datetime
+    received_at: datetime = T0
+    status: str = "pending"
+    attempts: int = 0
+    last_error: Optional[str] = None
+    next_attempt_at: Optional[datetime] = None
+    processed_at: Optional[datetime] = None
+    payload: dict = field(default_factory=dict)
+    
+    def __post_init__(self):
+        self.payload = self.payload or {"id": self.id, "type": self.type, "data": {"object": {}}}
+
+
+class FakeSession:
+    """只提供處理器用到的 session 介面"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    @contextmanager
+    def begin_nested(self):
+        yield
+    
+    def commit(self):
+        pass
+
+
+class FakeStripeEventRepository:
+    """以 list 模擬 stripe_events；locked 為其他 worker 持有 advisory lock 的訂閱"""
+    
+    def __init__(self, events, locked=()):
+        self.events = events
+        self.locked = set(locked)
+    
+    def claim_pending(self, limit, now):
+        pending = [
+            event for event in self.events
+            if event.status == "pending" and (event.next_attempt_at is None or event.next_attempt_at <= now)
+        ]
+        return sorted(pending, key=lambda e: (e.stripe_created_at, e.received_at, e.id))[:limit]
+    
+    def try_lock_subscription(self, stripe_subscription_id):
+        return stripe_subscription_id not in self.locked
+    
+    def has_earlier_pending(self, stripe_subscription_id, before, exclude_ids):
+        return any(
+            event.stripe_subscription_id == stripe_subscription_id
+            and event.status == "pending"
+            and event.id not in exclude_ids
+            and (event.stripe_created_at, event.received_at) < (before.stripe_created_at, before.received_at)
+            for event in self.events
+        )
+    
+    def latest_processed_at(self, stripe_subscription_id):
+        applied = [
+            event.stripe_created_at for event in self.events
+            if event.stripe_subscription_id == stripe_subscription_id and event.status == "processed"
+        ]
+        return max(applied, default=None)
+
+
+class InMemorySubscriptionRepository:
+    """記錄狀態變更順序的 Subscription Repository（sub_broken 查無訂閱）"""
+    
+    def __init__(self):
+        self.subscriptions = {
+            stripe_id: Subscription(
+                id=f"local-{stripe_id}",
+                merchant_id=f"merchant-{stripe_id}",
+                plan_id=1,
+                status=SubscriptionStatus.ACTIVE,
+                current_period_start=T0,
+                stripe_subscription_id=stripe_id
+            )
+            for stripe_id in ("sub_a", "sub_b")
+        }
+        self.history = []
+    
+    def find_by_stripe_subscription_id(self, stripe_sub_id):
+        return self.subscriptions.get(stripe_sub_id)
+    
+    def find_by_id(self, subscription_id):
+        return next(sub for sub in self.subscriptions.values() if sub.id == subscription_id)
+    
+    def save(self, subscription):
+        self.history.append((subscription.stripe_subscription_id, subscription.status))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = T0.timestamp()
+    
+    def __call__(self):
+        return self.now
+
+
+def make_processor(repo, subscription_repo, max_attempts=3, batch_size=100, clock=None):
+    return StripeEventProcessor(
+        session_factory=FakeSession,
+        batch_size=batch_size,
+        max_attempts=max_attempts,
+        retry_base_seconds=30,
+        repository_factory=lambda session: repo,
+        service_factory=lambda session: BillingService(subscription_repo, None),
+        clock=clock or FakeClock()
+    )
+
+
+def event(event_id, event_type, subscription_id, seconds):
+    return FakeEvent(event_id, event_type, subscription_id, T0 + timedelta(seconds=seconds))
+
+
+class TestStripeEventProcessor:
+    """背景事件處理測試"""
+    
+    def test_group_by_subscription_keeps_order(self):
+        """✅ 測試案例：同訂閱事件保持順序；無訂閱的事件各自一組"""
+        events = [event("1", "invoice.paid", "sub_a", 0), event("2", "x", None, 1),
+                  event("3", "invoice.paid", "sub_b", 2), event("4", "invoice.paid", "sub_a", 3)]
+        
+        assert [[e.id for e in group] for group in group_by_subscription(events)] == [["1", "4"], ["3"], ["2"]]
+    
+    def test_events_applied_in_created_order(self):
+        """✅ 測試案例：依 Stripe 建立時間套用；不處理的事件類型標記 ignored"""
+        events = [
+            event("evt_3", "customer.subscription.deleted", "sub_a", 20),
+            event("evt_1", "invoice.payment_failed", "sub_a", 0),
+            event("evt_2", "invoice.paid", "sub_a", 10),
+            event("evt_4", "charge.succeeded", None, 5),
+        ]
+        subscription_repo = InMemorySubscriptionRepository()
+        
+        done = make_processor(FakeStripeEventRepository(events), subscription_repo).process_pending()
+        
+        assert done == 4
+        assert subscription_repo.history == [
+            ("sub_a", SubscriptionStatus.PAST_DUE),
+            ("sub_a", SubscriptionStatus.ACTIVE),
+            ("sub_a", SubscriptionStatus.CANCELLED),
+        ]
+        assert {e.id: e.status for e in events}["evt_4"] == "ignored"
+    
+    def test_status_changes_published_after_commit(self, monkeypatch):
+        """✅ 測試案例：訂閱狀態變更事件（快取失效）於批次提交後才發布"""
+        log = []
+        bus = EventBus()
+        bus.subscribe("SubscriptionStatusChanged", lambda e: log.append(("published", e.payload["merchant_id"])))
+        monkeypatch.setattr("billing.application.services.event_bus", bus)
+        monkeypatch.setattr(FakeSession, "commit", lambda session: log.append(("commit", None)))
+        
+        make_processor(
+            FakeStripeEventRepository([event("evt_1", "invoice.payment_failed", "sub_a", 0)]),
+            InMemorySubscriptionRepository()
+        ).process_pending()
+        
+        assert log == [("commit", None), ("published", "merchant-sub_a")]
+    
+    def test_paid_invoice_renews_period(self):
+        """✅ 測試案例：付款成功帶有較新週期結束時間時續訂，推進 current_period_end"""
+        paid = event("evt_1", "invoice.paid", "sub_b", 0)
+        paid.payload["data"]["object"]["lines"] = {"data": [{"period": {"end": 1893456000}}]}
+        subscription_repo = InMemorySubscriptionRepository()
+        
+        make_processor(FakeStripeEventRepository([paid]), subscription_repo).process_pending()
+        
+        subscription = subscription_repo.subscriptions["sub_b"]
+        assert subscription.current_period_end == datetime.fromtimestamp(1893456000, tz=timezone.utc)
+        assert subscription.status == SubscriptionStatus.ACTIVE
+    
+    def test_stale_event_not_applied(self):
+        """✅ 測試案例：遲到的舊事件不覆蓋較新的訂閱狀態"""
+        events = [event("evt_new", "invoice.paid", "sub_a", 10)]
+        repo = FakeStripeEventRepository(events)
+        subscription_repo = InMemorySubscriptionRepository()
+        processor = make_processor(repo, subscription_repo)
+        processor.process_pending()
+        
+        late = event("evt_old", "invoice.payment_failed", "sub_a", 0)
+        events.append(late)
+        processor.process_pending()
+        
+        assert late.status == "ignored"
+        assert late.last_error.startswith("stale")
+        assert subscription_repo.history == [("sub_a", SubscriptionStatus.ACTIVE)]
+    
+    def test_failure_blocks_later_events_until_dead(self):
+        """❌ 測試案例：失敗事件重試期間同訂閱後續事件等待；達上限標記 failed 後才繼續"""
+        events = [
+            event("evt_1", "invoice.paid", "sub_missing", 0),
+            event("evt_2", "invoice.payment_failed", "sub_missing", 10),
+            event("evt_3", "invoice.payment_failed", "sub_b", 5),
+        ]
+        clock = FakeClock()
+        processor = make_processor(
+            FakeStripeEventRepository(events), InMemorySubscriptionRepository(), max_attempts=2, clock=clock
+        )
+        
+        processor.process_pending()
+        assert [(e.status, e.attempts) for e in events] == [("pending", 1), ("pending", 0), ("processed", 0)]
+        
+        # 退避期間不重試，同訂閱後續事件也繼續等待
+        processor.process_pending()
+        assert [(e.status, e.attempts) for e in events[:2]] == [("pending", 1), ("pending", 0)]
+        
+        clock.now += 30
+        processor.process_pending()
+        assert events[0].status == "failed"
+        assert events[0].attempts == 2
+        assert "訂閱不存在" in events[0].last_error
+        assert events[1].attempts == 1
+    
+    def test_retry_backs_off_exponentially(self):
+        """❌ 測試案例：滿批時失敗事件不在同一輪被反覆領取，重試間隔依 30s、60s 倍增"""
+        clock = FakeClock()
+        events = [event("evt_1", "invoice.paid", "sub_missing", 0)] + [
+            event(f"evt_ok_{i}", "invoice.paid", "sub_a", i + 1) for i in range(3)
+        ]
+        processor = make_processor(
+            FakeStripeEventRepository(events), InMemorySubscriptionRepository(), max_attempts=5, batch_size=2, clock=clock
+        )
+        
+        processor.process_pending()
+        assert events[0].attempts == 1
+        assert events[0].next_attempt_at == T0 + timedelta(seconds=30)
+        assert [e.status for e in events[1:]] == ["processed"] * 3
+        
+        clock.now += 30
+        processor.process_pending()
+        assert events[0].attempts == 2
+        assert events[0].next_attempt_at == T0 + timedelta(seconds=90)
+    
+    def test_locked_subscription_yielded(self):
+        """✅ 測試案例：其他 worker 處理中的訂閱整組讓出，留待下次"""
+        events = [event("evt_1", "invoice.paid", "sub_a", 0), event("evt_2", "invoice.paid", "sub_b", 0)]
+        repo = FakeStripeEventRepository(events, locked={"sub_a"})
+        
+        make_processor(repo, InMemorySubscriptionRepository()).process_pending()
+        
+        assert [e.status for e in events] == ["pending", "processed"]
@@ -0,0 +1,67 @@
+"""
+Billing Context - Unit Tests - Subscription Expiry Scheduler
+測試排程分批直到領取不滿一批、每批提交後才一次發布狀態變更事件
+"""
+from datetime import datetime, timezone
+
+from billing.domain.events import SubscriptionStatusChangedEvent
+from billing.domain.models import SubscriptionStatus
+from billing.infrastructure import subscription_scheduler
+from billing.infrastructure.subscription_scheduler import ScheduleResult, SubscriptionScheduler
+from shared.event_bus import EventBus
+
+
+NOW = datetime(2025, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeSession:
+    """記錄提交次數的 session"""
+    
+    def __init__(self, log):
+        self.log = log
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def commit(self):
+        self.log.append("commit")
+
+
+class ScriptedScheduler(SubscriptionScheduler):
+    """依腳本回傳每批領取結果（試用中：無到期；啟用中：兩批滿批 + 一批不滿）"""
+    
+    def __init__(self, log):
+        super().__init__(lambda: FakeSession(log), batch_size=2)
+        self.log = log
+        self.batches = {SubscriptionStatus.ACTIVE: [2, 2, 1], SubscriptionStatus.TRIALING: [0]}
+    
+    def process_batch(self, session, status, now):
+        claimed = self.batches[status].pop(0)
+        self.log.append(f"batch:{status.value}:{claimed}")
+        events = [
+            SubscriptionStatusChangedEvent.create(f"sub-{len(self.log)}-{n}", f"merchant-{n}", "past_due")
+            for n in range(claimed)
+        ]
+        return ScheduleResult(past_due=claimed, events=events), claimed
+
+
+def test_batches_until_partial_and_publishes_after_commit(monkeypatch):
+    """✅ 測試案例：滿批時繼續領取；事件於各批提交後才發布"""
+    log = []
+    bus = EventBus()
+    bus.subscribe("SubscriptionStatusChanged", lambda event: log.append("event"))
+    monkeypatch.setattr(subscription_scheduler, "event_bus", bus)
+    
+    result = ScriptedScheduler(log).run_once(NOW)
+    
+    assert result.past_due == 5
+    assert len(result.events) == 5
+    assert log == [
+        "batch:trialing:0", "commit",
+        "batch:active:2", "commit", "event", "event",
+        "batch:active:2", "commit", "event", "event",
+        "batch:active:1", "commit", "event",
+    ]
@@ -0,0 +1,214 @@
+"""
+Booking Context - Unit Tests - Availability Feed
+測試主題推播（連線上限、慢速訂閱者、跨執行緒發布）、預約事件轉時段差異訊息與 SSE 串流格式
+"""
+import asyncio
+import json
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from api.routers.public_router import _availability_events
+from booking.application.availability import AvailabilityFeed, availability_topic
+from booking.domain.events import BookingCancelledEvent, BookingConfirmedEvent
+from shared.broadcast import CLOSED, Broadcaster, PostgresNotifyBridge
+from shared.config import settings
+from shared.event_bus import EventBus
+from shared.exceptions import TooManySubscribersError
+
+
+MERCHANT_ID = "merchant-1"
+
+
+class TestBroadcaster:
+    """主題推播測試"""
+    
+    def test_publish_reaches_topic_subscribers_only(self):
+        """✅ 測試案例：只有同主題的訂閱者收到訊息"""
+        async def scenario():
+            broadcaster = Broadcaster()
+            target = broadcaster.subscribe("a")
+            other = broadcaster.subscribe("b")
+            
+            assert broadcaster.publish("a", "hello") == 1
+            return await target.get(timeout=1), await other.get(timeout=0.01)
+        
+        assert asyncio.run(scenario()) == ("hello", None)
+    
+    def test_publish_from_other_thread(self):
+        """✅ 測試案例：可由其他執行緒（LISTEN 執行緒）發布"""
+        async def scenario():
+            broadcaster = Broadcaster()
+            subscription = broadcaster.subscribe("a")
+            thread = threading.Thread(target=broadcaster.publish, args=("a", "from-thread"))
+            thread.start()
+            thread.join()
+            return await subscription.get(timeout=1)
+        
+        assert asyncio.run(scenario()) == "from-thread"
+    
+    def test_connection_limits(self):
+        """❌ 測試案例：超過每主題或總連線上限時拒絕；關閉後釋出名額"""
+        async def scenario():
+            broadcaster = Broadcaster(max_subscribers=3, max_per_topic=2)
+            first = broadcaster.subscribe("a")
+            broadcaster.subscribe("a")
+            with pytest.raises(TooManySubscribersError):
+                broadcaster.subscribe("a")
+            
+            broadcaster.subscribe("b")
+            with pytest.raises(TooManySubscribersError):
+                broadcaster.subscribe("c")
+            
+            first.close()
+            first.close()  # 重複關閉不影響計數
+            broadcaster.subscribe("c")
+            return broadcaster.subscriber_count
+        
+        assert asyncio.run(scenario()) == 3
+    
+    def test_slow_subscriber_dropped(self):
+        """✅ 測試案例：佇列滿的訂閱者被關閉並直接收到 CLOSED，其他訂閱者不受影響"""
+        async def scenario():
+            broadcaster = Broadcaster(queue_size=2)
+            slow = broadcaster.subscribe("a")
+            fast = broadcaster.subscribe("a")
+            
+            for i in range(3):
+                broadcaster.publish("a", str(i))
+                await asyncio.sleep(0)
+                await fast.get(timeout=1)
+            
+            return await slow.get(timeout=1), broadcaster.subscriber_count
+        
+        received, count = asyncio.run(scenario())
+        
+        assert received is CLOSED
+        assert count == 1
+
+
+class TestAvailabilityFeed:
+    """預約事件 → 時段差異訊息測試"""
+    
+    def test_booking_events_published_to_staff_day_topic(self):
+        """✅ 測試案例：建立 / 取消預約推播至（商家, 員工, 當地日期）主題"""
+        async def scenario():
+            bus = EventBus()
+            broadcaster = Broadcaster()
+            AvailabilityFeed(broadcaster).subscribe(bus)
+            subscription = broadcaster.subscribe(availability_topic(MERCHANT_ID, 1, date(2025, 10, 16)))
+            
+            # UTC 10/15 16:00 = 台北 10/16 00:00
+            start_at = datetime(2025, 10, 15, 16, 0, tzinfo=timezone.utc)
+            bus.publish(BookingConfirmedEvent.create("b-1", MERCHANT_ID, {
+                "staff_id": 1,
+                "start_at": start_at.isoformat(),
+                "end_at": (start_at + timedelta(hours=1)).isoformat(),
+            }))
+            bus.publish(BookingCancelledEvent.create(
+                "b-1", MERCHANT_ID, "merchant",
+                staff_id=1, start_at=start_at, end_at=start_at + timedelta(hours=1)
+            ))
+            return [json.loads(await subscription.get(timeout=1)) for _ in range(2)]
+        
+        booked, released = asyncio.run(scenario())
+        
+        assert booked == {
+            "type": "booked", "booking_id": "b-1", "staff_id": 1,
+            "date": "2025-10-16", "start_time": "00:00", "end_time": "01:00",
+        }
+        assert released["type"] == "released"
+    
+    def test_bridge_dispatch_delivers_locally(self):
+        """✅ 測試案例：LISTEN 收到的通知交給本地推播；格式錯誤時略過"""
+        async def scenario():
+            broadcaster = Broadcaster()
+            bridge = PostgresNotifyBridge("postgresql://unused", "availability", broadcaster)
+            subscription = broadcaster.subscribe("a")
+            
+            bridge.dispatch("not-json")
+            bridge.dispatch(json.dumps({"topic": "a", "message": "hello"}))
+            return await subscription.get(timeout=1)
+        
+        assert asyncio.run(scenario()) == "hello"
+    
+    
+    def test_bridge_publish_queues_and_sends_from_background_thread(self):
+        """✅ 測試案例：publish 不在呼叫端執行 NOTIFY；stop 前送出佇列中的訊息"""
+        sent = []
+        
+        class FakeConnection:
+            closed = False
+            
+            def cursor(self):
+                return self
+            
+            def __enter__(self):
+                return self
+            
+            def __exit__(self, *exc):
+                return False
+            
+            def execute(self, sql, params):
+                sent.append((threading.current_thread().name, json.loads(params[1])))
+            
+            def close(self):
+                pass
+        
+        bridge = PostgresNotifyBridge("postgresql://unused", "availability", Broadcaster())
+        bridge._connect = FakeConnection
+        bridge._run = lambda: None  # 不啟動 LISTEN
+        
+        bridge.publish("a", "hello")
+        assert sent == []
+        
+        bridge.start()
+        bridge.stop()
+        
+        assert sent == [("broadcast-notify", {"topic": "a", "message": "hello"})]
+    
+    def test_bridge_full_queue_delivers_locally(self):
+        """❌ 測試案例：傳送佇列已滿時只推播給本 worker 的訂閱者"""
+        async def scenario():
+            broadcaster = Broadcaster()
+            bridge = PostgresNotifyBridge("postgresql://unused", "availability", broadcaster, max_pending=1)
+            subscription = broadcaster.subscribe("a")
+            
+            bridge.publish("a", "queued")
+            bridge.publish("a", "local")
+            return await subscription.get(timeout=1)
+        
+        assert asyncio.run(scenario()) == "local"
+
+class TestAvailabilityStream:
+    """SSE 串流格式測試"""
+    
+    def test_stream_ready_heartbeat_message_and_resync(self, monkeypatch):
+        """✅ 測試案例：ready → 心跳 → 訊息 → 訂閱關閉時 resync 並結束"""
+        monkeypatch.setattr(settings, "sse_heartbeat_seconds", 0.01)
+        
+        async def scenario():
+            broadcaster = Broadcaster()
+            subscription = broadcaster.subscribe("a")
+            stream = _availability_events(subscription)
+            
+            chunks = [await stream.__anext__() for _ in range(3)]
+            broadcaster.publish("a", '{"type": "booked"}')
+            chunks.append(await stream.__anext__())
+            broadcaster.close_all()
+            chunks.append(await stream.__anext__())
+            with pytest.raises(StopAsyncIteration):
+                await stream.__anext__()
+            return chunks, broadcaster.subscriber_count
+        
+        chunks, count = asyncio.run(scenario())
+        
+        assert chunks == [
+            "retry: 3000\n\n",
+            "event: ready\ndata: {}\n\n",
+            ": ping\n\n",
+            'event: availability\ndata: {"type": "booked"}\n\n',
+            "event: resync\ndata: {}\n\n",
+        ]
+        assert count == 0
@@ -253,3 +253,84 @@ class TestBookingAggregate:
         with pytest.raises(InvalidStatusTransitionError):
             booking.complete()
 
+
+
+class TestBookingTotalsCache:
+    """Booking 總計快取測試"""
+    
+    def _make_item(self, price: str = "800", minutes: int = 60) -> BookingItem:
+        return BookingItem(
+            service_id=1,
+            service_name="Test",
+            service_price=Money(Decimal(price)),
+            service_duration=Duration(minutes),
+            option_ids=[],
+            option_names=[],
+            option_prices=[],
+            option_durations=[]
+        )
+    
+    def test_totals_are_memoised(self):
+        """✅ 測試案例：重複存取返回同一快取物件"""
+        booking = Booking.create_new(
+            merchant_id="test",
+            customer=Customer(line_user_id="U123"),
+            staff_id=1,
+            start_at=datetime(2025, 10, 16, 14, 0, tzinfo=TZ),
+            items=[self._make_item()]
+        )
+        
+        assert booking.total_price() is booking.total_price()
+        assert booking.total_duration() is booking.total_duration()
+        assert booking.end_at is booking.end_at
+    
+    def test_reassigning_items_invalidates_totals(self):
+        """✅ 測試案例：重新指派 items 後重新計算"""
+        booking = Booking.create_new(
+            merchant_id="test",
+            customer=Customer(line_user_id="U123"),
+            staff_id=1,
+            start_at=datetime(2025, 10, 16, 14, 0, tzinfo=TZ),
+            items=[self._make_item()]
+        )
+        assert booking.total_price().amount == Decimal("800")
+        
+        booking.items = [self._make_item(), self._make_item("500", 45)]
+        
+        assert booking.total_price().amount == Decimal("1300")
+        assert booking.total_duration().minutes == 105
+        assert booking.end_at == datetime(2025, 10, 16, 15, 45, tzinfo=TZ)
+    
+    def test_reassigning_start_at_invalidates_end_at(self):
+        """✅ 測試案例：改期後 end_at 重新計算"""
+        booking = Booking.create_new(
+            merchant_id="test",
+            customer=Customer(line_user_id="U123"),
+            staff_id=1,
+            start_at=datetime(2025, 10, 16, 14, 0, tzinfo=TZ),
+            items=[self._make_item()]
+        )
+        assert booking.end_at == datetime(2025, 10, 16, 15, 0, tzinfo=TZ)
+        
+        booking.start_at = datetime(2025, 10, 16, 16, 0, tzinfo=TZ)
+        
+        assert booking.end_at == datetime(2025, 10, 16, 17, 0, tzinfo=TZ)
+    
+    def test_booking_item_cache_invalidated_on_field_assignment(self):
+        """✅ 測試案例：BookingItem 欄位重新指派後快取失效"""
+        item = self._make_item()
+        assert item.total_price().amount == Decimal("800")
+        
+        item.option_prices = [Money(Decimal("200"))]
+        item.option_durations = [Duration(15)]
+        
+        assert item.total_price().amount == Decimal("1000")
+        assert item.total_duration().minutes == 75
+    
+    def test_booking_item_equality_ignores_cache(self):
+        """✅ 測試案例：快取不影響 BookingItem 相等性"""
+        a = self._make_item()
+        b = self._make_item()
+        a.total_price()
+        
+        assert a == b
@@ -0,0 +1,157 @@
+"""
+Booking Context - Unit Tests - Read Models
+測試查詢端讀取模型在時段計算與列表查詢中的使用
+"""
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from booking.application.services import BookingService
+from booking.domain.models import Booking, BookingItem, Customer
+from booking.domain.read_models import BookingListRow, BookingSlotRow
+from booking.domain.value_objects import Money, Duration
+
+
+TZ = timezone(timedelta(hours=8))
+MERCHANT_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+class FakeBookingRepository:
+    """僅回傳預先準備的聚合（寫入端）"""
+    
+    def __init__(self, bookings: list[Booking]):
+        self.bookings = bookings
+        self.calls = 0
+    
+    def find_by_merchant(self, merchant_id, start_date=None, end_date=None, status=None):
+        self.calls += 1
+        return list(self.bookings)
+    
+    def find_by_staff_and_date_range(self, merchant_id, staff_id, start_at, end_at):
+        self.calls += 1
+        return [b for b in self.bookings if b.staff_id == staff_id]
+
+
+class FakeBookingReadRepository:
+    """僅回傳預先準備的資料列（查詢端）"""
+    
+    def __init__(self, slots: list[BookingSlotRow], rows: list[BookingListRow] = ()):
+        self.slots = slots
+        self.rows = list(rows)
+    
+    def list_busy_slots(self, merchant_id, staff_id, start_at, end_at):
+        return list(self.slots)
+    
+    def list_rows(self, merchant_id, start_date=None, end_date=None, status=None, staff_id=None):
+        return [r for r in self.rows if not staff_id or r.staff_id == staff_id]
+
+
+def make_booking(staff_id: int, hour: int) -> Booking:
+    return Booking.create_new(
+        merchant_id=MERCHANT_ID,
+        customer=Customer(line_user_id="U123", name="王小明"),
+        staff_id=staff_id,
+        start_at=datetime(2025, 10, 16, hour, 0, tzinfo=TZ),
+        items=[
+            BookingItem(
+                service_id=1,
+                service_name="Gel Basic",
+                service_price=Money(Decimal("800"), "TWD"),
+                service_duration=Duration(60)
+            )
+        ]
+    )
+
+
+def available_starts(slots: list[dict]) -> set[str]:
+    return {s["start_time"] for s in slots if s["available"]}
+
+
+class TestSlotCalculationWithReadModel:
+    """時段計算使用讀取模型"""
+    
+    def test_read_model_slots_match_aggregate_path(self):
+        """✅ 測試案例：讀取模型與聚合路徑計算結果一致，且不查詢聚合"""
+        booking = make_booking(staff_id=1, hour=14)
+        aggregate_repo = FakeBookingRepository([booking])
+        read_repo = FakeBookingReadRepository(
+            [BookingSlotRow(booking.id, booking.start_at, booking.end_at)]
+        )
+        
+        via_aggregate = asyncio.run(
+            BookingService(aggregate_repo, None).calculate_available_slots(
+                merchant_id=MERCHANT_ID, staff_id=1, target_date=date(2025, 10, 16)
+            )
+        )
+        aggregate_calls = aggregate_repo.calls
+        via_read_model = asyncio.run(
+            BookingService(aggregate_repo, None, booking_read_repo=read_repo).calculate_available_slots(
+                merchant_id=MERCHANT_ID, staff_id=1, target_date=date(2025, 10, 16)
+            )
+        )
+        
+        assert via_read_model == via_aggregate
+        assert aggregate_repo.calls == aggregate_calls
+        assert "14:00" not in available_starts(via_read_model)
+        assert "13:30" not in available_starts(via_read_model)
+        assert "15:00" in available_starts(via_read_model)
+    
+    def test_adjacent_booking_does_not_block_slot(self):
+        """✅ 測試案例：相鄰（end == start）的預約不算重疊"""
+        read_repo = FakeBookingReadRepository([
+            BookingSlotRow(
+                "b-1",
+                datetime(2025, 10, 16, 10, 0, tzinfo=TZ),
+                datetime(2025, 10, 16, 11, 0, tzinfo=TZ)
+            )
+        ])
+        service = BookingService(FakeBookingRepository([]), None, booking_read_repo=read_repo)
+        
+        slots = asyncio.run(
+            service.calculate_available_slots(
+                merchant_id=MERCHANT_ID, staff_id=1, target_date=date(2025, 10, 16)
+            )
+        )
+        
+        assert "10:00" not in available_starts(slots)
+        assert "11:00" in available_starts(slots)
+
+
+class TestBookingListRows:
+    """列表查詢使用讀取模型"""
+    
+    def test_fallback_converts_aggregates_to_rows(self):
+        """✅ 測試案例：未注入讀取倉儲時，由聚合轉為相同格式的資料列"""
+        booking = make_booking(staff_id=2, hour=10)
+        service = BookingService(FakeBookingRepository([booking, make_booking(staff_id=3, hour=12)]), None)
+        
+        rows = asyncio.run(service.list_booking_rows(merchant_id=MERCHANT_ID, staff_id=2))
+        
+        assert len(rows) == 1
+        row = rows[0]
+        assert isinstance(row, BookingListRow)
+        assert row.id == booking.id
+        assert row.status == booking.status.value
+        assert row.end_at == booking.end_at
+        assert row.total_price_amount == Decimal("800")
+        assert row.total_duration_minutes == 60
+        assert row.customer["line_user_id"] == "U123"
+        assert row.items[0]["service_duration_minutes"] == 60
+    
+    def test_read_repository_is_preferred(self):
+        """✅ 測試案例：注入讀取倉儲時不水合聚合"""
+        aggregate_repo = FakeBookingRepository([make_booking(staff_id=1, hour=10)])
+        row = asyncio.run(
+            BookingService(aggregate_repo, None).list_booking_rows(merchant_id=MERCHANT_ID)
+        )[0]
+        read_repo = FakeBookingReadRepository([], rows=[row])
+        aggregate_repo.calls = 0
+        
+        rows = asyncio.run(
+            BookingService(aggregate_repo, None, booking_read_repo=read_repo).list_booking_rows(
+                merchant_id=MERCHANT_ID
+            )
+        )
+        
+        assert rows == [row]
+        assert aggregate_repo.calls == 0
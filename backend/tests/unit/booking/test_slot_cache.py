@@ -0,0 +1,183 @@
+"""
+Booking Context - Unit Tests - Slot Query Cache
+測試並行相同查詢合併（single-flight）、TTL 快取與預約建立 / 取消後的員工當日失效
+"""
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+
+from booking.application.services import BookingService
+from booking.application.slot_cache import SlotQueryCache
+from booking.domain.events import BookingCancelledEvent
+from shared.event_bus import EventBus
+from shared.single_flight import MISSING, SingleFlight, TTLCache
+
+
+TZ = timezone(timedelta(hours=8))
+MERCHANT_ID = "merchant-1"
+TARGET_DATE = date(2025, 10, 16)
+
+
+class CountingCompute:
+    """記錄被呼叫次數；等待 gate 後回傳結果，模擬進行中的查詢"""
+    
+    def __init__(self, result=None):
+        self.calls = 0
+        self.result = result if result is not None else [{"start_time": "10:00"}]
+        self.gate = asyncio.Event()
+    
+    async def __call__(self):
+        self.calls += 1
+        await self.gate.wait()
+        return self.result
+
+
+class TestSingleFlight:
+    """single-flight 測試"""
+    
+    def test_concurrent_calls_share_one_computation(self):
+        """✅ 測試案例：並行的相同 key 只計算一次"""
+        async def scenario():
+            flight = SingleFlight()
+            compute = CountingCompute()
+            tasks = [asyncio.create_task(flight.do("key", compute)) for _ in range(5)]
+            await asyncio.sleep(0)
+            compute.gate.set()
+            return compute, await asyncio.gather(*tasks), flight
+        
+        compute, results, flight = asyncio.run(scenario())
+        
+        assert compute.calls == 1
+        assert [shared for _, shared in results] == [False, True, True, True, True]
+        assert flight.in_flight() == 0
+    
+    def test_leader_error_propagates(self):
+        """❌ 測試案例：領頭者失敗時跟隨者收到相同例外"""
+        async def failing():
+            await asyncio.sleep(0)
+            raise RuntimeError("db down")
+        
+        async def scenario():
+            flight = SingleFlight()
+            return await asyncio.gather(
+                flight.do("key", failing), flight.do("key", failing), return_exceptions=True
+            )
+        
+        results = asyncio.run(scenario())
+        
+        assert all(isinstance(result, RuntimeError) for result in results)
+    
+    def test_leader_cancelled_follower_recomputes(self):
+        """✅ 測試案例：領頭者被取消（客戶斷線）時跟隨者自行計算"""
+        async def scenario():
+            flight = SingleFlight()
+            slow = CountingCompute()
+            leader = asyncio.create_task(flight.do("key", slow))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(flight.do("key", lambda: asyncio.sleep(0, result=["fresh"])))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+        
+        assert asyncio.run(scenario()) == (["fresh"], False)
+
+
+class TestTTLCache:
+    """TTL 快取測試"""
+    
+    def test_expiry_and_lru_limit(self):
+        """✅ 測試案例：到期後失效；超過上限淘汰最久未使用者"""
+        now = [0.0]
+        cache = TTLCache(ttl_seconds=5, max_entries=2, clock=lambda: now[0])
+        
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+        cache.set("c", 3)
+        
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        
+        now[0] = 5.0
+        assert cache.get("a") is MISSING
+
+
+class TestSlotQueryCache:
+    """時段查詢快取測試"""
+    
+    def test_cached_until_booking_changes(self):
+        """✅ 測試案例：結果快取至該員工當日有預約取消"""
+        bus = EventBus()
+        cache = SlotQueryCache(ttl_seconds=60)
+        cache.subscribe(bus)
+        compute = CountingCompute()
+        compute.gate.set()
+        
+        async def query(staff_id: int = 1):
+            return await cache.get_or_compute(MERCHANT_ID, staff_id, TARGET_DATE, (60, 30), compute)
+        
+        asyncio.run(query())
+        asyncio.run(query())
+        assert compute.calls == 1
+        
+        # 其他員工的異動不影響
+        bus.publish(BookingCancelledEvent.create(
+            "b-1", MERCHANT_ID, "merchant", staff_id=2, start_at=datetime(2025, 10, 16, 10, tzinfo=TZ)
+        ))
+        asyncio.run(query())
+        assert compute.calls == 1
+        
+        # UTC 前一天 18:00 = 台北 10/16 02:00，屬於同一員工當日
+        bus.publish(BookingCancelledEvent.create(
+            "b-2", MERCHANT_ID, "merchant", staff_id=1, start_at=datetime(2025, 10, 15, 18, tzinfo=timezone.utc)
+        ))
+        asyncio.run(query())
+        assert compute.calls == 2
+    
+    def test_result_computed_before_invalidation_not_cached(self):
+        """✅ 測試案例：計算期間發生失效時，結果不寫入快取"""
+        cache = SlotQueryCache(ttl_seconds=60)
+        compute = CountingCompute()
+        
+        async def scenario():
+            task = asyncio.create_task(
+                cache.get_or_compute(MERCHANT_ID, 1, TARGET_DATE, (60, 30), compute)
+            )
+            await asyncio.sleep(0)
+            cache.invalidate(MERCHANT_ID, 1, datetime(2025, 10, 16, 10, tzinfo=TZ))
+            compute.gate.set()
+            await task
+            await cache.get_or_compute(MERCHANT_ID, 1, TARGET_DATE, (60, 30), compute)
+        
+        asyncio.run(scenario())
+        
+        assert compute.calls == 2
+    
+    def test_zero_ttl_only_coalesces(self):
+        """✅ 測試案例：TTL 為 0 時不快取結果"""
+        cache = SlotQueryCache(ttl_seconds=0)
+        compute = CountingCompute()
+        compute.gate.set()
+        
+        for _ in range(2):
+            asyncio.run(cache.get_or_compute(MERCHANT_ID, 1, TARGET_DATE, (60, 30), compute))
+        
+        assert compute.calls == 2
+    
+    def test_booking_service_uses_cache(self):
+        """✅ 測試案例：BookingService 注入快取後重複查詢不再計算"""
+        class CountingReadRepository:
+            calls = 0
+            
+            def list_busy_slots(self, merchant_id, staff_id, start_at, end_at):
+                CountingReadRepository.calls += 1
+                return []
+        
+        service = BookingService(
+            None, None, booking_read_repo=CountingReadRepository(), slot_cache=SlotQueryCache(ttl_seconds=60)
+        )
+        
+        first = asyncio.run(service.calculate_available_slots(MERCHANT_ID, 1, TARGET_DATE))
+        second = asyncio.run(service.calculate_available_slots(MERCHANT_ID, 1, TARGET_DATE))
+        
+        assert first == second
+        assert CountingReadRepository.calls == 1
@@ -0,0 +1,282 @@
+"""
+Booking Context - Unit Tests - Slot Holds
+測試時段暫留（阻擋他人、同一客戶改選、到期視同不存在）、暫留轉為預約、事件於提交後發布與釋出事件推播
+"""
+import asyncio
+import json
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from booking.application.availability import AvailabilityFeed, availability_topic
+from booking.application.services import BookingService
+from booking.domain.events import SlotHeldEvent
+from booking.domain.exceptions import BookingOverlapError, SlotHoldError
+from booking.domain.models import BookingLock, Customer
+from shared.broadcast import Broadcaster
+from shared.event_bus import EventBus
+from shared.exceptions import PermissionDeniedError
+
+
+TZ = timezone(timedelta(hours=8))
+MERCHANT_ID = "merchant-1"
+START_AT = datetime(2030, 1, 15, 10, 0, tzinfo=TZ)
+ITEMS = [{"service_id": 1, "option_ids": []}]  # 模擬資料：60 分鐘
+
+
+class FakeBookingRepository:
+    """只記錄 save 的 Booking Repository"""
+    
+    def __init__(self):
+        self.saved = []
+    
+    def save(self, booking):
+        self.saved.append(booking)
+        return booking
+
+
+class InMemoryBookingLockRepository:
+    """以 dict 模擬 booking_locks（含 EXCLUDE 約束與暫留到期）"""
+    
+    def __init__(self):
+        self.locks: dict[str, BookingLock] = {}
+    
+    def _active(self):
+        return [lock for lock in self.locks.values() if not lock.is_expired()]
+    
+    def find_overlapping_locks(self, merchant_id, staff_id, start_at, end_at):
+        return [
+            lock for lock in self._active()
+            if lock.merchant_id == merchant_id and lock.staff_id == staff_id
+            and lock.start_at < end_at and lock.end_at > start_at
+        ]
+    
+    def create_lock(self, lock):
+        if self.find_overlapping_locks(lock.merchant_id, lock.staff_id, lock.start_at, lock.end_at):
+            raise BookingOverlapError(lock.staff_id, lock.start_at, lock.end_at)
+        self.locks[lock.id] = lock
+        return lock
+    
+    def find_by_id(self, lock_id):
+        return self.locks.get(lock_id)
+    
+    def confirm_hold(self, lock_id, start_at, end_at):
+        lock = self.locks.get(lock_id)
+        if lock is None or not lock.is_hold or lock.is_expired():
+            return False
+        self.locks[lock_id] = replace(lock, start_at=start_at, end_at=end_at, expires_at=None)
+        return True
+    
+    def link_to_booking(self, lock_id, booking_id):
+        self.locks[lock_id].booking_id = booking_id
+        return True
+    
+    def delete_lock(self, lock_id):
+        return self.locks.pop(lock_id, None) is not None
+    
+    def delete_holds_by_holder(self, merchant_id, holder_id):
+        held = [
+            lock for lock in self.locks.values()
+            if lock.is_hold and lock.merchant_id == merchant_id and lock.holder_id == holder_id
+        ]
+        for lock in held:
+            del self.locks[lock.id]
+        return held
+    
+    def expire(self, lock_id):
+        self.locks[lock_id].expires_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+
+@pytest.fixture
+def lock_repo():
+    return InMemoryBookingLockRepository()
+
+
+@pytest.fixture
+def service(lock_repo):
+    return BookingService(FakeBookingRepository(), lock_repo)
+
+
+def hold(service, holder_id, start_at=START_AT):
+    return asyncio.run(service.hold_slot(MERCHANT_ID, holder_id, 1, start_at, ITEMS))
+
+
+def book(service, holder_id, hold_id=None, start_at=START_AT):
+    return asyncio.run(service.create_booking(
+        merchant_id=MERCHANT_ID,
+        customer=Customer(line_user_id=holder_id, name="王小明"),
+        staff_id=1,
+        start_at=start_at,
+        items_data=ITEMS,
+        hold_id=hold_id,
+        holder_id=holder_id
+    ))
+
+
+class TestHoldSlot:
+    """暫留時段測試"""
+    
+    def test_hold_blocks_other_customers(self, service):
+        """❌ 測試案例：暫留期間其他客戶無法暫留或直接預約重疊時段"""
+        held = hold(service, "user-a")
+        
+        assert held.is_hold
+        assert held.end_at == START_AT + timedelta(minutes=60)
+        with pytest.raises(BookingOverlapError):
+            hold(service, "user-b", START_AT + timedelta(minutes=30))
+        with pytest.raises(BookingOverlapError):
+            book(service, "user-b")
+    
+    def test_new_hold_replaces_previous(self, service, lock_repo):
+        """✅ 測試案例：同一客戶改選時段時釋出先前的暫留"""
+        first = hold(service, "user-a")
+        second = hold(service, "user-a", START_AT + timedelta(hours=2))
+        
+        assert set(lock_repo.locks) == {second.id}
+        assert hold(service, "user-b").id != first.id
+    
+    def test_expired_hold_is_ignored(self, service, lock_repo):
+        """✅ 測試案例：到期的暫留視同不存在（不必等背景清除）"""
+        held = hold(service, "user-a")
+        lock_repo.expire(held.id)
+        
+        assert book(service, "user-b").staff_id == 1
+    
+    def test_release_only_by_holder(self, service, lock_repo):
+        """❌ 測試案例：只有暫留者本人可釋出暫留"""
+        held = hold(service, "user-a")
+        
+        with pytest.raises(PermissionDeniedError):
+            asyncio.run(service.release_hold(held.id, MERCHANT_ID, "user-b"))
+        
+        asyncio.run(service.release_hold(held.id, MERCHANT_ID, "user-a"))
+        assert lock_repo.locks == {}
+
+
+class TestConvertHold:
+    """暫留轉為預約測試"""
+    
+    def test_hold_converted_without_new_lock(self, service, lock_repo):
+        """✅ 測試案例：帶 hold_id 預約時轉為正式鎖定並關聯預約"""
+        held = hold(service, "user-a")
+        
+        booking = book(service, "user-a", hold_id=held.id)
+        
+        lock = lock_repo.locks[held.id]
+        assert len(lock_repo.locks) == 1
+        assert lock.booking_id == booking.id
+        assert lock.expires_at is None
+        assert not lock.is_hold
+    
+    def test_invalid_holds_rejected(self, service, lock_repo):
+        """❌ 測試案例：他人的暫留、不涵蓋預約時段或已到期的暫留皆拒絕"""
+        held = hold(service, "user-a")
+        
+        with pytest.raises(SlotHoldError, match="非暫留者本人"):
+            book(service, "user-b", hold_id=held.id)
+        with pytest.raises(SlotHoldError, match="不在暫留範圍內"):
+            book(service, "user-a", hold_id=held.id, start_at=START_AT + timedelta(minutes=30))
+        
+        lock_repo.expire(held.id)
+        with pytest.raises(SlotHoldError, match="已到期"):
+            book(service, "user-a", hold_id=held.id)
+
+
+class TestBookingNotification:
+    """預約確認推播測試"""
+    
+    def test_confirmation_sent_through_injected_service(self, lock_repo):
+        """✅ 測試案例：預約確認使用注入的 NotificationService，提交後（publish_pending_events）才送出"""
+        sent = []
+        
+        class FakeMerchantService:
+            def validate_merchant_active(self, merchant_id):
+                pass
+            
+            def get_merchant(self, merchant_id):
+                return {"id": merchant_id}
+        
+        class FakeNotificationService:
+            def send_booking_confirmed_notification(self, **kwargs):
+                sent.append(kwargs)
+                return True
+        
+        service = BookingService(
+            FakeBookingRepository(),
+            lock_repo,
+            merchant_service=FakeMerchantService(),
+            notification_service=FakeNotificationService()
+        )
+        
+        booking = book(service, "user-a")
+        assert sent == []
+        
+        service.publish_pending_events()
+        
+        assert [(call["booking_id"], call["merchant"]) for call in sent] == [(booking.id, {"id": MERCHANT_ID})]
+        service.publish_pending_events()
+        assert len(sent) == 1
+
+
+class TestHoldEvents:
+    """暫留事件推播測試"""
+    
+    def test_events_published_only_after_commit(self, service, monkeypatch):
+        """✅ 測試案例：暫留 / 改選 / 釋出的事件暫存，呼叫端提交後才發布"""
+        bus = EventBus()
+        published = []
+        for event_type in ("SlotHeld", "SlotHoldReleased"):
+            bus.subscribe(event_type, published.append)
+        monkeypatch.setattr("booking.application.services.event_bus", bus)
+        
+        hold(service, "user-a")
+        second = hold(service, "user-a", START_AT + timedelta(hours=2))
+        asyncio.run(service.release_hold(second.id, MERCHANT_ID, "user-a"))
+        assert published == []
+        
+        service.publish_pending_events()
+        
+        assert [(event.event_type, event.payload.get("reason")) for event in published] == [
+            ("SlotHeld", None),
+            ("SlotHoldReleased", "replaced"),
+            ("SlotHeld", None),
+            ("SlotHoldReleased", "released"),
+        ]
+        service.publish_pending_events()
+        assert len(published) == 4
+    
+    def test_booking_events_published_only_after_commit(self, service, monkeypatch):
+        """✅ 測試案例：預約建立 / 取消事件（時段快取失效、可訂狀態推播）於提交後才發布"""
+        bus = EventBus()
+        published = []
+        for event_type in ("BookingConfirmed", "BookingCancelled"):
+            bus.subscribe(event_type, published.append)
+        monkeypatch.setattr("booking.application.services.event_bus", bus)
+        service.booking_repo.find_by_id = lambda booking_id, merchant_id: booking
+        
+        booking = book(service, "user-a")
+        asyncio.run(service.cancel_booking(booking.id, MERCHANT_ID, "user-a"))
+        assert published == []
+        
+        service.publish_pending_events()
+        
+        assert [event.event_type for event in published] == ["BookingConfirmed", "BookingCancelled"]
+    
+    def test_held_event_published_to_availability_topic(self):
+        """✅ 測試案例：暫留以 held 訊息推播至員工當日主題"""
+        async def scenario():
+            bus = EventBus()
+            broadcaster = Broadcaster()
+            AvailabilityFeed(broadcaster).subscribe(bus)
+            subscription = broadcaster.subscribe(availability_topic(MERCHANT_ID, 1, START_AT.date()))
+            
+            bus.publish(SlotHeldEvent.create(
+                "hold-1", MERCHANT_ID, 1, START_AT, START_AT + timedelta(hours=1)
+            ))
+            return json.loads(await subscription.get(timeout=1))
+        
+        assert asyncio.run(scenario()) == {
+            "type": "held", "hold_id": "hold-1", "staff_id": 1,
+            "date": "2030-01-15", "start_time": "10:00", "end_time": "11:00",
+        }
@@ -60,6 +60,47 @@ class TestMoney:
         
         assert zero.amount == Decimal("0")
         assert zero.currency == "TWD"
+    
+    def test_money_stores_integer_minor_units(self):
+        """✅ 測試案例：內部以整數最小單位儲存"""
+        money = Money(amount=Decimal("800.5"), currency="TWD")
+        
+        assert money.minor == 80050
+        assert money.amount == Decimal("800.50")
+    
+    def test_money_rejects_sub_minor_precision(self):
+        """❌ 測試案例：超過兩位小數的金額拒絕建立，避免 amount 與 minor 不一致"""
+        with pytest.raises(ValueError, match="最多 2 位小數"):
+            Money(amount="1.005")
+        
+        assert Money(amount="1.500") == Money(amount="1.5")
+        assert Money(amount="1.500").amount == Money(amount="1.5").amount
+    
+    def test_money_from_minor_round_trip(self):
+        """✅ 測試案例：from_minor 與 amount 互相轉換"""
+        money = Money.from_minor(123456, "USD")
+        
+        assert money == Money(Decimal("1234.56"), "USD")
+        assert hash(money) == hash(Money(Decimal("1234.56"), "USD"))
+    
+    def test_money_multiplication_by_decimal_rounds_to_minor_unit(self):
+        """✅ 測試案例：小數乘法四捨五入至分"""
+        money = Money(amount=Decimal("10.05"))
+        
+        assert (money * Decimal("0.5")).amount == Decimal("5.03")
+    
+    def test_money_is_immutable_and_slotted(self):
+        """✅ 測試案例：Money 不可變且無 __dict__"""
+        money = Money(amount=Decimal("800"))
+        
+        with pytest.raises(AttributeError):
+            money.currency = "USD"
+        assert not hasattr(money, "__dict__")
+    
+    def test_unsupported_currency_raises(self):
+        """✅ 測試案例：不支援的幣別應拋出異常"""
+        with pytest.raises(ValueError, match="不支援的幣別"):
+            Money(amount=Decimal("100"), currency="EUR")
 
 
 class TestDuration:
@@ -98,6 +139,14 @@ class TestDuration:
         duration = Duration.from_hours(1.5)
         
         assert duration.minutes == 90
+    
+    def test_duration_is_immutable_and_hashable(self):
+        """✅ 測試案例：Duration 不可變且可雜湊"""
+        duration = Duration(minutes=30)
+        
+        with pytest.raises(AttributeError):
+            duration.minutes = 45
+        assert {Duration(30), Duration(30)} == {duration}
 
 
 class TestTimeSlot:
@@ -166,4 +215,13 @@ class TestTimeSlot:
         duration = slot.duration()
         
         assert duration.minutes == 90
-
+    
+    def test_time_slot_is_immutable(self):
+        """✅ 測試案例：TimeSlot 不可變"""
+        slot = TimeSlot(
+            start_at=datetime(2025, 10, 16, 14, 0, tzinfo=TZ),
+            end_at=datetime(2025, 10, 16, 15, 0, tzinfo=TZ)
+        )
+        
+        with pytest.raises(AttributeError):
+            slot.end_at = datetime(2025, 10, 16, 16, 0, tzinfo=TZ)
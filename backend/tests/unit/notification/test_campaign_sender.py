@@ -0,0 +1,311 @@
+"""
+Notification Context - Unit Tests - Campaign Sender
+以本機的 LINE multicast stub 測試推播活動分批、429 重送、失敗後續傳與中斷後接續
+"""
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import pytest
+
+from notification.domain.line_service import LineMessagingService
+from notification.domain.models import Campaign, CampaignChunk, CampaignChunkStatus, CampaignStatus
+from notification.infrastructure.campaign_sender import CampaignSender
+from shared.rate_limit import InMemoryRateLimitBackend
+
+
+MERCHANT_ID = "merchant-1"
+
+
+class StubLineServer:
+    """模擬 LINE multicast API：記錄請求、依設定回應錯誤，重複的 retry key 回應 409"""
+    
+    def __init__(self):
+        self.requests: list[dict] = []
+        self.accepted_keys: set[str] = set()
+        self.responses: list[int] = []  # 依序回應的錯誤狀態碼（用完後回應 200）
+        self.reject_recipient: str | None = None  # 收件者包含此 ID 時回應 500
+        self._lock = threading.Lock()
+        
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                retry_key = self.headers.get("X-Line-Retry-Key")
+                code = stub.handle(self.path, self.headers.get("Authorization"), retry_key, body)
+                self.send_response(code)
+                if code == 429:
+                    self.send_header("Retry-After", "1")
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(b"{}")
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+    
+    def handle(self, path: str, authorization: str, retry_key: str, body: dict) -> int:
+        with self._lock:
+            code = self._respond(retry_key, body)
+            self.requests.append({
+                "path": path,
+                "authorization": authorization,
+                "retry_key": retry_key,
+                "to": body["to"],
+                "messages": body["messages"],
+                "status": code,
+            })
+            return code
+    
+    def _respond(self, retry_key: str, body: dict) -> int:
+        if self.responses:
+            return self.responses.pop(0)
+        if self.reject_recipient in body["to"]:
+            return 500
+        if retry_key in self.accepted_keys:
+            return 409
+        self.accepted_keys.add(retry_key)
+        return 200
+    
+    def delivered(self) -> list[str]:
+        """實際投遞（200）的收件者"""
+        return sorted(
+            user_id
+            for request in self.requests
+            if request["status"] == 200
+            for user_id in request["to"]
+        )
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class FakeSession:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def commit(self):
+        pass
+
+
+class InMemoryCampaignStore:
+    """模擬 campaigns / campaign_chunks / bookings；以 repository_factory 提供給發送器"""
+    
+    def __init__(self, line_user_ids: list[str]):
+        self.line_user_ids = line_user_ids  # 預約中的客戶（可重複）
+        self.campaigns: dict[str, Campaign] = {}
+        self.chunks: dict[tuple[str, int], CampaignChunk] = {}
+        self.heartbeats: dict[str, datetime] = {}
+    
+    def __call__(self, session):
+        return self
+    
+    def create(self, campaign: Campaign) -> Campaign:
+        self.campaigns[campaign.id] = campaign
+        return campaign
+    
+    def find_by_id(self, campaign_id: str, merchant_id: str):
+        return self.campaigns.get(campaign_id)
+    
+    def claim(self, campaign_id: str, lease_seconds: float):
+        campaign = self.campaigns.get(campaign_id)
+        now = datetime.now(timezone.utc)
+        if campaign is None or campaign.status == CampaignStatus.COMPLETED:
+            return None
+        if campaign.status == CampaignStatus.RUNNING and (
+            self.heartbeats[campaign_id] >= now - timedelta(seconds=lease_seconds)
+        ):
+            return None
+        campaign.status = CampaignStatus.RUNNING
+        self.heartbeats[campaign_id] = now
+        return campaign
+    
+    def heartbeat(self, campaign_id: str):
+        self.heartbeats[campaign_id] = datetime.now(timezone.utc)
+    
+    def next_recipients(self, merchant_id: str, after, limit: int) -> list[str]:
+        distinct = sorted(set(self.line_user_ids))
+        return [user_id for user_id in distinct if after is None or user_id > after][:limit]
+    
+    def add_chunk(self, chunk: CampaignChunk):
+        campaign = self.campaigns[chunk.campaign_id]
+        assert (chunk.campaign_id, chunk.seq) not in self.chunks
+        self.chunks[(chunk.campaign_id, chunk.seq)] = chunk
+        campaign.recipient_cursor = chunk.recipients[-1]
+        campaign.chunk_count += 1
+        campaign.recipient_count += len(chunk.recipients)
+    
+    def mark_recipients_exhausted(self, campaign_id: str):
+        self.campaigns[campaign_id].recipients_exhausted = True
+    
+    def find_unsent_chunks(self, campaign_id: str) -> list[CampaignChunk]:
+        return [
+            chunk for (cid, _), chunk in sorted(self.chunks.items())
+            if cid == campaign_id and chunk.status != CampaignChunkStatus.SENT
+        ]
+    
+    def mark_chunk(self, chunk: CampaignChunk, status: CampaignChunkStatus, error=None):
+        stored = self.chunks[(chunk.campaign_id, chunk.seq)]
+        stored.status, stored.attempts, stored.error_message = status, chunk.attempts, error
+    
+    def finish(self, campaign_id: str, aborted: bool = False) -> Campaign:
+        campaign = self.campaigns[campaign_id]
+        chunks = [chunk for (cid, _), chunk in self.chunks.items() if cid == campaign_id]
+        campaign.sent_count = sum(len(c.recipients) for c in chunks if c.status == CampaignChunkStatus.SENT)
+        campaign.failed_count = sum(len(c.recipients) for c in chunks if c.status != CampaignChunkStatus.SENT)
+        campaign.status = CampaignStatus.FAILED if campaign.failed_count or aborted else CampaignStatus.COMPLETED
+        campaign.completed_at = datetime.now(timezone.utc)
+        return campaign
+
+
+@pytest.fixture
+def line_server():
+    server = StubLineServer()
+    yield server
+    server.close()
+
+
+def make_sender(store, line_server, sleeps=None, **kwargs) -> CampaignSender:
+    options = dict(
+        chunk_size=500,
+        concurrency=4,
+        rate_per_second=1000.0,
+        burst=1000,
+        max_attempts=3,
+        repository_factory=store,
+        token_loader=lambda merchant_id: "channel-token",
+        rate_limiter=InMemoryRateLimitBackend(),
+        sleep=(sleeps.append if sleeps is not None else lambda seconds: None)
+    )
+    options.update(kwargs)
+    return CampaignSender(
+        lambda: FakeSession(),
+        client_factory=lambda token: LineMessagingService(token, api_base_url=line_server.base_url),
+        **options
+    )
+
+
+def make_store(customers: int, duplicates: int = 0) -> InMemoryCampaignStore:
+    line_user_ids = [f"U{i:05d}" for i in range(customers)]
+    store = InMemoryCampaignStore(line_user_ids + line_user_ids[:duplicates])
+    store.create(Campaign(id="campaign-1", merchant_id=MERCHANT_ID, message="週年慶全品項 8 折"))
+    return store
+
+
+def test_sends_distinct_customers_in_multicast_chunks(line_server):
+    store = make_store(1200, duplicates=300)
+    
+    campaign = make_sender(store, line_server).run("campaign-1")
+    
+    assert campaign.status == CampaignStatus.COMPLETED
+    assert (campaign.chunk_count, campaign.recipient_count, campaign.sent_count) == (3, 1200, 1200)
+    assert sorted(len(request["to"]) for request in line_server.requests) == [200, 500, 500]
+    assert line_server.delivered() == sorted(set(store.line_user_ids))
+    
+    request = line_server.requests[0]
+    assert request["path"] == "/v2/bot/message/multicast"
+    assert request["authorization"] == "Bearer channel-token"
+    assert request["messages"] == [{"type": "text", "text": "週年慶全品項 8 折"}]
+    assert len({request["retry_key"] for request in line_server.requests}) == 3
+
+
+def test_rate_limited_chunk_is_retried_with_same_retry_key(line_server):
+    store = make_store(10)
+    line_server.responses = [429]
+    sleeps = []
+    
+    campaign = make_sender(store, line_server, sleeps=sleeps).run("campaign-1")
+    
+    assert campaign.status == CampaignStatus.COMPLETED
+    assert [request["retry_key"] for request in line_server.requests] == [store.chunks[("campaign-1", 0)].retry_key] * 2
+    assert store.chunks[("campaign-1", 0)].attempts == 2
+    assert sleeps == [1.0]  # Retry-After
+
+
+def test_failed_chunk_is_resent_on_resume_without_duplicates(line_server):
+    store = make_store(1200)
+    line_server.reject_recipient = "U00600"  # 第二個分批持續 500
+    
+    sender = make_sender(store, line_server)
+    campaign = sender.run("campaign-1")
+    
+    assert campaign.status == CampaignStatus.FAILED
+    assert (campaign.sent_count, campaign.failed_count) == (700, 500)
+    failed = store.chunks[("campaign-1", 1)]
+    assert failed.status == CampaignChunkStatus.FAILED
+    assert failed.attempts == 3
+    assert "HTTP 500" in failed.error_message
+    
+    line_server.reject_recipient = None
+    previous = len(line_server.requests)
+    campaign = sender.run("campaign-1")
+    
+    assert campaign.status == CampaignStatus.COMPLETED
+    assert (campaign.sent_count, campaign.failed_count) == (1200, 0)
+    # 只重送失敗的分批，沿用原本的 retry key；不再建立新分批
+    assert [request["retry_key"] for request in line_server.requests[previous:]] == [failed.retry_key]
+    assert campaign.chunk_count == 3
+    assert line_server.delivered() == sorted(store.line_user_ids)
+
+
+def test_resume_after_interruption_continues_from_cursor(line_server):
+    store = make_store(1200)
+    campaign = store.campaigns["campaign-1"]
+    
+    # 模擬中斷：第一個分批已送出，第二個分批已寫入但不確定是否送達，之後的收件者尚未分批
+    sent = CampaignChunk("campaign-1", 0, store.line_user_ids[:500], retry_key="key-0")
+    in_doubt = CampaignChunk("campaign-1", 1, store.line_user_ids[500:1000], retry_key="key-1")
+    store.add_chunk(sent)
+    store.add_chunk(in_doubt)
+    sent.status = CampaignChunkStatus.SENT
+    line_server.accepted_keys.update({"key-0", "key-1"})  # LINE 實際上已接受第二個分批
+    campaign.status = CampaignStatus.RUNNING
+    store.heartbeats["campaign-1"] = datetime.now(timezone.utc) - timedelta(minutes=10)
+    
+    campaign = make_sender(store, line_server, lease_seconds=300).run("campaign-1")
+    
+    assert campaign.status == CampaignStatus.COMPLETED
+    assert (campaign.chunk_count, campaign.sent_count) == (3, 1200)
+    retried, new = line_server.requests
+    assert retried["retry_key"] == "key-1"  # 409：已接受，不重複投遞
+    assert store.chunks[("campaign-1", 1)].status == CampaignChunkStatus.SENT
+    assert new["to"] == store.line_user_ids[1000:]
+
+
+def test_running_campaign_is_not_claimed_twice(line_server):
+    store = make_store(10)
+    store.campaigns["campaign-1"].status = CampaignStatus.RUNNING
+    store.heartbeats["campaign-1"] = datetime.now(timezone.utc)
+    
+    assert make_sender(store, line_server).run("campaign-1") is None
+    assert line_server.requests == []
+
+
+def test_rejected_chunk_is_not_retried(line_server):
+    store = make_store(10)
+    line_server.responses = [400]
+    
+    campaign = make_sender(store, line_server).run("campaign-1")
+    
+    assert campaign.status == CampaignStatus.FAILED
+    assert len(line_server.requests) == 1
+    assert store.chunks[("campaign-1", 0)].attempts == 1
+
+
+def test_campaign_fails_without_line_credentials(line_server):
+    store = make_store(10)
+    
+    campaign = make_sender(store, line_server, token_loader=lambda merchant_id: None).run("campaign-1")
+    
+    assert campaign.status == CampaignStatus.FAILED
+    assert line_server.requests == []
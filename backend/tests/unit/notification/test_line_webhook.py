@@ -0,0 +1,208 @@
+"""
+Notification Context - Unit Tests - LINE Webhook
+測試簽章驗證、依商家分批的事件佇列、去重發布與 webhook 端點（驗證後放入佇列、secret 更新後重新載入）
+"""
+import base64
+import hashlib
+import hmac
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routers import notification_router
+from notification.application.line_webhook import (
+    ChannelSecretStore,
+    LineEventPublisher,
+    LineWebhookQueue
+)
+from notification.domain.line_service import LineMessagingService
+from shared.event_bus import EventBus
+
+
+SECRET = "channel-secret"
+MERCHANT_ID = "00000000-0000-0000-0000-000000000001"
+
+
+class FakeClock:
+    """可手動推進的時鐘"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    return base64.b64encode(hmac.new(secret.encode(), body, hashlib.sha256).digest()).decode()
+
+
+def line_event(event_id: str, event_type: str = "follow", timestamp: int = 1000, user_id: str = "U1") -> dict:
+    return {
+        "type": event_type,
+        "webhookEventId": event_id,
+        "timestamp": timestamp,
+        "source": {"type": "user", "userId": user_id},
+        "replyToken": f"reply-{event_id}",
+    }
+
+
+class TestVerifySignature:
+    """X-Line-Signature 驗證測試"""
+    
+    def test_valid_and_invalid(self):
+        """✅ 測試案例：以原始 body 驗證；內容或 secret 不符、缺少簽章皆失敗"""
+        body = json.dumps({"events": []}).encode()
+        
+        assert LineMessagingService.verify_webhook_signature(body, sign(body), SECRET)
+        assert LineMessagingService.verify_webhook_signature(body.decode(), sign(body), SECRET)
+        assert not LineMessagingService.verify_webhook_signature(body + b" ", sign(body), SECRET)
+        assert not LineMessagingService.verify_webhook_signature(body, sign(body, "other"), SECRET)
+        assert not LineMessagingService.verify_webhook_signature(body, None, SECRET)
+
+
+class TestLineWebhookQueue:
+    """事件佇列測試"""
+    
+    def test_batches_per_merchant_in_order(self):
+        """✅ 測試案例：累積的請求依商家合併為一批，保持到達順序"""
+        batches = []
+        webhook_queue = LineWebhookQueue(lambda m, events: batches.append((m, [e["id"] for e in events])), workers=1)
+        
+        webhook_queue.submit("m1", [{"id": 1}])
+        webhook_queue.submit("m2", [{"id": 2}])
+        webhook_queue.submit("m1", [{"id": 3}, {"id": 4}])
+        webhook_queue.start().stop()
+        
+        assert batches == [("m1", [1, 3, 4]), ("m2", [2])]
+    
+    def test_full_queue_rejects(self):
+        """❌ 測試案例：佇列已滿時不阻塞、返回 False"""
+        webhook_queue = LineWebhookQueue(lambda m, events: None, workers=2, max_pending=2)
+        
+        assert webhook_queue.submit("m1", [{}]) is True
+        assert webhook_queue.submit("m1", [{}]) is False
+        assert webhook_queue.pending() == 1
+    
+    def test_handler_error_does_not_stop_worker(self):
+        """✅ 測試案例：單一商家批次失敗不影響其他商家"""
+        handled = []
+        
+        def handler(merchant_id, events):
+            if merchant_id == "bad":
+                raise RuntimeError("boom")
+            handled.append(merchant_id)
+        
+        webhook_queue = LineWebhookQueue(handler, workers=1)
+        webhook_queue.submit("bad", [{}])
+        webhook_queue.submit("good", [{}])
+        webhook_queue.start().stop()
+        
+        assert handled == ["good"]
+
+
+class TestLineEventPublisher:
+    """去重與領域事件發布測試"""
+    
+    def test_dedupes_and_maps_event_types(self):
+        """✅ 測試案例：重送事件只發布一次；依時間排序；不支援的類型略過"""
+        bus = EventBus()
+        received = []
+        for event_type in ("LineFollowed", "LineMessageReceived"):
+            bus.subscribe(event_type, received.append)
+        publisher = LineEventPublisher(bus)
+        
+        publisher(MERCHANT_ID, [
+            line_event("e2", "message", timestamp=2000),
+            line_event("e1", "follow", timestamp=1000),
+            line_event("e3", "beacon", timestamp=3000),
+        ])
+        publisher(MERCHANT_ID, [line_event("e2", "message", timestamp=2000)])
+        
+        assert [(e.event_type, e.event_id) for e in received] == [("LineFollowed", "e1"), ("LineMessageReceived", "e2")]
+        assert received[0].payload["merchant_id"] == MERCHANT_ID
+        assert received[0].aggregate_id == "U1"
+
+
+class TestLineWebhookEndpoint:
+    """webhook 端點測試"""
+    
+    @pytest.fixture
+    def client(self, monkeypatch):
+        secrets = {MERCHANT_ID: SECRET}
+        submitted = []
+        webhook_queue = LineWebhookQueue(lambda m, events: None)
+        monkeypatch.setattr(webhook_queue, "submit", lambda m, events: submitted.append((m, events)) or True)
+        monkeypatch.setattr(notification_router, "channel_secrets", ChannelSecretStore(secrets.get))
+        monkeypatch.setattr(notification_router, "line_webhook_queue", webhook_queue)
+        
+        app = FastAPI()
+        app.include_router(notification_router.router)
+        return TestClient(app), secrets, submitted
+    
+    def post(self, client, body: bytes, signature: str, merchant_id: str = MERCHANT_ID):
+        return client.post(
+            f"/notifications/webhooks/line/{merchant_id}",
+            content=body,
+            headers={"X-Line-Signature": signature}
+        )
+    
+    def test_valid_request_queued(self, client):
+        """✅ 測試案例：簽章正確時放入佇列；空 events（Verify）直接回應"""
+        test_client, _, submitted = client
+        body = json.dumps({"events": [line_event("e1")]}).encode()
+        empty = json.dumps({"events": []}).encode()
+        
+        assert self.post(test_client, body, sign(body)).status_code == 200
+        assert self.post(test_client, empty, sign(empty)).status_code == 200
+        assert submitted == [(MERCHANT_ID, [line_event("e1")])]
+    
+    def test_invalid_signature_or_unknown_merchant(self, client):
+        """❌ 測試案例：簽章不符回應 400；未設定 LINE channel 的商家回應 404"""
+        test_client, _, submitted = client
+        body = json.dumps({"events": [line_event("e1")]}).encode()
+        
+        assert self.post(test_client, body, sign(body, "wrong")).status_code == 400
+        assert self.post(test_client, body, sign(body), merchant_id="unknown").status_code == 404
+        assert submitted == []
+    
+    def test_rotated_secret_reloaded(self, client):
+        """✅ 測試案例：快取中的 secret 已過時，簽章不符時重新載入後通過"""
+        test_client, secrets, submitted = client
+        body = json.dumps({"events": [line_event("e1")]}).encode()
+        self.post(test_client, body, sign(body))
+        
+        secrets[MERCHANT_ID] = "rotated-secret"
+        
+        assert self.post(test_client, body, sign(body, "rotated-secret")).status_code == 200
+        assert len(submitted) == 2
+    
+    def test_forged_signatures_do_not_reload_every_request(self, client, monkeypatch):
+        """❌ 測試案例：連續簽章不符時，每個商家在重新載入間隔內只查詢一次"""
+        test_client, secrets, _ = client
+        loads = []
+        clock = FakeClock()
+        
+        def loader(merchant_id):
+            loads.append(merchant_id)
+            return secrets.get(merchant_id)
+        
+        monkeypatch.setattr(
+            notification_router,
+            "channel_secrets",
+            ChannelSecretStore(loader, refresh_interval_seconds=10, clock=clock)
+        )
+        body = json.dumps({"events": [line_event("e1")]}).encode()
+        
+        for _ in range(20):
+            assert self.post(test_client, body, sign(body, "forged")).status_code == 400
+        assert len(loads) == 2  # 首次載入 + 一次重新載入
+        
+        clock.advance(10)
+        self.post(test_client, body, sign(body, "forged"))
+        assert len(loads) == 3
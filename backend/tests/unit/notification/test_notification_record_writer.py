@@ -0,0 +1,140 @@
+"""
+Notification Context - Unit Tests - Notification Record Writer
+測試通知記錄分批寫入、佇列滿時捨棄、停止前寫入剩餘記錄、分批清除過期記錄，以及發送時產生記錄
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import OperationalError
+
+from merchant.domain.models import Merchant, MerchantStatus
+from notification.application.services import NotificationService
+from notification.domain.models import ChannelType, NotificationRecord, NotificationType
+from notification.infrastructure.notification_record_writer import NotificationRecordWriter
+
+
+NOW = datetime(2025, 10, 28, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeSession:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def commit(self):
+        pass
+
+
+class InMemoryRecordStore:
+    """模擬 notification_records；以 repository_factory 提供給寫入器"""
+    
+    def __init__(self):
+        self.records: list[NotificationRecord] = []
+        self.batches: list[int] = []
+        self.fail = False
+    
+    def __call__(self, session):
+        return self
+    
+    def add_many(self, records):
+        if self.fail:
+            raise OperationalError("INSERT", {}, Exception("connection lost"))
+        self.batches.append(len(records))
+        self.records.extend(records)
+    
+    def delete_created_before(self, cutoff, limit):
+        expired = [record for record in self.records if record.created_at < cutoff][:limit]
+        self.records = [record for record in self.records if record not in expired]
+        return len(expired)
+
+
+def make_record(index: int = 0, created_at: datetime = NOW) -> NotificationRecord:
+    return NotificationRecord(
+        id=f"record-{index}",
+        merchant_id="merchant-001",
+        recipient="U123456789",
+        channel_type=ChannelType.LINE,
+        notification_type=NotificationType.BOOKING_CONFIRMED,
+        message="預約確認",
+        booking_id="booking-001",
+        created_at=created_at
+    )
+
+
+def make_writer(store, **kwargs) -> NotificationRecordWriter:
+    return NotificationRecordWriter(lambda: FakeSession(), repository_factory=store, **kwargs)
+
+
+def test_flush_writes_in_batches():
+    store = InMemoryRecordStore()
+    writer = make_writer(store, batch_size=100)
+    for index in range(250):
+        assert writer.submit(make_record(index))
+    
+    assert writer.flush() == 250
+    assert store.batches == [100, 100, 50]
+    assert writer.pending() == 0
+
+
+def test_submit_drops_records_when_queue_is_full():
+    store = InMemoryRecordStore()
+    writer = make_writer(store, max_pending=2)
+    
+    assert writer.submit(make_record(1))
+    assert writer.submit(make_record(2))
+    assert not writer.submit(make_record(3))
+    assert writer.flush() == 2
+
+
+def test_failed_batch_is_dropped_without_raising():
+    store = InMemoryRecordStore()
+    store.fail = True
+    writer = make_writer(store)
+    writer.submit(make_record())
+    
+    assert writer.flush() == 0
+    assert writer.pending() == 0
+
+
+def test_stop_writes_pending_records():
+    store = InMemoryRecordStore()
+    writer = make_writer(store, flush_seconds=0.01, prune_interval_seconds=0).start()
+    for index in range(10):
+        writer.submit(make_record(index))
+    
+    writer.stop()
+    
+    assert sorted(record.id for record in store.records) == sorted(f"record-{i}" for i in range(10))
+
+
+def test_prune_deletes_expired_records_in_batches():
+    store = InMemoryRecordStore()
+    store.records = [make_record(i, NOW - timedelta(days=100)) for i in range(5)] + [make_record(9, NOW)]
+    writer = make_writer(store, retention_days=90, prune_batch_size=2)
+    
+    assert writer.prune(NOW) == 5
+    assert [record.id for record in store.records] == ["record-9"]
+
+
+def test_service_records_skipped_notification():
+    records = []
+    service = NotificationService(record_sink=records.append)
+    merchant = Merchant(id="merchant-001", slug="test-salon", name="測試美甲沙龍", status=MerchantStatus.ACTIVE)
+    
+    assert not service.send_booking_confirmed_notification(
+        merchant=merchant,
+        customer_line_user_id="U123456789",
+        customer_name="王小明",
+        booking_id="booking-001",
+        start_at="2025-10-28 14:00",
+        service_name="凝膠指甲"
+    )
+    
+    [record] = records
+    assert record.booking_id == "booking-001"
+    assert record.recipient == "U123456789"
+    assert record.notification_type == NotificationType.BOOKING_CONFIRMED
+    assert record.status == "failed"
+    assert record.error_message == "商家未配置 LINE 憑證"
+    assert "王小明" in record.message
@@ -0,0 +1,235 @@
+"""
+Notification Context - Unit Tests - Booking Reminder Scheduler
+測試提醒載入至時間輪後準時發送、重啟補發、發送權去重、取消 / 新確認預約與商家限流延後
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from booking.domain.events import BookingCancelledEvent, BookingConfirmedEvent
+from notification.domain.models import DueReminder
+from notification.infrastructure.reminder_scheduler import ReminderScheduler
+from shared.event_bus import EventBus
+from shared.rate_limit import InMemoryRateLimitBackend
+
+
+MERCHANT_ID = "merchant-1"
+NOW = datetime(2025, 10, 16, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    """可手動推進的時鐘（epoch 秒）"""
+    
+    def __init__(self):
+        self.now = NOW.timestamp()
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSession:
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+    
+    def commit(self):
+        pass
+
+
+class InMemoryReminderStore:
+    """模擬 bookings + booking_reminders；以 repository_factory 提供給排程器"""
+    
+    def __init__(self):
+        self.reminders: dict[tuple, DueReminder] = {}
+        self.results: dict[tuple, str] = {}
+        self.cancelled: set[str] = set()
+        self.find_calls = []
+    
+    def add(self, booking_id: str, start_at: datetime, offset_minutes: int = 120) -> DueReminder:
+        reminder = DueReminder(
+            booking_id=booking_id,
+            merchant_id=MERCHANT_ID,
+            offset_minutes=offset_minutes,
+            start_at=start_at,
+            line_user_id="U123",
+            customer_name="王小明",
+            service_name="凝膠指甲",
+            merchant_name="美甲店",
+            channel_access_token="token"
+        )
+        self.reminders[reminder.key] = reminder
+        return reminder
+    
+    def __call__(self, session):
+        return self
+    
+    def find_due(self, due_from, due_until, offsets_minutes, booking_ids=None):
+        self.find_calls.append((due_from, due_until, booking_ids))
+        return [
+            reminder for key, reminder in self.reminders.items()
+            if due_from <= reminder.due_at < due_until
+            and reminder.offset_minutes in offsets_minutes
+            and key not in self.results
+            and reminder.booking_id not in self.cancelled
+            and (booking_ids is None or reminder.booking_id in booking_ids)
+        ]
+    
+    def claim(self, reminder):
+        if reminder.key in self.results or reminder.booking_id in self.cancelled:
+            return False
+        self.results[reminder.key] = "sending"
+        return True
+    
+    def mark_result(self, reminder, sent, error=None):
+        self.results[reminder.key] = "sent" if sent else f"failed: {error}"
+
+
+@pytest.fixture
+def store():
+    return InMemoryReminderStore()
+
+
+def make_scheduler(store, clock, sent, **kwargs):
+    def send(reminder):
+        sent.append(reminder.key)
+        return True
+    
+    return ReminderScheduler(
+        FakeSession,
+        send=send,
+        offsets_minutes=(1440, 120),
+        window=timedelta(minutes=60),
+        catchup=timedelta(minutes=30),
+        reload_seconds=300,
+        repository_factory=store,
+        clock=clock,
+        **kwargs
+    )
+
+
+class TestReminderScheduling:
+    """提醒排程測試"""
+    
+    def test_reminder_sent_when_due(self, store):
+        """✅ 測試案例：載入視窗內的提醒於提醒時間才發送；視窗外的不載入"""
+        clock, sent = FakeClock(), []
+        scheduler = make_scheduler(store, clock, sent)
+        store.add("b-1", NOW + timedelta(hours=2, minutes=10))
+        store.add("b-2", NOW + timedelta(hours=4))
+        
+        assert scheduler.reload(clock.now) == 1
+        assert scheduler.tick(clock.now + 599) == 0
+        assert scheduler.tick(clock.now + 600) == 1
+        
+        assert scheduler.run_pending() == {"sent": 1}
+        assert sent == [("b-1", 120)]
+        assert store.results == {("b-1", 120): "sent"}
+    
+    def test_missed_reminders_sent_after_restart(self, store):
+        """✅ 測試案例：重啟後 catchup 內錯過的提醒立即補發，更早的不補發"""
+        clock, sent = FakeClock(), []
+        store.add("b-1", NOW + timedelta(hours=2) - timedelta(minutes=10))
+        store.add("b-2", NOW + timedelta(hours=2) - timedelta(minutes=45))
+        
+        scheduler = make_scheduler(store, clock, sent)
+        scheduler.reload(clock.now)
+        
+        assert scheduler.run_pending() == {"sent": 1}
+        assert sent == [("b-1", 120)]
+    
+    def test_claimed_elsewhere_not_sent(self, store):
+        """❌ 測試案例：已由其他 replica 取得發送權時不重複發送"""
+        clock, sent = FakeClock(), []
+        scheduler = make_scheduler(store, clock, sent)
+        reminder = store.add("b-1", NOW + timedelta(hours=2, minutes=1))
+        scheduler.reload(clock.now)
+        store.results[reminder.key] = "sent"
+        
+        scheduler.tick(clock.now + 60)
+        
+        assert scheduler.run_pending() == {"duplicate": 1}
+        assert sent == []
+    
+    def test_send_error_recorded_as_failed(self, store):
+        """❌ 測試案例：發送拋出例外時記錄失敗原因"""
+        def send(reminder):
+            raise RuntimeError("LINE down")
+        
+        clock = FakeClock()
+        scheduler = ReminderScheduler(FakeSession, send=send, repository_factory=store, clock=clock)
+        reminder = store.add("b-1", NOW + timedelta(hours=2))
+        scheduler.reload(clock.now)
+        
+        assert scheduler.run_pending() == {"failed": 1}
+        assert store.results[reminder.key] == "failed: LINE down"
+    
+    def test_window_must_exceed_reload_interval(self, store):
+        """❌ 測試案例：載入視窗不大於重新載入間隔時拒絕（提醒會落在兩次載入之間）"""
+        with pytest.raises(ValueError):
+            ReminderScheduler(FakeSession, send=print, window=timedelta(minutes=5), reload_seconds=300)
+
+
+class TestReminderEvents:
+    """預約事件測試"""
+    
+    def test_cancelled_booking_removed(self, store):
+        """✅ 測試案例：取消預約後移除該預約的提醒，其他預約不受影響"""
+        clock, sent = FakeClock(), []
+        scheduler = make_scheduler(store, clock, sent)
+        bus = EventBus()
+        scheduler.subscribe(bus)
+        store.add("b-1", NOW + timedelta(hours=2, minutes=30))
+        store.add("b-2", NOW + timedelta(hours=2, minutes=30))
+        scheduler.reload(clock.now)
+        assert len(scheduler) == 2
+        
+        bus.publish(BookingCancelledEvent.create("b-1", MERCHANT_ID, "customer"))
+        
+        assert len(scheduler) == 1
+        scheduler.tick(clock.now + 1800)
+        assert scheduler.run_pending() == {"sent": 1}
+        assert sent == [("b-2", 120)]
+    
+    def test_confirmed_booking_loaded_within_window(self, store):
+        """✅ 測試案例：新確認的預約只依預約 ID 補載入，沿用上次載入的視窗"""
+        clock, sent = FakeClock(), []
+        scheduler = make_scheduler(store, clock, sent)
+        bus = EventBus()
+        scheduler.subscribe(bus)
+        scheduler.reload(clock.now)
+        
+        store.add("b-1", NOW + timedelta(hours=2, minutes=20))
+        bus.publish(BookingConfirmedEvent.create("b-1", MERCHANT_ID, {}))
+        clock.now += 1
+        scheduler._reload_pending_bookings(clock.now)
+        
+        due_from, due_until, booking_ids = store.find_calls[-1]
+        assert booking_ids == {"b-1"}
+        assert due_until == NOW + timedelta(minutes=60)
+        assert len(scheduler) == 1
+
+
+class TestReminderRateLimit:
+    """商家限流測試"""
+    
+    def test_over_limit_deferred_and_sent_later(self, store):
+        """✅ 測試案例：超過商家速率的提醒延後重排，令牌補充後發送"""
+        clock, sent = FakeClock(), []
+        scheduler = make_scheduler(
+            store, clock, sent,
+            merchant_rate_per_second=1, merchant_burst=2,
+            rate_limiter=InMemoryRateLimitBackend(clock=clock)
+        )
+        for i in range(3):
+            store.add(f"b-{i}", NOW + timedelta(hours=2))
+        scheduler.reload(clock.now)
+        
+        assert scheduler.run_pending() == {"sent": 2, "deferred": 1}
+        assert len(scheduler) == 1
+        
+        clock.now += 1
+        scheduler.tick(clock.now)
+        assert scheduler.run_pending() == {"sent": 1}
+        assert len(sent) == 3
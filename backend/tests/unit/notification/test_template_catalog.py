@@ -0,0 +1,162 @@
+"""
+Notification Context - Unit Tests - Template Compilation & Catalog
+測試模板預先編譯（格式、批次渲染、拒絕屬性存取）與依 (商家, 類型, 版本) 快取的模板目錄
+"""
+import pytest
+
+from notification.application.services import NotificationService
+from notification.application.template_catalog import TemplateCatalog, default_template
+from notification.domain.models import ChannelType, MessageTemplate, NotificationType
+from notification.domain.templates import CompiledTemplate
+
+
+MERCHANT_ID = "merchant-001"
+
+
+class FakeClock:
+    """可手動推進的時鐘"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingTemplateRepository:
+    """記錄查詢次數的 MessageTemplate Repository"""
+    
+    def __init__(self):
+        self.templates: dict[tuple, MessageTemplate] = {}
+        self.version_lookups = 0
+        self.loads = 0
+    
+    def find_active_version(self, merchant_id, template_key, channel_type=ChannelType.LINE):
+        self.version_lookups += 1
+        template = self.templates.get((merchant_id, template_key))
+        return template.version if template else None
+    
+    def find_active(self, merchant_id, template_key, channel_type=ChannelType.LINE):
+        self.loads += 1
+        return self.templates.get((merchant_id, template_key))
+    
+    def save(self, template):
+        previous = self.templates.get((template.merchant_id, template.template_key))
+        saved = MessageTemplate(
+            id=1,
+            merchant_id=template.merchant_id,
+            template_key=template.template_key,
+            channel_type=template.channel_type,
+            template=template.template,
+            version=previous.version + 1 if previous else 1
+        )
+        self.templates[(template.merchant_id, template.template_key)] = saved
+        return saved
+
+
+def make_template(text: str) -> MessageTemplate:
+    return MessageTemplate(
+        id=0,
+        merchant_id=MERCHANT_ID,
+        template_key=NotificationType.BOOKING_CONFIRMED,
+        channel_type=ChannelType.LINE,
+        template=text
+    )
+
+
+class TestCompiledTemplate:
+    """模板編譯測試"""
+    
+    def test_render_matches_str_format(self):
+        """✅ 測試案例：渲染結果與 str.format 相同（跳脫大括號、格式、轉換）"""
+        source = "{{預約}} {customer_name!r} 合計 {total:,.0f} 元，{customer_name}"
+        variables = {"customer_name": "王小明", "total": 12345.6}
+        
+        compiled = CompiledTemplate(source)
+        
+        assert compiled.render(variables) == source.format(**variables)
+        assert compiled.fields == {"customer_name", "total"}
+    
+    def test_render_many_with_common_variables(self):
+        """✅ 測試案例：批次渲染，共用變數可被個別變數覆寫"""
+        compiled = CompiledTemplate("{merchant_name}：{customer_name} 您好")
+        
+        rendered = compiled.render_many(
+            [{"customer_name": "A"}, {"customer_name": "B", "merchant_name": "分店"}],
+            merchant_name="美甲店"
+        )
+        
+        assert rendered == ["美甲店：A 您好", "分店：B 您好"]
+    
+    @pytest.mark.parametrize("source", ["{x.__class__}", "{x[0]}", "{0}", "{}", "{x:{y}}", "{x!z}", "{"])
+    def test_unsafe_or_invalid_placeholders_rejected(self, source):
+        """❌ 測試案例：屬性 / 索引存取、位置參數與格式錯誤於建立模板時拒絕"""
+        with pytest.raises(ValueError):
+            make_template(source)
+    
+    def test_missing_variable_raises_key_error(self):
+        """❌ 測試案例：缺少變數時拋出 KeyError"""
+        with pytest.raises(KeyError):
+            make_template("{customer_name}").render()
+
+
+class TestTemplateCatalog:
+    """模板目錄測試"""
+    
+    def test_default_without_override(self):
+        """✅ 測試案例：未自訂時使用共用的預設模板，並快取「未自訂」"""
+        repo = CountingTemplateRepository()
+        catalog = TemplateCatalog(ttl_seconds=60)
+        
+        first = catalog.get(MERCHANT_ID, NotificationType.BOOKING_CONFIRMED, repo)
+        second = catalog.get(MERCHANT_ID, NotificationType.BOOKING_CONFIRMED, repo)
+        
+        assert first is second is default_template(NotificationType.BOOKING_CONFIRMED)
+        assert repo.version_lookups == 1
+        assert repo.loads == 0
+    
+    def test_compiled_template_reused_until_version_changes(self):
+        """✅ 測試案例：TTL 到期後只查詢版本，版本未變沿用已編譯模板；版本改變才重新載入"""
+        clock = FakeClock()
+        repo = CountingTemplateRepository()
+        repo.save(make_template("v1 {customer_name}"))
+        catalog = TemplateCatalog(ttl_seconds=60, clock=clock)
+        
+        first = catalog.get(MERCHANT_ID, NotificationType.BOOKING_CONFIRMED, repo)
+        clock.now += 60
+        assert catalog.get(MERCHANT_ID, NotificationType.BOOKING_CONFIRMED, repo) is first
+        assert (repo.version_lookups, repo.loads) == (2, 1)
+        
+        repo.save(make_template("v2 {customer_name}"))
+        assert catalog.get(MERCHANT_ID, NotificationType.BOOKING_CONFIRMED, repo) is first
+        clock.now += 60
+        
+        assert catalog.get(MERCHANT_ID, NotificationType.BOOKING_CONFIRMED, repo).render(customer_name="A") == "v2 A"
+        assert repo.loads == 2
+    
+    def test_lru_evicts_least_recently_used(self):
+        """✅ 測試案例：已編譯模板超過上限時淘汰最久未使用者"""
+        repo = CountingTemplateRepository()
+        catalog = TemplateCatalog(ttl_seconds=0, max_entries=2)
+        for merchant_id in ("m-1", "m-2", "m-3"):
+            template = make_template(f"{merchant_id} {{customer_name}}")
+            template.merchant_id = merchant_id
+            repo.save(template)
+            catalog.get(merchant_id, NotificationType.BOOKING_CONFIRMED, repo)
+        
+        catalog.get("m-1", NotificationType.BOOKING_CONFIRMED, repo)
+        
+        assert repo.loads == 4
+    
+    def test_service_uses_merchant_override_after_save(self):
+        """✅ 測試案例：NotificationService 儲存模板後本 worker 立即使用新版本"""
+        repo = CountingTemplateRepository()
+        service = NotificationService(repo, template_catalog=TemplateCatalog(ttl_seconds=60))
+        
+        assert service._get_template(NotificationType.BOOKING_CONFIRMED, MERCHANT_ID).id == 0
+        
+        saved = service.save_template(make_template("自訂 {customer_name}"))
+        template = service._get_template(NotificationType.BOOKING_CONFIRMED, MERCHANT_ID)
+        
+        assert template.version == saved.version == 1
+        assert template.render(customer_name="王小明") == "自訂 王小明"
@@ -0,0 +1,92 @@
+"""
+API - Unit Tests - App Factory
+測試應用工廠：掛載 api/routers 下所有路由、CORS 公開 read-your-writes 標頭、匯入時不建立資料庫引擎、延遲匯入 jose / passlib，以及延遲綁定的 Session Factory
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from api.main import create_app
+from shared.database import READ_YOUR_WRITES_HEADER, LazySessionFactory
+
+SRC = Path(__file__).resolve().parents[3] / "src"
+
+
+def run_isolated(code: str) -> dict:
+    """於新的直譯器執行（不受其他測試已匯入的模組影響）"""
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_create_app_mounts_all_routers():
+    paths = set(TestClient(create_app()).get("/openapi.json").json()["paths"])
+    
+    assert "/health" in paths
+    assert "/api/v1/auth/login" in paths
+    assert "/api/v1/public/merchants/{slug}/slots" in paths
+    assert "/api/v1/liff/bookings" in paths
+    assert "/api/v1/liff/bookings/{booking_id}" in paths
+    assert "/api/v1/liff/holds" in paths
+    assert "/api/v1/notifications/campaigns" in paths
+    assert "/api/v1/admin/stats" in paths
+
+
+def test_liff_routes_are_reachable():
+    client = TestClient(create_app())
+    
+    # 未認證 / 請求內容不完整，但不可是 404（路由未掛載）
+    assert client.get("/api/v1/liff/bookings").status_code in (401, 403)
+    assert client.post("/api/v1/liff/holds", json={}).status_code in (401, 403, 422)
+
+
+def test_cors_exposes_read_your_writes_header():
+    client = TestClient(create_app(router_modules=[]))
+    
+    response = client.get("/health", headers={"Origin": "https://liff.line.me"})
+    
+    assert READ_YOUR_WRITES_HEADER in response.headers["access-control-expose-headers"]
+
+
+def test_create_app_with_selected_routers():
+    paths = set(TestClient(create_app(router_modules=[])).get("/openapi.json").json()["paths"])
+    
+    assert "/health" in paths
+    assert not any(path.startswith("/api/v1/admin") for path in paths)
+
+
+def test_import_defers_engine_and_heavy_modules():
+    loaded = run_isolated(
+        "import json, sys\n"
+        "import api.main\n"
+        "app = api.main.create_app()\n"
+        "import shared.database as database\n"
+        "print(json.dumps({\n"
+        "    'engine': database._engine is not None,\n"
+        "    'jose': 'jose' in sys.modules,\n"
+        "    'passlib': 'passlib' in sys.modules,\n"
+        "}))"
+    )
+    
+    assert loaded == {"engine": False, "jose": False, "passlib": False}
+
+
+def test_lazy_session_factory_binds_on_first_call():
+    calls = []
+    
+    def engine_getter():
+        calls.append(1)
+        return create_engine("sqlite://")
+    
+    factory = LazySessionFactory(engine_getter, expire_on_commit=False)
+    assert calls == []
+    
+    with factory() as first, factory() as second:
+        assert first.execute(text("SELECT 1")).scalar() == 1
+        assert second.execute(text("SELECT 1")).scalar() == 1
+    assert calls == [1]
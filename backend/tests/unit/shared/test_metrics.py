@@ -0,0 +1,148 @@
+"""
+Shared Kernel - Unit Tests - Metrics
+測試指標收集、Prometheus 文字輸出、多 worker 快照合併與請求指標中介層
+"""
+import asyncio
+import json
+import os
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.middleware import MetricsMiddleware
+from shared.metrics import (
+    HTTP_REQUEST_DURATION,
+    MetricsRegistry,
+    count_outcomes,
+    load_peer_snapshots,
+    publish_snapshot
+)
+
+
+class TestRegistryRender:
+    """指標輸出測試"""
+    
+    def test_counter_and_gauge_render(self):
+        """✅ 測試案例：counter / gauge 以 Prometheus 文字格式輸出"""
+        registry = MetricsRegistry()
+        requests = registry.counter("app_requests_total", "請求數", ["route"])
+        in_flight = registry.gauge("app_in_flight", "處理中")
+        
+        requests.inc(route="/health")
+        requests.inc(2, route="/health")
+        in_flight.set_function(lambda: 3)
+        
+        text = registry.render()
+        
+        assert "# TYPE app_requests_total counter" in text
+        assert 'app_requests_total{route="/health"} 3' in text
+        assert "app_in_flight 3" in text
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """✅ 測試案例：histogram 分桶累積、含 +Inf / sum / count"""
+        registry = MetricsRegistry()
+        latency = registry.histogram("app_latency_seconds", "延遲", buckets=(0.1, 1.0))
+        
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value)
+        
+        text = registry.render()
+        
+        assert 'app_latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'app_latency_seconds_bucket{le="1"} 2' in text
+        assert 'app_latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "app_latency_seconds_sum 5.55" in text
+        assert "app_latency_seconds_count 3" in text
+        assert latency.count() == 3
+    
+    def test_wrong_labels_rejected(self):
+        """❌ 測試案例：標籤不符時拋出錯誤"""
+        registry = MetricsRegistry()
+        requests = registry.counter("app_requests_total", "請求數", ["route"])
+        
+        with pytest.raises(ValueError):
+            requests.inc(method="GET")
+
+
+class TestSnapshots:
+    """多 worker 快照測試"""
+    
+    def test_peer_snapshots_are_merged(self):
+        """✅ 測試案例：其他 worker 的快照與本 worker 相加"""
+        worker_a = MetricsRegistry()
+        worker_b = MetricsRegistry()
+        for registry, amount in ((worker_a, 1), (worker_b, 4)):
+            registry.counter("jobs_total", "工作數").inc(amount)
+            registry.histogram("job_seconds", "耗時", buckets=(1.0,)).observe(0.5)
+        
+        text = worker_a.render([worker_b.snapshot()])
+        
+        assert "jobs_total 5" in text
+        assert "job_seconds_count 2" in text
+    
+    def test_publish_and_load_skip_own_and_stale(self, tmp_path):
+        """✅ 測試案例：讀取快照時略過本 worker 與過期檔案"""
+        registry = MetricsRegistry()
+        registry.counter("jobs_total", "工作數").inc()
+        publish_snapshot(registry, str(tmp_path))
+        
+        peer = {"published_at": time.time(), "metrics": registry.snapshot()}
+        (tmp_path / "metrics-1.json").write_text(json.dumps(peer))
+        stale = {"published_at": time.time() - 60, "metrics": registry.snapshot()}
+        (tmp_path / "metrics-2.json").write_text(json.dumps(stale))
+        
+        snapshots = load_peer_snapshots(str(tmp_path), max_age_seconds=10)
+        
+        assert os.path.exists(tmp_path / f"metrics-{os.getpid()}.json")
+        assert len(snapshots) == 1
+
+
+class TestCountOutcomes:
+    """count_outcomes 裝飾器測試"""
+    
+    def test_async_outcomes(self):
+        """✅ 測試案例：依例外型別分類結果"""
+        registry = MetricsRegistry()
+        counter = registry.counter("create_total", "建立結果", ["outcome"])
+        
+        @count_outcomes(counter, {KeyError: "missing"})
+        async def create(error=None):
+            if error:
+                raise error
+            return "ok"
+        
+        assert asyncio.run(create()) == "ok"
+        with pytest.raises(KeyError):
+            asyncio.run(create(KeyError("x")))
+        with pytest.raises(RuntimeError):
+            asyncio.run(create(RuntimeError("x")))
+        
+        assert counter.value(outcome="success") == 1
+        assert counter.value(outcome="missing") == 1
+        assert counter.value(outcome="error") == 1
+
+
+class TestMetricsMiddleware:
+    """請求指標中介層測試"""
+    
+    def test_latency_labelled_by_route_template(self):
+        """✅ 測試案例：延遲以路由樣板與狀態碼為標籤"""
+        app = FastAPI()
+        app.add_middleware(MetricsMiddleware)
+        
+        @app.get("/metrics-test/{item_id}")
+        def get_item(item_id: int):
+            return {"id": item_id}
+        
+        client = TestClient(app)
+        labels = {"method": "GET", "route": "/metrics-test/{item_id}", "status": "200"}
+        before = HTTP_REQUEST_DURATION.count(**labels)
+        
+        client.get("/metrics-test/1")
+        client.get("/metrics-test/2")
+        client.get("/no-such-path")
+        
+        assert HTTP_REQUEST_DURATION.count(**labels) == before + 2
+        assert HTTP_REQUEST_DURATION.count(method="GET", route="unmatched", status="404") >= 1
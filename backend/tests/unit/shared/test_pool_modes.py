@@ -0,0 +1,95 @@
+"""
+Shared Kernel - Unit Tests - Connection Pool Modes
+測試連線池模式（queue / pgbouncer / null）的參數與背景連線存活檢查（使用 SQLite 檔案）
+"""
+import time
+
+import pytest
+from sqlalchemy.pool import NullPool
+
+from shared.database import (
+    POOL_MODE_NULL,
+    POOL_MODE_PGBOUNCER,
+    POOL_MODE_QUEUE,
+    InstrumentedQueuePool,
+    PoolLivenessChecker,
+    create_db_engine
+)
+from shared.metrics import DB_POOL_LIVENESS_FAILURES
+
+
+@pytest.fixture
+def sqlite_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'pool.db'}"
+
+
+class TestPoolModes:
+    """連線池模式測試"""
+    
+    def test_queue_mode_pre_pings(self, sqlite_url):
+        """✅ 測試案例：queue 模式每次借出前 pre-ping"""
+        engine = create_db_engine(sqlite_url, register_metrics=False, pool_mode=POOL_MODE_QUEUE)
+        
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert engine.pool._pre_ping is True
+        engine.dispose()
+    
+    def test_pgbouncer_mode_skips_pre_ping(self, sqlite_url):
+        """✅ 測試案例：pgbouncer 模式不 pre-ping、LIFO 借出並限制連線壽命"""
+        engine = create_db_engine(sqlite_url, register_metrics=False, pool_mode=POOL_MODE_PGBOUNCER)
+        
+        assert isinstance(engine.pool, InstrumentedQueuePool)
+        assert engine.pool._pre_ping is False
+        assert engine.pool._pool.use_lifo is True
+        assert engine.pool._recycle > 0
+        engine.dispose()
+    
+    def test_null_mode_keeps_no_connections(self, sqlite_url):
+        """✅ 測試案例：null 模式不在 client 端保留連線"""
+        engine = create_db_engine(sqlite_url, register_metrics=False, pool_mode=POOL_MODE_NULL)
+        
+        assert isinstance(engine.pool, NullPool)
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT 1").scalar() == 1
+        engine.dispose()
+
+
+class TestPoolLivenessChecker:
+    """背景連線存活檢查測試"""
+    
+    def test_check_succeeds(self, sqlite_url):
+        """✅ 測試案例：連線正常時回傳 True"""
+        engine = create_db_engine(sqlite_url, register_metrics=False, pool_mode=POOL_MODE_PGBOUNCER)
+        
+        assert PoolLivenessChecker(engine).check() is True
+        engine.dispose()
+    
+    def test_check_failure_counted(self, tmp_path):
+        """❌ 測試案例：無法連線時回傳 False 並累計失敗次數"""
+        engine = create_db_engine(
+            f"sqlite:///{tmp_path / 'missing' / 'pool.db'}",
+            register_metrics=False,
+            pool_mode=POOL_MODE_PGBOUNCER
+        )
+        before = DB_POOL_LIVENESS_FAILURES.value()
+        
+        assert PoolLivenessChecker(engine).check() is False
+        assert DB_POOL_LIVENESS_FAILURES.value() == before + 1
+        engine.dispose()
+    
+    def test_background_thread_runs_checks(self, sqlite_url):
+        """✅ 測試案例：背景執行緒定期檢查，stop() 後結束"""
+        engine = create_db_engine(sqlite_url, register_metrics=False, pool_mode=POOL_MODE_PGBOUNCER)
+        checker = PoolLivenessChecker(engine, interval_seconds=0.01)
+        calls = []
+        checker.check = lambda: calls.append(1) or True
+        
+        checker.start()
+        deadline = time.monotonic() + 2
+        while len(calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        checker.stop()
+        
+        assert len(calls) >= 2
+        assert not checker._thread.is_alive()
+        engine.dispose()
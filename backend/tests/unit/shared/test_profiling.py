@@ -0,0 +1,166 @@
+"""
+Shared Kernel - Unit Tests - Request Profiling
+測試 CPU 取樣、記憶體配置快照、剖析結果儲存與剖析中介層
+"""
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.middleware import PROFILE_ID_HEADER, PROFILE_REQUEST_HEADER, ProfilingMiddleware
+from api.routers.profiling_router import download_profile, list_profiles
+from identity.domain.auth_service import TokenService
+from shared.profiling import ProfileStore, SamplingProfiler, collapsed_stacks, profile_request
+
+
+def busy_loop(seconds: float):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path), max_profiles=3)
+
+
+class TestSamplingProfiler:
+    """CPU 取樣測試"""
+    
+    def test_samples_current_thread(self):
+        """✅ 測試案例：取樣到呼叫執行緒中的熱點函式"""
+        profiler = SamplingProfiler(interval_seconds=0.001)
+        profiler.start()
+        busy_loop(0.1)
+        report = profiler.stop()
+        
+        assert report["samples"] > 0
+        hot_functions = [label for label, _ in report["top_self"]]
+        assert any(label.endswith(":busy_loop") for label in hot_functions)
+    
+    def test_profile_request_collects_cpu_and_memory(self):
+        """✅ 測試案例：剖析結果包含 CPU、記憶體與耗時"""
+        with profile_request(interval_seconds=0.001) as profile:
+            busy_loop(0.05)
+            retained = [bytes(1024) for _ in range(200)]
+        
+        assert profile["duration_ms"] >= 50
+        assert profile["cpu"]["samples"] > 0
+        assert profile["memory"]["peak_traced_bytes"] > 0
+        assert profile["memory"]["allocations"]
+        assert len(retained) == 200
+    
+    def test_only_one_request_profiled_at_a_time(self):
+        """✅ 測試案例：剖析中時其他請求不剖析"""
+        with profile_request() as outer:
+            with profile_request() as inner:
+                pass
+        
+        assert outer is not None
+        assert inner is None
+
+
+class TestProfileStore:
+    """剖析結果儲存測試"""
+    
+    def test_keeps_most_recent_profiles(self, store):
+        """✅ 測試案例：只保留最近 max_profiles 份"""
+        ids = []
+        for i in range(5):
+            ids.append(store.save({"route": f"/r{i}", "cpu": {"samples": i}}))
+            time.sleep(0.002)
+        
+        summaries = store.list_summaries()
+        
+        assert [s["id"] for s in summaries] == list(reversed(ids[-3:]))
+        assert summaries[0]["route"] == "/r4"
+        assert store.load(ids[0]) is None
+    
+    def test_rejects_path_traversal(self, store):
+        """❌ 測試案例：非法 profile_id 拋出錯誤"""
+        with pytest.raises(ValueError):
+            store.path("../../etc/passwd")
+    
+    def test_collapsed_stacks(self):
+        """✅ 測試案例：輸出 collapsed stack 文字"""
+        profile = {"cpu": {"stacks": {"a;b": 3, "a;c": 1}}}
+        
+        assert collapsed_stacks(profile) == "a;b 3\na;c 1\n"
+
+
+class TestProfilingMiddleware:
+    """剖析中介層測試"""
+    
+    def make_client(self, store, sample_rate: float = 0.0) -> TestClient:
+        app = FastAPI()
+        app.add_middleware(ProfilingMiddleware, store=store, sample_rate=sample_rate, interval_ms=1)
+        
+        @app.get("/calendar/{staff_id}")
+        def calendar(staff_id: int, date: str = ""):
+            busy_loop(0.02)
+            return {"staff_id": staff_id}
+        
+        return TestClient(app)
+    
+    def test_admin_header_triggers_profile(self, store):
+        """✅ 測試案例：管理員帶上標頭時剖析並記錄路由與查詢參數"""
+        token = TokenService.create_access_token(user_id="admin-1", role="admin")
+        
+        response = self.make_client(store).get(
+            "/calendar/3?date=2025-10-16",
+            headers={PROFILE_REQUEST_HEADER: "1", "Authorization": f"Bearer {token}"}
+        )
+        
+        profile_id = response.headers[PROFILE_ID_HEADER]
+        profile = store.load(profile_id)
+        assert profile["route"] == "/calendar/{staff_id}"
+        assert profile["query_params"] == {"date": "2025-10-16"}
+        assert profile["status"] == 200
+        assert profile["trigger"] == "admin"
+    
+    def test_non_admin_header_ignored(self, store):
+        """❌ 測試案例：非管理員帶上標頭不會剖析"""
+        token = TokenService.create_access_token(user_id="owner-1", role="merchant_owner")
+        
+        response = self.make_client(store).get(
+            "/calendar/3",
+            headers={PROFILE_REQUEST_HEADER: "1", "Authorization": f"Bearer {token}"}
+        )
+        
+        assert PROFILE_ID_HEADER not in response.headers
+        assert store.list_summaries() == []
+    
+    def test_sampling_rate(self, store):
+        """✅ 測試案例：抽樣比例為 1 時每個請求都剖析"""
+        response = self.make_client(store, sample_rate=1.0).get("/calendar/1")
+        
+        summaries = store.list_summaries()
+        assert summaries[0]["id"] == response.headers[PROFILE_ID_HEADER]
+        assert summaries[0]["trigger"] == "sampled"
+
+
+class TestProfileEndpoints:
+    """管理員剖析端點測試"""
+    
+    def test_list_and_download(self, store):
+        """✅ 測試案例：列出摘要並下載 JSON / collapsed 格式"""
+        profile_id = store.save({"route": "/calendar", "cpu": {"samples": 2, "stacks": {"a;b": 2}}})
+        
+        summaries = asyncio.run(list_profiles(limit=10, current_user=None, store=store))
+        json_response = asyncio.run(
+            download_profile(profile_id, format="json", current_user=None, store=store)
+        )
+        collapsed_response = asyncio.run(
+            download_profile(profile_id, format="collapsed", current_user=None, store=store)
+        )
+        
+        assert summaries[0].id == profile_id
+        assert summaries[0].cpu_samples == 2
+        with open(json_response.path, encoding="utf-8") as f:
+            assert json.load(f)["route"] == "/calendar"
+        assert collapsed_response.body == b"a;b 2\n"
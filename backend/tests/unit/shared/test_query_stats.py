@@ -0,0 +1,131 @@
+"""
+Shared Kernel - Unit Tests - Query Statistics
+測試每請求查詢統計、N+1 偵測與慢查詢歸因（使用 SQLite 記憶體資料庫）
+"""
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from api.middleware import QUERY_COUNT_HEADER, QueryStatsMiddleware
+from shared.query_stats import current_query_stats, install_query_hooks, track_queries
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    install_query_hooks(engine)
+    yield engine
+    engine.dispose()
+
+
+def run_select(engine, times: int = 1):
+    with engine.connect() as conn:
+        for _ in range(times):
+            conn.execute(text("SELECT 1"))
+
+
+class TestTrackQueries:
+    """查詢統計範圍測試"""
+    
+    def test_counts_statements_in_scope(self, engine):
+        """✅ 測試案例：範圍內的語句被計數與計時"""
+        with track_queries("GET /bookings") as stats:
+            run_select(engine, times=3)
+        
+        assert stats.count == 3
+        assert stats.total_ms >= 0
+        assert stats.repeated(3) == [("SELECT 1", 3)]
+        assert current_query_stats() is None
+    
+    def test_statements_outside_scope_not_counted(self, engine):
+        """✅ 測試案例：範圍外的語句不計入"""
+        run_select(engine)
+        
+        with track_queries() as stats:
+            pass
+        
+        assert stats.count == 0
+    
+    def test_install_is_idempotent(self, engine):
+        """✅ 測試案例：重複註冊不會重複計數"""
+        install_query_hooks(engine)
+        
+        with track_queries() as stats:
+            run_select(engine)
+        
+        assert stats.count == 1
+    
+    def test_slow_query_logged_with_route(self, engine, caplog):
+        """✅ 測試案例：慢查詢 log 附上發起路由"""
+        install_query_hooks(engine, slow_threshold_ms=0)
+        
+        with caplog.at_level(logging.WARNING, logger="shared.query_stats"):
+            with track_queries("GET /merchant/bookings") as stats:
+                run_select(engine)
+        
+        assert len(stats.slow) == 1
+        assert "route=GET /merchant/bookings" in caplog.text
+        assert "SELECT 1" in caplog.text
+
+
+class TestQueryBudgetFixture:
+    """query_budget fixture 測試"""
+    
+    def test_within_budget_passes(self, engine, query_budget):
+        """✅ 測試案例：未超過預算時通過"""
+        with query_budget(max_queries=2) as stats:
+            run_select(engine)
+        
+        assert stats.count == 1
+    
+    def test_repeated_statement_fails(self, engine, query_budget):
+        """✅ 測試案例：同一語句重複超過允許次數時失敗"""
+        with pytest.raises(pytest.fail.Exception, match="N\\+1"):
+            with query_budget(max_repeats=2):
+                run_select(engine, times=3)
+    
+    def test_over_budget_fails(self, engine, query_budget):
+        """✅ 測試案例：查詢總數超過預算時失敗"""
+        with pytest.raises(pytest.fail.Exception, match="超過預算"):
+            with query_budget(max_queries=1, max_repeats=5):
+                run_select(engine, times=2)
+
+
+class TestQueryStatsMiddleware:
+    """查詢統計中介層測試"""
+    
+    def make_client(self, engine, queries_per_request: int) -> TestClient:
+        app = FastAPI()
+        app.add_middleware(QueryStatsMiddleware, n_plus_one_threshold=3)
+        
+        @app.get("/items/{item_id}")
+        def get_item(item_id: int):
+            run_select(engine, times=queries_per_request)
+            return {"id": item_id}
+        
+        return TestClient(app)
+    
+    def test_response_includes_query_headers(self, engine):
+        """✅ 測試案例：回應標頭包含查詢次數與耗時"""
+        response = self.make_client(engine, queries_per_request=2).get("/items/1")
+        
+        assert response.status_code == 200
+        assert response.headers[QUERY_COUNT_HEADER] == "2"
+        assert "X-DB-Query-Time-Ms" in response.headers
+    
+    def test_n_plus_one_logged_with_route_template(self, engine, caplog):
+        """✅ 測試案例：重複語句達門檻時以路由樣板記錄警告"""
+        client = self.make_client(engine, queries_per_request=3)
+        
+        with caplog.at_level(logging.WARNING, logger="api.middleware"):
+            client.get("/items/42")
+        
+        assert "Possible N+1 on GET /items/{item_id}: 3x SELECT 1" in caplog.text
@@ -0,0 +1,255 @@
+"""
+Shared Kernel - Unit Tests - Rate Limiting & Admission Control
+測試令牌桶（補充 / 突發 / Retry-After）、多維度限流、連線池等待衰減平均與限流 / 准入中介層
+"""
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.middleware import (
+    RATE_LIMIT_REMAINING_HEADER,
+    AdmissionControlMiddleware,
+    RateLimitMiddleware
+)
+from identity.domain.auth_service import TokenService
+from shared.rate_limit import (
+    AdmissionController,
+    InMemoryRateLimitBackend,
+    PoolWaitTracker,
+    RateLimitRule,
+    TokenBucketLimiter
+)
+
+
+class FakeClock:
+    """可手動推進的時鐘"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestInMemoryRateLimitBackend:
+    """行程內令牌桶測試"""
+    
+    def test_burst_then_reject(self, clock):
+        """❌ 測試案例：突發用完後拒絕，並回傳需等待的秒數"""
+        backend = InMemoryRateLimitBackend(clock=clock)
+        
+        decisions = [backend.take("ip:1.2.3.4", rate_per_second=1, capacity=3) for _ in range(4)]
+        
+        assert [d.allowed for d in decisions] == [True, True, True, False]
+        assert decisions[2].remaining == 0
+        assert decisions[3].retry_after_seconds == pytest.approx(1.0)
+    
+    def test_refill_over_time(self, clock):
+        """✅ 測試案例：依速率補充令牌，且不超過容量"""
+        backend = InMemoryRateLimitBackend(clock=clock)
+        for _ in range(3):
+            backend.take("ip:1.2.3.4", rate_per_second=1, capacity=3)
+        
+        clock.advance(1.5)
+        assert backend.take("ip:1.2.3.4", rate_per_second=1, capacity=3).allowed is True
+        assert backend.take("ip:1.2.3.4", rate_per_second=1, capacity=3).allowed is False
+        
+        clock.advance(60)
+        assert backend.take("ip:1.2.3.4", rate_per_second=1, capacity=3).remaining == 2
+    
+    def test_keys_are_independent_and_evicted(self, clock):
+        """✅ 測試案例：各 key 獨立；超過上限時丟棄最久未更新的 key"""
+        backend = InMemoryRateLimitBackend(max_keys=4, clock=clock)
+        
+        for i in range(5):
+            clock.advance(1)
+            assert backend.take(f"ip:{i}", rate_per_second=1, capacity=1).allowed is True
+        
+        assert len(backend._buckets) <= 4
+        assert "ip:4" in backend._buckets
+
+
+class TestTokenBucketLimiter:
+    """多維度限流測試"""
+    
+    def test_any_scope_exhausted_rejects(self, clock):
+        """❌ 測試案例：同一商家所有客戶合計超過上限時，以 merchant 維度拒絕"""
+        limiter = TokenBucketLimiter(
+            InMemoryRateLimitBackend(clock=clock),
+            {"ip": RateLimitRule(60, 10), "merchant": RateLimitRule(60, 2)}
+        )
+        
+        results = [limiter.check({"ip": f"10.0.0.{i}", "merchant": "nail-shop"}) for i in range(3)]
+        
+        assert [scope for scope, _ in results] == [None, None, "merchant"]
+    
+    def test_missing_identity_skipped(self, clock):
+        """✅ 測試案例：未登入時略過 user 維度"""
+        limiter = TokenBucketLimiter(
+            InMemoryRateLimitBackend(clock=clock),
+            {"ip": RateLimitRule(60, 5), "user": RateLimitRule(60, 1)}
+        )
+        
+        for _ in range(3):
+            limited_scope, decision = limiter.check({"ip": "10.0.0.1", "user": None})
+            assert limited_scope is None
+        
+        assert decision.remaining == 2
+
+
+class TestAdmissionControl:
+    """連線池等待追蹤與准入控制測試"""
+    
+    def test_wait_average_decays_without_samples(self, clock):
+        """✅ 測試案例：沒有新樣本時等待平均隨時間衰減"""
+        tracker = PoolWaitTracker(half_life_seconds=5, clock=clock)
+        for _ in range(50):
+            tracker.observe(0.5)
+        
+        assert tracker.current() == pytest.approx(0.5, rel=0.01)
+        
+        clock.advance(5)
+        assert tracker.current() == pytest.approx(0.25, rel=0.01)
+    
+    def test_single_outlier_does_not_shed(self, clock):
+        """✅ 測試案例：單次離群等待不觸發拒絕"""
+        tracker = PoolWaitTracker(clock=clock)
+        controller = AdmissionController(tracker, shed_wait_seconds=0.1)
+        
+        tracker.observe(0.3)
+        
+        assert controller.should_shed("GET", "/api/v1/public/merchants/nail-shop/slots") is False
+    
+    def test_sheds_only_low_priority(self, clock):
+        """✅ 測試案例：壅塞時只拒絕公開查詢，寫入與其他端點放行"""
+        tracker = PoolWaitTracker(clock=clock)
+        controller = AdmissionController(tracker, shed_wait_seconds=0.1)
+        for _ in range(20):
+            tracker.observe(0.5)
+        
+        assert controller.should_shed("GET", "/api/v1/public/merchants/nail-shop/slots") is True
+        assert controller.should_shed("POST", "/api/v1/public/merchants/nail-shop/slots") is False
+        assert controller.should_shed("GET", "/api/v1/liff/bookings") is False
+
+
+class TestMiddleware:
+    """限流 / 准入中介層測試"""
+    
+    def make_client(self, limiter=None, controller=None) -> TestClient:
+        app = FastAPI()
+        if controller is not None:
+            app.add_middleware(AdmissionControlMiddleware, controller=controller)
+        if limiter is not None:
+            app.add_middleware(RateLimitMiddleware, limiter=limiter, trust_forwarded_for=True)
+        
+        @app.get("/api/v1/public/merchants/{slug}/slots")
+        def slots(slug: str):
+            return []
+        
+        @app.get("/health")
+        def health():
+            return {"status": "healthy"}
+        
+        @app.post("/api/v1/billing/webhooks/stripe")
+        def stripe_webhook():
+            return {"received": True}
+        
+        @app.post("/api/v1/notifications/webhooks/line/{merchant_id}")
+        def line_webhook(merchant_id: str):
+            return {"status": "received"}
+        
+        return TestClient(app)
+    
+    def test_rate_limited_returns_429(self, clock):
+        """❌ 測試案例：超過限制回 429 + Retry-After；/health 不受限"""
+        limiter = TokenBucketLimiter(InMemoryRateLimitBackend(clock=clock), {"ip": RateLimitRule(60, 2)})
+        client = self.make_client(limiter=limiter)
+        
+        first = client.get("/api/v1/public/merchants/nail-shop/slots")
+        client.get("/api/v1/public/merchants/nail-shop/slots")
+        limited = client.get("/api/v1/public/merchants/nail-shop/slots")
+        
+        assert first.headers[RATE_LIMIT_REMAINING_HEADER] == "1"
+        assert limited.status_code == 429
+        assert limited.headers["Retry-After"] == "1"
+        assert limited.json() == {"detail": "請求過於頻繁，請稍後再試"}
+        assert client.get("/health").status_code == 200
+    
+    @pytest.mark.parametrize("path", [
+        "/api/v1/billing/webhooks/stripe",
+        "/api/v1/notifications/webhooks/line/00000000-0000-0000-0000-000000000001",
+    ])
+    def test_webhooks_are_not_limited(self, clock, path):
+        """✅ 測試案例：Stripe / LINE webhook（簽章驗證）不受每 IP 限流"""
+        limiter = TokenBucketLimiter(InMemoryRateLimitBackend(clock=clock), {"ip": RateLimitRule(60, 60)})
+        client = self.make_client(limiter=limiter)
+        
+        statuses = {client.post(path).status_code for _ in range(75)}
+        
+        assert statuses == {200}
+        assert limiter.backend._buckets == {}
+    
+    def test_identities_from_forwarded_for_token_and_slug(self, clock):
+        """✅ 測試案例：依 X-Forwarded-For、JWT sub 與商家 slug 分別限流"""
+        limiter = TokenBucketLimiter(
+            InMemoryRateLimitBackend(clock=clock),
+            {"ip": RateLimitRule(60, 5), "user": RateLimitRule(60, 1), "merchant": RateLimitRule(60, 5)}
+        )
+        client = self.make_client(limiter=limiter)
+        token = TokenService.create_access_token(user_id="customer-1", role="customer")
+        headers = {"Authorization": f"Bearer {token}"}
+        
+        assert client.get("/api/v1/public/merchants/a/slots", headers=headers).status_code == 200
+        assert client.get("/api/v1/public/merchants/a/slots", headers=headers).status_code == 429
+        assert client.get(
+            "/api/v1/public/merchants/a/slots", headers={"X-Forwarded-For": "10.0.0.9, 172.16.0.1"}
+        ).status_code == 200
+        
+        assert set(limiter.backend._buckets) == {
+            "ip:testclient", "ip:10.0.0.9", "user:customer-1", "merchant:a"
+        }
+    
+    @pytest.mark.parametrize("blocking", [True, False])
+    def test_blocking_backend_runs_off_event_loop(self, clock, blocking):
+        """✅ 測試案例：會阻塞的後端（Redis）於執行緒池呼叫，記憶體後端在 event loop 上直接呼叫"""
+        threads = []
+        
+        class RecordingBackend(InMemoryRateLimitBackend):
+            def take(self, key, rate_per_second, capacity, cost=1):
+                threads.append(threading.get_ident())
+                return super().take(key, rate_per_second, capacity, cost)
+        
+        backend = RecordingBackend(clock=clock)
+        backend.blocking = blocking
+        client = self.make_client(limiter=TokenBucketLimiter(backend, {"ip": RateLimitRule(60, 5)}))
+        
+        @client.app.get("/loop-thread")
+        async def loop_thread():
+            return threading.get_ident()
+        
+        loop_ident = client.get("/loop-thread").json()
+        
+        assert (threads[-1] != loop_ident) is blocking
+    
+    def test_admission_control_returns_503(self, clock):
+        """❌ 測試案例：連線池壅塞時公開查詢回 503 + Retry-After"""
+        tracker = PoolWaitTracker(clock=clock)
+        for _ in range(20):
+            tracker.observe(1.0)
+        client = self.make_client(controller=AdmissionController(tracker, retry_after_seconds=3))
+        
+        response = client.get("/api/v1/public/merchants/nail-shop/slots")
+        
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        assert client.get("/health").status_code == 200
@@ -0,0 +1,99 @@
+"""
+Shared Kernel - Unit Tests - Read Session Routing
+測試唯讀 Session 路由：唯讀庫優先、read-your-writes、唯讀庫失敗改走主庫（使用兩個 SQLite 檔案模擬主庫 / 唯讀庫）
+"""
+import time
+
+import pytest
+from fastapi import Response
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from shared.database import READ_YOUR_WRITES_HEADER, ReadSessionRouter
+
+
+def make_factory(url: str, source: str = None):
+    engine = create_engine(url)
+    if source is not None:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE marker (source TEXT)"))
+            conn.execute(text("INSERT INTO marker VALUES (:source)"), {"source": source})
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def make_request(headers: dict = None) -> Request:
+    headers = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def read_source(db) -> str:
+    return db.execute(text("SELECT source FROM marker")).scalar()
+
+
+@pytest.fixture
+def primary(tmp_path):
+    return make_factory(f"sqlite:///{tmp_path / 'primary.db'}", "primary")
+
+
+@pytest.fixture
+def replica(tmp_path):
+    return make_factory(f"sqlite:///{tmp_path / 'replica.db'}", "replica")
+
+
+class TestReadSessionRouter:
+    """唯讀 Session 路由測試"""
+    
+    def test_reads_go_to_replica(self, primary, replica):
+        """✅ 測試案例：預設走唯讀庫"""
+        router = ReadSessionRouter(primary, replica)
+        
+        db = router.open(make_request())
+        
+        assert read_source(db) == "replica"
+        assert db.info["read_target"] == "replica"
+        db.close()
+    
+    def test_no_replica_uses_primary(self, primary):
+        """✅ 測試案例：未設定唯讀庫時走主庫"""
+        router = ReadSessionRouter(primary, None)
+        
+        db = router.open(make_request())
+        
+        assert read_source(db) == "primary"
+        db.close()
+    
+    def test_recent_write_reads_primary(self, primary, replica):
+        """✅ 測試案例：客戶剛寫入時改走主庫（read-your-writes）"""
+        router = ReadSessionRouter(primary, replica, read_your_writes_seconds=10)
+        response = Response()
+        
+        router.remember_write(response)
+        
+        primary_until = response.headers[READ_YOUR_WRITES_HEADER]
+        assert "set-cookie" not in response.headers
+        
+        db = router.open(make_request({READ_YOUR_WRITES_HEADER: primary_until}))
+        assert read_source(db) == "primary"
+        db.close()
+    
+    def test_expired_write_window_reads_replica(self, primary, replica):
+        """✅ 測試案例：寫入時間窗過後回到唯讀庫；無效標頭視為無"""
+        router = ReadSessionRouter(primary, replica)
+        
+        for value in (str(int(time.time()) - 1), "not-a-number"):
+            db = router.open(make_request({READ_YOUR_WRITES_HEADER: value}))
+            assert read_source(db) == "replica"
+            db.close()
+    
+    def test_replica_failure_falls_back_to_primary(self, primary, tmp_path):
+        """✅ 測試案例：唯讀庫無法連線時改走主庫，並於重試時間內不再嘗試"""
+        broken_replica = make_factory(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        router = ReadSessionRouter(primary, broken_replica, replica_retry_after_seconds=60)
+        
+        db = router.open(make_request())
+        assert read_source(db) == "primary"
+        assert db.info["read_target"] == "primary"
+        db.close()
+        
+        assert router._use_replica(make_request()) is False
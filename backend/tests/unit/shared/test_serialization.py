@@ -0,0 +1,120 @@
+"""
+Shared Kernel - Unit Tests - Serialization
+測試 FastJSONResponse：輸出與 jsonable_encoder + JSONResponse 相同（datetime、Decimal、dataclass、Enum、中文）、預約列表資料列轉換，
+以及 PydanticJSONResponse（LIFF 預約）輸出與 response_model 驗證後序列化相同
+"""
+import json
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from pydantic import TypeAdapter
+
+from api.routers.merchant_router import _booking_row_to_dict
+from booking.application.dtos import BookingResponse
+from booking.domain.models import Booking, BookingItem, BookingStatus, Customer
+from booking.domain.read_models import BookingListRow
+from booking.domain.value_objects import Duration, Money
+from booking.infrastructure.routers.liff_router import _booking_to_dict
+from shared.serialization import FastJSONResponse, PydanticJSONResponse, dumps
+
+
+TZ = timezone(timedelta(hours=8))
+
+
+def legacy_body(content) -> bytes:
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+@pytest.mark.parametrize("value", [
+    datetime(2025, 10, 28, 14, 0, tzinfo=TZ),
+    datetime(2025, 10, 28, 6, 0, 30, 123456, tzinfo=timezone.utc),
+    date(2025, 10, 28),
+    Decimal("800"),
+    Decimal("800.00"),
+    Decimal("650.50"),
+    BookingStatus.CONFIRMED,
+    Customer(line_user_id="U123", name="王小明"),
+    {"name": "凝膠指甲", "option_ids": [1, 2], "notes": None},
+])
+def test_output_matches_jsonable_encoder(value):
+    assert json.loads(FastJSONResponse([value]).body) == json.loads(legacy_body([value]))
+
+
+def test_non_ascii_is_not_escaped():
+    assert dumps({"name": "王小明"}) == '{"name":"王小明"}'.encode()
+
+
+def test_unsupported_type_raises():
+    with pytest.raises(TypeError):
+        dumps(object())
+
+
+def test_booking_row_to_dict():
+    row = BookingListRow(
+        id="booking-001",
+        merchant_id="merchant-001",
+        staff_id=1,
+        status="confirmed",
+        start_at=datetime(2025, 10, 28, 14, 0, tzinfo=TZ),
+        end_at=datetime(2025, 10, 28, 15, 0, tzinfo=TZ),
+        customer={"line_user_id": "U123", "name": "王小明"},
+        items=[{"service_id": 1, "service_name": "凝膠指甲", "service_price": 800, "service_duration": 60}],
+        total_price_amount=Decimal("800.00"),
+        total_price_currency="TWD",
+        total_duration_minutes=60,
+        notes=None,
+        created_at=None
+    )
+    
+    body = json.loads(FastJSONResponse([_booking_row_to_dict(row)]).body)
+    
+    assert body == [{
+        "id": "booking-001",
+        "merchant_id": "merchant-001",
+        "customer": {"line_user_id": "U123", "name": "王小明"},
+        "staff_id": 1,
+        "start_at": "2025-10-28T14:00:00+08:00",
+        "end_at": "2025-10-28T15:00:00+08:00",
+        "status": "confirmed",
+        "total_price": 800.0,
+        "total_duration": 60,
+        "notes": None,
+        "created_at": None,
+        "items": [{
+            "service_id": 1,
+            "service_name": "凝膠指甲",
+            "service_price": 800.0,
+            "service_duration": 60,
+            "option_ids": [],
+            "option_names": [],
+        }],
+    }]
+
+
+def test_pydantic_response_matches_validated_response_model():
+    booking = Booking.create_new(
+        merchant_id="123e4567-e89b-12d3-a456-426614174000",
+        customer=Customer(line_user_id="U123", name="王小明", phone="0912345678"),
+        staff_id=1,
+        start_at=datetime(2025, 10, 28, 14, 0, tzinfo=TZ),
+        items=[BookingItem(
+            service_id=1,
+            service_name="凝膠指甲",
+            service_price=Money(Decimal("800")),
+            service_duration=Duration(60),
+            option_ids=[2],
+            option_names=["法式"],
+            option_prices=[Money(Decimal("200.50"))],
+            option_durations=[Duration(15)]
+        )]
+    )
+    adapter = TypeAdapter(list[BookingResponse])
+    content = [_booking_to_dict(booking)]
+    # response_model 路徑：先驗證再序列化
+    validated = adapter.validate_python(content)
+    
+    assert PydanticJSONResponse(content).body == adapter.dump_json(validated)
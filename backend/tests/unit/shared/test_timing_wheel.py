@@ -0,0 +1,59 @@
+"""
+Shared Kernel - Unit Tests - Timing Wheel
+測試階層式時間輪（跨層下放後準時到期、改期與取消、已到期與超出範圍）
+"""
+import random
+
+import pytest
+
+from shared.timing_wheel import TimingWheel
+
+
+class TestTimingWheel:
+    """時間輪測試"""
+    
+    def test_items_fire_at_deadline_across_levels(self):
+        """✅ 測試案例：各層的項目都在到期的 tick 取出，且依到期順序"""
+        wheel = TimingWheel(tick_seconds=1, wheel_size=8, levels=3, start=0)
+        rng = random.Random(7)
+        deadlines = {f"item-{i}": rng.randint(1, 500) for i in range(200)}
+        for key, deadline in deadlines.items():
+            assert wheel.add(key, deadline, key)
+        
+        fired = {}
+        for now in range(1, 512):
+            for key in wheel.advance(now):
+                fired[key] = now
+        
+        assert fired == deadlines
+        assert len(wheel) == 0
+    
+    def test_advance_skips_idle_ticks(self):
+        """✅ 測試案例：一次推進多個 tick 時取出期間所有到期項目"""
+        wheel = TimingWheel(tick_seconds=0.5, wheel_size=60, levels=3, start=100.0)
+        wheel.add("a", 130.0, "a")
+        wheel.add("b", 3700.0, "b")
+        wheel.add("c", 100.9, "c")
+        
+        assert wheel.advance(4000.0) == ["c", "a", "b"]
+    
+    def test_reschedule_and_remove(self):
+        """✅ 測試案例：同 key 再次新增視為改期；取消後不再到期"""
+        wheel = TimingWheel(tick_seconds=1, wheel_size=60, levels=2, start=0)
+        wheel.add("a", 10, "first")
+        wheel.add("a", 20, "second")
+        wheel.add("b", 15, "b")
+        
+        assert wheel.remove("b")
+        assert not wheel.remove("b")
+        assert wheel.advance(19) == []
+        assert wheel.advance(20) == ["second"]
+    
+    def test_due_and_out_of_range(self):
+        """❌ 測試案例：已到期時不放入；超出範圍時拋出 ValueError"""
+        wheel = TimingWheel(tick_seconds=1, wheel_size=10, levels=2, start=50)
+        
+        assert not wheel.add("past", 50, "past")
+        assert "past" not in wheel
+        with pytest.raises(ValueError):
+            wheel.add("far", 50 + wheel.span_seconds + 10, "far")
@@ -0,0 +1,194 @@
+"""
+Shared Kernel - Unit Tests - Tracing
+測試 span 父子關係、停用時 no-op、OTLP/JSON 輸出、p50 / p99 彙總與預約交易步驟 span
+"""
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from booking.application.services import BookingService
+from booking.domain.models import Customer
+from shared.tracing import (
+    FileSpanExporter,
+    STATUS_CODE_ERROR,
+    Tracer,
+    current_span,
+    iter_exported_spans,
+    summarize_spans,
+    traced,
+    tracer
+)
+
+
+TZ = timezone(timedelta(hours=8))
+
+
+@pytest.fixture
+def span_file(tmp_path):
+    return str(tmp_path / "spans.jsonl")
+
+
+@pytest.fixture
+def enabled_tracer(span_file):
+    """啟用全局 tracer 並輸出至暫存檔"""
+    original = (tracer.enabled, tracer.exporter)
+    tracer.enabled = True
+    tracer.exporter = FileSpanExporter(span_file)
+    yield tracer
+    tracer.enabled, tracer.exporter = original
+
+
+class FakeBookingRepository:
+    """只記錄 save 的 Booking Repository"""
+    
+    def save(self, booking):
+        return booking
+
+
+class FakeBookingLockRepository:
+    """無重疊的 BookingLock Repository"""
+    
+    def find_overlapping_locks(self, merchant_id, staff_id, start_at, end_at):
+        return []
+    
+    def create_lock(self, lock):
+        lock.id = 1
+        return lock
+    
+    def link_to_booking(self, lock_id, booking_id):
+        pass
+
+
+class TestTracer:
+    """Tracer 測試"""
+    
+    def test_disabled_tracer_is_noop(self, span_file):
+        """✅ 測試案例：停用時不產生 span、不寫檔"""
+        disabled = Tracer(enabled=False, exporter=FileSpanExporter(span_file))
+        
+        with disabled.span("work") as span:
+            span.set_attribute("key", "value")
+            assert current_span() is None
+        
+        with pytest.raises(FileNotFoundError):
+            list(iter_exported_spans(span_file))
+    
+    def test_nested_spans_share_trace(self, span_file):
+        """✅ 測試案例：子 span 繼承 trace_id 並指向父 span"""
+        local = Tracer(enabled=True, exporter=FileSpanExporter(span_file))
+        
+        with local.span("parent") as parent:
+            with local.span("child", staff_id=3) as child:
+                assert current_span() is child
+            assert current_span() is parent
+        
+        spans = {span["name"]: span for span in iter_exported_spans(span_file)}
+        assert spans["child"]["traceId"] == spans["parent"]["traceId"]
+        assert spans["child"]["parentSpanId"] == spans["parent"]["spanId"]
+        assert "parentSpanId" not in spans["parent"]
+        assert {"key": "staff_id", "value": {"intValue": "3"}} in spans["child"]["attributes"]
+    
+    def test_exports_one_otlp_request_per_root_span(self, span_file):
+        """✅ 測試案例：根 span 結束時輸出一行 OTLP/JSON"""
+        local = Tracer(enabled=True, exporter=FileSpanExporter(span_file, service_name="test-api"))
+        
+        for _ in range(2):
+            with local.span("root"):
+                with local.span("step"):
+                    pass
+        
+        with open(span_file, encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f]
+        
+        assert len(requests) == 2
+        resource_spans = requests[0]["resourceSpans"][0]
+        assert resource_spans["resource"]["attributes"][0] == {
+            "key": "service.name", "value": {"stringValue": "test-api"}
+        }
+        assert [s["name"] for s in resource_spans["scopeSpans"][0]["spans"]] == ["step", "root"]
+    
+    def test_exception_marks_span_error(self, span_file):
+        """✅ 測試案例：例外時 span 狀態為 ERROR 並記錄例外型別"""
+        local = Tracer(enabled=True, exporter=FileSpanExporter(span_file))
+        
+        with pytest.raises(ValueError):
+            with local.span("failing"):
+                raise ValueError("boom")
+        
+        span = next(iter_exported_spans(span_file))
+        assert span["status"] == {"code": STATUS_CODE_ERROR, "message": "boom"}
+    
+    def test_traced_decorator(self, enabled_tracer, span_file):
+        """✅ 測試案例：@traced 同步 / 非同步函式皆產生 span"""
+        @traced("sync_step")
+        def sync_step():
+            return 1
+        
+        @traced()
+        async def async_step():
+            return sync_step() + 1
+        
+        assert asyncio.run(async_step()) == 2
+        
+        names = [span["name"] for span in iter_exported_spans(span_file)]
+        assert names == ["sync_step", async_step.__wrapped__.__qualname__]
+
+
+class TestSummarizeSpans:
+    """p50 / p99 彙總測試"""
+    
+    def test_percentiles_per_span_name(self):
+        """✅ 測試案例：依名稱計算 nearest-rank p50 / p99"""
+        spans = [
+            {"name": "save", "startTimeUnixNano": "0", "endTimeUnixNano": str(ms * 1_000_000)}
+            for ms in range(1, 101)
+        ]
+        spans.append({
+            "name": "link", "startTimeUnixNano": "0", "endTimeUnixNano": "2000000",
+            "status": {"code": STATUS_CODE_ERROR}
+        })
+        
+        summaries = {summary["name"]: summary for summary in summarize_spans(spans)}
+        
+        assert summaries["save"]["count"] == 100
+        assert summaries["save"]["p50_ms"] == 50
+        assert summaries["save"]["p99_ms"] == 99
+        assert summaries["save"]["max_ms"] == 100
+        assert summaries["link"]["errors"] == 1
+
+
+class TestBookingTransactionSpans:
+    """預約交易步驟 span 測試"""
+    
+    def test_create_booking_emits_step_spans(self, enabled_tracer, span_file):
+        """✅ 測試案例：建立預約時每個步驟各有一個 span，且掛在 create_booking 之下"""
+        service = BookingService(FakeBookingRepository(), FakeBookingLockRepository())
+        
+        asyncio.run(
+            service.create_booking(
+                merchant_id="merchant-1",
+                customer=Customer(line_user_id="U123", name="王小明"),
+                staff_id=1,
+                start_at=datetime(2025, 10, 16, 10, 0, tzinfo=TZ),
+                items_data=[{"service_id": 1, "option_ids": []}]
+            )
+        )
+        
+        spans = {span["name"]: span for span in iter_exported_spans(span_file)}
+        root = spans["BookingService.create_booking"]
+        steps = [name for name in spans if name.startswith("BookingService.create_booking.")]
+        
+        assert steps == [
+            "BookingService.create_booking.merchant_check",
+            "BookingService.create_booking.subscription_check",
+            "BookingService.create_booking.catalog_validation",
+            "BookingService.create_booking.overlap_check",
+            "BookingService.create_booking.lock_insert",
+            "BookingService.create_booking.save",
+            "BookingService.create_booking.link_lock",
+            "BookingService.create_booking.publish_event",
+            "BookingService.create_booking.notify",
+        ]
+        assert all(spans[name]["parentSpanId"] == root["spanId"] for name in steps)
@@ -0,0 +1,133 @@
+"""
+Shared Kernel - Unit Tests - Unit of Work
+測試識別映射與延後 flush 行為（使用 SQLite 記憶體資料庫）
+"""
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, event
+from sqlalchemy.orm import Session, declarative_base
+
+from shared.unit_of_work import UnitOfWork
+
+
+LocalBase = declarative_base()
+
+
+class ItemORM(LocalBase):
+    __tablename__ = "uow_items"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50))
+
+
+class Item:
+    """測試用聚合"""
+    
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    LocalBase.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def statements(engine):
+    """記錄實際送出的 SQL"""
+    executed = []
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement.split()[0].upper())
+    
+    return executed
+
+
+class TestUnitOfWork:
+    """UnitOfWork 測試"""
+    
+    def test_for_session_returns_shared_instance(self, engine):
+        """✅ 測試案例：同一 Session 共用同一個 UnitOfWork"""
+        session = Session(engine)
+        
+        assert UnitOfWork.for_session(session) is UnitOfWork.for_session(session)
+        assert UnitOfWork.for_session(Session(engine)) is not UnitOfWork.for_session(session)
+    
+    def test_register_new_defers_insert_until_commit(self, engine, statements):
+        """✅ 測試案例：新增聚合延後至 commit 才 INSERT"""
+        session = Session(engine)
+        uow = UnitOfWork.for_session(session)
+        item = Item(1, "Gel Basic")
+        
+        uow.register_new(item, ItemORM(id=1, name="Gel Basic"))
+        
+        assert "INSERT" not in statements
+        assert uow.has_pending_changes
+        assert uow.get(Item, 1) is item
+        
+        uow.commit()
+        
+        assert statements.count("INSERT") == 1
+        assert not uow.has_pending_changes
+        # commit 後識別映射仍保留，不需重新查詢
+        assert uow.get(Item, 1) is item
+    
+    def test_register_clean_keeps_identity(self, engine):
+        """✅ 測試案例：重複登記同一聚合時回傳既有實例"""
+        session = Session(engine)
+        uow = UnitOfWork.for_session(session)
+        first = Item(1, "A")
+        orm = ItemORM(id=1, name="A")
+        
+        assert uow.register_clean(first, orm) is first
+        assert uow.register_clean(Item(1, "A"), orm) is first
+        assert uow.get_orm(Item, 1) is orm
+    
+    def test_dirty_changes_written_once_at_commit(self, engine, statements):
+        """✅ 測試案例：變更延後至 commit 時一次 UPDATE"""
+        session = Session(engine)
+        session.add(ItemORM(id=1, name="A"))
+        session.commit()
+        statements.clear()
+        
+        uow = UnitOfWork.for_session(session)
+        orm = session.get(ItemORM, 1)
+        item = uow.register_clean(Item(orm.id, orm.name), orm)
+        
+        for name in ("B", "C"):
+            item.name = name
+            orm.name = item.name
+            uow.register_dirty(item)
+        
+        assert "UPDATE" not in statements
+        uow.commit()
+        assert statements.count("UPDATE") == 1
+    
+    def test_rollback_clears_identity_map(self, engine):
+        """✅ 測試案例：回滾後捨棄識別映射"""
+        session = Session(engine)
+        uow = UnitOfWork.for_session(session)
+        uow.register_new(Item(1, "A"), ItemORM(id=1, name="A"))
+        
+        uow.rollback()
+        
+        assert uow.get(Item, 1) is None
+        assert not uow.has_pending_changes
+    
+    def test_rekey_after_generated_id(self, engine):
+        """✅ 測試案例：資料庫生成 ID 後更新識別映射鍵"""
+        session = Session(engine)
+        uow = UnitOfWork.for_session(session)
+        item = Item(0, "A")
+        orm = ItemORM(name="A")
+        uow.register_new(item, orm)
+        
+        uow.flush()
+        item.id = orm.id
+        uow.rekey(item, 0)
+        
+        assert uow.get(Item, 0) is None
+        assert uow.get(Item, item.id) is item
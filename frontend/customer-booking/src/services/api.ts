@@ -1,5 +1,8 @@
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
 
+// read-your-writes：寫入後後端回應此標頭（epoch 秒），到期前的請求帶回，讓查詢改走主庫
+const PRIMARY_UNTIL_HEADER = 'X-DB-Primary-Until';
+
 // === 後端 DTO 類型定義 ===
 
 interface MerchantInfo {
@@ -78,6 +81,7 @@ class CustomerApiService {
   private merchantSlug: string | null = null;
   private merchantId: string | null = null;
   private token: string | null = null;
+  private primaryUntil: string | null = null;
 
   constructor() {
     this.baseURL = API_BASE_URL;
@@ -171,6 +175,11 @@ class CustomerApiService {
       headers['Authorization'] = `Bearer ${this.token}`;
     }
 
+    // 剛寫入過：帶回標頭，讀得到自己的寫入
+    if (this.primaryUntil && Date.now() / 1000 < Number(this.primaryUntil)) {
+      headers[PRIMARY_UNTIL_HEADER] = this.primaryUntil;
+    }
+
     const config: RequestInit = {
       ...options,
       headers,
@@ -178,6 +187,11 @@ class CustomerApiService {
 
     try {
       const response = await fetch(url, config);
+
+      const primaryUntil = response.headers.get(PRIMARY_UNTIL_HEADER);
+      if (primaryUntil) {
+        this.primaryUntil = primaryUntil;
+      }
       
       if (!response.ok) {
         if (response.status === 401 && requiresAuth) {